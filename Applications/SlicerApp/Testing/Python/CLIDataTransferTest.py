@@ -0,0 +1,165 @@
+from __future__ import print_function
+import os
+import unittest
+from __main__ import vtk, qt, ctk, slicer
+import slicer.benchmark
+from slicer.ScriptedLoadableModule import *
+
+#
+# CLIDataTransferTest
+#
+
+class CLIDataTransferTest(ScriptedLoadableModule):
+  def __init__(self, parent):
+    parent.title = "CLIDataTransferTest"
+    parent.categories = ["Testing.TestCases"]
+    parent.dependencies = ["ThresholdScalarVolume"]
+    parent.contributors = ["Slicer Community"]
+    parent.helpText = """
+    This is a self test that compares passing volumes to a CLI through temporary files
+    and through shared memory.
+    """
+    parent.acknowledgementText = """""" # replace with organization, grant and thanks.
+    self.parent = parent
+
+    # Add this test to the SelfTest module's list for discovery when the module
+    # is created.  Since this module may be discovered before SelfTests itself,
+    # create the list if it doesn't already exist.
+    try:
+      slicer.selfTests
+    except AttributeError:
+      slicer.selfTests = {}
+    slicer.selfTests['CLIDataTransferTest'] = self.runTest
+
+  def runTest(self):
+    tester = CLIDataTransferTestTest()
+    tester.runTest()
+
+#
+# CLIDataTransferTestWidget
+#
+
+class CLIDataTransferTestWidget(ScriptedLoadableModuleWidget):
+
+  def setup(self):
+    ScriptedLoadableModuleWidget.setup(self)
+
+#
+# Benchmarks
+#
+
+def setUpThresholdBenchmark():
+  """Return the benchmark state: MRHead as input volume and an empty output volume."""
+  import SampleData
+  inputVolume = SampleData.downloadSample("MRHead")
+  if not inputVolume:
+    raise RuntimeError("Failed to download MRHead sample data")
+  outputVolume = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+  return {'inputVolume': inputVolume, 'outputVolume': outputVolume}
+
+def tearDownThresholdBenchmark(state):
+  slicer.mrmlScene.RemoveNode(state['inputVolume'])
+  slicer.mrmlScene.RemoveNode(state['outputVolume'])
+
+def runThreshold(state, sharedMemoryTransfer):
+  cliParams = {
+    'InputVolume': state['inputVolume'].GetID(),
+    'OutputVolume': state['outputVolume'].GetID(),
+    'ThresholdValue' : 100,
+    'ThresholdType' : 'Above'
+    }
+  cliNode = slicer.cli.runSync(slicer.modules.thresholdscalarvolume, None, cliParams,
+    update_display=False, shared_memory_transfer=sharedMemoryTransfer)
+  succeeded = (cliNode.GetStatus() == cliNode.Completed)
+  errorText = cliNode.GetErrorText()
+  slicer.mrmlScene.RemoveNode(cliNode)
+  if not succeeded:
+    raise RuntimeError("ThresholdScalarVolume failed: " + errorText)
+
+@slicer.benchmark.benchmark("CLI.ThresholdTemporaryFiles", group="CLI", warmup=1, repeat=5,
+  setUp=setUpThresholdBenchmark, tearDown=tearDownThresholdBenchmark)
+def thresholdTemporaryFilesBenchmark(state):
+  """Run ThresholdScalarVolume on MRHead, passing data through temporary files."""
+  runThreshold(state, False)
+
+@slicer.benchmark.benchmark("CLI.ThresholdSharedMemory", group="CLI", warmup=1, repeat=5,
+  setUp=setUpThresholdBenchmark, tearDown=tearDownThresholdBenchmark)
+def thresholdSharedMemoryBenchmark(state):
+  """Run ThresholdScalarVolume on MRHead, passing data through shared memory."""
+  runThreshold(state, True)
+
+#
+# CLIDataTransferTestTest
+#
+
+class CLIDataTransferTestTest(ScriptedLoadableModuleTest):
+
+  def setUp(self):
+    """ Reset the state for testing.
+    """
+    slicer.mrmlScene.Clear(0)
+
+  def runTest(self):
+    """Run as few or as many tests as needed here.
+    """
+    self.setUp()
+    self.test_DataTransferDirectory()
+    self.setUp()
+    self.test_SharedMemoryDataTransfer()
+
+  def test_DataTransferDirectory(self):
+    self.delayDisplay('Test data transfer directory selection')
+
+    logic = slicer.modules.thresholdscalarvolume.logic()
+    temporaryPath = os.path.normpath(slicer.app.temporaryPath)
+    logic.SetSharedMemoryDataTransfer(0)
+    self.assertEqual(os.path.normpath(logic.GetDataTransferDirectory()), temporaryPath)
+
+    logic.SetSharedMemoryDataTransfer(1)
+    sharedMemoryDirectory = logic.GetSharedMemoryDirectory()
+    if sharedMemoryDirectory:
+      import stat
+      self.assertTrue(os.path.isdir(sharedMemoryDirectory))
+      self.assertFalse(os.path.islink(sharedMemoryDirectory))
+      directoryStatus = os.lstat(sharedMemoryDirectory)
+      self.assertEqual(directoryStatus.st_uid, os.getuid())
+      self.assertEqual(stat.S_IMODE(directoryStatus.st_mode) & 0o077, 0)
+      self.assertEqual(logic.GetDataTransferDirectory(), sharedMemoryDirectory)
+
+      # Directory that other users can access is not used
+      os.chmod(sharedMemoryDirectory, 0o777)
+      try:
+        self.assertEqual(logic.GetSharedMemoryDirectory(), '')
+        self.assertEqual(os.path.normpath(logic.GetDataTransferDirectory()), temporaryPath)
+      finally:
+        os.chmod(sharedMemoryDirectory, 0o700)
+      self.assertEqual(logic.GetSharedMemoryDirectory(), sharedMemoryDirectory)
+    else:
+      # Shared memory is not available on this platform, temporary directory is used
+      self.assertEqual(os.path.normpath(logic.GetDataTransferDirectory()), temporaryPath)
+    logic.SetSharedMemoryDataTransfer(0)
+
+    self.delayDisplay('Test data transfer directory passed')
+
+  def test_SharedMemoryDataTransfer(self):
+    self.delayDisplay('Compare temporary file and shared memory data transfer')
+    import numpy as np
+
+    state = setUpThresholdBenchmark()
+    runThreshold(state, False)
+    temporaryFilesOutput = np.copy(slicer.util.arrayFromVolume(state['outputVolume']))
+    runThreshold(state, True)
+    sharedMemoryOutput = slicer.util.arrayFromVolume(state['outputVolume'])
+    np.testing.assert_array_equal(temporaryFilesOutput, sharedMemoryOutput)
+    tearDownThresholdBenchmark(state)
+
+    self.delayDisplay('Measure execution times')
+    results = [
+      thresholdTemporaryFilesBenchmark.benchmark.run(),
+      thresholdSharedMemoryBenchmark.benchmark.run()
+      ]
+    print(slicer.benchmark.formatResults(results))
+    for result in results:
+      self.assertTrue(result.succeeded, result.error)
+
+    self.delayDisplay('Test shared memory data transfer passed')
@@ -0,0 +1,148 @@
+from __future__ import print_function
+import concurrent.futures
+import os
+import unittest
+from __main__ import vtk, qt, ctk, slicer
+from slicer.ScriptedLoadableModule import *
+
+#
+# CLIJobQueueTest
+#
+
+class CLIJobQueueTest(ScriptedLoadableModule):
+  def __init__(self, parent):
+    parent.title = "CLIJobQueueTest"
+    parent.categories = ["Testing.TestCases"]
+    parent.dependencies = ["CLI4Test"]
+    parent.contributors = ["Slicer Community"]
+    parent.helpText = """
+    This is a self test that tests running many CLIs through slicer.cli.CLIJobQueue
+    """
+    parent.acknowledgementText = """""" # replace with organization, grant and thanks.
+    self.parent = parent
+
+    # Add this test to the SelfTest module's list for discovery when the module
+    # is created.  Since this module may be discovered before SelfTests itself,
+    # create the list if it doesn't already exist.
+    try:
+      slicer.selfTests
+    except AttributeError:
+      slicer.selfTests = {}
+    slicer.selfTests['CLIJobQueueTest'] = self.runTest
+
+  def runTest(self):
+    tester = CLIJobQueueTestTest()
+    tester.runTest()
+
+#
+# CLIJobQueueTestWidget
+#
+
+class CLIJobQueueTestWidget(ScriptedLoadableModuleWidget):
+
+  def setup(self):
+    ScriptedLoadableModuleWidget.setup(self)
+
+#
+# CLIJobQueueTestTest
+#
+
+class CLIJobQueueTestTest(ScriptedLoadableModuleTest):
+
+  def setUp(self):
+    """ Reset the state for testing.
+    """
+    slicer.mrmlScene.Clear(0)
+    self.tempFiles = []
+
+  def runTest(self):
+    """Run as few or as many tests as needed here.
+    """
+    self.setUp()
+    self.test_CLIJobQueue()
+    self.setUp()
+    self.test_CLIJobQueueErrors()
+    self.setUp()
+    self.test_CLIJobQueueCancel()
+
+  def jobParameters(self, inputValue1, operationType='Addition'):
+    tempFile = qt.QTemporaryFile("CLIJobQueueTest-outputFile-XXXXXX")
+    self.assertTrue(tempFile.open())
+    # keep reference to the file object so that it is not deleted before the CLI is executed
+    self.tempFiles.append(tempFile)
+    return {
+      "InputValue1": inputValue1,
+      "InputValue2": 2,
+      "OperationType": operationType,
+      "OutputFile": tempFile.fileName()
+      }
+
+  def test_CLIJobQueue(self):
+    self.delayDisplay('Running CLI jobs with bounded concurrency')
+
+    cliModule = slicer.modules.cli4test
+    queue = slicer.cli.CLIJobQueue(maximumNumberOfConcurrentJobs=2)
+    jobs = queue.submitJobs([(cliModule, self.jobParameters(index)) for index in range(6)])
+    self.assertEqual(queue.numberOfRunningJobs, 2)
+    self.assertEqual(queue.numberOfQueuedJobs, 4)
+
+    maximumNumberOfRunningJobs = 0
+    while not queue.wait(timeout=0.05):
+      maximumNumberOfRunningJobs = max(maximumNumberOfRunningJobs, queue.numberOfRunningJobs)
+    self.assertLessEqual(maximumNumberOfRunningJobs, 2)
+
+    for index, job in enumerate(jobs):
+      self.assertTrue(job.done())
+      self.assertEqual(job.status, 'Completed')
+      self.assertGreaterEqual(job.elapsedTime, 0.0)
+      self.assertEqual(job.result()["OutputFile"], job.parameters["OutputFile"])
+      with open(job.parameters["OutputFile"]) as outputFile:
+        self.assertEqual(outputFile.read().strip(), str(index + 2))
+
+    # Parameter nodes are reused, only as many nodes are created as jobs were running at the same time
+    cliNodes = slicer.util.getNodesByClass('vtkMRMLCommandLineModuleNode')
+    self.assertLessEqual(len(cliNodes), 2)
+    queue.removeParameterNodes()
+    self.assertEqual(len(slicer.util.getNodesByClass('vtkMRMLCommandLineModuleNode')), 0)
+
+    self.delayDisplay('Test CLIJobQueue passed')
+
+  def test_CLIJobQueueErrors(self):
+    self.delayDisplay('Running CLI jobs that fail')
+
+    cliModule = slicer.modules.cli4test
+    jobs = slicer.cli.runJobs([
+      (cliModule, self.jobParameters(1, 'Fail')),
+      (cliModule, self.jobParameters(1, 'Addition'))
+      ], maximumNumberOfConcurrentJobs=1)
+
+    self.assertEqual(jobs[0].status, 'CompletedWithErrors')
+    with self.assertRaises(slicer.cli.CLIError):
+      jobs[0].result()
+    # Failure of a job does not prevent running the next ones
+    self.assertEqual(jobs[1].status, 'Completed')
+    self.assertIsNone(jobs[1].exception())
+
+    self.delayDisplay('Test CLIJobQueue errors passed')
+
+  def test_CLIJobQueueCancel(self):
+    self.delayDisplay('Cancelling running and queued CLI jobs')
+
+    cliModule = slicer.modules.cli4test
+    self.assertFalse(slicer.cli.cancel(slicer.cli.createNode(cliModule)))
+
+    queue = slicer.cli.CLIJobQueue(maximumNumberOfConcurrentJobs=1)
+    runningJob = queue.submit(cliModule, self.jobParameters(1))
+    queuedJob = queue.submit(cliModule, self.jobParameters(2))
+    self.assertTrue(queuedJob.cancel())
+    self.assertTrue(queuedJob.cancelled())
+    self.assertEqual(queue.numberOfRunningJobs, 1)
+    self.assertTrue(runningJob.cancel())
+
+    self.assertTrue(queue.wait(timeout=60))
+    self.assertEqual(runningJob.status, 'Cancelled')
+    with self.assertRaises(concurrent.futures.CancelledError):
+      runningJob.result()
+    queue.removeParameterNodes()
+
+    self.delayDisplay('Test CLIJobQueue cancel passed')
@@ -205,6 +205,17 @@ def collect_startup_times_modules_to_load(output_file, modules_to_load, module_l
   with open(output_file, 'w') as file:
     file.write(json.dumps(results, indent=4))
 
+def collect_startup_profile(output_file, drop_cache=False, display_output=False):
+  """Run Slicer once with the in-process startup profiler enabled.
+  The trace is written into ``output_file`` (see ``slicer.profiling``).
+  """
+  test = ['--profile-startup', os.path.abspath(output_file)]
+  (duration, result) = runSlicerAndExitWithTime(slicer_executable, test, drop_cache=drop_cache)
+  (returnCode, stdout, stderr) = result
+  if display_output:
+    if stdout: print("STDOUT [%s]\n" % stdout)
+    if stderr and returnCode == EXIT_SUCCESS: print("STDERR [%s]\n" % stderr)
+
 if __name__ == '__main__':
 
   parser = argparse.ArgumentParser(description='Measure startup times.')
@@ -214,6 +225,9 @@ if __name__ == '__main__':
   parser.add_argument("--overall", action="store_true")
   parser.add_argument("--excluding-one-module", action="store_true")
   parser.add_argument("--including-one-module", action="store_true")
+  parser.add_argument("--profile", action="store_true",
+    help="record a per-module startup trace (flame graph folded stacks, or Chrome trace with --profile-format json)")
+  parser.add_argument("--profile-format", choices=["folded", "json"], default="folded")
   # Common options
   parser.add_argument("-n", "--repeat",  default=1, type=int)
   parser.add_argument("--drop-cache", action="store_true")
@@ -227,7 +241,8 @@ if __name__ == '__main__':
     and not args.modules_to_load
     and not args.overall
     and not args.excluding_one_module
-    and not args.including_one_module)
+    and not args.including_one_module
+    and not args.profile)
 
   runSlicerAndExitWithTime = timecall(runSlicerAndExit, repeat=args.repeat)
 
@@ -254,6 +269,11 @@ if __name__ == '__main__':
     collect_startup_times_modules_to_load(
       "StartupTimesSelectedModules.json", args.modules_to_load, module_list, **common_kwargs)
 
+  # Since the "profile" experiment records a detailed trace instead of overall times,
+  # it is not executed by default.
+  if args.profile:
+    collect_startup_profile("StartupProfile-r%s.%s" % (sliver_revision, args.profile_format), **common_kwargs)
+
   if all or args.overall:
     collect_startup_times_overall("StartupTimes-r%s.json" % sliver_revision, **common_kwargs)
 
@@ -2,6 +2,7 @@ from __future__ import print_function
 import os
 import unittest
 import vtk, qt, ctk, slicer
+import slicer.benchmark
 from slicer.ScriptedLoadableModule import *
 
 #
@@ -112,6 +113,9 @@ class ScenePerformanceWidget(ScriptedLoadableModuleWidget):
 #
 class ScenePerformanceLogic(ScriptedLoadableModuleLogic):
 
+  brainAtlasScene = ('http://slicer.kitware.com/midas3/download?items=10937', 'BrainAtlas2012.mrb',
+    'SHA256:688ebcc6f45989795be2bcdc6b8b5bfc461f1656d677ed3ddef8c313532687f1')
+
   def downloadFile(self, downloadURL, downloadFileName, downloadFileChecksum=None):
     import SampleData
     return SampleData.downloadFromURL(
@@ -119,13 +123,6 @@ class ScenePerformanceLogic(ScriptedLoadableModuleLogic):
       uris=downloadURL,
       checksums=downloadFileChecksum)[0]
 
-  def startTiming(self):
-    self.Timer = qt.QTime()
-    self.Timer.start()
-
-  def stopTiming(self):
-    return self.Timer.elapsed()
-
 class ScenePerformanceTest(ScriptedLoadableModuleTest):
 
   def setUp(self):
@@ -140,11 +137,23 @@ class ScenePerformanceTest(ScriptedLoadableModuleTest):
 
   def runTest(self):
     self.testAll()
+    self.setUp()
+    self.testSaveCompressedVolume()
+    self.setUp()
+    self.testLoadMemoryMappedVolume()
+    self.setUp()
+    self.testEventCoalescing()
+    self.setUp()
+    self.testTableSQLiteRoundTrip()
+    self.setUp()
+    self.testNodeReferences()
+    self.setUp()
+    self.testImportSceneConcurrentRead()
 
   def testAll(self):
     self.setUp()
 
-    self.addURLData('http://slicer.kitware.com/midas3/download?items=10937', 'BrainAtlas2012.mrb', 'SHA256:688ebcc6f45989795be2bcdc6b8b5bfc461f1656d677ed3ddef8c313532687f1')
+    self.addURLData(*ScenePerformanceLogic.brainAtlasScene)
     self.modifyNodeByID('vtkMRMLScalarVolumeNode1')
     self.modifyNodeByID('vtkMRMLScalarVolumeNode2')
     self.modifyNodeByID('vtkMRMLScalarVolumeNode3')
@@ -175,6 +184,22 @@ class ScenePerformanceTest(ScriptedLoadableModuleTest):
     self.delayDisplay(message)
     return message
 
+  def reportBenchmarkResult(self, action, property, result):
+    """Report the mean time of a benchmark result, as the measurements of earlier versions
+    of this test, and display the median time, which is less sensitive to outliers."""
+    self.displayPerformance(action + ' median', property, int(round(result.statistics['median'] * 1000)))
+    return self.reportPerformance(action, property, int(round(result.statistics['mean'] * 1000)))
+
+  def timePerformance(self, action, property, function, setUpSample=None):
+    """Time ``function`` Repeat times and report the mean time."""
+    result = slicer.benchmark.measure(function, '%s-%s' % (action, property),
+      repeat=self.Repeat, setUpSample=setUpSample)
+    if result.error is not None:
+      raise RuntimeError(result.error)
+    for sample in result.samples:
+      self.displayPerformance(action, property, int(round(sample * 1000)))
+    return self.reportBenchmarkResult(action, property, result)
+
   def addURLData(self, url, file, checksum):
     logic = ScenePerformanceLogic()
     file = logic.downloadFile(url, file, checksum)
@@ -182,30 +207,12 @@ class ScenePerformanceTest(ScriptedLoadableModuleTest):
 
   def addData(self, file):
     self.delayDisplay("Starting the AddData test")
-    logic = ScenePerformanceLogic()
-    averageTime = 0
-    for x in range(self.Repeat):
-      logic.startTiming()
-      ioManager = slicer.app.ioManager()
-      ioManager.loadFile(file)
-      time = logic.stopTiming()
-      self.displayPerformance('AddData', file, time)
-      averageTime = averageTime + time
-    averageTime = averageTime / self.Repeat
-    return self.reportPerformance('AddData', os.path.basename(file), averageTime)
+    ioManager = slicer.app.ioManager()
+    return self.timePerformance('AddData', os.path.basename(file), lambda: ioManager.loadFile(file))
 
   def closeScene(self):
     self.delayDisplay("Starting the Close Scene test")
-    logic = ScenePerformanceLogic()
-    averageTime = 0
-    for x in range(self.Repeat):
-      logic.startTiming()
-      slicer.mrmlScene.Clear(0)
-      time = logic.stopTiming()
-      self.displayPerformance('CloseScene', '', time)
-      averageTime = averageTime + time
-    averageTime = averageTime / self.Repeat
-    return self.reportPerformance('CloseScene', '', averageTime)
+    return self.timePerformance('CloseScene', '', lambda: slicer.mrmlScene.Clear(0))
 
   def restoreSceneView(self, sceneViewIndex):
     node = slicer.mrmlScene.GetNthNodeByClass(sceneViewIndex, 'vtkMRMLSceneViewNode')
@@ -213,30 +220,12 @@ class ScenePerformanceTest(ScriptedLoadableModuleTest):
 
   def restoreSceneViewNode(self, node):
     self.delayDisplay("Starting the Restore Scene test")
-    logic = ScenePerformanceLogic()
-    averageTime = 0
-    for x in range(self.Repeat):
-      logic.startTiming()
-      node.RestoreScene()
-      time = logic.stopTiming()
-      self.displayPerformance('RestoreSceneView', node.GetID(), time)
-      averageTime = averageTime + time
-    averageTime = averageTime / self.Repeat
-    return self.reportPerformance('RestoreSceneView', node.GetID(), averageTime)
+    return self.timePerformance('RestoreSceneView', node.GetID(), node.RestoreScene)
 
   def setLayout(self, layoutIndex):
     self.delayDisplay("Starting the layout test")
-    logic = ScenePerformanceLogic()
-    averageTime = 0
-    for x in range(self.Repeat):
-      logic.startTiming()
-      layoutManager = slicer.app.layoutManager()
-      layoutManager.setLayout(layoutIndex)
-      time = logic.stopTiming()
-      self.displayPerformance('Layout', layoutIndex, time)
-      averageTime = averageTime + time
-    averageTime = averageTime / self.Repeat
-    return self.reportPerformance('Layout', layoutIndex, averageTime)
+    layoutManager = slicer.app.layoutManager()
+    return self.timePerformance('Layout', layoutIndex, lambda: layoutManager.setLayout(layoutIndex))
 
   def addNodeByID(self, nodeID):
     node = slicer.mrmlScene.GetNodeByID(nodeID)
@@ -244,19 +233,14 @@ class ScenePerformanceTest(ScriptedLoadableModuleTest):
 
   def addNode(self, node):
     self.delayDisplay("Starting the add node test")
-    logic = ScenePerformanceLogic()
-    averageTime = 0
-    for x in range(self.Repeat):
+    newNodes = []
+    def createNode():
       newNode = node.CreateNodeInstance()
       newNode.UnRegister(node)
       newNode.Copy(node)
-      logic.startTiming()
-      slicer.mrmlScene.AddNode(newNode)
-      time = logic.stopTiming()
-      self.displayPerformance('AddNode', node.GetID(), time)
-      averageTime = averageTime + time
-    averageTime = averageTime / self.Repeat
-    return self.reportPerformance('AddNode', node.GetID(), averageTime)
+      newNodes.append(newNode)
+    return self.timePerformance('AddNode', node.GetID(),
+      lambda: slicer.mrmlScene.AddNode(newNodes[-1]), setUpSample=createNode)
 
   def modifyNodeByID(self, nodeID):
     node = slicer.mrmlScene.GetNodeByID(nodeID)
@@ -264,13 +248,502 @@ class ScenePerformanceTest(ScriptedLoadableModuleTest):
 
   def modifyNode(self, node):
     self.delayDisplay("Starting the modify node test")
-    logic = ScenePerformanceLogic()
-    averageTime = 0
-    for x in range(self.Repeat):
-      logic.startTiming()
-      node.Modified()
-      time = logic.stopTiming()
-      self.displayPerformance('ModifyNode', node.GetID(), time)
-      averageTime = averageTime + time
-    averageTime = averageTime / self.Repeat
-    return self.reportPerformance('ModifyNode', node.GetID(), averageTime)
+    return self.timePerformance('ModifyNode', node.GetID(), node.Modified)
+
+  def testSaveCompressedVolume(self):
+    self.delayDisplay("Starting the save compressed volume test")
+    import numpy as np
+    state = setUpSaveVolumeBenchmark()
+    try:
+      # Volume written using parallel compression is read back unchanged
+      saveVolume(state, "gzip_fastest", 0)
+      loadedVolume = slicer.util.loadVolume(state['filePath'])
+      np.testing.assert_array_equal(slicer.util.arrayFromVolume(loadedVolume),
+        slicer.util.arrayFromVolume(state['volumeNode']))
+      slicer.mrmlScene.RemoveNode(loadedVolume)
+    finally:
+      tearDownSaveVolumeBenchmark(state)
+
+    results = [registeredBenchmark.run() for registeredBenchmark in slicer.benchmark.benchmarks("ScenePerformance.SaveVolume.*")]
+    print(slicer.benchmark.formatResults(results))
+    for result in results:
+      self.assertTrue(result.succeeded, result.error)
+      self.reportBenchmarkResult(result.name, '', result)
+
+  def testLoadMemoryMappedVolume(self):
+    self.delayDisplay("Starting the load memory mapped volume test")
+    import numpy as np
+    state = setUpLoadVolumeBenchmark()
+    try:
+      loadVolume(state, True)
+      self.assertTrue(slicer.vtkTeemNRRDReader.IsMemoryMapped(state['loadedVolumeNode'].GetImageData()))
+      np.testing.assert_array_equal(slicer.util.arrayFromVolume(state['loadedVolumeNode']),
+        slicer.util.arrayFromVolume(state['volumeNode']))
+      removeLoadedVolume(state)
+    finally:
+      tearDownLoadVolumeBenchmark(state)
+
+    results = [registeredBenchmark.run() for registeredBenchmark in slicer.benchmark.benchmarks("ScenePerformance.LoadVolume.*")]
+    print(slicer.benchmark.formatResults(results))
+    for result in results:
+      self.assertTrue(result.succeeded, result.error)
+      self.reportBenchmarkResult(result.name, '', result)
+
+  def testEventCoalescing(self):
+    self.delayDisplay("Starting the event coalescing test")
+    state = setUpModifyDisplayNodesBenchmark()
+    try:
+      for useEventCoalescing in [False, True]:
+        emittedEvents, deliveredEvents = eventStatistics(lambda: modifyDisplayNodes(state, useEventCoalescing))
+        self.delayDisplay("Event coalescing %s: %d events emitted, %d delivered"
+          % ("on" if useEventCoalescing else "off", emittedEvents, deliveredEvents))
+        if useEventCoalescing:
+          self.assertLess(deliveredEvents, emittedEvents)
+    finally:
+      clearScene(state)
+
+    results = [registeredBenchmark.run() for registeredBenchmark in slicer.benchmark.benchmarks("ScenePerformance.ModifyDisplayNodes*")]
+    print(slicer.benchmark.formatResults(results))
+    for result in results:
+      self.assertTrue(result.succeeded, result.error)
+      self.reportBenchmarkResult(result.name, '', result)
+
+  def testTableSQLiteRoundTrip(self):
+    self.delayDisplay("Starting the SQLite table round-trip test")
+    import numpy as np
+    state = setUpTableSQLiteBenchmark(numberOfRows=1000)
+    try:
+      writeTableSQLite(state)
+      readTableNode = readTableSQLite(state)
+      for columnName in state['columns']:
+        np.testing.assert_array_equal(slicer.util.arrayFromTableColumn(readTableNode, columnName), state['columns'][columnName])
+      slicer.mrmlScene.RemoveNode(readTableNode)
+    finally:
+      tearDownTableSQLiteBenchmark(state)
+
+    results = [tableSQLiteWriteBenchmark.benchmark.run(), tableSQLiteReadBenchmark.benchmark.run()]
+    print(slicer.benchmark.formatResults(results))
+    for result in results:
+      self.assertTrue(result.succeeded, result.error)
+      self.reportBenchmarkResult(result.name, '', result)
+
+  def testNodeReferences(self):
+    self.delayDisplay("Starting the node references test")
+    state = setUpReferencedNodesBenchmark(numberOfModels=100)
+    try:
+      scene = createReferencedNodesScene(state)
+      displayNode = scene.GetFirstNodeByClass('vtkMRMLModelDisplayNode')
+      referencingNodes = vtk.vtkCollection()
+      scene.GetReferencingNodes(displayNode, referencingNodes)
+      self.assertEqual(referencingNodes.GetNumberOfItems(), 1)
+      modelNode = referencingNodes.GetItemAsObject(0)
+      self.assertEqual(modelNode.GetDisplayNode(), displayNode)
+
+      # Imported nodes get new IDs and their references are updated
+      importReferencedNodesScene(state, scene)
+      self.assertEqual(scene.GetNumberOfNodesByClass('vtkMRMLModelNode'), 2 * state['numberOfModels'])
+      for importedModelNode in list(slicer.util.getNodesByClass('vtkMRMLModelNode', scene))[state['numberOfModels']:]:
+        importedDisplayNode = importedModelNode.GetDisplayNode()
+        self.assertIsNotNone(importedDisplayNode)
+        scene.GetReferencingNodes(importedDisplayNode, referencingNodes)
+        self.assertEqual(referencingNodes.GetNumberOfItems(), 1)
+        self.assertEqual(referencingNodes.GetItemAsObject(0), importedModelNode)
+
+      removeReferencedNodes(scene)
+      self.assertEqual(scene.GetNumberOfNodes(), 0)
+      self.assertEqual(scene.GetNumberOfNodeReferences(), 0)
+    finally:
+      tearDownReferencedNodesBenchmark(state)
+
+    results = [removeReferencedNodesBenchmark.benchmark.run(), importReferencedNodesSceneBenchmark.benchmark.run()]
+    print(slicer.benchmark.formatResults(results))
+    for result in results:
+      self.assertTrue(result.succeeded, result.error)
+      self.reportBenchmarkResult(result.name, '', result)
+
+  def testImportSceneConcurrentRead(self):
+    self.delayDisplay("Starting the import scene with concurrent read test")
+    import numpy as np
+    state = setUpImportVolumesSceneBenchmark(numberOfVolumes=4, shape=(16, 32, 32))
+    try:
+      sequentialScene = importVolumesScene(state, 1)
+      concurrentScene = importVolumesScene(state, 0)
+      sequentialVolumeNodes = list(slicer.util.getNodesByClass('vtkMRMLScalarVolumeNode', sequentialScene))
+      concurrentVolumeNodes = list(slicer.util.getNodesByClass('vtkMRMLScalarVolumeNode', concurrentScene))
+      self.assertEqual(len(concurrentVolumeNodes), state['numberOfVolumes'])
+      # Nodes are in the same order and their voxels are the same
+      for sequentialVolumeNode, concurrentVolumeNode in zip(sequentialVolumeNodes, concurrentVolumeNodes):
+        self.assertEqual(sequentialVolumeNode.GetName(), concurrentVolumeNode.GetName())
+        np.testing.assert_array_equal(slicer.util.arrayFromVolume(concurrentVolumeNode),
+          slicer.util.arrayFromVolume(sequentialVolumeNode))
+    finally:
+      tearDownImportVolumesSceneBenchmark(state)
+
+    results = [registeredBenchmark.run() for registeredBenchmark in slicer.benchmark.benchmarks("ScenePerformance.ImportVolumesScene.*")]
+    print(slicer.benchmark.formatResults(results))
+    for result in results:
+      self.assertTrue(result.succeeded, result.error)
+      self.reportBenchmarkResult(result.name, '', result)
+
+#
+# Benchmarks
+#
+
+def setUpSceneBenchmark():
+  """Return the benchmark state holding the path of the scene to load."""
+  logic = ScenePerformanceLogic()
+  sceneFilePath = logic.downloadFile(*ScenePerformanceLogic.brainAtlasScene)
+  if not sceneFilePath:
+    raise RuntimeError("Failed to download %s" % ScenePerformanceLogic.brainAtlasScene[1])
+  slicer.mrmlScene.Clear(0)
+  return {'sceneFilePath': sceneFilePath}
+
+def loadBenchmarkScene(state):
+  slicer.app.ioManager().loadFile(state['sceneFilePath'])
+
+def clearScene(state):
+  slicer.mrmlScene.Clear(0)
+
+@slicer.benchmark.benchmark("ScenePerformance.AddData", group="Scene", warmup=0, repeat=3,
+  setUp=setUpSceneBenchmark, tearDown=clearScene, setUpSample=clearScene)
+def addDataBenchmark(state):
+  """Load the BrainAtlas2012 scene bundle into an empty scene."""
+  loadBenchmarkScene(state)
+
+@slicer.benchmark.benchmark("ScenePerformance.CloseScene", group="Scene", warmup=0, repeat=3,
+  setUp=setUpSceneBenchmark, setUpSample=loadBenchmarkScene)
+def closeSceneBenchmark(state):
+  """Close the BrainAtlas2012 scene."""
+  clearScene(state)
+
+def setUpRestoreSceneViewBenchmark():
+  state = setUpSceneBenchmark()
+  loadBenchmarkScene(state)
+  state['sceneViewNode'] = slicer.mrmlScene.GetNthNodeByClass(0, 'vtkMRMLSceneViewNode')
+  return state
+
+@slicer.benchmark.benchmark("ScenePerformance.RestoreSceneView", group="Scene", warmup=1, repeat=5,
+  setUp=setUpRestoreSceneViewBenchmark, tearDown=clearScene)
+def restoreSceneViewBenchmark(state):
+  """Restore the first scene view of the BrainAtlas2012 scene."""
+  state['sceneViewNode'].RestoreScene()
+
+def eventStatistics(function):
+  """Call ``function`` and return the number of events emitted to and delivered by the event broker."""
+  broker = slicer.vtkEventBroker.GetInstance()
+  broker.ResetEventStatistics()
+  function()
+  return broker.GetNumberOfEmittedEvents(), broker.GetNumberOfDeliveredEvents()
+
+def setUpModifyDisplayNodesBenchmark():
+  state = setUpSceneBenchmark()
+  loadBenchmarkScene(state)
+  state['displayNodes'] = list(slicer.util.getNodesByClass('vtkMRMLModelDisplayNode'))
+  return state
+
+def modifyDisplayNodes(state, useEventCoalescing):
+  """Change and restore color and opacity of all model display nodes, one property at a time."""
+  broker = slicer.vtkEventBroker.GetInstance()
+  if useEventCoalescing:
+    broker.StartEventCoalescing()
+  try:
+    for displayNode in state['displayNodes']:
+      color = displayNode.GetColor()
+      opacity = displayNode.GetOpacity()
+      displayNode.SetColor(1.0, 0.0, 0.0)
+      displayNode.SetOpacity(0.5)
+      displayNode.SetColor(color)
+      displayNode.SetOpacity(opacity)
+  finally:
+    if useEventCoalescing:
+      broker.EndEventCoalescing()
+
+@slicer.benchmark.benchmark("ScenePerformance.ModifyDisplayNodes", group="Scene", warmup=1, repeat=5,
+  setUp=setUpModifyDisplayNodesBenchmark, tearDown=clearScene)
+def modifyDisplayNodesBenchmark(state):
+  """Modify all model display nodes of the BrainAtlas2012 scene, with events delivered immediately."""
+  modifyDisplayNodes(state, False)
+
+@slicer.benchmark.benchmark("ScenePerformance.ModifyDisplayNodesCoalescedEvents", group="Scene", warmup=1, repeat=5,
+  setUp=setUpModifyDisplayNodesBenchmark, tearDown=clearScene)
+def modifyDisplayNodesCoalescedEventsBenchmark(state):
+  """Modify all model display nodes of the BrainAtlas2012 scene, with modified events coalesced."""
+  modifyDisplayNodes(state, True)
+
+def setUpReferencedNodesBenchmark(numberOfModels=5000):
+  """Return the benchmark state: the path of a scene file containing ``numberOfModels``
+  model nodes, each referencing its own display node."""
+  state = {
+    'numberOfModels': numberOfModels,
+    'sceneFilePath': os.path.join(slicer.app.temporaryPath, "ReferencedNodesBenchmark.mrml"),
+    }
+  scene = createReferencedNodesScene(state)
+  scene.SetURL(state['sceneFilePath'])
+  if not scene.Commit():
+    raise RuntimeError("Failed to write %s" % state['sceneFilePath'])
+  return state
+
+def tearDownReferencedNodesBenchmark(state):
+  state.pop('scene', None)
+  if os.path.exists(state['sceneFilePath']):
+    os.remove(state['sceneFilePath'])
+
+def createReferencedNodesScene(state):
+  """Return a new scene (not the application scene, to only measure scene bookkeeping)
+  with model nodes referencing display nodes."""
+  scene = slicer.vtkMRMLScene()
+  for index in range(state['numberOfModels']):
+    displayNode = scene.AddNewNodeByClass('vtkMRMLModelDisplayNode')
+    modelNode = scene.AddNewNodeByClass('vtkMRMLModelNode')
+    modelNode.SetAndObserveDisplayNodeID(displayNode.GetID())
+  return scene
+
+def setUpReferencedNodesSceneSample(state):
+  state['scene'] = createReferencedNodesScene(state)
+
+def removeReferencedNodes(scene):
+  """Remove all nodes one by one, referenced nodes first."""
+  nodes = [scene.GetNthNode(index) for index in range(scene.GetNumberOfNodes())]
+  for node in nodes:
+    scene.RemoveNode(node)
+
+def importReferencedNodesScene(state, scene):
+  """Import the benchmark scene file into ``scene``. Node IDs of the imported
+  nodes conflict with those already in the scene, therefore they are all changed."""
+  scene.SetURL(state['sceneFilePath'])
+  if not scene.Import():
+    raise RuntimeError("Failed to import %s" % state['sceneFilePath'])
+
+@slicer.benchmark.benchmark("ScenePerformance.RemoveReferencedNodes", group="Scene", warmup=1, repeat=5,
+  setUp=setUpReferencedNodesBenchmark, tearDown=tearDownReferencedNodesBenchmark,
+  setUpSample=setUpReferencedNodesSceneSample)
+def removeReferencedNodesBenchmark(state):
+  """Remove 5000 model nodes and their display nodes from a scene, one by one."""
+  removeReferencedNodes(state['scene'])
+
+@slicer.benchmark.benchmark("ScenePerformance.ImportReferencedNodesScene", group="Scene", warmup=1, repeat=5,
+  setUp=setUpReferencedNodesBenchmark, tearDown=tearDownReferencedNodesBenchmark,
+  setUpSample=setUpReferencedNodesSceneSample)
+def importReferencedNodesSceneBenchmark(state):
+  """Import a scene of 5000 model nodes and their display nodes into a scene containing the same node IDs."""
+  importReferencedNodesScene(state, state['scene'])
+
+def setUpSaveVolumeBenchmark():
+  """Return the benchmark state: a 512x512x256 CT-like volume and the path of the file to write."""
+  import numpy as np
+  shape = (256, 512, 512)
+  j, i = np.ogrid[:shape[1], :shape[2]]
+  voxels = np.repeat(np.where((i-256)**2 + (j-256)**2 < 200**2, 40, -1000).astype(np.int16)[np.newaxis, :, :], shape[0], axis=0)
+  # add noise, as real images do not compress as well as piecewise constant images
+  voxels += np.random.RandomState(0).randint(-20, 20, size=shape, dtype=np.int16)
+  volumeNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+  slicer.util.updateVolumeFromArray(volumeNode, voxels)
+  filePath = os.path.join(slicer.app.temporaryPath, "SaveVolumeBenchmark.nrrd")
+  return {'volumeNode': volumeNode, 'filePath': filePath}
+
+def tearDownSaveVolumeBenchmark(state):
+  slicer.mrmlScene.RemoveNode(state['volumeNode'])
+  if os.path.exists(state['filePath']):
+    os.remove(state['filePath'])
+
+def saveVolume(state, compressionParameter, numberOfCompressionThreads):
+  storageNode = slicer.vtkMRMLNRRDStorageNode()
+  storageNode.SetFileName(state['filePath'])
+  storageNode.SetUseCompression(True)
+  storageNode.SetCompressionParameter(compressionParameter)
+  storageNode.SetNumberOfCompressionThreads(numberOfCompressionThreads)
+  if not storageNode.WriteData(state['volumeNode']):
+    raise RuntimeError("Failed to write " + state['filePath'])
+
+def registerSaveVolumeBenchmarks():
+  """Register a benchmark for saving a volume with each compression preset,
+  using single-threaded and parallel compression."""
+  for compressionParameter in ["gzip_fastest", "gzip_normal", "gzip_minimum_size"]:
+    for numberOfCompressionThreads, threadsName in [(1, "SingleThread"), (0, "AllThreads")]:
+      def saveVolumeBenchmark(state, compressionParameter=compressionParameter,
+                              numberOfCompressionThreads=numberOfCompressionThreads):
+        saveVolume(state, compressionParameter, numberOfCompressionThreads)
+      slicer.benchmark.registerBenchmark(saveVolumeBenchmark,
+        "ScenePerformance.SaveVolume.%s.%s" % (compressionParameter, threadsName), group="IO",
+        description="Save a 512x512x256 volume as NRRD with %s compression using %s."
+          % (compressionParameter, "one thread" if numberOfCompressionThreads == 1 else "all threads"),
+        warmup=1, repeat=3, setUp=setUpSaveVolumeBenchmark, tearDown=tearDownSaveVolumeBenchmark)
+
+registerSaveVolumeBenchmarks()
+
+def setUpLoadVolumeBenchmark():
+  """Return the benchmark state: the volume of the save volume benchmark,
+  written without compression into a detached header NRRD file."""
+  state = setUpSaveVolumeBenchmark()
+  state['filePath'] = os.path.join(slicer.app.temporaryPath, "LoadVolumeBenchmark.nhdr")
+  storageNode = slicer.vtkMRMLNRRDStorageNode()
+  storageNode.SetFileName(state['filePath'])
+  storageNode.SetUseCompression(False)
+  if not storageNode.WriteData(state['volumeNode']):
+    raise RuntimeError("Failed to write " + state['filePath'])
+  state['loadedVolumeNode'] = None
+  return state
+
+def tearDownLoadVolumeBenchmark(state):
+  removeLoadedVolume(state)
+  tearDownSaveVolumeBenchmark(state)
+  rawFilePath = os.path.splitext(state['filePath'])[0] + ".raw"
+  if os.path.exists(rawFilePath):
+    os.remove(rawFilePath)
+
+def loadVolume(state, useMemoryMapping):
+  volumeNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLScalarVolumeNode")
+  state['loadedVolumeNode'] = volumeNode
+  storageNode = slicer.vtkMRMLNRRDStorageNode()
+  storageNode.SetFileName(state['filePath'])
+  storageNode.SetUseMemoryMapping(useMemoryMapping)
+  if not storageNode.ReadData(volumeNode):
+    raise RuntimeError("Failed to read " + state['filePath'])
+
+def removeLoadedVolume(state):
+  if state['loadedVolumeNode']:
+    slicer.mrmlScene.RemoveNode(state['loadedVolumeNode'])
+    state['loadedVolumeNode'] = None
+
+def registerLoadVolumeBenchmarks():
+  """Register a benchmark for loading an uncompressed volume by reading it
+  and by mapping it into memory."""
+  for useMemoryMapping, modeName in [(False, "Read"), (True, "MemoryMapped")]:
+    def loadVolumeBenchmark(state, useMemoryMapping=useMemoryMapping):
+      loadVolume(state, useMemoryMapping)
+    slicer.benchmark.registerBenchmark(loadVolumeBenchmark,
+      "ScenePerformance.LoadVolume.%s" % modeName, group="IO",
+      description="Load an uncompressed 512x512x256 NRRD volume %s."
+        % ("using memory mapping" if useMemoryMapping else "by reading the voxels"),
+      warmup=1, repeat=3, setUp=setUpLoadVolumeBenchmark, tearDown=tearDownLoadVolumeBenchmark,
+      tearDownSample=removeLoadedVolume)
+
+registerLoadVolumeBenchmarks()
+
+def setUpTableSQLiteBenchmark(numberOfRows=1000000):
+  """Return the benchmark state: a table node with integer, floating-point, and string columns
+  and the path of the SQLite database file to write."""
+  import numpy as np
+  randomState = np.random.RandomState(0)
+  columns = {
+    "Label": np.arange(numberOfRows, dtype=np.int32),
+    "Volume": randomState.uniform(0.0, 1000.0, numberOfRows),
+    "Mean": randomState.normal(100.0, 20.0, numberOfRows),
+    "Name": np.array(["Segment_%d" % (index % 1000) for index in range(numberOfRows)]),
+    }
+  tableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode")
+  slicer.util.updateTableFromArray(tableNode, list(columns.values()), list(columns.keys()))
+  filePath = os.path.join(slicer.app.temporaryPath, "TableSQLiteBenchmark.sqlite3")
+  return {'tableNode': tableNode, 'columns': columns, 'filePath': filePath, 'readTableNode': None}
+
+def tearDownTableSQLiteBenchmark(state):
+  slicer.mrmlScene.RemoveNode(state['tableNode'])
+  if state['readTableNode']:
+    slicer.mrmlScene.RemoveNode(state['readTableNode'])
+  if os.path.exists(state['filePath']):
+    os.remove(state['filePath'])
+
+def createTableSQLiteStorageNode(state):
+  storageNode = slicer.vtkMRMLTableSQLiteStorageNode()
+  storageNode.SetFileName(state['filePath'])
+  storageNode.SetTableName("Statistics")
+  return storageNode
+
+def writeTableSQLite(state):
+  if not createTableSQLiteStorageNode(state).WriteData(state['tableNode']):
+    raise RuntimeError("Failed to write " + state['filePath'])
+
+def readTableSQLite(state):
+  tableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode")
+  if not createTableSQLiteStorageNode(state).ReadData(tableNode):
+    slicer.mrmlScene.RemoveNode(tableNode)
+    raise RuntimeError("Failed to read " + state['filePath'])
+  return tableNode
+
+def setUpTableSQLiteReadBenchmark():
+  state = setUpTableSQLiteBenchmark()
+  writeTableSQLite(state)
+  return state
+
+def removeReadTableNode(state):
+  slicer.mrmlScene.RemoveNode(state['readTableNode'])
+  state['readTableNode'] = None
+
+@slicer.benchmark.benchmark("ScenePerformance.TableSQLiteWrite", group="IO", warmup=1, repeat=3,
+  setUp=setUpTableSQLiteBenchmark, tearDown=tearDownTableSQLiteBenchmark)
+def tableSQLiteWriteBenchmark(state):
+  """Write a table of 1M rows and 4 columns into an SQLite database."""
+  writeTableSQLite(state)
+
+@slicer.benchmark.benchmark("ScenePerformance.TableSQLiteRead", group="IO", warmup=1, repeat=3,
+  setUp=setUpTableSQLiteReadBenchmark, tearDown=tearDownTableSQLiteBenchmark, tearDownSample=removeReadTableNode)
+def tableSQLiteReadBenchmark(state):
+  """Read a table of 1M rows and 4 columns from an SQLite database."""
+  state['readTableNode'] = readTableSQLite(state)
+
+def setUpImportVolumesSceneBenchmark(numberOfVolumes=16, shape=(128, 256, 256)):
+  """Return the benchmark state: the path of a scene file referencing ``numberOfVolumes``
+  gzip compressed NRRD volumes of the given ``shape``."""
+  import numpy as np
+  state = {
+    'numberOfVolumes': numberOfVolumes,
+    'directory': os.path.join(slicer.app.temporaryPath, "ImportVolumesSceneBenchmark"),
+    'importedScene': None,
+    }
+  if not os.path.exists(state['directory']):
+    os.makedirs(state['directory'])
+  state['sceneFilePath'] = os.path.join(state['directory'], "ImportVolumesSceneBenchmark.mrml")
+  scene = slicer.vtkMRMLScene()
+  randomState = np.random.RandomState(0)
+  k, j, i = np.ogrid[:shape[0], :shape[1], :shape[2]]
+  for index in range(numberOfVolumes):
+    voxels = np.where((i-shape[2]//2)**2 + (j-shape[1]//2)**2 + (k-shape[0]//2)**2 < (shape[1]//3 + index)**2, 40, -1000).astype(np.int16)
+    # add noise, as real images do not compress as well as piecewise constant images
+    voxels += randomState.randint(-20, 20, size=shape, dtype=np.int16)
+    volumeNode = scene.AddNewNodeByClass("vtkMRMLScalarVolumeNode", "Volume%d" % index)
+    slicer.util.updateVolumeFromArray(volumeNode, voxels)
+    storageNode = scene.AddNewNodeByClass("vtkMRMLNRRDStorageNode")
+    storageNode.SetFileName(os.path.join(state['directory'], "Volume%d.nrrd" % index))
+    storageNode.SetUseCompression(True)
+    if not storageNode.WriteData(volumeNode):
+      raise RuntimeError("Failed to write " + storageNode.GetFileName())
+    volumeNode.SetAndObserveStorageNodeID(storageNode.GetID())
+  scene.SetURL(state['sceneFilePath'])
+  scene.SetRootDirectory(state['directory'])
+  if not scene.Commit():
+    raise RuntimeError("Failed to write " + state['sceneFilePath'])
+  return state
+
+def tearDownImportVolumesSceneBenchmark(state):
+  import shutil
+  removeImportedVolumesScene(state)
+  shutil.rmtree(state['directory'], True)
+
+def importVolumesScene(state, numberOfReadThreads):
+  """Import the benchmark scene file into a new scene (not the application scene,
+  to only measure reading of the data) and return the scene."""
+  scene = slicer.vtkMRMLScene()
+  scene.SetNumberOfReadThreads(numberOfReadThreads)
+  scene.SetURL(state['sceneFilePath'])
+  state['importedScene'] = scene
+  if not scene.Import():
+    raise RuntimeError("Failed to import " + state['sceneFilePath'])
+  return scene
+
+def removeImportedVolumesScene(state):
+  state['importedScene'] = None
+
+def registerImportVolumesSceneBenchmarks():
+  """Register a benchmark for importing a scene of compressed volumes,
+  with the data files read sequentially and concurrently."""
+  for numberOfReadThreads, modeName in [(1, "Sequential"), (0, "Concurrent")]:
+    def importVolumesSceneBenchmark(state, numberOfReadThreads=numberOfReadThreads):
+      importVolumesScene(state, numberOfReadThreads)
+    slicer.benchmark.registerBenchmark(importVolumesSceneBenchmark,
+      "ScenePerformance.ImportVolumesScene.%s" % modeName, group="IO",
+      description="Import a scene of 16 gzip compressed 256x256x128 NRRD volumes, reading the files %s."
+        % ("one by one" if numberOfReadThreads == 1 else "on all threads"),
+      warmup=1, repeat=3, setUp=setUpImportVolumesSceneBenchmark, tearDown=tearDownImportVolumesSceneBenchmark,
+      tearDownSample=removeImportedVolumesScene)
+
+registerImportVolumesSceneBenchmarks()
@@ -257,6 +257,59 @@ class UtilTestTest(ScriptedLoadableModuleTest):
     self.assertEqual(tableNode2.GetNumberOfColumns(), 2)
     self.assertEqual(tableNode2.GetNumberOfRows(), 11)
 
+    self.delayDisplay('Test value types are preserved')
+    int64Values = np.array([2**40+1, -3, 5], dtype=np.int64)
+    doubleValues = np.array([1.0/3.0, 1e-12, 2.5], dtype=np.float64)
+    stringValues = np.array(["first", "second", "third"])
+    boolValues = np.array([True, False, True])
+    tableNode3 = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode")
+    slicer.util.updateTableFromArray(tableNode3, [int64Values, doubleValues, stringValues, boolValues],
+      ["Index", "Value", "Name", "Selected"])
+    self.assertEqual(tableNode3.GetNumberOfColumns(), 4)
+    self.assertEqual(tableNode3.GetNumberOfRows(), 3)
+    self.assertEqual(tableNode3.GetTable().GetColumnByName("Name").GetDataType(), vtk.VTK_STRING)
+    np.testing.assert_array_equal(slicer.util.arrayFromTableColumn(tableNode3, "Index"), int64Values)
+    np.testing.assert_array_equal(slicer.util.arrayFromTableColumn(tableNode3, "Value"), doubleValues)
+    np.testing.assert_array_equal(slicer.util.arrayFromTableColumn(tableNode3, "Name"), stringValues)
+    np.testing.assert_array_equal(slicer.util.arrayFromTableColumn(tableNode3, "Selected"), boolValues)
+
+    self.delayDisplay('Test multi-column read')
+    indexAndValue = slicer.util.arrayFromTableColumn(tableNode3, ["Index", "Value"])
+    self.assertEqual(indexAndValue.shape, (3, 2))
+    self.assertEqual(indexAndValue.dtype, object)
+    self.assertEqual(indexAndValue[0, 0], 2**40+1)
+    np.testing.assert_array_equal(indexAndValue[:, 1].astype(np.float64), doubleValues)
+    indexAndName = slicer.util.arrayFromTableColumn(tableNode3, ["Index", "Name"])
+    self.assertEqual(indexAndName.dtype, object)
+    self.assertEqual(indexAndName[1, 1], "second")
+    with self.assertRaises(ValueError):
+      slicer.util.arrayFromTableColumn(tableNode3, ["Index", "NonExistingColumn"])
+
+    self.delayDisplay('Test in-place update')
+    valueColumn = tableNode3.GetTable().GetColumnByName("Value")
+    slicer.util.updateTableFromArray(tableNode3, [int64Values, doubleValues*2, stringValues, boolValues],
+      ["Index", "Value", "Name", "Selected"])
+    self.assertTrue(tableNode3.GetTable().GetColumnByName("Value") is valueColumn)
+    np.testing.assert_array_equal(slicer.util.arrayFromTableColumn(tableNode3, "Value"), doubleValues*2)
+    # Columns are replaced if the number of rows changes
+    slicer.util.updateTableFromArray(tableNode3, [int64Values[:2], doubleValues[:2], stringValues[:2], boolValues[:2]],
+      ["Index", "Value", "Name", "Selected"])
+    self.assertEqual(tableNode3.GetNumberOfRows(), 2)
+    self.assertFalse(tableNode3.GetTable().GetColumnByName("Value") is valueColumn)
+    np.testing.assert_array_equal(slicer.util.arrayFromTableColumn(tableNode3, "Value"), doubleValues[:2])
+
+    self.delayDisplay('Test update without copy')
+    sharedValues = np.arange(5, dtype=np.float64)
+    tableNode4 = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode")
+    slicer.util.updateTableFromArray(tableNode4, sharedValues, "Shared", deepCopy=False)
+    sharedValues[2] = 10.0
+    slicer.util.arrayFromTableColumnModified(tableNode4, "Shared")
+    self.assertEqual(tableNode4.GetTable().GetColumnByName("Shared").GetValue(2), 10.0)
+    # Updating the table again does not overwrite the shared numpy array
+    slicer.util.updateTableFromArray(tableNode4, np.zeros(5), "Shared")
+    self.assertEqual(sharedValues[2], 10.0)
+    self.assertEqual(tableNode4.GetTable().GetColumnByName("Shared").GetValue(2), 0.0)
+
     self.delayDisplay('Testing slicer.util.test_updateTableFromArray passed')
 
   def test_arrayFromModelPoints(self):
@@ -433,6 +486,28 @@ class UtilTestTest(ScriptedLoadableModuleTest):
     markupsNode.GetNthControlPointPositionWorld(1,position)
     np.testing.assert_array_equal(position,narray[1,:])
 
+    self.delayDisplay('Test updateMarkupsControlPointsFromArray with labels, selection and visibility')
+
+    pointModifiedEvents = []
+    observerTag = markupsNode.AddObserver(slicer.vtkMRMLMarkupsNode.PointModifiedEvent,
+      lambda caller, event: pointModifiedEvents.append(event))
+    narray = np.array([[1,2,3],[4,5,6],[7,8,9]])
+    slicer.util.updateMarkupsControlPointsFromArray(markupsNode, narray,
+      labels=['first', 'second', 'third'], selected=[True, False, True], visible=np.array([False, True, True]))
+    markupsNode.RemoveObserver(observerTag)
+    self.assertEqual(len(pointModifiedEvents), 1)
+    np.testing.assert_array_equal(slicer.util.arrayFromMarkupsControlPoints(markupsNode), narray)
+    self.assertEqual(slicer.util.markupsControlPointLabels(markupsNode), ['first', 'second', 'third'])
+    np.testing.assert_array_equal(slicer.util.arrayFromMarkupsControlPointSelected(markupsNode), [True, False, True])
+    np.testing.assert_array_equal(slicer.util.arrayFromMarkupsControlPointVisibility(markupsNode), [False, True, True])
+
+    with self.assertRaises(RuntimeError):
+      slicer.util.updateMarkupsControlPointsFromArray(markupsNode, narray, labels=['first'])
+
+    slicer.util.updateMarkupsControlPointsFromArray(markupsNode, np.zeros(0))
+    self.assertEqual(markupsNode.GetNumberOfControlPoints(), 0)
+    self.assertEqual(slicer.util.arrayFromMarkupsControlPoints(markupsNode).shape, (0, 3))
+
   def test_array(self):
     # Test if convenience function of getting numpy array from various nodes works
 
@@ -70,10 +70,19 @@ This work is partially supported by PAR-07-249: R01CA131718 NA-MIC Virtual Colon
     testCase.runTest(**kwargs)
 
 class ScriptedLoadableModuleWidget(object):
+
+  # If set to True in a derived class then ``setup()`` is not called when the application
+  # creates the module widget but when the module is entered for the first time
+  # (or when an attribute that ``setup()`` creates is accessed before that, for example by
+  # a subject hierarchy plugin). Heavy imports should then be done in ``setup()`` instead of
+  # at the top of the module file so that they are deferred as well.
+  lazySetup = False
+
   def __init__(self, parent = None):
     """If parent widget is not specified: a top-level widget is created automatically;
     the application has to delete this widget (by calling widget.parent.deleteLater() to avoid memory leaks.
     """
+    self._lazySetupState = None
     # Get module name by stripping 'Widget' from the class name
     self.moduleName = self.__class__.__name__
     if self.moduleName.endswith('Widget'):
@@ -89,9 +98,49 @@ class ScriptedLoadableModuleWidget(object):
     if not parent:
       self.setup()
       self.parent.show()
+    elif self.lazySetup and isinstance(parent, slicer.qSlicerScriptedLoadableModuleWidget):
+      # Widget is created by the module (not in a slicelet or other custom application).
+      # The application looks up the "setup" and "enter" methods right after the widget
+      # is instantiated, these instance attributes take precedence over the class methods.
+      self._lazySetupState = 'waiting'
+      self.setup = self._deferSetup
+      self.enter = self._enterAfterSetup
     slicer.app.moduleManager().connect(
       'moduleAboutToBeUnloaded(QString)', self._onModuleAboutToBeUnloaded)
 
+  @property
+  def setupPending(self):
+    """True if ``setup()`` has been requested but deferred until the module is entered."""
+    return self._lazySetupState in ('waiting', 'deferred')
+
+  def ensureSetup(self):
+    """Run the deferred ``setup()`` now. Does nothing if the widget is already set up."""
+    if self._lazySetupState != 'deferred':
+      return
+    self._lazySetupState = 'running'
+    try:
+      del self.setup
+      type(self).setup(self)
+    finally:
+      self._lazySetupState = None
+
+  def _deferSetup(self):
+    self._lazySetupState = 'deferred'
+
+  def _enterAfterSetup(self):
+    self.ensureSetup()
+    enter = getattr(type(self), 'enter', None)
+    if enter is not None:
+      enter(self)
+
+  def __getattr__(self, name):
+    # Only called for attributes that are not found the normal way: attributes that
+    # setup() creates are made available by running the deferred setup.
+    if name.startswith('__') or self.__dict__.get('_lazySetupState') != 'deferred':
+      raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+    self.ensureSetup()
+    return object.__getattribute__(self, name)
+
   def resourcePath(self, filename):
     scriptedModulesPath = os.path.dirname(slicer.util.modulePath(self.moduleName))
     return os.path.join(scriptedModulesPath, 'Resources', filename)
@@ -110,7 +159,8 @@ class ScriptedLoadableModuleWidget(object):
     current one.
     """
     if moduleName == self.moduleName:
-      self.cleanup()
+      if not self.setupPending:
+        self.cleanup()
       slicer.app.moduleManager().disconnect(
         'moduleAboutToBeUnloaded(QString)', self._onModuleAboutToBeUnloaded)
 
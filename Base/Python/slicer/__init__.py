@@ -40,18 +40,62 @@ except ImportError as detail:
 import string, os, sys
 standalone_python = "python" in str.lower(os.path.split(sys.executable)[-1])
 
+from .profiling import startupProfiler as _startupProfiler
+
+# Kits listed in the class index generated at build time (VTK-wrapped kits) are
+# imported when one of their classes is first accessed ("lazy loading") if running
+# in a regular python interpreter. Within the application, all kits are imported
+# at startup, as classes must be known before wrapped objects are returned to Python.
+# The SLICER_LAZY_KIT_LOADING environment variable (set to 0 or 1) overrides this.
+try:
+  from .kitsindex import kit_classes as _lazyKitClasses
+except ImportError:
+  _lazyKitClasses = {}
+
+if os.environ.get("SLICER_LAZY_KIT_LOADING", "1" if standalone_python else "0") == "0":
+  _lazyKitClasses = {}
+
+_lazyKits = set(_lazyKitClasses.values())
+_importedKits = set()
+
+def _importKit(kit):
+  _importedKits.add(kit)
+  try:
+    with _startupProfiler().profile(kit, "kit"):
+      exec("from %s import *" % (kit), globals())
+  except ImportError as detail:
+    print(detail)
+
 for kit in available_kits:
   # skip PythonQt kits if we are running in a regular python interpreter
   if standalone_python and "PythonQt" in kit:
     continue
 
-  try:
-    exec("from %s import *" % (kit))
-  except ImportError as detail:
-    print(detail)
+  if kit not in _lazyKits:
+    _importKit(kit)
 
   del kit
 
+if _lazyKits:
+  import types as _types
+
+  class _LazyKitsModule(_types.ModuleType):
+    """Type of the ``slicer`` module when kits are loaded lazily."""
+
+    def __getattr__(self, name):
+      # Only called for attributes that are not found the normal way
+      kit = _lazyKitClasses.get(name)
+      if kit is None or kit in _importedKits:
+        raise AttributeError("module 'slicer' has no attribute '%s'" % name)
+      _importKit(kit)
+      return _types.ModuleType.__getattribute__(self, name)
+
+    def __dir__(self):
+      return sorted(set(_types.ModuleType.__dir__(self)) | set(_lazyKitClasses))
+
+  # Module level __getattr__ is not supported before Python 3.7
+  sys.modules[__name__].__class__ = _LazyKitsModule
+
 #-----------------------------------------------------------------------------
 # Cleanup: Removing things the user shouldn't have to see.
 
@@ -0,0 +1,562 @@
+""" This module provides a harness for timing performance benchmarks and
+reporting the results in a machine-readable form.
+
+Benchmarks are registered using the :func:`benchmark` decorator, typically at
+the top level of a scripted module, and run from the Python console using
+:func:`runBenchmarks` or headless using the ``--benchmark`` command-line
+option::
+
+  Slicer --no-main-window --benchmark "ScenePerformance.*" --benchmark-output results.json
+
+Results can be compared with stored baselines to detect regressions, either
+using ``--benchmark-baseline`` or by running this file as a script::
+
+  python benchmark.py --threshold 0.1 baselines/ results.json
+"""
+from __future__ import print_function
+import collections
+
+_benchmarks = collections.OrderedDict()
+
+class SkipBenchmark(Exception):
+  """Exception raised by a benchmark (or its set up function) if it cannot
+  run in the current application configuration (e.g. no main window).
+  """
+  pass
+
+class Benchmark(object):
+  """Benchmarked function with its timing parameters.
+
+  ``function`` is called ``warmup`` times without being timed, then ``repeat``
+  times, each call being one sample. ``setUp`` is called once before the
+  first call and its return value, if not None, is passed as argument to
+  ``function``, ``setUpSample``, ``tearDownSample`` and ``tearDown``.
+  ``setUpSample`` and ``tearDownSample`` are called (untimed) before and after
+  each call of ``function``.
+  """
+
+  def __init__(self, function, name=None, group=None, description=None, warmup=1, repeat=10,
+               setUp=None, tearDown=None, setUpSample=None, tearDownSample=None):
+    self.function = function
+    self.name = name if name else function.__name__
+    self.group = group if group else ""
+    self.description = description if description else (function.__doc__ or "").strip()
+    self.warmup = warmup
+    self.repeat = repeat
+    self.setUp = setUp
+    self.tearDown = tearDown
+    self.setUpSample = setUpSample
+    self.tearDownSample = tearDownSample
+
+  def run(self, warmup=None, repeat=None):
+    """Run the benchmark and return a :class:`BenchmarkResult`.
+
+    ``warmup`` and ``repeat`` override the values the benchmark was created with.
+    Exceptions raised by the benchmark are reported in the result.
+    """
+    import logging, time, traceback
+    warmup = self.warmup if warmup is None else warmup
+    repeat = self.repeat if repeat is None else repeat
+    result = BenchmarkResult(self.name, self.group, self.description, warmup, repeat)
+
+    def call(function, state):
+      return function(state) if state is not None else function()
+
+    state = None
+    try:
+      if self.setUp:
+        state = self.setUp()
+      for sampleIndex in range(warmup + repeat):
+        if self.setUpSample:
+          call(self.setUpSample, state)
+        startTime = time.perf_counter()
+        call(self.function, state)
+        elapsedTime = time.perf_counter() - startTime
+        if self.tearDownSample:
+          call(self.tearDownSample, state)
+        if sampleIndex >= warmup:
+          result.samples.append(elapsedTime)
+    except SkipBenchmark as exception:
+      result.skipped = str(exception)
+      logging.info("Benchmark %s skipped: %s" % (self.name, result.skipped))
+    except Exception as exception:
+      result.error = traceback.format_exc()
+      logging.error("Benchmark %s failed: %s" % (self.name, result.error))
+    finally:
+      if self.tearDown:
+        try:
+          call(self.tearDown, state)
+        except Exception:
+          logging.error("Benchmark %s tear down failed: %s" % (self.name, traceback.format_exc()))
+    result.statistics = statistics(result.samples)
+    return result
+
+class BenchmarkResult(object):
+  """Timing samples (in seconds) and their statistics for one benchmark run."""
+
+  def __init__(self, name, group="", description="", warmup=0, repeat=0):
+    self.name = name
+    self.group = group
+    self.description = description
+    self.warmup = warmup
+    self.repeat = repeat
+    self.samples = []
+    self.statistics = statistics([])
+    self.skipped = None
+    self.error = None
+
+  @property
+  def succeeded(self):
+    return self.error is None and self.skipped is None
+
+  def toDict(self):
+    return collections.OrderedDict([
+      ('name', self.name),
+      ('group', self.group),
+      ('description', self.description),
+      ('warmup', self.warmup),
+      ('repeat', self.repeat),
+      ('unit', 's'),
+      ('statistics', self.statistics),
+      ('samples', self.samples),
+      ('skipped', self.skipped),
+      ('error', self.error),
+      ])
+
+  @classmethod
+  def fromDict(cls, dictionary):
+    result = cls(dictionary['name'], dictionary.get('group', ""), dictionary.get('description', ""),
+                 dictionary.get('warmup', 0), dictionary.get('repeat', 0))
+    result.samples = list(dictionary.get('samples') or [])
+    if result.samples:
+      result.statistics = statistics(result.samples)
+    else:
+      result.statistics.update(dictionary.get('statistics') or {})
+    result.skipped = dictionary.get('skipped')
+    result.error = dictionary.get('error')
+    return result
+
+#
+# Registration
+#
+
+def benchmark(name=None, **kwargs):
+  """Decorator registering a function as a benchmark.
+
+  Keyword arguments are passed to :class:`Benchmark`. The decorated function
+  is returned unchanged, with the registered benchmark as ``benchmark``
+  attribute.
+
+  .. code-block:: python
+
+    @slicer.benchmark.benchmark("MyModule.LoadVolume", group="IO", repeat=5,
+                                tearDownSample=lambda: slicer.mrmlScene.Clear(0))
+    def loadVolume():
+      slicer.util.loadVolume(filePath)
+  """
+  def decorator(function):
+    function.benchmark = registerBenchmark(function, name, **kwargs)
+    return function
+  return decorator
+
+def registerBenchmark(function, name=None, **kwargs):
+  """Register ``function`` as a benchmark and return the :class:`Benchmark`.
+  A benchmark previously registered with the same name is replaced.
+  """
+  registeredBenchmark = Benchmark(function, name, **kwargs)
+  _benchmarks[registeredBenchmark.name] = registeredBenchmark
+  return registeredBenchmark
+
+def unregisterBenchmark(name):
+  """Remove the benchmark ``name`` from the registered benchmarks."""
+  _benchmarks.pop(name, None)
+
+def benchmarks(pattern="*"):
+  """Return the registered benchmarks whose name or group matches ``pattern``."""
+  import fnmatch
+  return [registeredBenchmark for registeredBenchmark in _benchmarks.values()
+          if fnmatch.fnmatchcase(registeredBenchmark.name, pattern)
+          or fnmatch.fnmatchcase(registeredBenchmark.group, pattern)]
+
+#
+# Running
+#
+
+def measure(function, name=None, warmup=0, repeat=1, **kwargs):
+  """Time ``function`` without registering it and return a :class:`BenchmarkResult`."""
+  return Benchmark(function, name, warmup=warmup, repeat=repeat, **kwargs).run()
+
+def runBenchmarks(pattern="*", outputFilePath=None, warmup=None, repeat=None):
+  """Run the registered benchmarks matching ``pattern`` and return the list of
+  :class:`BenchmarkResult`.
+
+  A summary table is printed and, if ``outputFilePath`` is specified, the
+  results are written using :func:`writeResults`.
+  """
+  results = []
+  for registeredBenchmark in benchmarks(pattern):
+    print("Running benchmark %s" % registeredBenchmark.name)
+    results.append(registeredBenchmark.run(warmup, repeat))
+  print(formatResults(results))
+  if outputFilePath:
+    writeResults(results, outputFilePath)
+  return results
+
+def runBenchmarksFromCommandLine():
+  """Run the benchmarks selected by the ``--benchmark`` command-line option.
+
+  Results are written to the file specified by ``--benchmark-output`` (if any)
+  and compared with the baselines found in the ``--benchmark-baseline``
+  directory (if any). An exception is raised if any of the benchmarks failed
+  or regressed so that the application exits with a failure code.
+  """
+  import slicer
+  options = slicer.app.commandOptions()
+  results = runBenchmarks(options.benchmarkPattern, options.benchmarkOutputFilePath)
+  if not results:
+    raise RuntimeError("No benchmark matches '%s'" % options.benchmarkPattern)
+  failedResults = [result.name for result in results if result.error is not None]
+  if failedResults:
+    raise RuntimeError("Failed benchmarks: %s" % ", ".join(failedResults))
+  if options.benchmarkBaselineDirectory:
+    comparisons = compareResults(readBaselines(options.benchmarkBaselineDirectory), results)
+    print(formatComparisons(comparisons))
+    regressions = [comparison.name for comparison in comparisons if comparison.status == 'regression']
+    if regressions:
+      raise RuntimeError("Benchmark regressions: %s" % ", ".join(regressions))
+
+#
+# Statistics
+#
+
+def percentile(sortedSamples, fraction):
+  """Return the ``fraction`` (between 0 and 1) percentile of ``sortedSamples``,
+  linearly interpolated between the closest ranks.
+  """
+  if not sortedSamples:
+    return None
+  position = (len(sortedSamples) - 1) * fraction
+  lowerIndex = int(position)
+  upperIndex = min(lowerIndex + 1, len(sortedSamples) - 1)
+  weight = position - lowerIndex
+  return sortedSamples[lowerIndex] * (1.0 - weight) + sortedSamples[upperIndex] * weight
+
+def statistics(samples):
+  """Return a dictionary of summary statistics of ``samples``: count, min, max,
+  mean, median, p95 and (sample) standard deviation.
+  """
+  import math
+  sortedSamples = sorted(samples)
+  count = len(sortedSamples)
+  mean = sum(sortedSamples) / count if count else None
+  stddev = None
+  if count > 1:
+    stddev = math.sqrt(sum((sample - mean) ** 2 for sample in sortedSamples) / (count - 1))
+  elif count == 1:
+    stddev = 0.0
+  return collections.OrderedDict([
+    ('count', count),
+    ('min', sortedSamples[0] if count else None),
+    ('max', sortedSamples[-1] if count else None),
+    ('mean', mean),
+    ('median', percentile(sortedSamples, 0.5)),
+    ('p95', percentile(sortedSamples, 0.95)),
+    ('stddev', stddev),
+    ])
+
+def mannWhitneyU(samples, otherSamples):
+  """Return the Mann-Whitney U statistic of ``samples`` and the one-sided
+  p-value of the hypothesis that ``samples`` are not greater than
+  ``otherSamples``.
+
+  The p-value uses the normal approximation with tie and continuity
+  corrections, which is reasonable from about 5 samples in each group.
+  """
+  import math
+  values = sorted([(value, 0) for value in samples] + [(value, 1) for value in otherSamples])
+  count = len(values)
+  rankSum = 0.0
+  tieCorrection = 0.0
+  start = 0
+  while start < count:
+    end = start
+    while end + 1 < count and values[end + 1][0] == values[start][0]:
+      end += 1
+    # Tied values get the average of their ranks (ranks start at 1)
+    averageRank = (start + end) / 2.0 + 1
+    rankSum += averageRank * sum(1 for value in values[start:end + 1] if value[1] == 0)
+    ties = end - start + 1
+    tieCorrection += ties ** 3 - ties
+    start = end + 1
+  count1 = len(samples)
+  count2 = len(otherSamples)
+  u = rankSum - count1 * (count1 + 1) / 2.0
+  if count1 == 0 or count2 == 0 or count < 2:
+    return u, 1.0
+  variance = count1 * count2 / 12.0 * ((count + 1) - tieCorrection / (count * (count - 1)))
+  if variance <= 0:
+    return u, 1.0
+  z = (u - count1 * count2 / 2.0 - 0.5) / math.sqrt(variance)
+  return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+#
+# Reporting
+#
+
+def systemInformation():
+  """Return a dictionary describing the machine and the application build the
+  benchmarks ran on.
+  """
+  import datetime, os, platform
+  information = collections.OrderedDict([
+    ('timestamp', datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')),
+    ('hostname', platform.node()),
+    ('platform', platform.platform()),
+    ('machine', platform.machine()),
+    ('processor', platform.processor()),
+    ('cpuCount', os.cpu_count()),
+    ('pythonVersion', platform.python_version()),
+    ])
+  try:
+    import slicer
+    app = slicer.app
+  except (ImportError, AttributeError):
+    return information
+  information['applicationName'] = app.applicationName
+  information['applicationVersion'] = app.applicationVersion
+  information['repositoryRevision'] = app.repositoryRevision
+  information['repositoryBranch'] = app.repositoryBranch
+  information['releaseType'] = app.releaseType
+  information['os'] = app.os
+  information['arch'] = app.arch
+  return information
+
+def formatResults(results):
+  """Return the results as a human-readable table (times in milliseconds)."""
+  columns = ['count', 'min', 'median', 'mean', 'p95', 'stddev']
+  nameWidth = max([len("Benchmark")] + [len(result.name) for result in results])
+  lines = [("%-*s" % (nameWidth, "Benchmark")) + "%12s" % columns[0]
+           + "".join("%12s" % (column + " [ms]") for column in columns[1:])]
+  for result in results:
+    line = "%-*s" % (nameWidth, result.name)
+    if result.skipped is not None:
+      line += "  skipped: %s" % result.skipped
+    elif result.error is not None:
+      line += "  failed: %s" % result.error.strip().splitlines()[-1]
+    else:
+      line += "%12d" % result.statistics['count']
+      line += "".join("%12.3f" % (result.statistics[column] * 1000.0) for column in columns[1:])
+    lines.append(line)
+  return "\n".join(lines)
+
+_csvStatisticsColumns = ['count', 'min', 'max', 'mean', 'median', 'p95', 'stddev']
+
+def writeResults(results, filePath, fileFormat=None):
+  """Write benchmark results with :func:`systemInformation` to ``filePath``.
+
+  ``fileFormat`` is ``json`` or ``csv``; by default it is deduced from the file
+  extension. JSON files contain all the samples, CSV files contain one row
+  of statistics per benchmark.
+  """
+  import csv, json, os
+  if fileFormat is None:
+    fileFormat = 'csv' if filePath.lower().endswith('.csv') else 'json'
+  information = systemInformation()
+  directory = os.path.dirname(filePath)
+  if directory and not os.path.exists(directory):
+    os.makedirs(directory)
+  if fileFormat == 'json':
+    with open(filePath, 'w') as outputFile:
+      json.dump(collections.OrderedDict([
+        ('system', information),
+        ('results', [result.toDict() for result in results]),
+        ]), outputFile, indent=2)
+  elif fileFormat == 'csv':
+    with open(filePath, 'w', newline='') as outputFile:
+      writer = csv.writer(outputFile)
+      writer.writerow(['name', 'group', 'warmup', 'repeat', 'unit'] + _csvStatisticsColumns
+                      + ['skipped', 'error'] + list(information.keys()))
+      for result in results:
+        writer.writerow([result.name, result.group, result.warmup, result.repeat, 's']
+                        + [result.statistics[column] for column in _csvStatisticsColumns]
+                        + [result.skipped, result.error.strip().splitlines()[-1] if result.error else None]
+                        + list(information.values()))
+  else:
+    raise ValueError("Unsupported benchmark result file format: %s" % fileFormat)
+
+def readResults(filePath):
+  """Read benchmark results written by :func:`writeResults`.
+
+  Return the list of :class:`BenchmarkResult`. Results read from CSV files
+  have statistics but no samples.
+  """
+  import csv, json
+  if filePath.lower().endswith('.csv'):
+    results = []
+    with open(filePath, newline='') as inputFile:
+      for row in csv.DictReader(inputFile):
+        resultStatistics = collections.OrderedDict()
+        for column in _csvStatisticsColumns:
+          resultStatistics[column] = float(row[column]) if row[column] else None
+        resultStatistics['count'] = int(resultStatistics['count'] or 0)
+        results.append(BenchmarkResult.fromDict({
+          'name': row['name'], 'group': row['group'],
+          'warmup': int(row['warmup']), 'repeat': int(row['repeat']),
+          'statistics': resultStatistics,
+          'skipped': row['skipped'] or None, 'error': row['error'] or None}))
+    return results
+  with open(filePath) as inputFile:
+    content = json.load(inputFile)
+  return [BenchmarkResult.fromDict(result) for result in content['results']]
+
+#
+# Regression detection
+#
+
+class BenchmarkComparison(object):
+  """Comparison of the result of a benchmark with its baseline.
+
+  ``status`` is one of ``regression``, ``improvement``, ``unchanged``, ``new``
+  (no baseline), ``missing`` (no result), ``skipped`` or ``failed``.
+  ``relativeChange`` is the relative change of the median time and
+  ``pValue`` the Mann-Whitney p-value of the change (None if there are not
+  enough samples).
+  """
+
+  def __init__(self, name, status, baselineMedian=None, median=None, relativeChange=None, pValue=None, threshold=None):
+    self.name = name
+    self.status = status
+    self.baselineMedian = baselineMedian
+    self.median = median
+    self.relativeChange = relativeChange
+    self.pValue = pValue
+    self.threshold = threshold
+
+def baselineFilePath(baselineDirectory, name):
+  """Return the path of the baseline file of the benchmark ``name``."""
+  import os, re
+  return os.path.join(baselineDirectory, re.sub(r'[^A-Za-z0-9_.-]', '_', name) + '.json')
+
+def writeBaselines(results, baselineDirectory):
+  """Store each successful result as the baseline of its benchmark, in a
+  separate file of ``baselineDirectory``.
+  """
+  for result in results:
+    if result.succeeded:
+      writeResults([result], baselineFilePath(baselineDirectory, result.name))
+
+def readBaselines(baselineDirectory):
+  """Return the baseline results stored in ``baselineDirectory``, as a list
+  of :class:`BenchmarkResult`.
+  """
+  import glob, os
+  baselines = []
+  for filePath in sorted(glob.glob(os.path.join(baselineDirectory, '*.json'))):
+    baselines.extend(readResults(filePath))
+  return baselines
+
+def compareResults(baselines, results, relativeThreshold=0.1, thresholds=None, significanceLevel=0.05, minimumNumberOfSamples=5):
+  """Compare ``results`` with ``baselines`` (lists of :class:`BenchmarkResult`)
+  and return a list of :class:`BenchmarkComparison`.
+
+  A benchmark regressed if its median time increased by more than the
+  relative threshold and, if both runs have at least
+  ``minimumNumberOfSamples`` samples, a one-sided Mann-Whitney test of the
+  samples is significant at ``significanceLevel``. This avoids reporting
+  noise as regression. ``thresholds`` maps benchmark name patterns to
+  relative thresholds overriding ``relativeThreshold``.
+  """
+  import fnmatch
+  baselinesByName = collections.OrderedDict((baseline.name, baseline) for baseline in baselines)
+  comparisons = []
+  for result in results:
+    threshold = relativeThreshold
+    for pattern, patternThreshold in (thresholds or {}).items():
+      if fnmatch.fnmatchcase(result.name, pattern):
+        threshold = patternThreshold
+        break
+    baseline = baselinesByName.pop(result.name, None)
+    if result.error is not None:
+      comparisons.append(BenchmarkComparison(result.name, 'failed', threshold=threshold))
+      continue
+    if result.skipped is not None:
+      comparisons.append(BenchmarkComparison(result.name, 'skipped', threshold=threshold))
+      continue
+    median = result.statistics['median']
+    if baseline is None or not baseline.statistics['median']:
+      comparisons.append(BenchmarkComparison(result.name, 'new', median=median, threshold=threshold))
+      continue
+    baselineMedian = baseline.statistics['median']
+    relativeChange = (median - baselineMedian) / baselineMedian
+    pValue = None
+    enoughSamples = min(len(result.samples), len(baseline.samples)) >= minimumNumberOfSamples
+    if relativeChange > threshold:
+      if enoughSamples:
+        pValue = mannWhitneyU(result.samples, baseline.samples)[1]
+      status = 'regression' if pValue is None or pValue < significanceLevel else 'unchanged'
+    elif relativeChange < -threshold:
+      if enoughSamples:
+        pValue = mannWhitneyU(baseline.samples, result.samples)[1]
+      status = 'improvement' if pValue is None or pValue < significanceLevel else 'unchanged'
+    else:
+      status = 'unchanged'
+    comparisons.append(BenchmarkComparison(result.name, status, baselineMedian, median, relativeChange, pValue, threshold))
+  for name in baselinesByName:
+    comparisons.append(BenchmarkComparison(name, 'missing', baselineMedian=baselinesByName[name].statistics['median']))
+  return comparisons
+
+def formatComparisons(comparisons):
+  """Return the comparisons as a human-readable table, regressions first."""
+  statusOrder = ['regression', 'failed', 'improvement', 'unchanged', 'new', 'missing', 'skipped']
+  comparisons = sorted(comparisons, key=lambda comparison: statusOrder.index(comparison.status))
+  nameWidth = max([len("Benchmark")] + [len(comparison.name) for comparison in comparisons])
+  def formatValue(value, valueFormat):
+    return "%14s" % (valueFormat % value if value is not None else "-")
+  lines = [("%-*s" % (nameWidth, "Benchmark")) + "".join("%14s" % column for column in
+           ["status", "baseline [ms]", "median [ms]", "change", "threshold", "p-value"])]
+  for comparison in comparisons:
+    lines.append("%-*s" % (nameWidth, comparison.name)
+      + "%14s" % comparison.status
+      + formatValue(comparison.baselineMedian * 1000.0 if comparison.baselineMedian is not None else None, "%.3f")
+      + formatValue(comparison.median * 1000.0 if comparison.median is not None else None, "%.3f")
+      + formatValue(comparison.relativeChange * 100.0 if comparison.relativeChange is not None else None, "%+.1f%%")
+      + formatValue(comparison.threshold * 100.0 if comparison.threshold is not None else None, "%.1f%%")
+      + formatValue(comparison.pValue, "%.4f"))
+  return "\n".join(lines)
+
+def main(argv=None):
+  """Compare benchmark result files with stored baselines.
+
+  Usage: python benchmark.py [--threshold 0.1] [--significance-level 0.05]
+  [--update-baselines] baselineDirectory resultFile [resultFile ...]
+
+  Return 1 if any benchmark failed or regressed, 0 otherwise.
+  """
+  import argparse
+  parser = argparse.ArgumentParser(description="Compare benchmark results with stored baselines.")
+  parser.add_argument("baselineDirectory", help="directory containing one baseline file per benchmark")
+  parser.add_argument("resultFiles", nargs="+", help="JSON or CSV benchmark result files")
+  parser.add_argument("--threshold", type=float, default=0.1,
+                      help="relative increase of the median time above which a benchmark regressed (default: 0.1)")
+  parser.add_argument("--benchmark-threshold", nargs=2, action="append", default=[], metavar=("PATTERN", "THRESHOLD"),
+                      help="relative threshold of the benchmarks matching the pattern")
+  parser.add_argument("--significance-level", type=float, default=0.05,
+                      help="significance level of the Mann-Whitney test (default: 0.05)")
+  parser.add_argument("--update-baselines", action="store_true",
+                      help="store the results as new baselines after comparison")
+  args = parser.parse_args(argv)
+
+  results = []
+  for resultFile in args.resultFiles:
+    results.extend(readResults(resultFile))
+  thresholds = collections.OrderedDict((pattern, float(threshold)) for pattern, threshold in args.benchmark_threshold)
+  comparisons = compareResults(readBaselines(args.baselineDirectory), results,
+    args.threshold, thresholds, args.significance_level)
+  print(formatComparisons(comparisons))
+  if args.update_baselines:
+    writeBaselines(results, args.baselineDirectory)
+  return 1 if any(comparison.status in ['regression', 'failed'] for comparison in comparisons) else 0
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(main())
@@ -1,6 +1,10 @@
 """ This module is a place holder for convenient functions allowing to interact with CLI."""
 from __future__ import print_function
 
+import collections
+import concurrent.futures
+import time
+
 def createNode(cliModule, parameters = None):
   """Creates a new vtkMRMLCommandLineModuleNode for a specific module, with
   optional parameters"""
@@ -46,17 +50,19 @@ def setNodeParameters(node, parameters):
     else:
       print("parameter ", key, " has unsupported type ", value.__class__.__name__)
 
-def runSync(module, node=None, parameters=None, delete_temporary_files=True, update_display=True):
+def runSync(module, node=None, parameters=None, delete_temporary_files=True, update_display=True, shared_memory_transfer=False):
   """Run a CLI synchronously, optionally given a node with optional parameters,
   returning the node (or the new one if created)
   node: existing parameter node (None by default)
   parameters: dictionary of parameters for cli (None by default)
   delete_temporary_files: remove temp files created during execution (True by default)
   update_display: show output nodes after completion
+  shared_memory_transfer: pass data files through shared memory, if available (False by default)
   """
-  return run(module, node=node, parameters=parameters, wait_for_completion=True, delete_temporary_files=delete_temporary_files, update_display=update_display)
+  return run(module, node=node, parameters=parameters, wait_for_completion=True, delete_temporary_files=delete_temporary_files,
+    update_display=update_display, shared_memory_transfer=shared_memory_transfer)
 
-def run(module, node = None, parameters = None, wait_for_completion = False, delete_temporary_files = True, update_display=True):
+def run(module, node = None, parameters = None, wait_for_completion = False, delete_temporary_files = True, update_display=True, shared_memory_transfer=False):
   """Runs a CLI, optionally given a node with optional parameters, returning
   back the node (or the new one if created)
   node: existing parameter node (None by default)
@@ -64,6 +70,8 @@ def run(module, node = None, parameters = None, wait_for_completion = False, del
   wait_for_completion: block if True (False by default)
   delete_temporary_files: remove temp files created during exectuion (True by default)
   update_display: show output nodes after completion
+  shared_memory_transfer: write data files exchanged with CLI executables to a memory-backed
+    file system (POSIX shared memory) instead of the temporary directory, if available (False by default)
   """
   import slicer.util
   if node:
@@ -76,6 +84,7 @@ def run(module, node = None, parameters = None, wait_for_completion = False, del
   logic = module.logic()
 
   logic.SetDeleteTemporaryFiles(1 if delete_temporary_files else 0)
+  logic.SetSharedMemoryDataTransfer(1 if shared_memory_transfer else 0)
 
   if wait_for_completion:
       logic.ApplyAndWait(node, update_display)
@@ -90,4 +99,268 @@ def run(module, node = None, parameters = None, wait_for_completion = False, del
   return node
 
 def cancel(node):
-  print("Not yet implemented")
+  """Requests cancellation of a CLI that is scheduled or running.
+  Returns True if cancellation was requested, False if the CLI was not busy.
+  The node status is set to ``Cancelled`` once the execution has been stopped.
+  """
+  if not node or not node.IsBusy():
+    return False
+  node.Cancel()
+  return True
+
+def parameterNames(node, channel=None):
+  """Returns the names of the parameters of a vtkMRMLCommandLineModuleNode.
+  If channel is specified ("input" or "output") then only names of parameters
+  in that channel are returned.
+  """
+  names = []
+  for groupIndex in range(node.GetNumberOfParameterGroups()):
+    for parameterIndex in range(node.GetNumberOfParametersInGroup(groupIndex)):
+      if channel is not None and node.GetParameterChannel(groupIndex, parameterIndex) != channel:
+        continue
+      names.append(node.GetParameterName(groupIndex, parameterIndex))
+  return names
+
+#
+# Job queue
+#
+
+class CLIError(RuntimeError):
+  """Raised by :py:meth:`CLIJob.result` when a CLI completed with errors."""
+  pass
+
+class CLIJob(concurrent.futures.Future):
+  """Future representing a CLI execution submitted to a :py:class:`CLIJobQueue`.
+
+  The result of the future is a dictionary containing the values of the output
+  parameters of the CLI (for node parameters it is the node ID). If the CLI
+  completed with errors then :py:class:`CLIError` is raised; if the job
+  is cancelled then :py:class:`concurrent.futures.CancelledError` is raised.
+
+  The following attributes are available for reporting:
+
+  - ``module``, ``parameters``: what was submitted
+  - ``node``: the CLI parameter node while the job is running (None otherwise)
+  - ``status``: ``Queued`` or the last status string of the CLI node
+  - ``queuedTime``, ``startTime``, ``stopTime``: time stamps (``time.perf_counter``)
+  - ``elapsedTime``: execution time in seconds, ``waitingTime``: time spent in the queue
+  - ``outputText``, ``errorText``: output of the CLI process
+
+  .. warning:: Job states are updated by processing application events, therefore
+    :py:meth:`result` must not be called from the main thread before the job is done,
+    use :py:meth:`CLIJobQueue.wait` instead.
+  """
+
+  def __init__(self, queue, module, parameters, update_display):
+    super(CLIJob, self).__init__()
+    self.queue = queue
+    self.module = module
+    self.parameters = parameters
+    self.update_display = update_display
+    self.node = None
+    self.status = "Queued"
+    self.queuedTime = time.perf_counter()
+    self.startTime = None
+    self.stopTime = None
+    self.outputText = ""
+    self.errorText = ""
+
+  @property
+  def elapsedTime(self):
+    if self.startTime is None:
+      return None
+    stopTime = self.stopTime if self.stopTime is not None else time.perf_counter()
+    return stopTime - self.startTime
+
+  @property
+  def waitingTime(self):
+    startTime = self.startTime if self.startTime is not None else time.perf_counter()
+    return startTime - self.queuedTime
+
+  def cancel(self):
+    """Cancels the job. A queued job is removed from the queue, a running CLI is
+    requested to stop (the job becomes done when the CLI has actually stopped).
+    Returns False if the job is already done.
+    """
+    if self.node is not None:
+      return cancel(self.node)
+    if super(CLIJob, self).cancel():
+      self.status = "Cancelled"
+      if self in self.queue._queuedJobs:
+        self.queue._queuedJobs.remove(self)
+      return True
+    return False
+
+class CLIJobQueue(object):
+  """Runs many CLI jobs with a bounded number of concurrent executions.
+
+  Jobs are started in the order they are submitted. CLI parameter nodes are reused between
+  jobs of the same module: parameters that are not specified for a job are reset to the
+  value they had when the node was created.
+
+  Example:
+
+  .. code-block:: python
+
+    queue = slicer.cli.CLIJobQueue()
+    jobs = [queue.submit(slicer.modules.thresholdscalarvolume, {
+        "InputVolume": volumeNode.GetID(), "OutputVolume": outputVolumeNode.GetID(),
+        "ThresholdValue": 100, "ThresholdType": "Above"})
+      for volumeNode, outputVolumeNode in zip(inputVolumes, outputVolumes)]
+    queue.wait()
+    for job in jobs:
+      print("{0}: {1} ({2:.2f}s)".format(job.parameters["InputVolume"], job.status, job.elapsedTime))
+    queue.removeParameterNodes()
+  """
+
+  def __init__(self, maximumNumberOfConcurrentJobs=None, delete_temporary_files=True, shared_memory_transfer=False):
+    """
+    :param maximumNumberOfConcurrentJobs: maximum number of CLIs running at the same time.
+      By default the number of processor cores is used.
+    :param delete_temporary_files: remove temp files created during execution (True by default)
+    :param shared_memory_transfer: pass data files through shared memory, if available (False by default)
+    """
+    if maximumNumberOfConcurrentJobs is None:
+      import os
+      maximumNumberOfConcurrentJobs = os.cpu_count() or 1
+    self.maximumNumberOfConcurrentJobs = max(1, maximumNumberOfConcurrentJobs)
+    self.delete_temporary_files = delete_temporary_files
+    self.shared_memory_transfer = shared_memory_transfer
+    self._queuedJobs = collections.deque()
+    self._runningJobs = []
+    # Idle parameter nodes and their initial parameter values for each module
+    self._idleNodes = {}
+    self._defaultParameters = {}
+    self._nodeObservations = {}
+
+  def submit(self, module, parameters=None, update_display=False):
+    """Adds a job to the queue and returns a :py:class:`CLIJob` future.
+    The job is started as soon as the number of running jobs allows it.
+    """
+    job = CLIJob(self, module, dict(parameters) if parameters else {}, update_display)
+    self._queuedJobs.append(job)
+    self._startQueuedJobs()
+    return job
+
+  def submitJobs(self, jobs, update_display=False):
+    """Adds a list of ``(module, parameters)`` jobs to the queue and returns list of futures."""
+    return [self.submit(module, parameters, update_display) for module, parameters in jobs]
+
+  @property
+  def numberOfQueuedJobs(self):
+    return len(self._queuedJobs)
+
+  @property
+  def numberOfRunningJobs(self):
+    return len(self._runningJobs)
+
+  def cancelAll(self):
+    """Cancels all queued and running jobs."""
+    for job in list(self._queuedJobs):
+      job.cancel()
+    for job in list(self._runningJobs):
+      job.cancel()
+
+  def wait(self, jobs=None, timeout=None):
+    """Processes application events until all the jobs (all jobs of the queue by default) are done.
+    Returns False if the timeout (in seconds) expired before that.
+    """
+    import slicer
+    startTime = time.perf_counter()
+    while True:
+      if jobs is None:
+        if not self._queuedJobs and not self._runningJobs:
+          return True
+      elif all(job.done() for job in jobs):
+        return True
+      if timeout is not None and time.perf_counter() - startTime > timeout:
+        return False
+      slicer.app.processEvents()
+      time.sleep(0.01)
+
+  def removeParameterNodes(self):
+    """Removes parameter nodes of finished jobs from the scene."""
+    for nodes in self._idleNodes.values():
+      for node in nodes:
+        if node.GetScene():
+          node.GetScene().RemoveNode(node)
+    self._idleNodes = {}
+
+  def _acquireNode(self, module):
+    idleNodes = self._idleNodes.setdefault(module.name, [])
+    if idleNodes:
+      node = idleNodes.pop()
+      setNodeParameters(node, self._defaultParameters[module.name])
+      return node
+    node = createNode(module)
+    if node and module.name not in self._defaultParameters:
+      self._defaultParameters[module.name] = dict(
+        (name, node.GetParameterAsString(name)) for name in parameterNames(node))
+    return node
+
+  def _startQueuedJobs(self):
+    while self._queuedJobs and len(self._runningJobs) < self.maximumNumberOfConcurrentJobs:
+      job = self._queuedJobs.popleft()
+      if not job.set_running_or_notify_cancel():
+        # cancelled while queued
+        continue
+      self._startJob(job)
+
+  def _startJob(self, job):
+    import slicer
+    node = self._acquireNode(job.module)
+    if not node:
+      job.status = "CompletedWithErrors"
+      job.set_exception(CLIError("Failed to create parameter node for CLI module '%s'" % job.module.name))
+      return
+    setNodeParameters(node, job.parameters)
+    job.node = node
+    job.startTime = time.perf_counter()
+    self._runningJobs.append(job)
+    self._nodeObservations[node] = node.AddObserver(slicer.vtkMRMLCommandLineModuleNode.StatusModifiedEvent,
+      lambda caller, event, job=job: self._onJobStatusModified(job))
+    logic = job.module.logic()
+    logic.SetDeleteTemporaryFiles(1 if self.delete_temporary_files else 0)
+    logic.SetSharedMemoryDataTransfer(1 if self.shared_memory_transfer else 0)
+    logic.Apply(node, job.update_display)
+    # Apply may fail without scheduling the execution
+    if not node.IsBusy():
+      self._onJobStatusModified(job)
+
+  def _onJobStatusModified(self, job):
+    node = job.node
+    if node is None:
+      # already finished
+      return
+    job.status = node.GetStatusString()
+    if node.IsBusy():
+      return
+    job.stopTime = time.perf_counter()
+    job.outputText = node.GetOutputText()
+    job.errorText = node.GetErrorText()
+    status = node.GetStatus()
+    outputs = dict((name, node.GetParameterAsString(name)) for name in parameterNames(node, "output"))
+    node.RemoveObserver(self._nodeObservations.pop(node))
+    job.node = None
+    self._runningJobs.remove(job)
+    self._idleNodes.setdefault(job.module.name, []).append(node)
+    if status == node.Cancelled:
+      job.set_exception(concurrent.futures.CancelledError())
+    elif status == node.Completed:
+      job.set_result(outputs)
+    else:
+      job.set_exception(CLIError("CLI module '%s' %s: %s" % (job.module.name, job.status, job.errorText)))
+    self._startQueuedJobs()
+
+def runJobs(jobs, maximumNumberOfConcurrentJobs=None, wait_for_completion=True, update_display=False):
+  """Runs a list of ``(module, parameters)`` CLI jobs with bounded concurrency
+  and returns the list of :py:class:`CLIJob` futures.
+  If wait_for_completion is True (default) then the function returns when all jobs are done
+  and parameter nodes created for the jobs are removed from the scene.
+  """
+  queue = CLIJobQueue(maximumNumberOfConcurrentJobs)
+  futures = queue.submitJobs(jobs, update_display)
+  if wait_for_completion:
+    queue.wait()
+    queue.removeParameterNodes()
+  return futures
@@ -0,0 +1,257 @@
+"""This module provides a lightweight profiler for the application startup.
+
+The profiler records the wall time spent importing Python kits (in ``slicer/__init__.py``),
+importing scripted module files, instantiating scripted modules, and setting up scripted
+module widgets. It is enabled by setting the ``SLICER_STARTUP_PROFILE`` environment variable
+to the path of the trace file to write, which is what the ``--profile-startup`` command-line
+option does.
+
+The trace is written when startup is completed and updated when the application quits
+(to include module widgets that are set up later). The trace format is selected based on
+the file extension:
+
+- ``.json``: Chrome trace event format, which can be opened in ``chrome://tracing``,
+  `Perfetto <https://ui.perfetto.dev>`_ or `speedscope <https://www.speedscope.app>`_.
+- any other extension: folded stacks (one ``frame;frame;frame microseconds`` line per stack),
+  which is the input format of ``flamegraph.pl`` and is also accepted by speedscope.
+
+Example::
+
+  Slicer --profile-startup /tmp/startup.json --exit-after-startup
+
+This module must not import anything else than the Python standard library, as it is
+imported by ``slicer/__init__.py`` before the kits are loaded.
+"""
+from __future__ import print_function
+
+import functools
+import json
+import os
+import time
+
+STARTUP_PROFILE_ENVIRONMENT_VARIABLE = "SLICER_STARTUP_PROFILE"
+
+#
+# Profiler
+#
+
+class ProfilerEvent(object):
+  """Timing of a profiled operation. Times are in seconds (``time.perf_counter``)."""
+
+  def __init__(self, name, category, startTime, parent=None):
+    self.name = name
+    self.category = category
+    self.startTime = startTime
+    self.duration = None
+    self.parent = parent
+
+  @property
+  def stack(self):
+    """Return list of enclosing events, starting from the outermost one, including this event."""
+    stack = [self]
+    while stack[0].parent is not None:
+      stack.insert(0, stack[0].parent)
+    return stack
+
+class _NoProfiling(object):
+  """Context manager returned by :meth:`Profiler.profile` when profiling is disabled."""
+  def __enter__(self):
+    return None
+  def __exit__(self, exc_type, exc_value, traceback):
+    return False
+
+_noProfiling = _NoProfiling()
+
+class _Profiling(object):
+  def __init__(self, profiler, name, category):
+    self.profiler = profiler
+    self.name = name
+    self.category = category
+  def __enter__(self):
+    return self.profiler.begin(self.name, self.category)
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.profiler.end()
+    return False
+
+class Profiler(object):
+  """Records nested timed operations.
+
+  .. code-block:: python
+
+    profiler = slicer.profiling.Profiler()
+    with profiler.profile("MyModule", "import"):
+      import MyModule
+    print(profiler.formatSummary())
+  """
+
+  def __init__(self, enabled=True, outputFilePath=None):
+    self.enabled = enabled
+    self.outputFilePath = outputFilePath
+    self.startTime = time.perf_counter()
+    self.events = []
+    self._stack = []
+
+  def profile(self, name, category):
+    """Return a context manager that records the time spent in the ``with`` block."""
+    if not self.enabled:
+      return _noProfiling
+    return _Profiling(self, name, category)
+
+  def begin(self, name, category):
+    event = ProfilerEvent(name, category, time.perf_counter(), self._stack[-1] if self._stack else None)
+    self._stack.append(event)
+    self.events.append(event)
+    return event
+
+  def end(self):
+    event = self._stack.pop()
+    event.duration = time.perf_counter() - event.startTime
+    return event
+
+  def wrap(self, function, name, category):
+    """Return a wrapper of ``function`` that records the time spent in each call."""
+    @functools.wraps(function)
+    def profiledFunction(*args, **kwargs):
+      with self.profile(name, category):
+        return function(*args, **kwargs)
+    profiledFunction.profiledFunction = function
+    return profiledFunction
+
+  def completedEvents(self):
+    return [event for event in self.events if event.duration is not None]
+
+  def totalDurationByCategory(self):
+    """Return dictionary of total time of the outermost events of each category."""
+    totals = {}
+    for event in self.completedEvents():
+      # Avoid counting nested events of the same category twice
+      if any(parent.category == event.category for parent in event.stack[:-1]):
+        continue
+      totals[event.category] = totals.get(event.category, 0.0) + event.duration
+    return totals
+
+  def formatSummary(self, numberOfEvents=20):
+    """Return a human-readable summary: totals by category and the slowest events (times in milliseconds)."""
+    lines = ["Startup profile:"]
+    for category, duration in sorted(self.totalDurationByCategory().items(), key=lambda item: -item[1]):
+      lines.append("  %-10s %10.1f ms" % (category, duration * 1000.0))
+    events = sorted(self.completedEvents(), key=lambda event: -event.duration)[:numberOfEvents]
+    if events:
+      lines.append("Slowest operations:")
+      nameWidth = max(len(event.name) for event in events)
+      for event in events:
+        lines.append("  %-*s %-10s %10.1f ms" % (nameWidth, event.name, event.category, event.duration * 1000.0))
+    return "\n".join(lines)
+
+  def traceEvents(self):
+    """Return events in Chrome trace event format (complete events, times in microseconds)."""
+    pid = os.getpid()
+    return [{
+      "name": event.name,
+      "cat": event.category,
+      "ph": "X",
+      "ts": (event.startTime - self.startTime) * 1e6,
+      "dur": event.duration * 1e6,
+      "pid": pid,
+      "tid": 0
+      } for event in self.completedEvents()]
+
+  def foldedStacks(self):
+    """Return list of ``(stack, selfTime)`` pairs, where stack is a tuple of names
+    and self time is the time spent in the event excluding its children (in microseconds)."""
+    selfTimes = {}
+    for event in self.completedEvents():
+      stack = tuple("%s [%s]" % (frame.name, frame.category) for frame in event.stack)
+      selfTimes[stack] = selfTimes.get(stack, 0.0) + event.duration * 1e6
+      if len(stack) > 1:
+        selfTimes[stack[:-1]] = selfTimes.get(stack[:-1], 0.0) - event.duration * 1e6
+    return [(stack, max(0, int(round(selfTime)))) for stack, selfTime in selfTimes.items()]
+
+  def writeTrace(self, filePath=None):
+    """Write the recorded events into ``filePath`` (by default :attr:`outputFilePath`).
+    Chrome trace event format is used if the file extension is ``.json``, folded stacks otherwise.
+    """
+    if filePath is None:
+      filePath = self.outputFilePath
+    if not filePath:
+      raise ValueError("Output file path is not specified")
+    directory = os.path.dirname(os.path.abspath(filePath))
+    if not os.path.isdir(directory):
+      os.makedirs(directory)
+    with open(filePath, "w") as traceFile:
+      if filePath.lower().endswith(".json"):
+        json.dump({"traceEvents": self.traceEvents(), "displayTimeUnit": "ms"}, traceFile, indent=1)
+      else:
+        for stack, selfTime in sorted(self.foldedStacks()):
+          traceFile.write("%s %d\n" % (";".join(stack), selfTime))
+
+#
+# Startup profiling
+#
+
+_startupProfiler = None
+
+def startupProfiler():
+  """Return the application startup profiler.
+  It is enabled if the ``SLICER_STARTUP_PROFILE`` environment variable is set.
+  """
+  global _startupProfiler
+  if _startupProfiler is None:
+    outputFilePath = os.environ.get(STARTUP_PROFILE_ENVIRONMENT_VARIABLE)
+    _startupProfiler = Profiler(enabled=bool(outputFilePath), outputFilePath=outputFilePath or None)
+  return _startupProfiler
+
+def isStartupProfilingEnabled():
+  return startupProfiler().enabled
+
+def instrumentScriptedModule(pythonModule, moduleName):
+  """Record the time spent in the ``__init__`` method of the scripted module class
+  and in the ``setup`` method of its widget class.
+  """
+  profiler = startupProfiler()
+  moduleClass = getattr(pythonModule, moduleName, None)
+  if isinstance(moduleClass, type) and '__init__' in moduleClass.__dict__:
+    moduleClass.__init__ = profiler.wrap(moduleClass.__init__, moduleName, "init")
+  widgetClass = getattr(pythonModule, moduleName + "Widget", None)
+  if isinstance(widgetClass, type) and 'setup' in widgetClass.__dict__:
+    widgetClass.setup = profiler.wrap(widgetClass.setup, moduleName + "Widget", "setup")
+
+def loadSourceAsModule(moduleName, fileName):
+  """Import ``fileName`` (``.py`` or ``.pyc``) as ``moduleName`` while recording the import time.
+  Called by the application instead of ``imp.load_source`` when startup profiling is enabled.
+  """
+  import imp
+  _connectApplicationSignals()
+  with startupProfiler().profile(moduleName, "import"):
+    if fileName.endswith(".pyc"):
+      with open(fileName, 'rb') as f:
+        pythonModule = imp.load_module(moduleName, f, fileName, ('.pyc', 'rb', imp.PY_COMPILED))
+    else:
+      pythonModule = imp.load_source(moduleName, fileName)
+  instrumentScriptedModule(pythonModule, moduleName)
+  return pythonModule
+
+def writeStartupProfile(printSummary=True):
+  """Write the startup trace and optionally print a summary."""
+  profiler = startupProfiler()
+  if not profiler.enabled:
+    return
+  profiler.writeTrace()
+  if printSummary:
+    print(profiler.formatSummary())
+    print("Startup profile written to %s" % profiler.outputFilePath)
+
+_applicationSignalsConnected = False
+
+def _connectApplicationSignals():
+  global _applicationSignalsConnected
+  if _applicationSignalsConnected:
+    return
+  import slicer
+  app = getattr(slicer, "app", None)
+  if app is None:
+    return
+  if hasattr(app, "startupCompleted"):
+    app.connect("startupCompleted()", writeStartupProfile)
+  app.connect("aboutToQuit()", lambda: writeStartupProfile(printSummary=False))
+  _applicationSignalsConnected = True
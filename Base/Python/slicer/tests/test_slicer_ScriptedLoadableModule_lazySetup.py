@@ -0,0 +1,77 @@
+import qt
+import slicer
+import unittest
+
+from slicer.ScriptedLoadableModule import ScriptedLoadableModuleWidget
+
+class LazySetupTestWidget(ScriptedLoadableModuleWidget):
+  lazySetup = True
+
+  def __init__(self, parent=None):
+    ScriptedLoadableModuleWidget.__init__(self, parent)
+    self.setupCount = 0
+    self.enterCount = 0
+
+  def setup(self):
+    self.setupCount += 1
+    self.label = "set up"
+
+  def enter(self):
+    self.enterCount += 1
+
+
+class SlicerScriptedLoadableModuleLazySetupTests(unittest.TestCase):
+
+    def setUp(self):
+        self.widgets = []
+
+    def tearDown(self):
+        for widget in self.widgets:
+            slicer.app.moduleManager().disconnect(
+                'moduleAboutToBeUnloaded(QString)', widget._onModuleAboutToBeUnloaded)
+
+    def createWidget(self, parent):
+        widget = LazySetupTestWidget(parent)
+        self.widgets.append(widget)
+        # The application calls setup() after the widget is instantiated
+        widget.setup()
+        return widget
+
+    def test_setupOnEnter(self):
+        widget = self.createWidget(slicer.qSlicerScriptedLoadableModuleWidget())
+        self.assertTrue(widget.setupPending)
+        self.assertEqual(widget.setupCount, 0)
+        widget.enter()
+        self.assertFalse(widget.setupPending)
+        self.assertEqual(widget.setupCount, 1)
+        self.assertEqual(widget.enterCount, 1)
+        widget.enter()
+        self.assertEqual(widget.setupCount, 1)
+        self.assertEqual(widget.enterCount, 2)
+
+    def test_setupOnAttributeAccess(self):
+        widget = self.createWidget(slicer.qSlicerScriptedLoadableModuleWidget())
+        self.assertEqual(widget.label, "set up")
+        self.assertEqual(widget.setupCount, 1)
+        widget.enter()
+        self.assertEqual(widget.setupCount, 1)
+        with self.assertRaises(AttributeError):
+            widget.nonExistingAttribute
+
+    def test_ensureSetup(self):
+        widget = self.createWidget(slicer.qSlicerScriptedLoadableModuleWidget())
+        widget.ensureSetup()
+        widget.ensureSetup()
+        self.assertEqual(widget.setupCount, 1)
+        self.assertEqual(widget.enterCount, 0)
+
+    def test_missingAttributeBeforeSetupIsRequested(self):
+        widget = LazySetupTestWidget(slicer.qSlicerScriptedLoadableModuleWidget())
+        self.widgets.append(widget)
+        self.assertFalse(hasattr(widget, 'label'))
+        self.assertEqual(widget.setupCount, 0)
+
+    def test_setupNotDeferredInOtherParent(self):
+        widget = self.createWidget(qt.QWidget())
+        self.assertFalse(widget.setupPending)
+        self.assertEqual(widget.setupCount, 1)
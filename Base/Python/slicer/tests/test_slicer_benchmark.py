@@ -0,0 +1,168 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import slicer.benchmark
+
+class SlicerBenchmarkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir, True)
+        for name in ["SlicerBenchmarkTest.Count", "SlicerBenchmarkTest.Skipped", "SlicerBenchmarkTest.Failed"]:
+            slicer.benchmark.unregisterBenchmark(name)
+
+    def _registerBenchmarks(self):
+        @slicer.benchmark.benchmark("SlicerBenchmarkTest.Count", group="SlicerBenchmarkTest", warmup=2, repeat=5,
+            setUp=lambda: self.calls.append("setUp") or {'count': 0},
+            tearDown=lambda state: self.calls.append("tearDown"),
+            setUpSample=lambda state: self.calls.append("setUpSample"))
+        def countBenchmark(state):
+            """Count calls."""
+            state['count'] += 1
+            self.calls.append("run")
+
+        def skippedBenchmark():
+            raise slicer.benchmark.SkipBenchmark("not available")
+        slicer.benchmark.registerBenchmark(skippedBenchmark, "SlicerBenchmarkTest.Skipped", group="SlicerBenchmarkTest")
+
+        def failedBenchmark():
+            raise ValueError("benchmark error")
+        slicer.benchmark.registerBenchmark(failedBenchmark, "SlicerBenchmarkTest.Failed", group="SlicerBenchmarkTest")
+        return countBenchmark
+
+    def test_statistics(self):
+        statistics = slicer.benchmark.statistics([5.0, 1.0, 3.0, 2.0, 4.0])
+        self.assertEqual(statistics['count'], 5)
+        self.assertEqual(statistics['min'], 1.0)
+        self.assertEqual(statistics['max'], 5.0)
+        self.assertEqual(statistics['mean'], 3.0)
+        self.assertEqual(statistics['median'], 3.0)
+        self.assertAlmostEqual(statistics['p95'], 4.8)
+        self.assertAlmostEqual(statistics['stddev'], 2.5 ** 0.5)
+
+        statistics = slicer.benchmark.statistics([])
+        self.assertEqual(statistics['count'], 0)
+        self.assertIsNone(statistics['median'])
+
+    def test_run(self):
+        countBenchmark = self._registerBenchmarks()
+        self.assertEqual([b.name for b in slicer.benchmark.benchmarks("SlicerBenchmarkTest.*")],
+            ["SlicerBenchmarkTest.Count", "SlicerBenchmarkTest.Skipped", "SlicerBenchmarkTest.Failed"])
+        self.assertEqual(len(slicer.benchmark.benchmarks("SlicerBenchmarkTest")), 3)
+
+        result = countBenchmark.benchmark.run()
+        self.assertTrue(result.succeeded)
+        self.assertEqual(result.description, "Count calls.")
+        self.assertEqual(len(result.samples), 5)
+        self.assertEqual(result.statistics['count'], 5)
+        self.assertEqual(self.calls, ["setUp"] + ["setUpSample", "run"] * 7 + ["tearDown"])
+
+        result = countBenchmark.benchmark.run(warmup=0, repeat=1)
+        self.assertEqual(len(result.samples), 1)
+
+        results = slicer.benchmark.runBenchmarks("SlicerBenchmarkTest.*")
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[1].skipped, "not available")
+        self.assertFalse(results[1].succeeded)
+        self.assertIn("benchmark error", results[2].error)
+        self.assertIn("skipped: not available", slicer.benchmark.formatResults(results))
+
+    def test_writeResults(self):
+        self._registerBenchmarks()
+        jsonFilePath = os.path.join(self.tempDir, "results", "results.json")
+        results = slicer.benchmark.runBenchmarks("SlicerBenchmarkTest.*", jsonFilePath)
+        with open(jsonFilePath) as jsonFile:
+            content = json.load(jsonFile)
+        self.assertIn("platform", content["system"])
+        self.assertEqual([result["name"] for result in content["results"]], [result.name for result in results])
+        self.assertEqual(content["results"][0]["samples"], results[0].samples)
+        self.assertEqual(content["results"][0]["statistics"]["median"], results[0].statistics["median"])
+
+        csvFilePath = os.path.join(self.tempDir, "results.csv")
+        slicer.benchmark.writeResults(results, csvFilePath)
+        with open(csvFilePath) as csvFile:
+            rows = list(csv.DictReader(csvFile))
+        self.assertEqual([row["name"] for row in rows], [result.name for result in results])
+        self.assertEqual(float(rows[0]["median"]), results[0].statistics["median"])
+        self.assertEqual(rows[1]["skipped"], "not available")
+        self.assertEqual(rows[2]["error"], "ValueError: benchmark error")
+
+        with self.assertRaises(ValueError):
+            slicer.benchmark.writeResults(results, csvFilePath, "xml")
+
+    @staticmethod
+    def _result(name, samples):
+        result = slicer.benchmark.BenchmarkResult(name, repeat=len(samples))
+        result.samples = samples
+        result.statistics = slicer.benchmark.statistics(samples)
+        return result
+
+    def test_mannWhitneyU(self):
+        slower = [1.2, 1.3, 1.25, 1.35, 1.22, 1.28]
+        faster = [1.0, 1.05, 0.98, 1.02, 1.01, 0.99]
+        u, pValue = slicer.benchmark.mannWhitneyU(slower, faster)
+        self.assertEqual(u, 36)
+        self.assertLess(pValue, 0.01)
+        u, pValue = slicer.benchmark.mannWhitneyU(faster, slower)
+        self.assertEqual(u, 0)
+        self.assertGreater(pValue, 0.99)
+        u, pValue = slicer.benchmark.mannWhitneyU([1.0] * 5, [1.0] * 5)
+        self.assertEqual(pValue, 1.0)
+
+    def test_compareResults(self):
+        baselines = [
+            self._result("Regressed", [1.0, 1.05, 0.98, 1.02, 1.01, 0.99]),
+            self._result("Noisy", [1.0, 2.0, 1.0, 2.0, 1.0, 2.0]),
+            self._result("Improved", [2.0, 2.1, 1.9, 2.0, 2.05, 1.95]),
+            self._result("Unchanged", [1.0, 1.01, 0.99]),
+            self._result("Removed", [1.0]),
+            ]
+        failed = self._result("Failed", [])
+        failed.error = "ValueError: benchmark error"
+        results = [
+            self._result("Regressed", [1.2, 1.3, 1.25, 1.35, 1.22, 1.28]),
+            self._result("Noisy", [1.0, 2.2, 2.1, 1.0, 2.2, 1.0]),
+            self._result("Improved", [1.0, 1.05, 0.98, 1.02, 1.01, 0.99]),
+            self._result("Unchanged", [1.05, 1.06, 1.04]),
+            self._result("Added", [1.0]),
+            failed,
+            ]
+        comparisons = slicer.benchmark.compareResults(baselines, results)
+        statuses = dict((comparison.name, comparison.status) for comparison in comparisons)
+        self.assertEqual(statuses, {
+            "Regressed": "regression", "Noisy": "unchanged", "Improved": "improvement",
+            "Unchanged": "unchanged", "Added": "new", "Failed": "failed", "Removed": "missing"})
+
+        # Thresholds can be set per benchmark
+        comparisons = slicer.benchmark.compareResults(baselines, results, thresholds={"Regr*": 0.5, "Unch*": 0.01})
+        statuses = dict((comparison.name, comparison.status) for comparison in comparisons)
+        self.assertEqual(statuses["Regressed"], "unchanged")
+        self.assertEqual(statuses["Unchanged"], "regression")
+
+        table = slicer.benchmark.formatComparisons(comparisons)
+        self.assertTrue(table.splitlines()[1].startswith("Unchanged"))
+
+    def test_baselines(self):
+        baselineDirectory = os.path.join(self.tempDir, "baselines")
+        baselines = [self._result("Group.First", [1.0, 1.1, 1.2]), self._result("Group.Second", [2.0, 2.1, 2.2])]
+        slicer.benchmark.writeBaselines(baselines, baselineDirectory)
+        self.assertEqual(sorted(os.listdir(baselineDirectory)), ["Group.First.json", "Group.Second.json"])
+        readBaselines = slicer.benchmark.readBaselines(baselineDirectory)
+        self.assertEqual([baseline.name for baseline in readBaselines], ["Group.First", "Group.Second"])
+        self.assertEqual(readBaselines[1].samples, [2.0, 2.1, 2.2])
+
+        resultFilePath = os.path.join(self.tempDir, "results.csv")
+        slicer.benchmark.writeResults([self._result("Group.First", [1.5, 1.6, 1.7])], resultFilePath)
+        self.assertEqual(slicer.benchmark.readResults(resultFilePath)[0].statistics["median"], 1.6)
+        self.assertEqual(slicer.benchmark.main([baselineDirectory, resultFilePath]), 1)
+        self.assertEqual(slicer.benchmark.main([baselineDirectory, resultFilePath, "--threshold", "0.6"]), 0)
+
+        resultFilePath = os.path.join(self.tempDir, "results.json")
+        slicer.benchmark.writeResults([self._result("Group.First", [1.0, 1.1, 1.2])], resultFilePath)
+        self.assertEqual(slicer.benchmark.main([baselineDirectory, resultFilePath, "--update-baselines"]), 0)
@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import slicer.profiling
+
+class SlicerProfilingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir, True)
+
+    def _profile(self):
+        profiler = slicer.profiling.Profiler()
+        with profiler.profile("kits", "kit"):
+            with profiler.profile("vtkAddon", "kit"):
+                pass
+            with profiler.profile("mrml", "kit"):
+                pass
+        with profiler.profile("MyModule", "import"):
+            pass
+        return profiler
+
+    def test_disabled(self):
+        profiler = slicer.profiling.Profiler(enabled=False)
+        with profiler.profile("MyModule", "import"):
+            pass
+        self.assertEqual(profiler.events, [])
+
+    def test_nesting(self):
+        profiler = self._profile()
+        self.assertEqual([event.name for event in profiler.events], ["kits", "vtkAddon", "mrml", "MyModule"])
+        self.assertEqual([event.name for event in profiler.events[2].stack], ["kits", "mrml"])
+        kits = profiler.events[0]
+        self.assertGreaterEqual(kits.duration, profiler.events[1].duration + profiler.events[2].duration)
+        # Nested events of the same category are only counted once
+        totals = profiler.totalDurationByCategory()
+        self.assertEqual(sorted(totals.keys()), ["import", "kit"])
+        self.assertEqual(totals["kit"], kits.duration)
+        self.assertIn("MyModule", profiler.formatSummary())
+
+    def test_wrap(self):
+        profiler = slicer.profiling.Profiler()
+        def setup(value):
+            """Set up."""
+            return value * 2
+        profiledSetup = profiler.wrap(setup, "MyModuleWidget", "setup")
+        self.assertEqual(profiledSetup(3), 6)
+        self.assertEqual(profiledSetup.__doc__, "Set up.")
+        self.assertEqual(len(profiler.events), 1)
+        self.assertEqual(profiler.events[0].category, "setup")
+
+    def test_instrumentScriptedModule(self):
+        modulePath = os.path.join(self.tempDir, "ProfiledModule.py")
+        with open(modulePath, "w") as moduleFile:
+            moduleFile.write(
+                "class ProfiledModule(object):\n"
+                "  def __init__(self, parent):\n"
+                "    self.parent = parent\n"
+                "class ProfiledModuleWidget(object):\n"
+                "  def setup(self):\n"
+                "    self.isSetUp = True\n")
+        profiler = slicer.profiling.startupProfiler()
+        enabled = profiler.enabled
+        numberOfEvents = len(profiler.events)
+        profiler.enabled = True
+        try:
+            pythonModule = slicer.profiling.loadSourceAsModule("ProfiledModule", modulePath)
+            pythonModule.ProfiledModule(None)
+            pythonModule.ProfiledModuleWidget().setup()
+        finally:
+            profiler.enabled = enabled
+            del sys.modules["ProfiledModule"]
+        newEvents = profiler.events[numberOfEvents:]
+        del profiler.events[numberOfEvents:]
+        self.assertEqual([(event.name, event.category) for event in newEvents],
+            [("ProfiledModule", "import"), ("ProfiledModule", "init"), ("ProfiledModuleWidget", "setup")])
+
+    def test_writeTrace(self):
+        profiler = self._profile()
+
+        jsonFilePath = os.path.join(self.tempDir, "startup.json")
+        profiler.writeTrace(jsonFilePath)
+        with open(jsonFilePath) as traceFile:
+            trace = json.load(traceFile)
+        self.assertEqual([event["name"] for event in trace["traceEvents"]], ["kits", "vtkAddon", "mrml", "MyModule"])
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"]))
+
+        foldedFilePath = os.path.join(self.tempDir, "startup.folded")
+        profiler.writeTrace(foldedFilePath)
+        with open(foldedFilePath) as traceFile:
+            stacks = [line.rsplit(" ", 1)[0] for line in traceFile.read().splitlines()]
+        self.assertEqual(sorted(stacks), [
+            "MyModule [import]",
+            "kits [kit]",
+            "kits [kit];mrml [kit]",
+            "kits [kit];vtkAddon [kit]"
+            ])
+
+        with self.assertRaises(ValueError):
+            slicer.profiling.Profiler().writeTrace()
@@ -134,6 +134,36 @@ class SlicerUtilVTKObservationMixinTests(unittest.TestCase):
     foo.removeObserver(object2, event, callback2)
     self.assertEqual(len(foo.Observations), 0)
 
+  def test_setObservations(self):
+    foo = Foo()
+    object = vtk.vtkObject()
+    object2 = vtk.vtkObject()
+    event = vtk.vtkCommand.ModifiedEvent
+    callback = foo.onObjectModified
+    callback2 = foo.onObjectModifiedAgain
+
+    foo.addObserver(object, event, callback)
+    foo.addObserver(object2, event, callback)
+    observations = foo.Observations
+    tag = object.AddObserver(event, callback2)
+    observations.append([object, event, callback2, 'none', tag, 0.0])
+    self.assertEqual(len(foo.Observations), 2)
+
+    foo.Observations = observations
+    self.assertEqual(len(foo.Observations), 3)
+    self.assertTrue(foo.hasObserver(object, event, callback2))
+    self.assertEqual(foo.observer(event, callback2), object)
+
+    foo.removeObservers(object=object)
+    self.assertEqual(len(foo.Observations), 1)
+    foo.ModifiedEventCount = {}
+    object.Modified()
+    self.assertEqual(foo.modifiedEventCount(object), 0)
+
+    foo.Observations = []
+    self.assertEqual(len(foo.Observations), 0)
+    self.assertFalse(foo.hasObserver(object2, event, callback))
+
   def test_removeObservers(self):
     foo = Foo()
     object = vtk.vtkObject()
@@ -159,3 +189,63 @@ class SlicerUtilVTKObservationMixinTests(unittest.TestCase):
     self.assertEqual(len(foo.Observations), 1)
 
 
+
+  def test_removeObserversOfObject(self):
+    foo = Foo()
+    object = vtk.vtkObject()
+    object2 = vtk.vtkObject()
+    event = vtk.vtkCommand.ModifiedEvent
+    callback = foo.onObjectModified
+    callback2 = foo.onObjectModifiedAgain
+
+    foo.addObserver(object, event, callback)
+    foo.addObserver(object2, event, callback)
+    foo.addObserver(object2, event, callback2)
+    foo.addObserver(object, event, callback2)
+    self.assertEqual(len(foo.Observations), 4)
+
+    foo.removeObservers(object=object2, method=callback2)
+    self.assertEqual(len(foo.Observations), 3)
+    self.assertTrue(foo.hasObserver(object2, event, callback))
+
+    foo.removeObservers(object=object)
+    self.assertEqual(len(foo.Observations), 1)
+    self.assertFalse(foo.hasObserver(object, event, callback))
+    self.assertFalse(foo.hasObserver(object, event, callback2))
+
+    object.Modified()
+    object2.Modified()
+    self.assertEqual(foo.modifiedEventCount(object), 0)
+    self.assertEqual(foo.modifiedEventCount(object2), 1)
+
+    # Removing observers of an object that is not observed is a no-op
+    foo.removeObservers(object=object)
+    self.assertEqual(len(foo.Observations), 1)
+
+  def test_observationsOrder(self):
+    foo = Foo()
+    objects = [vtk.vtkObject() for _ in range(5)]
+    event = vtk.vtkCommand.ModifiedEvent
+    for object in objects:
+      foo.addObserver(object, event, foo.onObjectModified)
+    foo.removeObserver(objects[2], event, foo.onObjectModified)
+    self.assertEqual([o for o, e, m, g, t, p in foo.Observations],
+      [objects[0], objects[1], objects[3], objects[4]])
+    self.assertEqual(foo.observer(event, foo.onObjectModified), objects[0])
+
+  def test_manyObservers(self):
+    foo = Foo()
+    objects = [vtk.vtkObject() for _ in range(2000)]
+    event = vtk.vtkCommand.ModifiedEvent
+    for object in objects:
+      foo.addObserver(object, event, foo.onObjectModified)
+      foo.addObserver(object, event, foo.onObjectModifiedAgain)
+    self.assertEqual(len(foo.Observations), 4000)
+    for object in objects[::2]:
+      self.assertTrue(foo.hasObserver(object, event, foo.onObjectModified))
+      foo.removeObservers(object=object)
+    self.assertEqual(len(foo.Observations), 2000)
+    objects[1].Modified()
+    self.assertEqual(foo.modifiedEventCount(objects[1]), 2)
+    foo.removeObservers()
+    self.assertEqual(len(foo.Observations), 0)
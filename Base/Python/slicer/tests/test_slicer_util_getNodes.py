@@ -1,4 +1,5 @@
 import unittest
+import weakref
 import slicer
 import slicer.util
 import vtk
@@ -61,3 +62,71 @@ class SlicerUtilGetNodeTest(unittest.TestCase):
         self.assertIsInstance(slicer.util.getNodes("Volume")["Volume"], vtk.vtkObject)
         self.assertEqual(list(slicer.util.getNodes("Volume",useLists=True).keys()), ["Volume"])
         self.assertIsInstance(slicer.util.getNodes("Volume",useLists=True)["Volume"], list)
+
+    def test_getNodeAfterSceneChanges(self):
+        # Exact name and ID lookups go through the scene node index, which
+        # must follow node renaming and removal.
+        self.assertEqual(slicer.util.getNode("Volume2"), self.nodes[1])
+        self.assertEqual(slicer.util.getNode(self.nodes[1].GetID()), self.nodes[1])
+
+        self.nodes[1].SetName("Renamed")
+        self.assertEqual(slicer.util.getNode("Renamed"), self.nodes[1])
+        self.assertEqual(slicer.util.getNodes("Volume2"), {})
+
+        slicer.mrmlScene.RemoveNode(self.nodes[3])
+        self.assertEqual(slicer.util.getNode("Volume"), self.nodes[2])
+        self.assertEqual(slicer.util.getNodes("Volume", useLists=True)["Volume"], [self.nodes[2]])
+
+        slicer.mrmlScene.RemoveNode(self.nodes[2])
+        with self.assertRaises(slicer.util.MRMLNodeNotFoundException):
+            slicer.util.getNode("Volume")
+
+    def test_mrmlSceneNodeIndex(self):
+        index = slicer.util.mrmlSceneNodeIndex()
+        self.assertEqual(index.nodesByName("Volume"), [self.nodes[2], self.nodes[3]])
+        self.assertEqual(index.nodesByNamePrefix("Volume"), [self.nodes[2], self.nodes[3], self.nodes[0], self.nodes[1]])
+        self.assertEqual(index.nodesByNamePrefix("NotExisting"), [])
+        self.assertEqual(index.nodesByClass("vtkMRMLScalarVolumeNode"), self.nodes)
+
+    def test_getNodeAfterRenamingToExistingName(self):
+        # Nodes named "Volume" are found by the index before and after the renaming
+        self.assertEqual(slicer.util.getNodes("Volume", useLists=True)["Volume"], [self.nodes[2], self.nodes[3]])
+        self.nodes[0].SetName("Volume")
+        self.assertEqual(slicer.util.getNodes("Volume", useLists=True)["Volume"], [self.nodes[0], self.nodes[2], self.nodes[3]])
+        self.assertEqual(slicer.util.getNode("Volume"), self.nodes[3])
+        with self.assertRaises(slicer.util.MRMLNodeNotFoundException):
+            slicer.util.getNode("Volume1")
+
+    def test_mrmlSceneNodeIndexAfterSceneChanges(self):
+        index = slicer.util.mrmlSceneNodeIndex()
+
+        # Only name changes of the nodes are observed
+        hasObserver = [node.HasObserver(vtk.vtkCommand.ModifiedEvent) for node in self.nodes]
+        index.rebuild()
+        self.assertEqual([node.HasObserver(vtk.vtkCommand.ModifiedEvent) for node in self.nodes], hasObserver)
+
+        # Renamed nodes are found by their new name only
+        self.nodes[1].SetName("Renamed")
+        self.assertEqual(index.nodesByName("Volume2"), [])
+        self.assertEqual(index.nodesByName("Renamed"), [self.nodes[1]])
+        self.assertEqual(index.nodesByNamePrefix("Volume"), [self.nodes[2], self.nodes[3], self.nodes[0]])
+        self.nodes[2].SetName("Volume1")
+        self.assertEqual(index.nodesByName("Volume"), [self.nodes[3]])
+        self.assertEqual(index.nodesByName("Volume1"), [self.nodes[0], self.nodes[2]])
+
+        # Node renamed after being added
+        node = slicer.mrmlScene.AddNode(slicer.vtkMRMLScalarVolumeNode())
+        node.SetName("Added")
+        self.assertEqual(index.nodesByName("Added"), [node])
+        self.assertEqual(index.nodesByClass("vtkMRMLScalarVolumeNode"), self.nodes + [node])
+
+        # Removed node
+        slicer.mrmlScene.RemoveNode(node)
+        self.assertEqual(index.nodesByName("Added"), [])
+        self.assertEqual(index.nodesByClass("vtkMRMLScalarVolumeNode"), self.nodes)
+        self.assertFalse(node.HasObserver(slicer.vtkMRMLNode.NameChangedEvent))
+
+        # The index does not keep removed nodes alive
+        nodeRef = weakref.ref(node)
+        del node
+        self.assertIsNone(nodeRef())
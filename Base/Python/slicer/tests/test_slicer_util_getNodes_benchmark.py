@@ -0,0 +1,48 @@
+import unittest
+import slicer
+import slicer.benchmark
+import slicer.util
+
+numberOfNodes = 10000
+numberOfLookups = 200
+
+def setUpGetNodeBenchmark():
+    slicer.mrmlScene.Clear(0)
+    for idx in range(numberOfNodes):
+        node = slicer.vtkMRMLLinearTransformNode()
+        node.SetName("Transform%d" % idx)
+        slicer.mrmlScene.AddNode(node)
+
+def tearDownGetNodeBenchmark():
+    slicer.mrmlScene.Clear(0)
+
+def lookUpNodes(patternFormat):
+    for idx in range(0, numberOfNodes, numberOfNodes // numberOfLookups):
+        node = slicer.util.getNode(patternFormat % idx)
+        if node.GetName() != "Transform%d" % idx:
+            raise ValueError("getNode('%s') returned node %s" % (patternFormat % idx, node.GetName()))
+
+@slicer.benchmark.benchmark("SlicerUtil.GetNodeByName", group="SlicerUtil", warmup=1, repeat=5,
+    setUp=setUpGetNodeBenchmark, tearDown=tearDownGetNodeBenchmark)
+def getNodeByNameBenchmark():
+    """Get 200 nodes by exact name (indexed) in a scene of 10000 nodes."""
+    lookUpNodes("Transform%d")
+
+@slicer.benchmark.benchmark("SlicerUtil.GetNodeByWildcardPattern", group="SlicerUtil", warmup=1, repeat=5,
+    setUp=setUpGetNodeBenchmark, tearDown=tearDownGetNodeBenchmark)
+def getNodeByWildcardPatternBenchmark():
+    """Get 200 nodes by wildcard pattern (matching every node) in a scene of 10000 nodes."""
+    lookUpNodes("Transform%d*")
+
+class SlicerUtilGetNodeBenchmark(unittest.TestCase):
+    """Compare node lookup by exact name (indexed) with lookup by wildcard
+    pattern (which has to match every node of the scene).
+    """
+
+    def test_getNodeBenchmark(self):
+        results = [registeredBenchmark.run() for registeredBenchmark in slicer.benchmark.benchmarks("SlicerUtil.GetNode*")]
+        print(slicer.benchmark.formatResults(results))
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertTrue(result.succeeded, result.error)
+            self.assertEqual(result.statistics['count'], 5)
@@ -0,0 +1,94 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import slicer.util
+
+MODULE_SOURCES = {
+    "ReloadTestModule.py":
+        "import ReloadTestOther\n"
+        "import ReloadTestHelpers\n"
+        "from ReloadTestHelpers.Tools import tool\n"
+        "import ReloadTestOutside\n"
+        "import vtk\n",
+    "ReloadTestOther.py":
+        "VALUE = 'other'\n",
+    os.path.join("ReloadTestHelpers", "__init__.py"):
+        "from .Tools import *\n",
+    os.path.join("ReloadTestHelpers", "Tools.py"):
+        "from . import Constants\n"
+        "def tool():\n"
+        "  return Constants.VALUE\n",
+    os.path.join("ReloadTestHelpers", "Constants.py"):
+        "VALUE = 1\n",
+    }
+
+HELPER_MODULE_NAMES = ["ReloadTestOther", "ReloadTestHelpers", "ReloadTestHelpers.Tools", "ReloadTestHelpers.Constants"]
+
+
+class SlicerUtilReloadScriptedModuleTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        # Helper modules located outside of the module directory are not reloaded
+        self.outsideDir = tempfile.mkdtemp()
+        with open(os.path.join(self.outsideDir, "ReloadTestOutside.py"), "w") as f:
+            f.write("VALUE = 'outside'\n")
+        sys.path.insert(0, self.outsideDir)
+        import ReloadTestOutside
+        os.mkdir(os.path.join(self.tempDir, "ReloadTestHelpers"))
+        for fileName, source in MODULE_SOURCES.items():
+            self.writeSource(fileName, source)
+        sys.path.insert(0, self.tempDir)
+        import ReloadTestOther
+        import ReloadTestHelpers
+        self.moduleFilePath = os.path.join(self.tempDir, "ReloadTestModule.py")
+
+    def tearDown(self):
+        sys.path.remove(self.tempDir)
+        sys.path.remove(self.outsideDir)
+        for name in HELPER_MODULE_NAMES + ["ReloadTestOutside"]:
+            sys.modules.pop(name, None)
+        shutil.rmtree(self.tempDir, True)
+        shutil.rmtree(self.outsideDir, True)
+
+    def writeSource(self, fileName, source):
+        with open(os.path.join(self.tempDir, fileName), "w") as f:
+            f.write(source)
+
+    def reloadDependencies(self):
+        return slicer.util._reloadChangedModuleDependencies("ReloadTestModule", self.moduleFilePath)
+
+    def test_importedModuleNames(self):
+        names = slicer.util._importedModuleNames(
+            os.path.join(self.tempDir, "ReloadTestHelpers", "Tools.py"), "ReloadTestHelpers.Tools")
+        self.assertIn("ReloadTestHelpers", names)
+        self.assertIn("ReloadTestHelpers.Constants", names)
+        names = slicer.util._importedModuleNames(
+            os.path.join(self.tempDir, "ReloadTestHelpers", "__init__.py"), "ReloadTestHelpers")
+        self.assertIn("ReloadTestHelpers.Tools", names)
+
+    def test_reloadInDependencyOrder(self):
+        reloaded = self.reloadDependencies()
+        # All helper modules are reloaded the first time
+        self.assertEqual(sorted(reloaded), sorted(HELPER_MODULE_NAMES))
+        self.assertLess(reloaded.index("ReloadTestHelpers.Constants"), reloaded.index("ReloadTestHelpers.Tools"))
+        self.assertLess(reloaded.index("ReloadTestHelpers.Tools"), reloaded.index("ReloadTestHelpers"))
+
+    def test_reloadOnlyChangedModules(self):
+        self.reloadDependencies()
+        self.assertEqual(self.reloadDependencies(), [])
+
+        # Modules importing the changed module are reloaded too
+        self.writeSource(os.path.join("ReloadTestHelpers", "Constants.py"), "VALUE = 22\n")
+        self.assertEqual(self.reloadDependencies(),
+            ["ReloadTestHelpers.Constants", "ReloadTestHelpers.Tools", "ReloadTestHelpers"])
+        self.assertEqual(sys.modules["ReloadTestHelpers"].tool(), 22)
+
+        # Modification time changes but content does not
+        filePath = os.path.join(self.tempDir, "ReloadTestOther.py")
+        modificationTime = os.path.getmtime(filePath) + 10
+        os.utime(filePath, (modificationTime, modificationTime))
+        self.assertEqual(self.reloadDependencies(), [])
@@ -29,3 +29,182 @@ class SlicerUtilWithoutModulesTest(unittest.TestCase):
     self.assertEqual(
       slicer.util.extractAlgoAndDigest('SHA256:4a57f3207b97f26a6061f86948483c00b03893ddfef9e82b639ebe66e3aba338'),
       ('SHA256', '4a57f3207b97f26a6061f86948483c00b03893ddfef9e82b639ebe66e3aba338'))
+
+  def test_downloadFile_dataCache(self):
+    import shutil
+    import tempfile
+    import urllib.parse, urllib.request
+    cacheManager = slicer.mrmlScene.GetCacheManager()
+    remoteCacheDirectory = cacheManager.GetRemoteCacheDirectory()
+    tempDir = tempfile.mkdtemp()
+    cacheManager.SetRemoteCacheDirectory(tempDir)
+    try:
+      input_file = os.path.join(os.path.dirname(__file__), 'compute-checksum.txt')
+      url = urllib.parse.urljoin('file:', urllib.request.pathname2url(input_file))
+      checksum = 'SHA256:4a57f3207b97f26a6061f86948483c00b03893ddfef9e82b639ebe66e3aba338'
+
+      # Checksum is computed while downloading and the file is recorded in the index
+      firstFilePath = os.path.join(tempDir, 'first.txt')
+      self.assertIsNone(slicer.util.findFileByChecksum(checksum))
+      self.assertTrue(slicer.util.downloadFile(url, firstFilePath, checksum, chunkSize=4))
+      self.assertEqual(slicer.util.findFileByChecksum(checksum), firstFilePath)
+      self.assertEqual(slicer.util.findFileByChecksum(checksum, firstFilePath), firstFilePath)
+
+      # Lookups do not write the manifest
+      os.utime(slicer.util.dataCacheManifestFilePath(), ns=(0, 0))
+      self.assertEqual(slicer.util.findFileByChecksum(checksum), firstFilePath)
+      self.assertEqual(os.stat(slicer.util.dataCacheManifestFilePath()).st_mtime_ns, 0)
+
+      # File with the same checksum is reused without downloading
+      secondFilePath = os.path.join(tempDir, 'second.txt')
+      self.assertTrue(slicer.util.downloadFile('file:///nonexistent/compute-checksum.txt', secondFilePath, checksum))
+      self.assertEqual(slicer.util.computeChecksum('SHA256', secondFilePath), checksum.split(':')[1])
+      self.assertEqual(slicer.util.findFileByChecksum(checksum, secondFilePath), secondFilePath)
+
+      # Modified file is not considered verified anymore
+      with open(firstFilePath, 'a') as firstFile:
+        firstFile.write('modified')
+      self.assertIsNone(slicer.util.findFileByChecksum(checksum, firstFilePath))
+
+      # Invalid download is not recorded
+      invalidChecksum = 'SHA256:' + '0' * 64
+      self.assertFalse(slicer.util.downloadFile(url, os.path.join(tempDir, 'third.txt'), invalidChecksum))
+      self.assertIsNone(slicer.util.findFileByChecksum(invalidChecksum))
+    finally:
+      cacheManager.SetRemoteCacheDirectory(remoteCacheDirectory)
+      shutil.rmtree(tempDir)
+
+  def test_extractArchive_dataCache(self):
+    import shutil
+    import tempfile
+    import zipfile
+    cacheManager = slicer.mrmlScene.GetCacheManager()
+    remoteCacheDirectory = cacheManager.GetRemoteCacheDirectory()
+    tempDir = tempfile.mkdtemp()
+    cacheManager.SetRemoteCacheDirectory(tempDir)
+    try:
+      archiveFilePath = os.path.join(tempDir, 'archive.zip')
+      with zipfile.ZipFile(archiveFilePath, 'w') as archive:
+        archive.writestr('a.txt', 'a' * 1000)
+        archive.writestr('sub/b.txt', 'b' * 1000)
+      outputDir = os.path.join(tempDir, 'archive')
+      self.assertTrue(slicer.util.extractArchive(archiveFilePath, outputDir))
+      self.assertEqual(sorted(slicer.util.getFilesInDirectory(outputDir, False)), ['a.txt', 'b.txt'])
+
+      # Extraction manifest is keyed by the archive checksum
+      checksum = 'SHA256:' + slicer.util.computeChecksum('SHA256', archiveFilePath)
+      self.assertTrue(slicer.util.findExtractedArchive(checksum, outputDir))
+      self.assertFalse(slicer.util.findExtractedArchive(checksum, tempDir))
+
+      # Removing an extracted file invalidates the extraction
+      os.remove(os.path.join(outputDir, 'a.txt'))
+      self.assertFalse(slicer.util.findExtractedArchive(checksum, outputDir))
+      self.assertTrue(slicer.util.extractArchive(archiveFilePath, outputDir))
+      self.assertTrue(os.path.exists(os.path.join(outputDir, 'a.txt')))
+
+      # Least recently used data is evicted first
+      otherFilePath = os.path.join(tempDir, 'other.bin')
+      with open(otherFilePath, 'wb') as otherFile:
+        otherFile.write(b'0' * 1000)
+      slicer.util.registerCachedFile(otherFilePath)
+      self.assertEqual(slicer.util.evictDataCache(0, keepCurrentSessionData=False), [])
+      self.assertEqual(slicer.util.evictDataCache(10000, keepCurrentSessionData=False), [])
+      self.assertEqual(slicer.util.evictDataCache(3000, keepCurrentSessionData=False), [os.path.normcase(archiveFilePath)])
+      self.assertEqual(slicer.util.evictDataCache(1500, keepCurrentSessionData=False), [os.path.normcase(outputDir)])
+      self.assertFalse(os.path.exists(outputDir))
+      self.assertTrue(os.path.exists(otherFilePath))
+
+      # Data used in the current session is kept by default
+      self.assertEqual(slicer.util.evictDataCache(1), [])
+      self.assertTrue(os.path.exists(otherFilePath))
+
+      # Extractions are recorded for each output directory
+      otherOutputDir = os.path.join(tempDir, 'otherArchive')
+      with zipfile.ZipFile(archiveFilePath, 'w') as archive:
+        archive.writestr('a.txt', 'a' * 1000)
+      checksum = 'SHA256:' + slicer.util.computeChecksum('SHA256', archiveFilePath)
+      self.assertTrue(slicer.util.extractArchive(archiveFilePath, outputDir))
+      self.assertTrue(slicer.util.extractArchive(archiveFilePath, otherOutputDir))
+      self.assertTrue(slicer.util.findExtractedArchive(checksum, outputDir))
+      self.assertTrue(slicer.util.findExtractedArchive(checksum, otherOutputDir))
+    finally:
+      cacheManager.SetRemoteCacheDirectory(remoteCacheDirectory)
+      shutil.rmtree(tempDir)
+
+  def test_splitArchiveExtension(self):
+    self.assertEqual(slicer.util.splitArchiveExtension('/data/a.zip'), ('/data/a', 'zip'))
+    self.assertEqual(slicer.util.splitArchiveExtension('/data/a.TAR.GZ'), ('/data/a', 'tar.gz'))
+    self.assertEqual(slicer.util.splitArchiveExtension('/data/a.tgz'), ('/data/a', 'tar.gz'))
+    self.assertEqual(slicer.util.splitArchiveExtension('/data/a.tar.zst'), ('/data/a', 'tar.zst'))
+    self.assertEqual(slicer.util.splitArchiveExtension('/data/a.nrrd'), ('/data/a.nrrd', None))
+
+  def test_extractArchive_formats(self):
+    import io
+    import shutil
+    import tarfile
+    import tempfile
+    import zipfile
+    cacheManager = slicer.mrmlScene.GetCacheManager()
+    remoteCacheDirectory = cacheManager.GetRemoteCacheDirectory()
+    tempDir = tempfile.mkdtemp()
+    cacheManager.SetRemoteCacheDirectory(tempDir)
+    try:
+      contents = {'series/image%03d.dcm' % index: bytes([index]) * (1000 + index) for index in range(50)}
+
+      zipFilePath = os.path.join(tempDir, 'series.zip')
+      with zipfile.ZipFile(zipFilePath, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in contents.items():
+          archive.writestr(name, content)
+      archiveFilePaths = [zipFilePath]
+      for compression in ['', 'gz', 'bz2', 'xz']:
+        tarFilePath = os.path.join(tempDir, 'series.tar' + ('.' + compression if compression else ''))
+        with tarfile.open(tarFilePath, 'w:' + compression) as archive:
+          for name, content in contents.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+        archiveFilePaths.append(tarFilePath)
+
+      for archiveFilePath in archiveFilePaths:
+        for numberOfThreads in [1, 4]:
+          outputDir = os.path.join(tempDir, 'output-%d' % numberOfThreads, os.path.basename(archiveFilePath))
+          progress = []
+          self.assertTrue(slicer.util.extractArchive(archiveFilePath, outputDir,
+            expectedNumberOfExtractedFiles=len(contents), numberOfThreads=numberOfThreads,
+            progressCallback=lambda processedSize, totalSize: progress.append((processedSize, totalSize))))
+          for name, content in contents.items():
+            with open(os.path.join(outputDir, name), 'rb') as extractedFile:
+              self.assertEqual(extractedFile.read(), content)
+          self.assertTrue(len(progress) > 0)
+          self.assertEqual(progress[-1][0], progress[-1][1])
+
+      # Archives created from a directory (`tar -C dir -czf archive.tar.gz .`) contain the './' root entry
+      rootedFilePath = os.path.join(tempDir, 'rooted.tar.gz')
+      with tarfile.open(rootedFilePath, 'w:gz') as archive:
+        rootInfo = tarfile.TarInfo('.')
+        rootInfo.type = tarfile.DIRTYPE
+        archive.addfile(rootInfo)
+        for name, content in contents.items():
+          info = tarfile.TarInfo('./' + name)
+          info.size = len(content)
+          archive.addfile(info, io.BytesIO(content))
+      outputDir = os.path.join(tempDir, 'rooted')
+      self.assertTrue(slicer.util.extractArchive(rootedFilePath, outputDir, expectedNumberOfExtractedFiles=len(contents)))
+      for name, content in contents.items():
+        with open(os.path.join(outputDir, name), 'rb') as extractedFile:
+          self.assertEqual(extractedFile.read(), content)
+
+      # Members extracted outside of the output directory are rejected
+      unsafeFilePath = os.path.join(tempDir, 'unsafe.zip')
+      with zipfile.ZipFile(unsafeFilePath, 'w') as archive:
+        archive.writestr('../outside.txt', 'outside')
+      self.assertFalse(slicer.util.extractArchive(unsafeFilePath, os.path.join(tempDir, 'unsafe')))
+      self.assertFalse(os.path.exists(os.path.join(tempDir, 'outside.txt')))
+
+      # Unsupported archive type
+      rarFilePath = os.path.join(tempDir, 'series.rar')
+      shutil.copyfile(zipFilePath, rarFilePath)
+      self.assertFalse(slicer.util.extractArchive(rarFilePath, os.path.join(tempDir, 'rar')))
+    finally:
+      cacheManager.SetRemoteCacheDirectory(remoteCacheDirectory)
+      shutil.rmtree(tempDir)
@@ -753,10 +753,192 @@ def modulePath(moduleName):
   import slicer
   return eval('slicer.modules.%s.path' % moduleName.lower())
 
+_moduleSourceFingerprints = {}
+
+def _moduleSourcePath(module):
+  """Return path of the Python source file of ``module``, None if it is not loaded from a source file."""
+  import os
+  filePath = getattr(module, '__file__', None)
+  if not filePath:
+    return None
+  if filePath.endswith('.pyc'):
+    filePath = filePath[:-1]
+  if not filePath.endswith('.py') or not os.path.isfile(filePath):
+    return None
+  return filePath
+
+def _moduleSourceFingerprint(filePath, previousFingerprint=None):
+  """Return ``(modificationTime, size, sha1)`` of the file.
+  Content is not read if modification time and size are the same as in ``previousFingerprint``.
+  """
+  import hashlib, os
+  fileStat = os.stat(filePath)
+  if previousFingerprint and previousFingerprint[:2] == (fileStat.st_mtime, fileStat.st_size):
+    return previousFingerprint
+  with open(filePath, 'rb') as f:
+    return (fileStat.st_mtime, fileStat.st_size, hashlib.sha1(f.read()).hexdigest())
+
+def _importedModuleNames(filePath, moduleName):
+  """Return the set of absolute names of modules (and their parent packages) imported
+  anywhere in the Python source file of module ``moduleName``.
+  Imported names that are not modules (``from module import function``) are included as well.
+  """
+  import ast, os
+  with open(filePath, 'rb') as f:
+    tree = ast.parse(f.read(), filePath)
+  isPackage = os.path.basename(filePath) == '__init__.py'
+  packageParts = moduleName.split('.') if isPackage else moduleName.split('.')[:-1]
+
+  names = set()
+  def addModuleName(name):
+    parts = name.split('.')
+    names.update('.'.join(parts[:index]) for index in range(1, len(parts) + 1))
+
+  for node in ast.walk(tree):
+    if isinstance(node, ast.Import):
+      for alias in node.names:
+        addModuleName(alias.name)
+    elif isinstance(node, ast.ImportFrom):
+      if node.level:
+        # relative import
+        if node.level - 1 > len(packageParts):
+          continue
+        baseParts = packageParts[:len(packageParts) - (node.level - 1)]
+        if node.module:
+          baseParts = baseParts + node.module.split('.')
+        base = '.'.join(baseParts)
+      else:
+        base = node.module
+      if not base:
+        continue
+      addModuleName(base)
+      for alias in node.names:
+        if alias.name != '*':
+          names.add(base + '.' + alias.name)
+  return names
+
+def _isInDirectory(filePath, directory):
+  import os
+  return filePath.startswith(os.path.normcase(os.path.realpath(directory)) + os.sep)
+
+def _slicerPythonDirectories():
+  """Return the directories of the Python installation and of the Python packages of the
+  application (``slicer``, ``vtk``, ``ctk``, ...)."""
+  import os, sys
+  directories = set([sys.prefix, sys.base_prefix, sys.exec_prefix])
+  for name in ('slicer', 'vtk', 'ctk', 'qt', 'mrml', 'vtkAddon'):
+    module = sys.modules.get(name)
+    filePath = getattr(module, '__file__', None)
+    if filePath is None:
+      continue
+    if os.path.basename(filePath).startswith('__init__.'):
+      filePath = os.path.dirname(filePath)
+    directories.add(os.path.dirname(filePath))
+  return directories
+
+def _isReloadableHelperModule(module, moduleDirectory):
+  """Return True if ``module`` is loaded from a Python source file located in ``moduleDirectory``
+  (the directory of the scripted module that is reloaded), that is not part of the Python
+  installation or of the Python packages of the application, and is not a scripted module
+  (scripted modules are reloaded using :func:`reloadScriptedModule`).
+  """
+  import os
+  import slicer
+  filePath = _moduleSourcePath(module)
+  if filePath is None:
+    return False
+  name = module.__name__
+  if name in ('__main__', 'slicer') or name.startswith('slicer.') or hasattr(slicer.moduleNames, name):
+    return False
+  filePath = os.path.normcase(os.path.realpath(filePath))
+  if not _isInDirectory(filePath, moduleDirectory):
+    return False
+  for directory in _slicerPythonDirectories():
+    if _isInDirectory(filePath, directory):
+      return False
+  return True
+
+def _moduleDependencyGraph(moduleName, filePath):
+  """Return dictionary mapping the module and each helper module it imports (directly or not)
+  to the set of helper modules it imports.
+  """
+  import os, sys
+  moduleDirectory = os.path.dirname(filePath)
+  graph = {}
+  modulesToVisit = [(moduleName, filePath)]
+  while modulesToVisit:
+    name, path = modulesToVisit.pop()
+    if name in graph:
+      continue
+    graph[name] = set()
+    for importedName in _importedModuleNames(path, name):
+      importedModule = sys.modules.get(importedName)
+      if importedName == name or importedModule is None or not _isReloadableHelperModule(importedModule, moduleDirectory):
+        continue
+      graph[name].add(importedName)
+      modulesToVisit.append((importedName, _moduleSourcePath(importedModule)))
+  return graph
+
+def _dependencyOrder(graph, moduleName):
+  """Return names of modules in ``graph``, dependencies first. Import cycles are broken
+  at the module that is reached first from ``moduleName``."""
+  order = []
+  visited = set()
+  def visit(name):
+    visited.add(name)
+    for dependency in sorted(graph[name]):
+      if dependency not in visited:
+        visit(dependency)
+    order.append(name)
+  visit(moduleName)
+  return order
+
+def _reloadChangedModuleDependencies(moduleName, filePath):
+  """Reload helper modules imported by a scripted module that changed since they were last
+  reloaded, and the helper modules that import them, in dependency order.
+
+  Changes are detected using modification time and size of the source files, then content hash.
+  A helper module is considered changed if it has not been reloaded by this function before.
+
+  :return: names of the reloaded helper modules
+  """
+  import importlib, sys
+  graph = _moduleDependencyGraph(moduleName, filePath)
+  order = _dependencyOrder(graph, moduleName)
+  order.remove(moduleName)
+
+  changedModuleNames = set()
+  fingerprints = {}
+  for name in order:
+    path = _moduleSourcePath(sys.modules[name])
+    previousFingerprint = _moduleSourceFingerprints.get(path)
+    fingerprints[name] = _moduleSourceFingerprint(path, previousFingerprint)
+    if previousFingerprint is None or fingerprints[name][2] != previousFingerprint[2]:
+      changedModuleNames.add(name)
+
+  # Modules importing a reloaded module have to be reloaded as well, to not keep references
+  # to classes and functions of the previous version.
+  invalidatedModuleNames = set(changedModuleNames)
+  for name in order:
+    if graph[name] & invalidatedModuleNames:
+      invalidatedModuleNames.add(name)
+
+  reloadedModuleNames = []
+  for name in order:
+    if name in invalidatedModuleNames:
+      importlib.reload(sys.modules[name])
+      reloadedModuleNames.append(name)
+    _moduleSourceFingerprints[_moduleSourcePath(sys.modules[name])] = fingerprints[name]
+  return reloadedModuleNames
+
 def reloadScriptedModule(moduleName):
   """Generic reload method for any scripted module.
 
   The function performs the following:
+  * Reload helper modules and packages imported by the module (for example ``EditorLib``
+    or ``SegmentStatisticsPlugins``) that changed since the previous reload, and modules
+    that import them, in dependency order. All of them are reloaded the first time.
+    Only helper modules located in the directory of the module are reloaded.
   * Ensure ``sys.path`` includes the module path and use ``imp.load_module``
     to load the associated script.
   * For the current module widget representation:
@@ -764,12 +946,14 @@ def reloadScriptedModule(moduleName):
     * Call ``cleanup()`` function and disconnect ``ScriptedLoadableModuleWidget_onModuleAboutToBeUnloaded``
     * Remove layout items
   * Instantiate new widget representation
-  * Call ``setup()`` function
+  * Call ``setup()`` function (also if the widget defers its setup, see ``ScriptedLoadableModuleWidget.lazySetup``)
   * Update ``slicer.modules.<moduleName>Widget`` attribute
+  * Log the reload time and the reloaded helper modules
   """
-  import imp, sys, os
+  import imp, sys, os, logging, time
   import slicer
 
+  startTime = time.time()
   widgetName = moduleName + "Widget"
 
   # reload the source code
@@ -777,6 +961,7 @@ def reloadScriptedModule(moduleName):
   p = os.path.dirname(filePath)
   if not p in sys.path:
     sys.path.insert(0,p)
+  reloadedHelperModuleNames = _reloadChangedModuleDependencies(moduleName, filePath)
   with open(filePath, "r") as fp:
     reloaded_module = imp.load_module(
         moduleName, fp, filePath, ('.py', 'r', imp.PY_SOURCE))
@@ -794,7 +979,9 @@ def reloadScriptedModule(moduleName):
   # application exit)
   if hasattr(slicer.modules, widgetName):
     widget = getattr(slicer.modules, widgetName)
-    widget.cleanup()
+    # a widget with deferred setup has nothing to clean up
+    if not getattr(widget, 'setupPending', False):
+      widget.cleanup()
 
     if hasattr(widget, '_onModuleAboutToBeUnloaded'):
       slicer.app.moduleManager().disconnect('moduleAboutToBeUnloaded(QString)', widget._onModuleAboutToBeUnloaded)
@@ -809,8 +996,14 @@ def reloadScriptedModule(moduleName):
   # create new widget inside existing parent
   widget = eval('reloaded_module.%s(parent)' % widgetName)
   widget.setup()
+  # the module is being displayed, do not defer the setup
+  if hasattr(type(widget), 'ensureSetup'):
+    widget.ensureSetup()
   setattr(slicer.modules, widgetName, widget)
 
+  logging.info("Reloaded module %s in %.2fs (reloaded helper modules: %s)" % (moduleName, time.time() - startTime,
+    ", ".join(reloadedHelperModuleNames) if reloadedHelperModuleNames else "none"))
+
   return reloaded_module
 
 #
@@ -838,6 +1031,236 @@ class MRMLNodeNotFoundException(Exception):
   """
   pass
 
+class MRMLNodeIndex(object):
+  """Index of the nodes of a MRML scene by name and class.
+
+  The index is kept up-to-date by observing the scene ``NodeAddedEvent`` and
+  ``NodeRemovedEvent`` and the ``NameChangedEvent`` of the indexed nodes.
+  Nodes are referenced by ID, so the index does not keep removed nodes alive.
+  Lookup by exact name or class is O(1), lookup by name prefix is O(log n).
+  Returned nodes are always checked to be still in the scene with the expected
+  name, the index is rebuilt if it is found to be out of date (for example
+  if nodes were added without notification).
+
+  Use :func:`mrmlSceneNodeIndex` to get the index of ``slicer.mrmlScene``.
+  """
+
+  def __init__(self, scene):
+    import vtk
+    self.scene = scene
+    self._nodeNames = {}
+    self._nameObservations = {}
+    self._nodeIDsByName = {}
+    self._nodeIDsByClass = {}
+    self._sortedNames = []
+
+    @vtk.calldata_type(vtk.VTK_OBJECT)
+    def onNodeAdded(caller, event, node):
+      self._addNode(node)
+
+    @vtk.calldata_type(vtk.VTK_OBJECT)
+    def onNodeRemoved(caller, event, node):
+      self._removeNode(node)
+
+    self._onNodeNameChanged = lambda caller, event: self._updateNodeName(caller)
+    self._sceneObservations = [
+      scene.AddObserver(scene.NodeAddedEvent, onNodeAdded),
+      scene.AddObserver(scene.NodeRemovedEvent, onNodeRemoved),
+      ]
+    self.rebuild()
+
+  def removeObservers(self):
+    """Stop maintaining the index and discard its content."""
+    self._clear()
+    for tag in self._sceneObservations:
+      self.scene.RemoveObserver(tag)
+    self._sceneObservations = []
+
+  def rebuild(self):
+    """Discard the index content and index all the nodes of the scene."""
+    self._clear()
+    for node in _iterateNodes(self.scene):
+      self._addNode(node)
+
+  def nodesByName(self, name):
+    """Return the list of nodes named ``name``."""
+    self._rebuildIfNeeded()
+    nodes = self._namedNodes(name)
+    if nodes is None:
+      self.rebuild()
+      nodes = self._namedNodes(name) or []
+    return nodes
+
+  def nodesByNamePrefix(self, prefix):
+    """Return the list of nodes whose name starts with ``prefix``, sorted by name."""
+    self._rebuildIfNeeded()
+    nodes = self._nodesWithNamePrefix(prefix)
+    if nodes is None:
+      self.rebuild()
+      nodes = self._nodesWithNamePrefix(prefix) or []
+    return nodes
+
+  def nodesByClass(self, className):
+    """Return the list of nodes of class ``className`` (subclasses are not included)."""
+    self._rebuildIfNeeded()
+    nodes = [self.scene.GetNodeByID(nodeID) for nodeID in self._nodeIDsByClass.get(className, [])]
+    return [node for node in nodes if node is not None and node.GetClassName() == className]
+
+  def _clear(self):
+    for nodeID, tag in self._nameObservations.items():
+      node = self.scene.GetNodeByID(nodeID)
+      if node is not None:
+        node.RemoveObserver(tag)
+    self._nodeNames = {}
+    self._nameObservations = {}
+    self._nodeIDsByName = {}
+    self._nodeIDsByClass = {}
+    self._sortedNames = []
+
+  def _rebuildIfNeeded(self):
+    # Nodes added or removed without notification (e.g. during batch
+    # processing) are caught up here.
+    if len(self._nodeNames) != self.scene.GetNumberOfNodes():
+      self.rebuild()
+
+  def _namedNodes(self, name):
+    """Return the nodes indexed with ``name``, None if the index is out of date."""
+    nodes = []
+    for nodeID in self._nodeIDsByName.get(name, []):
+      node = self.scene.GetNodeByID(nodeID)
+      if node is None or node.GetName() != name:
+        return None
+      nodes.append(node)
+    return nodes
+
+  def _nodesWithNamePrefix(self, prefix):
+    """Return the nodes indexed with a name starting with ``prefix``, None if the index is out of date."""
+    import bisect
+    nodes = []
+    for name in self._sortedNames[bisect.bisect_left(self._sortedNames, prefix):]:
+      if not name.startswith(prefix):
+        break
+      namedNodes = self._namedNodes(name)
+      if namedNodes is None:
+        return None
+      nodes.extend(namedNodes)
+    return nodes
+
+  def _addNode(self, node):
+    import slicer
+    if node is None or node.GetID() is None or node.GetID() in self._nodeNames:
+      return
+    nodeID = node.GetID()
+    name = node.GetName()
+    self._nodeNames[nodeID] = name
+    self._nameObservations[nodeID] = node.AddObserver(slicer.vtkMRMLNode.NameChangedEvent, self._onNodeNameChanged)
+    self._addName(nodeID, name)
+    self._nodeIDsByClass.setdefault(node.GetClassName(), []).append(nodeID)
+
+  def _removeNode(self, node):
+    if node is None or node.GetID() not in self._nodeNames:
+      return
+    nodeID = node.GetID()
+    node.RemoveObserver(self._nameObservations.pop(nodeID))
+    self._removeName(nodeID, self._nodeNames.pop(nodeID))
+    classNodeIDs = self._nodeIDsByClass.get(node.GetClassName(), [])
+    if nodeID in classNodeIDs:
+      classNodeIDs.remove(nodeID)
+      if not classNodeIDs:
+        del self._nodeIDsByClass[node.GetClassName()]
+
+  def _updateNodeName(self, node):
+    nodeID = node.GetID()
+    if nodeID not in self._nodeNames or self.scene.GetNodeByID(nodeID) is not node:
+      return
+    name = node.GetName()
+    if name == self._nodeNames[nodeID]:
+      return
+    self._removeName(nodeID, self._nodeNames[nodeID])
+    self._addName(nodeID, name)
+    self._nodeNames[nodeID] = name
+
+  def _addName(self, nodeID, name):
+    import bisect
+    if name is None:
+      return
+    nodeIDs = self._nodeIDsByName.get(name)
+    if nodeIDs is None:
+      nodeIDs = self._nodeIDsByName[name] = []
+      bisect.insort(self._sortedNames, name)
+    nodeIDs.append(nodeID)
+
+  def _removeName(self, nodeID, name):
+    import bisect
+    if name is None:
+      return
+    nodeIDs = self._nodeIDsByName[name]
+    nodeIDs.remove(nodeID)
+    if not nodeIDs:
+      del self._nodeIDsByName[name]
+      del self._sortedNames[bisect.bisect_left(self._sortedNames, name)]
+
+_mrmlSceneNodeIndex = None
+
+def mrmlSceneNodeIndex():
+  """Return the :class:`MRMLNodeIndex` of ``slicer.mrmlScene``.
+
+  The index is created on first use and then maintained for the lifetime of
+  the application.
+  """
+  import slicer
+  global _mrmlSceneNodeIndex
+  if _mrmlSceneNodeIndex is None or _mrmlSceneNodeIndex.scene != slicer.mrmlScene:
+    if _mrmlSceneNodeIndex is not None:
+      _mrmlSceneNodeIndex.removeObservers()
+    _mrmlSceneNodeIndex = MRMLNodeIndex(slicer.mrmlScene)
+  return _mrmlSceneNodeIndex
+
+def _iterateNodes(scene):
+  """Iterate over the nodes of ``scene`` in scene order.
+
+  Unlike ``GetNthNode``, which walks the node collection from its start on
+  each call, this is linear in the number of nodes.
+  """
+  iterator = scene.GetNodes().NewIterator()
+  iterator.InitTraversal()
+  while not iterator.IsDoneWithTraversal():
+    yield iterator.GetCurrentObject()
+    iterator.GoToNextItem()
+
+def _isWildcardPattern(pattern):
+  return any(character in pattern for character in "*?[")
+
+def _getNodesByExactNameOrID(pattern, scene, useLists):
+  """Look up ``pattern`` as a node name or ID using the scene node index.
+
+  Returns None if the result cannot be decided from the index, in which case
+  the nodes have to be searched by iterating over the whole scene.
+  """
+  import slicer, collections
+  namedNodes = mrmlSceneNodeIndex().nodesByName(pattern)
+  idNode = scene.GetNodeByID(pattern)
+  if idNode is not None and idNode.GetName() == pattern:
+    idNode = None
+  if not namedNodes and idNode is None:
+    # Not found, or the node was added without notification
+    return None
+  if namedNodes and idNode is not None:
+    # Order of the node found by ID relative to the nodes found by name is not known
+    return None
+  if len(namedNodes) > 1:
+    # Get the nodes sharing the name in scene order
+    sceneNodes = scene.GetNodesByName(pattern)
+    sceneNodes.UnRegister(scene)
+    namedNodes = [sceneNodes.GetItemAsObject(idx) for idx in range(sceneNodes.GetNumberOfItems())]
+  nodes = collections.OrderedDict()
+  for node in (namedNodes if namedNodes else [idNode]):
+    if useLists:
+      nodes.setdefault(node.GetName(), []).append(node)
+    else:
+      nodes[node.GetName()] = node
+  return nodes
+
 def getNodes(pattern="*", scene=None, useLists=False):
   """Return a dictionary of nodes where the name or id matches the ``pattern``.
   By default, ``pattern`` is a wildcard and it returns all nodes associated
@@ -845,14 +1268,20 @@ def getNodes(pattern="*", scene=None, useLists=False):
   If multiple node share the same name, using ``useLists=False`` (default behavior)
   returns only the last node with that name. If ``useLists=True``, it returns
   a dictionary of lists of nodes.
+
+  Patterns without wildcard characters are looked up in the node index of
+  ``slicer.mrmlScene`` (see :func:`mrmlSceneNodeIndex`) instead of matching
+  every node of the scene.
   """
   import slicer, collections, fnmatch
-  nodes = collections.OrderedDict()
   if scene is None:
     scene = slicer.mrmlScene
-  count = scene.GetNumberOfNodes()
-  for idx in range(count):
-    node = scene.GetNthNode(idx)
+  if isinstance(pattern, str) and not _isWildcardPattern(pattern) and scene == slicer.mrmlScene:
+    nodes = _getNodesByExactNameOrID(pattern, scene, useLists)
+    if nodes is not None:
+      return nodes
+  nodes = collections.OrderedDict()
+  for node in _iterateNodes(scene):
     name = node.GetName()
     id = node.GetID()
     if (fnmatch.fnmatchcase(name, pattern) or
@@ -1227,21 +1656,57 @@ def arrayFromMarkupsControlPoints(markupsNode, world = False):
   The returned array is just a copy and so any modification in the array will not affect the markup node.
   To modify markup control points based on a numpy array, use :py:meth:`updateMarkupsControlPointsFromArray`.
   """
-  numberOfControlPoints = markupsNode.GetNumberOfControlPoints()
   import numpy as np
-  narray = np.zeros([numberOfControlPoints, 3])
-  for controlPointIndex in range(numberOfControlPoints):
-    if world:
-      markupsNode.GetNthControlPointPositionWorld(controlPointIndex, narray[controlPointIndex,:])
-    else:
-      markupsNode.GetNthControlPointPosition(controlPointIndex, narray[controlPointIndex,:])
-  return narray
+  import vtk.util.numpy_support
+  points = vtk.vtkPoints()
+  points.SetDataTypeToDouble()
+  if world:
+    markupsNode.GetControlPointPositionsWorld(points)
+  else:
+    markupsNode.GetControlPointPositions(points)
+  if points.GetNumberOfPoints() == 0:
+    return np.zeros([0, 3])
+  return np.array(vtk.util.numpy_support.vtk_to_numpy(points.GetData()))
 
-def updateMarkupsControlPointsFromArray(markupsNode, narray, world = False):
+def arrayFromMarkupsControlPointSelected(markupsNode):
+  """Return the selected state of all control points of a markups node as a numpy array of booleans.
+  To modify the selected state of control points, use :py:meth:`updateMarkupsControlPointsFromArray`.
+  """
+  import numpy as np
+  import vtk.util.numpy_support
+  flags = vtk.vtkUnsignedCharArray()
+  markupsNode.GetControlPointSelectedFlags(flags)
+  return vtk.util.numpy_support.vtk_to_numpy(flags).astype(bool) if flags.GetNumberOfValues() else np.zeros(0, bool)
+
+def arrayFromMarkupsControlPointVisibility(markupsNode):
+  """Return the visibility of all control points of a markups node as a numpy array of booleans.
+  To modify the visibility of control points, use :py:meth:`updateMarkupsControlPointsFromArray`.
+  """
+  import numpy as np
+  import vtk.util.numpy_support
+  flags = vtk.vtkUnsignedCharArray()
+  markupsNode.GetControlPointVisibilityFlags(flags)
+  return vtk.util.numpy_support.vtk_to_numpy(flags).astype(bool) if flags.GetNumberOfValues() else np.zeros(0, bool)
+
+def markupsControlPointLabels(markupsNode):
+  """Return the labels of all control points of a markups node as a list of strings."""
+  import vtk
+  labels = vtk.vtkStringArray()
+  markupsNode.GetControlPointLabels(labels)
+  return [labels.GetValue(index) for index in range(labels.GetNumberOfValues())]
+
+def updateMarkupsControlPointsFromArray(markupsNode, narray, world = False, labels = None, selected = None, visible = None):
   """Sets control point positions in a markups node from a numpy array of size Nx3.
   :param world: if set to True then the control point coordinates are expected in world coordinate system.
+  :param labels: optional list of N control point labels.
+  :param selected: optional array of N booleans, the selected state of each control point.
+  :param visible: optional array of N booleans, the visibility of each control point.
   All previous content of the node is deleted.
+  The node is updated in a single call, in one modify block: node observers are notified once,
+  regardless of the number of control points.
   """
+  import numpy as np
+  import vtk.util.numpy_support
   narrayshape = narray.shape
   if narrayshape == (0,):
     markupsNode.RemoveAllControlPoints()
@@ -1249,25 +1714,28 @@ def updateMarkupsControlPointsFromArray(markupsNode, narray, world = False):
   if len(narrayshape) != 2 or narrayshape[1] != 3:
     raise RuntimeError("Unsupported numpy array shape: "+str(narrayshape)+" expected (N,3)")
   numberOfControlPoints = narrayshape[0]
-  oldNumberOfControlPoints = markupsNode.GetNumberOfControlPoints()
-  # Update existing control points
-  for controlPointIndex in range(min(numberOfControlPoints, oldNumberOfControlPoints)):
+  for name, values in [("labels", labels), ("selected", selected), ("visible", visible)]:
+    if values is not None and len(values) != numberOfControlPoints:
+      raise RuntimeError("Number of %s (%d) does not match number of control points (%d)" % (name, len(values), numberOfControlPoints))
+  # Keep a reference to the contiguous array while the points use its memory
+  positions = np.ascontiguousarray(narray, dtype=np.float64)
+  points = vtk.vtkPoints()
+  points.SetData(vtk.util.numpy_support.numpy_to_vtk(positions))
+  with NodeModify(markupsNode):
     if world:
-      markupsNode.SetNthControlPointPositionWorldFromArray(controlPointIndex, narray[controlPointIndex,:])
+      markupsNode.SetControlPointPositionsWorld(points)
     else:
-      markupsNode.SetNthControlPointPositionFromArray(controlPointIndex, narray[controlPointIndex,:])
-  if numberOfControlPoints >= oldNumberOfControlPoints:
-    # Add new points to the markup node
-    from vtk import vtkVector3d
-    for controlPointIndex in range(oldNumberOfControlPoints, numberOfControlPoints):
-      if world:
-        markupsNode.AddControlPointWorld(vtkVector3d(narray[controlPointIndex,:]))
-      else:
-        markupsNode.AddControlPoint(vtkVector3d(narray[controlPointIndex,:]))
-  else:
-    # Remove extra point from the markup node
-    for controlPointIndex in range(oldNumberOfControlPoints, numberOfControlPoints, -1):
-      markupsNode.RemoveNthControlPoint(controlPointIndex-1)
+      markupsNode.SetControlPointPositions(points)
+    if labels is not None:
+      labelArray = vtk.vtkStringArray()
+      labelArray.SetNumberOfValues(numberOfControlPoints)
+      for index, label in enumerate(labels):
+        labelArray.SetValue(index, label)
+      markupsNode.SetControlPointLabels(labelArray)
+    for values, setFlags in [(selected, markupsNode.SetControlPointSelectedFlags), (visible, markupsNode.SetControlPointVisibilityFlags)]:
+      if values is not None:
+        flags = np.ascontiguousarray(values, dtype=np.uint8)
+        setFlags(vtk.util.numpy_support.numpy_to_vtk(flags, array_type=vtk.VTK_UNSIGNED_CHAR))
 
 def arrayFromMarkupsCurvePoints(markupsNode, world = False):
   """Return interpolated curve point positions of a markups node as rows in a numpy array (of size Nx3).
@@ -1373,19 +1841,53 @@ def addVolumeFromArray(narray, ijkToRAS=None, name=None, nodeClassName=None):
 
   return volumeNode
 
+def _tableColumnValues(tableNode, columnName):
+  """Return values of a table column as a numpy array.
+  Numeric columns are returned as a view of the VTK array, string columns as a new array of strings.
+  """
+  import numpy as np
+  import vtk.util.numpy_support
+  columnData = tableNode.GetTable().GetColumnByName(columnName)
+  if columnData is None:
+    raise ValueError("Column '{0}' not found in table node '{1}'".format(columnName, tableNode.GetName()))
+  if not columnData.IsNumeric():
+    return np.array([columnData.GetValue(rowIndex) for rowIndex in range(columnData.GetNumberOfValues())], dtype=str)
+  return vtk.util.numpy_support.vtk_to_numpy(columnData)
+
 def arrayFromTableColumn(tableNode, columnName):
-  """Return values of a table node's column as numpy array.
-  Values can be modified by modifying the numpy array.
-  After all modifications has been completed, call :py:meth:`arrayFromTableColumnModified`.
+  """Return values of a table node's column(s) as numpy array.
+
+  If ``columnName`` is a single column name then values of a numeric column can be modified
+  by modifying the numpy array. After all modifications has been completed,
+  call :py:meth:`arrayFromTableColumnModified`. Values of string columns are returned
+  as a numpy array of strings, which is a copy of the table content.
+
+  If ``columnName`` is a list of column names then a 2D array is returned
+  (one row for each table row, one column for each requested column).
+  The returned array is a copy of the table content. If the columns have different
+  value types (for example, integer and floating-point, or any of them contains strings)
+  then the array has ``object`` data type, so that each value keeps the type of its column.
+
+  Example:
+
+      pointsAndCounts = arrayFromTableColumn(tableNode, ["X", "Y", "Count"])
 
   .. warning:: Important: memory area of the returned array is managed by VTK,
     therefore values in the array may be changed, but the array must not be reallocated.
     See :py:meth:`arrayFromVolume` for details.
   """
-  import vtk.util.numpy_support
-  columnData = tableNode.GetTable().GetColumnByName(columnName)
-  narray = vtk.util.numpy_support.vtk_to_numpy(columnData)
-  return narray
+  import numpy as np
+  if isinstance(columnName, str):
+    return _tableColumnValues(tableNode, columnName)
+  ncolumns = [_tableColumnValues(tableNode, name) for name in columnName]
+  if not ncolumns:
+    return np.zeros((tableNode.GetNumberOfRows(), 0))
+  if any(ncolumn.dtype != ncolumns[0].dtype for ncolumn in ncolumns) or ncolumns[0].dtype.kind == 'U':
+    narray = np.empty((len(ncolumns[0]), len(ncolumns)), dtype=object)
+    for columnIndex, ncolumn in enumerate(ncolumns):
+      narray[:, columnIndex] = ncolumn
+    return narray
+  return np.column_stack(ncolumns)
 
 def arrayFromTableColumnModified(tableNode, columnName):
   """Indicate that modification of a numpy array returned by :py:meth:`arrayFromModelPoints` has been completed."""
@@ -1394,13 +1896,101 @@ def arrayFromTableColumnModified(tableNode, columnName):
   columnData.Modified()
   tableNode.GetTable().Modified()
 
-def updateTableFromArray(tableNode, narrays, columnNames=None):
+def _tableColumnInputArray(ncolumn):
+  """Return a 1D numpy array that can be stored in a VTK table column.
+  Boolean values are stored as unsigned char, strings and other non-numeric values as strings.
+  """
+  import numpy as np
+  ncolumn = np.asarray(ncolumn).ravel()
+  if ncolumn.dtype.kind == 'b':
+    ncolumn = ncolumn.astype(np.uint8)
+  return ncolumn
+
+def _tableColumnVTKType(ncolumn):
+  """Return the VTK data type that stores values of a numpy array without loss of precision."""
+  import vtk
+  import vtk.util.numpy_support
+  if ncolumn.dtype.kind in 'biuf':
+    return vtk.util.numpy_support.get_vtk_array_type(ncolumn.dtype)
+  return vtk.VTK_STRING
+
+def _tableColumnStringValue(value):
+  if isinstance(value, bytes):
+    return value.decode()
+  return str(value)
+
+def _vtkArrayFromTableColumnInputArray(ncolumn, deepCopy=True):
+  """Create a VTK array from a 1D numpy array returned by :py:func:`_tableColumnInputArray`.
+  If ``deepCopy`` is False then numeric values are not copied, the VTK array uses
+  the memory buffer of the numpy array.
+  """
+  import vtk
+  import vtk.util.numpy_support
+  if _tableColumnVTKType(ncolumn) == vtk.VTK_STRING:
+    vcolumn = vtk.vtkStringArray()
+    vcolumn.SetNumberOfValues(len(ncolumn))
+    for rowIndex, value in enumerate(ncolumn):
+      vcolumn.SetValue(rowIndex, _tableColumnStringValue(value))
+    return vcolumn
+  return vtk.util.numpy_support.numpy_to_vtk(num_array=ncolumn, deep=deepCopy)
+
+def _updateTableColumnsInPlace(tableNode, ncolumns, columnNames):
+  """Copy values into the existing columns of a table node.
+  Returns False (without changing the table) if number of columns, value types, or column lengths do not match,
+  or if a column shares memory with a numpy array (see ``deepCopy`` in :py:meth:`updateTableFromArray`).
+  """
+  import vtk
+  import vtk.util.numpy_support
+  table = tableNode.GetTable()
+  if table is None or table.GetNumberOfColumns() != len(ncolumns) or not ncolumns:
+    return False
+  numberOfRows = len(ncolumns[0])
+  vcolumns = []
+  for columnIndex, ncolumn in enumerate(ncolumns):
+    vcolumn = table.GetColumn(columnIndex)
+    if len(ncolumn) != numberOfRows or vcolumn.GetNumberOfComponents() != 1:
+      return False
+    if vcolumn.GetNumberOfTuples() != numberOfRows or vcolumn.GetDataType() != _tableColumnVTKType(ncolumn):
+      return False
+    if getattr(vcolumn, '_numpy_reference', None) is not None:
+      # Values are stored in the memory of a numpy array of the caller, do not overwrite them
+      return False
+    vcolumns.append(vcolumn)
+  with NodeModify(tableNode):
+    for columnIndex, (ncolumn, vcolumn) in enumerate(zip(ncolumns, vcolumns)):
+      if vcolumn.GetDataType() == vtk.VTK_STRING:
+        for rowIndex, value in enumerate(ncolumn):
+          vcolumn.SetValue(rowIndex, _tableColumnStringValue(value))
+      else:
+        vtk.util.numpy_support.vtk_to_numpy(vcolumn)[:] = ncolumn
+      vcolumn.SetName(columnNames[columnIndex] if columnIndex < len(columnNames) else None)
+      vcolumn.Modified()
+    table.Modified()
+  return True
+
+def updateTableFromArray(tableNode, narrays, columnNames=None, deepCopy=True):
   """Sets values in a table node from a numpy array.
   columnNames may contain a string or list of strings that will be used as column name(s).
-  Values are copied, therefore if the numpy array  is modified after calling this method,
-  values in the table node will not change.
   All previous content of the table is deleted.
 
+  Value type of each column is preserved: integer, floating-point, and boolean arrays
+  are stored in VTK arrays of matching type, while string (and other non-numeric)
+  arrays are stored in string columns.
+
+  If the table already contains the same number of columns, with matching value types and
+  the same number of rows as the input arrays, then values are copied into the existing
+  columns instead of replacing them (unless a column shares memory with a numpy array, see
+  ``deepCopy`` below). This makes repeated updates (for example, refreshing
+  a plot with :py:meth:`plot`) cheaper, as no new columns are allocated.
+
+  If ``deepCopy`` is True (default) then values are copied, therefore if the numpy array is
+  modified after calling this method, values in the table node will not change.
+  If ``deepCopy`` is False then numeric columns share memory with the numpy array
+  (the table keeps a reference to it), which avoids copying large arrays. This is intended for
+  data that is not modified afterwards; if the numpy array is modified then
+  :py:meth:`arrayFromTableColumnModified` must be called. Non-contiguous arrays (such as columns
+  of a 2D array) and string arrays are always copied.
+
   Example:
 
       import numpy as np
@@ -1410,7 +2000,6 @@ def updateTableFromArray(tableNode, narrays, columnNames=None):
 
   """
   import numpy as np
-  import vtk.util.numpy_support
   import slicer
 
   if tableNode is None:
@@ -1423,17 +2012,21 @@ def updateTableFromArray(tableNode, narrays, columnNames=None):
     ncolumns = narrays
   else:
     raise ValueError('Expected narrays is a numpy ndarray, or tuple or list of numpy ndarrays, got %s instead.' % (str(type(narrays))))
-  tableNode.RemoveAllColumns()
+  ncolumns = [_tableColumnInputArray(ncolumn) for ncolumn in ncolumns]
   # Convert single string to a single-element string list
   if columnNames is None:
     columnNames = []
   if isinstance(columnNames, str):
     columnNames = [columnNames]
-  for columnIndex, ncolumn in enumerate(ncolumns):
-    vcolumn = vtk.util.numpy_support.numpy_to_vtk(num_array=ncolumn.ravel(),deep=True,array_type=vtk.VTK_FLOAT)
-    if (columnNames is not None) and (columnIndex < len(columnNames)):
-      vcolumn.SetName(columnNames[columnIndex])
-    tableNode.AddColumn(vcolumn)
+  if deepCopy and _updateTableColumnsInPlace(tableNode, ncolumns, columnNames):
+    return tableNode
+  with NodeModify(tableNode):
+    tableNode.RemoveAllColumns()
+    for columnIndex, ncolumn in enumerate(ncolumns):
+      vcolumn = _vtkArrayFromTableColumnInputArray(ncolumn, deepCopy)
+      if (columnNames is not None) and (columnIndex < len(columnNames)):
+        vcolumn.SetName(columnNames[columnIndex])
+      tableNode.AddColumn(vcolumn)
   return tableNode
 
 #
@@ -1441,41 +2034,87 @@ def updateTableFromArray(tableNode, narrays, columnNames=None):
 #
 
 class VTKObservationMixin(object):
+  """Mixin class for keeping track of VTK observers added by an object.
+
+  Observations are indexed by ``(object, event, method)`` and by observed object,
+  therefore adding, removing and checking an observer takes the same time regardless
+  of how many observers are added, and removing all observers of an object only
+  depends on the number of observers of that object.
+  """
   def __init__(self):
     super(VTKObservationMixin, self).__init__()
-    self.Observations = []
-
-  def removeObservers(self, method=None):
-    for o, e, m, g, t, p in list(self.Observations):
-      if method == m or method is None:
-        o.RemoveObserver(t)
-        self.Observations.remove([o, e, m, g, t, p])
+    import collections
+    # (object, event, method) -> [object, event, method, group, tag, priority]
+    self._observations = collections.OrderedDict()
+    # object -> OrderedDict of the (object, event, method) keys of its observations
+    self._observationKeysByObject = {}
+
+  @property
+  def Observations(self):
+    """List of observations in the order they were added,
+    each stored as ``[object, event, method, group, tag, priority]``.
+
+    The returned list is a copy: observations appended to it are not recorded.
+    Assigning a list replaces the recorded observations, without adding or
+    removing any observer.
+    """
+    return list(self._observations.values())
+
+  @Observations.setter
+  def Observations(self, observations):
+    import collections
+    self._observations = collections.OrderedDict()
+    self._observationKeysByObject = {}
+    for observation in observations:
+      o, e, m, g, t, p = observation
+      key = (o, e, m)
+      self._observations[key] = list(observation)
+      self._observationKeysByObject.setdefault(o, collections.OrderedDict())[key] = None
+
+  def removeObservers(self, method=None, object=None):
+    """Remove observers that call ``method`` and observe ``object``.
+    All observers are removed if neither of them is specified.
+    """
+    if object is not None:
+      keys = list(self._observationKeysByObject.get(object, ()))
+    else:
+      keys = list(self._observations)
+    for key in keys:
+      if method is None or key[2] == method:
+        self._removeObservation(key)
 
   def addObserver(self, object, event, method, group = 'none', priority = 0.0):
-    if self.hasObserver(object, event, method):
+    key = (object, event, method)
+    if key in self._observations:
       print('already has observer')
       return
+    import collections
     tag = object.AddObserver(event, method, priority)
-    self.Observations.append([object, event, method, group, tag, priority])
+    self._observations[key] = [object, event, method, group, tag, priority]
+    self._observationKeysByObject.setdefault(object, collections.OrderedDict())[key] = None
 
   def removeObserver(self, object, event, method):
-    for o, e, m, g, t, p in self.Observations:
-      if o == object and e == event and m == method:
-        o.RemoveObserver(t)
-        self.Observations.remove([o, e, m, g, t, p])
+    key = (object, event, method)
+    if key in self._observations:
+      self._removeObservation(key)
 
   def hasObserver(self, object, event, method):
-    for o, e, m, g, t, p in self.Observations:
-      if o == object and e == event and m == method:
-        return True
-    return False
+    return (object, event, method) in self._observations
 
   def observer(self, event, method):
-    for o, e, m, g, t, p in self.Observations:
+    for o, e, m, g, t, p in self._observations.values():
       if e == event and m == method:
         return o
     return None
 
+  def _removeObservation(self, key):
+    o, e, m, g, t, p = self._observations.pop(key)
+    o.RemoveObserver(t)
+    objectKeys = self._observationKeysByObject[o]
+    del objectKeys[key]
+    if not objectKeys:
+      del self._observationKeysByObject[o]
+
 def toVTKString(text):
   """Convert unicode string into 8-bit encoded ascii string.
   Unicode characters without ascii equivalent will be stripped out.
@@ -1732,34 +2371,42 @@ interactor.AddObserver(vtk.vtkCommand.LeftButtonPressEvent, onClick)
   interactor.SetShiftKey(0)
   interactor.SetControlKey(0)
 
-def downloadFile(url, targetFilePath, checksum=None, reDownloadIfChecksumInvalid=True):
+def downloadFile(url, targetFilePath, checksum=None, reDownloadIfChecksumInvalid=True, chunkSize=1024*1024):
   """ Download ``url`` to local storage as ``targetFilePath``
 
   Target file path needs to indicate the file name and extension as well
 
   If specified, the ``checksum`` is used to verify that the downloaded file is the expected one.
   It must be specified as ``<algo>:<digest>``. For example, ``SHA256:cc211f0dfd9a05ca3841ce1141b292898b2dd2d3f08286affadf823a7e58df93``.
+
+  The checksum is computed while the data is received, reading it by chunk of ``chunkSize`` bytes,
+  and the downloaded file is recorded in the data cache manifest (see :func:`registerCachedFile`).
+  A file already verified with the same checksum is reused instead of being downloaded again.
   """
   import os
   import logging
   try:
     (algo, digest) = extractAlgoAndDigest(checksum)
   except ValueError as excinfo:
-    logging.error('Failed to parse checksum: ' + excinfo.message)
+    logging.error('Failed to parse checksum: ' + str(excinfo))
     return False
   if not os.path.exists(targetFilePath) or os.stat(targetFilePath).st_size == 0:
+    if algo is not None:
+      cachedFilePath = findFileByChecksum(checksum)
+      if cachedFilePath is not None:
+        logging.info('Requested file has been found in data cache: ' + cachedFilePath)
+        linkOrCopyFile(cachedFilePath, targetFilePath)
+        registerCachedFile(targetFilePath, checksum)
+        return True
     logging.info('Downloading from\n  %s\nas file\n  %s\nIt may take a few minutes...' % (url,targetFilePath))
     try:
-      import urllib.request, urllib.parse, urllib.error
-      urllib.request.urlretrieve(url, targetFilePath)
+      current_digest = _downloadAndComputeChecksum(url, targetFilePath, algo, chunkSize)
     except Exception as e:
       import traceback
       traceback.print_exc()
       logging.error('Failed to download file from ' + url)
       return False
     if algo is not None:
-      logging.info('Verifying checksum\n  %s' % targetFilePath)
-      current_digest = computeChecksum(algo, targetFilePath)
       if current_digest != digest:
         logging.error('Downloaded file does not have expected checksum.'
           '\n   current checksum: %s'
@@ -1767,14 +2414,20 @@ def downloadFile(url, targetFilePath, checksum=None, reDownloadIfChecksumInvalid
         return False
       else:
         logging.info('Checksum OK')
+        registerCachedFile(targetFilePath, checksum)
+    else:
+      registerCachedFile(targetFilePath)
   else:
     if algo is not None:
-      current_digest = computeChecksum(algo, targetFilePath)
+      if findFileByChecksum(checksum, targetFilePath) is not None:
+        logging.info('Requested file has been found and checksum was already verified: ' + targetFilePath)
+        return True
+      current_digest = computeChecksum(algo, targetFilePath, chunkSize)
       if current_digest != digest:
         if reDownloadIfChecksumInvalid:
           logging.info('Requested file has been found but its checksum is different: deleting and re-downloading')
           os.remove(targetFilePath)
-          return downloadFile(url, targetFilePath, checksum, reDownloadIfChecksumInvalid=False)
+          return downloadFile(url, targetFilePath, checksum, reDownloadIfChecksumInvalid=False, chunkSize=chunkSize)
         else:
           logging.error('Requested file has been found but its checksum is different:'
             '\n   current checksum: %s'
@@ -1782,50 +2435,613 @@ def downloadFile(url, targetFilePath, checksum=None, reDownloadIfChecksumInvalid
           return False
       else:
         logging.info('Requested file has been found and checksum is OK: ' + targetFilePath)
+        registerCachedFile(targetFilePath, checksum)
     else:
       logging.info('Requested file has been found: ' + targetFilePath)
+      registerCachedFile(targetFilePath)
   return True
 
-def extractArchive(archiveFilePath, outputDir, expectedNumberOfExtractedFiles=None):
+def _downloadAndComputeChecksum(url, targetFilePath, algo=None, chunkSize=1024*1024):
+  """Download ``url`` as ``targetFilePath`` and return the digest computed with ``algo``
+  while the data is received. Returns None if ``algo`` is None.
+  """
+  import hashlib
+  import urllib.request
+  hash = hashlib.new(algo) if algo is not None else None
+  with urllib.request.urlopen(url) as response, open(targetFilePath, 'wb') as targetFile:
+    while True:
+      chunk = response.read(chunkSize)
+      if not chunk:
+        break
+      targetFile.write(chunk)
+      if hash is not None:
+        hash.update(chunk)
+  return hash.hexdigest() if hash is not None else None
+
+def linkOrCopyFile(sourceFilePath, targetFilePath):
+  """Hard link ``sourceFilePath`` as ``targetFilePath``, copy it if linking is not possible."""
+  import os
+  import shutil
+  if os.path.exists(targetFilePath):
+    os.remove(targetFilePath)
+  try:
+    os.link(sourceFilePath, targetFilePath)
+  except OSError:
+    shutil.copyfile(sourceFilePath, targetFilePath)
+
+#
+# Data cache
+#
+# Downloaded files and extracted archives are recorded in a manifest stored as
+# ``DataCacheManifest.json`` in the remote cache directory. For each file, the manifest
+# stores its checksum (if verified), size, modification time and last access time, and
+# it maps each checksum to the verified files having it. For each extracted archive,
+# keyed by the archive checksum and the output directory, it stores the extracted files.
+#
+# A file is considered unchanged (and its checksum verified) as long as its size and
+# modification time are the same as recorded. Only data located in the remote cache
+# directory is accounted in the cache size and evicted.
+#
+# The manifest may be shared by several application instances: it is updated while
+# holding a lock on ``DataCacheManifest.json.lock``. Lookups use the manifest loaded in
+# memory, which is only read again when the file changes, and do not write it: access
+# times are kept in memory and saved with the next manifest update.
+#
+
+_dataCacheManifestVersion = 3
+
+class _DataCacheManifest(object):
+  """Manifest of the data cache loaded in memory, see :func:`dataCacheManifestFilePath`."""
+
+  def __init__(self):
+    import threading
+    import time
+    self.sessionStartTime = time.time()
+    self._lock = threading.RLock()
+    self._manifest = None
+    self._manifestFileStatus = None
+    # Last access time of manifest entries not saved yet, keyed by (kind, key)
+    self._accessTimes = {}
+
+  def read(self):
+    """Return the manifest, read again only if the manifest file has changed."""
+    with self._lock:
+      manifestFileStatus = self._fileStatus()
+      if self._manifest is None or manifestFileStatus != self._manifestFileStatus:
+        self._manifest = _readDataCacheManifest()
+        self._manifestFileStatus = manifestFileStatus
+      return self._manifest
+
+  def recordAccess(self, kind, key):
+    import time
+    with self._lock:
+      self._accessTimes[(kind, key)] = time.time()
+
+  def update(self):
+    """Return a context manager locking the manifest file (also against other processes)
+    and yielding the up-to-date manifest, which is written when the context is exited."""
+    import contextlib
+
+    @contextlib.contextmanager
+    def updateManifest():
+      with self._lock, _DataCacheFileLock(dataCacheManifestFilePath() + '.lock'):
+        manifest = self.read()
+        try:
+          yield manifest
+          for (kind, key), accessTime in self._accessTimes.items():
+            entry = _dataCacheEntry(manifest, kind, key)
+            if entry is not None and entry['lastAccess'] < accessTime:
+              entry['lastAccess'] = accessTime
+          self._accessTimes = {}
+          _writeDataCacheManifest(manifest)
+        except Exception:
+          # The manifest in memory may have been partially updated, read it again
+          self._manifest = None
+          raise
+        self._manifestFileStatus = self._fileStatus()
+
+    return updateManifest()
+
+  def _fileStatus(self):
+    import os
+    manifestFilePath = dataCacheManifestFilePath()
+    try:
+      fileStat = os.stat(manifestFilePath)
+    except OSError:
+      return (manifestFilePath, None)
+    return (manifestFilePath, fileStat.st_ino, fileStat.st_size, fileStat.st_mtime_ns)
+
+class _DataCacheFileLock(object):
+  """Exclusive lock on a file, held by one process at a time."""
+
+  def __init__(self, lockFilePath):
+    self.lockFilePath = lockFilePath
+    self._lockFile = None
+
+  def __enter__(self):
+    import os
+    os.makedirs(os.path.dirname(self.lockFilePath), exist_ok=True)
+    self._lockFile = open(self.lockFilePath, 'a')
+    try:
+      if os.name == 'nt':
+        import msvcrt
+        while True:
+          try:
+            # Retries for 10 seconds before raising an error
+            msvcrt.locking(self._lockFile.fileno(), msvcrt.LK_LOCK, 1)
+            break
+          except OSError:
+            pass
+      else:
+        import fcntl
+        fcntl.flock(self._lockFile.fileno(), fcntl.LOCK_EX)
+    except Exception:
+      self._lockFile.close()
+      raise
+    return self
+
+  def __exit__(self, exceptionType, exceptionValue, traceback):
+    import os
+    try:
+      if os.name == 'nt':
+        import msvcrt
+        msvcrt.locking(self._lockFile.fileno(), msvcrt.LK_UNLCK, 1)
+      else:
+        import fcntl
+        fcntl.flock(self._lockFile.fileno(), fcntl.LOCK_UN)
+    finally:
+      self._lockFile.close()
+      self._lockFile = None
+
+_dataCacheManifest = _DataCacheManifest()
+
+def dataCacheDirectory():
+  """Return the directory where downloaded data is cached."""
+  import slicer
+  return slicer.mrmlScene.GetCacheManager().GetRemoteCacheDirectory()
+
+def dataCacheManifestFilePath():
+  """Return the path of the JSON file storing the data cache manifest."""
+  import os
+  return os.path.join(dataCacheDirectory(), 'DataCacheManifest.json')
+
+def dataCacheQuota():
+  """Return the maximum size of the data cache in bytes, 0 if unlimited.
+
+  The quota is the cache size configured in the application settings (see
+  ``slicer.mrmlScene.GetCacheManager().GetRemoteCacheLimit()``, in MB).
+  """
+  import slicer
+  return max(slicer.mrmlScene.GetCacheManager().GetRemoteCacheLimit(), 0) * 1000000
+
+def _readDataCacheManifest():
+  import json
+  import os
+  manifest = {'version': _dataCacheManifestVersion, 'files': {}, 'checksums': {}, 'extractions': {}}
+  manifestFilePath = dataCacheManifestFilePath()
+  if not os.path.exists(manifestFilePath):
+    return manifest
+  try:
+    with open(manifestFilePath) as manifestFile:
+      content = json.load(manifestFile)
+  except (IOError, ValueError):
+    # Corrupted manifest is discarded, files will be verified again
+    return manifest
+  if content.get('version') == _dataCacheManifestVersion:
+    manifest.update(content)
+  return manifest
+
+def _writeDataCacheManifest(manifest):
+  import json
+  import os
+  manifestFilePath = dataCacheManifestFilePath()
+  os.makedirs(os.path.dirname(manifestFilePath), exist_ok=True)
+  temporaryFilePath = manifestFilePath + '.%d.tmp' % os.getpid()
+  with open(temporaryFilePath, 'w') as manifestFile:
+    json.dump(manifest, manifestFile, indent=1)
+  os.replace(temporaryFilePath, manifestFilePath)
+
+def _dataCacheEntry(manifest, kind, key):
+  """Return the manifest entry of a file (``kind`` is ``files``, ``key`` the file path) or
+  of an extraction (``kind`` is ``extractions``, ``key`` is ``(archiveChecksum, outputDir)``)."""
+  if kind == 'files':
+    return manifest['files'].get(key)
+  archiveChecksum, outputDir = key
+  return manifest['extractions'].get(archiveChecksum, {}).get(outputDir)
+
+def _setFileEntry(manifest, filePath, entry):
+  _removeFileEntry(manifest, filePath)
+  manifest['files'][filePath] = entry
+  if entry['checksum'] is not None:
+    manifest['checksums'].setdefault(entry['checksum'], []).append(filePath)
+
+def _removeFileEntry(manifest, filePath):
+  entry = manifest['files'].pop(filePath, None)
+  if entry is None or entry['checksum'] is None:
+    return
+  filePaths = manifest['checksums'].get(entry['checksum'], [])
+  if filePath in filePaths:
+    filePaths.remove(filePath)
+  if not filePaths:
+    manifest['checksums'].pop(entry['checksum'], None)
+
+def _removeExtractionEntry(manifest, archiveChecksum, outputDir):
+  extractions = manifest['extractions'].get(archiveChecksum, {})
+  extractions.pop(outputDir, None)
+  if not extractions:
+    manifest['extractions'].pop(archiveChecksum, None)
+
+def _normalizedPath(path):
+  import os
+  return os.path.normcase(os.path.abspath(path))
+
+def _fileStatus(filePath):
+  import os
+  try:
+    fileStat = os.stat(filePath)
+  except OSError:
+    return None
+  return [fileStat.st_size, fileStat.st_mtime_ns]
+
+def _isFileEntryValid(filePath, entry):
+  return _fileStatus(filePath) == [entry['size'], entry['mtime']]
+
+def _isExtractionEntryValid(outputDir, entry):
+  import os
+  for relativeFilePath, status in entry['files'].items():
+    if _fileStatus(os.path.join(outputDir, relativeFilePath)) != status:
+      return False
+  return True
+
+def _isInDataCacheDirectory(path):
+  import os
+  cacheDirectory = _normalizedPath(dataCacheDirectory())
+  return _normalizedPath(path).startswith(cacheDirectory + os.sep)
+
+def findFileByChecksum(checksum, filePath=None):
+  """Return the path of an unmodified file verified to have ``checksum``.
+
+  If ``filePath`` is specified, only this file is considered. Returns None if no
+  such file is recorded in the data cache manifest.
+
+  Files are looked up in the manifest by checksum, the time does not depend on the
+  number of files in the cache.
+  """
+  if checksum is None:
+    return None
+  manifest = _dataCacheManifest.read()
+  filePaths = list(manifest['checksums'].get(checksum, []))
+  if filePath is not None:
+    filePaths = [path for path in filePaths if path == _normalizedPath(filePath)]
+  for path in filePaths:
+    entry = manifest['files'].get(path)
+    if entry is not None and _isFileEntryValid(path, entry):
+      _dataCacheManifest.recordAccess('files', path)
+      return path
+  return None
+
+def fileChecksumFromDataCache(filePath):
+  """Return the checksum recorded for ``filePath`` if the file is unchanged, None otherwise."""
+  filePath = _normalizedPath(filePath)
+  entry = _dataCacheManifest.read()['files'].get(filePath)
+  if entry is not None and _isFileEntryValid(filePath, entry):
+    return entry['checksum']
+  return None
+
+def registerCachedFile(filePath, checksum=None):
+  """Record ``filePath`` in the data cache manifest and evict least recently used data
+  if the cache exceeds its quota (see :func:`evictDataCache`).
+
+  ``checksum`` must only be specified if the file has been verified to have it. If it
+  is not specified, the checksum previously recorded for the unchanged file is kept.
+  """
+  import time
+  filePath = _normalizedPath(filePath)
+  status = _fileStatus(filePath)
+  if status is None:
+    return
+  with _dataCacheManifest.update() as manifest:
+    previousEntry = manifest['files'].get(filePath)
+    if checksum is None and previousEntry is not None and _isFileEntryValid(filePath, previousEntry):
+      checksum = previousEntry['checksum']
+    _setFileEntry(manifest, filePath, {
+      'checksum': checksum, 'size': status[0], 'mtime': status[1], 'lastAccess': time.time()})
+    _evictDataCache(manifest)
+
+def findExtractedArchive(archiveChecksum, outputDir):
+  """Return True if an archive with ``archiveChecksum`` has been extracted into ``outputDir``
+  and none of the extracted files has been modified or removed since.
+  """
+  key = (archiveChecksum, _normalizedPath(outputDir))
+  entry = _dataCacheEntry(_dataCacheManifest.read(), 'extractions', key)
+  if entry is None or not _isExtractionEntryValid(key[1], entry):
+    return False
+  _dataCacheManifest.recordAccess('extractions', key)
+  return True
+
+def registerExtractedArchive(archiveChecksum, outputDir, relativeFilePaths):
+  """Record in the data cache manifest that the archive with ``archiveChecksum`` has been extracted
+  into ``outputDir``, creating the files listed in ``relativeFilePaths``, and evict least recently
+  used data if the cache exceeds its quota (see :func:`evictDataCache`).
+  """
+  import os
+  import time
+  outputDir = _normalizedPath(outputDir)
+  files = {}
+  for relativeFilePath in relativeFilePaths:
+    status = _fileStatus(os.path.join(outputDir, relativeFilePath))
+    if status is not None:
+      files[relativeFilePath] = status
+  with _dataCacheManifest.update() as manifest:
+    manifest['extractions'].setdefault(archiveChecksum, {})[outputDir] = {
+      'files': files, 'size': sum(status[0] for status in files.values()), 'lastAccess': time.time()}
+    _evictDataCache(manifest)
+
+def evictDataCache(quota=None, keepCurrentSessionData=True):
+  """Remove least recently used files and extracted archives until the data cache
+  size is below ``quota`` bytes (:func:`dataCacheQuota` by default, 0 means unlimited).
+
+  If ``keepCurrentSessionData`` is True, data accessed since the application started
+  is not removed. Entries of files modified or removed outside of the cache are
+  discarded from the manifest.
+
+  This is done each time a downloaded file or an extracted archive is recorded in the
+  data cache manifest. Removed paths are logged.
+
+  Returns the list of removed files and extraction directories.
+  """
+  with _dataCacheManifest.update() as manifest:
+    return _evictDataCache(manifest, quota, keepCurrentSessionData)
+
+def _evictDataCache(manifest, quota=None, keepCurrentSessionData=True):
+  import os
+  import logging
+  if quota is None:
+    quota = dataCacheQuota()
+  keepAccessedAfter = _dataCacheManifest.sessionStartTime if keepCurrentSessionData else float('inf')
+
+  # Collect (lastAccess, size, kind, key) of evictable items, discarding stale entries
+  items = []
+  for filePath, entry in list(manifest['files'].items()):
+    if not _isFileEntryValid(filePath, entry):
+      _removeFileEntry(manifest, filePath)
+    elif _isInDataCacheDirectory(filePath):
+      items.append((entry['lastAccess'], entry['size'], 'files', filePath))
+  for archiveChecksum, extractions in list(manifest['extractions'].items()):
+    for outputDir, entry in list(extractions.items()):
+      if not _isExtractionEntryValid(outputDir, entry):
+        _removeExtractionEntry(manifest, archiveChecksum, outputDir)
+      elif _isInDataCacheDirectory(outputDir):
+        items.append((entry['lastAccess'], entry['size'], 'extractions', (archiveChecksum, outputDir)))
+
+  removedPaths = []
+  cacheSize = sum(item[1] for item in items)
+  if quota <= 0 or cacheSize <= quota:
+    return removedPaths
+  for lastAccess, size, kind, key in sorted(items):
+    if cacheSize <= quota or lastAccess >= keepAccessedAfter:
+      break
+    try:
+      if kind == 'files':
+        os.remove(key)
+        removedPaths.append(key)
+      else:
+        archiveChecksum, outputDir = key
+        for relativeFilePath in _dataCacheEntry(manifest, kind, key)['files']:
+          os.remove(os.path.join(outputDir, relativeFilePath))
+        # Remove directories left empty by the extraction
+        for root, dirs, files in os.walk(outputDir, topdown=False):
+          if not os.listdir(root):
+            os.rmdir(root)
+        removedPaths.append(outputDir)
+    except OSError as e:
+      logging.warning('Failed to remove %s from data cache: %s' % (key, e))
+      continue
+    logging.info('Removed %s from data cache (%d bytes, cache quota is %d bytes)' % (removedPaths[-1], size, quota))
+    if kind == 'files':
+      _removeFileEntry(manifest, key)
+    else:
+      _removeExtractionEntry(manifest, *key)
+    cacheSize -= size
+  return removedPaths
+
+_archiveExtensions = (
+  ('.zip', 'zip'),
+  ('.tar', 'tar'),
+  ('.tar.gz', 'tar.gz'), ('.tgz', 'tar.gz'),
+  ('.tar.bz2', 'tar.bz2'), ('.tbz2', 'tar.bz2'),
+  ('.tar.xz', 'tar.xz'), ('.txz', 'tar.xz'),
+  ('.tar.zst', 'tar.zst'), ('.tzst', 'tar.zst'),
+  )
+
+def splitArchiveExtension(filePath):
+  """Split ``filePath`` into ``(root, archiveFormat)``.
+
+  ``archiveFormat`` is one of ``zip``, ``tar``, ``tar.gz``, ``tar.bz2``, ``tar.xz``
+  and ``tar.zst``, or None if the file extension is not a supported archive extension.
+
+  >>> splitArchiveExtension('/data/TinyPatient_Seg.tgz')
+  ('/data/TinyPatient_Seg', 'tar.gz')
+  """
+  for extension, archiveFormat in _archiveExtensions:
+    if filePath.lower().endswith(extension):
+      return filePath[:-len(extension)], archiveFormat
+  return filePath, None
+
+def extractArchive(archiveFilePath, outputDir, expectedNumberOfExtractedFiles=None, checksum=None,
+                   progressCallback=None, numberOfThreads=None):
   """ Extract file ``archiveFilePath`` into folder ``outputDir``.
 
+  Supported archive formats are zip and tar, uncompressed or compressed with gzip, bzip2,
+  xz or zstandard (see :func:`splitArchiveExtension`). Extracting zstandard compressed archives
+  requires the ``zstandard`` Python package.
+
+  Files are extracted directly from the archive into ``outputDir``, without intermediate copy.
+  Members of zip archives are decompressed in parallel using ``numberOfThreads`` threads
+  (number of CPU cores by default). Tar archives are extracted in a single streaming pass.
+
+  If specified, ``progressCallback(processedSize, totalSize)`` is regularly called from the
+  calling thread. For zip archives, sizes are the uncompressed size of the members, for tar
+  archives they are the compressed size of the archive.
+
   Number of expected files unzipped may be specified in ``expectedNumberOfExtractedFiles``.
   If folder contains the same number of files as expected (if specified), then it will be
   assumed that unzipping has been successfully done earlier.
+
+  Extractions are recorded in the data cache manifest, keyed by the archive checksum.
+  If ``checksum`` is not specified, the one recorded when the archive was downloaded is used,
+  otherwise it is computed. Extraction is skipped if an archive with the same checksum has
+  already been extracted into ``outputDir`` and the extracted files are unchanged.
   """
   import os
   import logging
-  from slicer import app
   if not os.path.exists(archiveFilePath):
     logging.error('Specified file %s does not exist' % (archiveFilePath))
     return False
-  fileName, fileExtension = os.path.splitext(archiveFilePath)
-  if fileExtension.lower() != '.zip':
-    #TODO: Support other archive types
-    logging.error('Only zip archives are supported now, got ' + fileExtension)
+  archiveFormat = splitArchiveExtension(archiveFilePath)[1]
+  if archiveFormat is None:
+    logging.error('Unsupported archive type %s. Supported extensions are %s' % (
+      archiveFilePath, ', '.join(extension for extension, _ in _archiveExtensions)))
     return False
 
+  if checksum is None:
+    checksum = fileChecksumFromDataCache(archiveFilePath)
+  if checksum is None:
+    checksum = 'SHA256:' + computeChecksum('SHA256', archiveFilePath, 1024*1024)
+    registerCachedFile(archiveFilePath, checksum)
+  if findExtractedArchive(checksum, outputDir):
+    logging.info('File %s already extracted into %s' % (archiveFilePath, outputDir))
+    return True
+
   numOfFilesInOutputDir = len(getFilesInDirectory(outputDir, False))
   if expectedNumberOfExtractedFiles is not None \
       and numOfFilesInOutputDir == expectedNumberOfExtractedFiles:
-    logging.info('File %s already unzipped into %s' % (archiveFilePath, outputDir))
+    logging.info('File %s already extracted into %s' % (archiveFilePath, outputDir))
     return True
 
-  extractSuccessful = app.applicationLogic().Unzip(archiveFilePath, outputDir)
+  try:
+    if archiveFormat == 'zip':
+      extractedFilePaths = _extractZipArchive(archiveFilePath, outputDir, progressCallback, numberOfThreads)
+    else:
+      extractedFilePaths = _extractTarArchive(archiveFilePath, outputDir, archiveFormat, progressCallback)
+  except Exception as e:
+    logging.error('Extracting %s into %s failed: %s' % (archiveFilePath, outputDir, e))
+    return False
   numOfFilesInOutputDirTest = len(getFilesInDirectory(outputDir, False))
-  if extractSuccessful is False or (expectedNumberOfExtractedFiles is not None \
-      and numOfFilesInOutputDirTest != expectedNumberOfExtractedFiles):
-    logging.error('Unzipping %s into %s failed' % (archiveFilePath, outputDir))
+  if expectedNumberOfExtractedFiles is not None \
+      and numOfFilesInOutputDirTest != expectedNumberOfExtractedFiles:
+    logging.error('Extracting %s into %s failed: %d files were expected, %d found' % (
+      archiveFilePath, outputDir, expectedNumberOfExtractedFiles, numOfFilesInOutputDirTest))
     return False
-  logging.info('Unzipping %s into %s successful' % (archiveFilePath, outputDir))
+  registerExtractedArchive(checksum, outputDir, extractedFilePaths)
+  logging.info('Extracting %s into %s successful' % (archiveFilePath, outputDir))
   return True
 
-def computeChecksum(algo, filePath):
+def _archiveMemberOutputPath(outputDir, memberName):
+  """Return the path where ``memberName`` is extracted, raise :class:`ValueError`
+  if it is located outside of ``outputDir``.
+  """
+  import os
+  outputDir = os.path.normpath(os.path.abspath(outputDir))
+  outputPath = os.path.normpath(os.path.abspath(os.path.join(outputDir, memberName)))
+  # the output directory itself is a valid member (for example './' in archives created from a directory)
+  if os.path.commonpath([outputDir, outputPath]) != outputDir:
+    raise ValueError("archive member '%s' would be extracted outside of %s" % (memberName, outputDir))
+  return outputPath
+
+def _extractZipArchive(archiveFilePath, outputDir, progressCallback=None, numberOfThreads=None):
+  import concurrent.futures
+  import os
+  import shutil
+  import threading
+  import zipfile
+
+  with zipfile.ZipFile(archiveFilePath) as archive:
+    members = archive.infolist()
+  for member in members:
+    outputPath = _archiveMemberOutputPath(outputDir, member.filename)
+    os.makedirs(outputPath if member.is_dir() else os.path.dirname(outputPath), exist_ok=True)
+  fileMembers = [member for member in members if not member.is_dir()]
+
+  # Distribute members between threads, largest first, balancing compressed sizes
+  if numberOfThreads is None:
+    numberOfThreads = os.cpu_count() or 1
+  numberOfThreads = max(1, min(numberOfThreads, len(fileMembers)))
+  memberGroups = [[] for _ in range(numberOfThreads)]
+  groupSizes = [0] * numberOfThreads
+  for member in sorted(fileMembers, key=lambda member: member.compress_size, reverse=True):
+    groupIndex = groupSizes.index(min(groupSizes))
+    memberGroups[groupIndex].append(member)
+    groupSizes[groupIndex] += member.compress_size
+
+  totalSize = sum(member.file_size for member in fileMembers)
+  extractedSize = [0]
+  extractedSizeLock = threading.Lock()
+
+  def extractMembers(memberGroup):
+    # Each thread uses its own file handle, zlib releases the GIL while inflating
+    with zipfile.ZipFile(archiveFilePath) as archive:
+      for member in memberGroup:
+        with archive.open(member) as source, open(_archiveMemberOutputPath(outputDir, member.filename), 'wb') as target:
+          shutil.copyfileobj(source, target, 1024*1024)
+        with extractedSizeLock:
+          extractedSize[0] += member.file_size
+
+  with concurrent.futures.ThreadPoolExecutor(max_workers=numberOfThreads) as executor:
+    futures = [executor.submit(extractMembers, memberGroup) for memberGroup in memberGroups if memberGroup]
+    notDone = set(futures)
+    while notDone:
+      _, notDone = concurrent.futures.wait(notDone, timeout=0.1)
+      if progressCallback:
+        progressCallback(extractedSize[0], totalSize)
+    for future in futures:
+      future.result()
+  return [member.filename for member in fileMembers]
+
+def _extractTarArchive(archiveFilePath, outputDir, archiveFormat, progressCallback=None):
+  import logging
+  import os
+  import shutil
+  import tarfile
+
+  totalSize = os.path.getsize(archiveFilePath)
+  extractedFilePaths = []
+  with open(archiveFilePath, 'rb') as archiveFile:
+    if archiveFormat == 'tar.zst':
+      try:
+        import zstandard
+      except ImportError:
+        raise ValueError("extracting zstandard compressed archives requires the 'zstandard' Python package")
+      stream = zstandard.ZstdDecompressor().stream_reader(archiveFile)
+      mode = 'r|'
+    else:
+      stream = archiveFile
+      mode = 'r|' + archiveFormat[4:]
+    # Streaming mode: members are extracted in archive order while it is decompressed
+    with tarfile.open(fileobj=stream, mode=mode) as archive:
+      for member in archive:
+        outputPath = _archiveMemberOutputPath(outputDir, member.name)
+        if member.isdir():
+          os.makedirs(outputPath, exist_ok=True)
+        elif member.isfile():
+          os.makedirs(os.path.dirname(outputPath), exist_ok=True)
+          with archive.extractfile(member) as source, open(outputPath, 'wb') as target:
+            shutil.copyfileobj(source, target, 1024*1024)
+          extractedFilePaths.append(member.name)
+        else:
+          logging.warning('Skipped extraction of %s: only regular files and directories are supported' % member.name)
+        if progressCallback:
+          progressCallback(archiveFile.tell(), totalSize)
+  if progressCallback:
+    progressCallback(totalSize, totalSize)
+  return extractedFilePaths
+
+def computeChecksum(algo, filePath, chunkSize=8192):
   """Compute digest of ``filePath`` using ``algo``.
 
   Supported hashing algorithms are SHA256, SHA512, and MD5.
 
-  It internally reads the file by chunk of 8192 bytes.
+  It internally reads the file by chunk of ``chunkSize`` bytes (8192 by default).
 
   Raises :class:`ValueError` if algo is unknown.
   Raises :class:`IOError` if filePath does not exist.
@@ -1838,7 +3054,7 @@ def computeChecksum(algo, filePath):
   with open(filePath, 'rb') as content:
     hash = hashlib.new(algo)
     while True:
-        chunk = content.read(8192)
+        chunk = content.read(chunkSize)
         if not chunk:
             break
         hash.update(chunk)
@@ -1867,7 +3083,8 @@ def extractAlgoAndDigest(checksum):
   return algo, digest
 
 def downloadAndExtractArchive(url, archiveFilePath, outputDir, \
-                              expectedNumberOfExtractedFiles=None, numberOfTrials=3, checksum=None):
+                              expectedNumberOfExtractedFiles=None, numberOfTrials=3, checksum=None,
+                              progressCallback=None):
   """ Downloads an archive from ``url`` as ``archiveFilePath``, and extracts it to ``outputDir``.
 
   This combined function tests the success of the download by the extraction step,
@@ -1875,6 +3092,11 @@ def downloadAndExtractArchive(url, archiveFilePath, outputDir, \
 
   If specified, the ``checksum`` is used to verify that the downloaded file is the expected one.
   It must be specified as ``<algo>:<digest>``. For example, ``SHA256:cc211f0dfd9a05ca3841ce1141b292898b2dd2d3f08286affadf823a7e58df93``.
+
+  Both the archive and the extracted files are recorded in the data cache manifest (see
+  :func:`evictDataCache`), the archive is not extracted again if it has already been extracted into ``outputDir``.
+
+  Supported archive formats and ``progressCallback`` are described in :func:`extractArchive`.
   """
   import os
   import shutil
@@ -1894,7 +3116,7 @@ def downloadAndExtractArchive(url, archiveFilePath, outputDir, \
       numberOfTrials -= 1
       _cleanup()
       continue
-    if not extractArchive(archiveFilePath, outputDir, expectedNumberOfExtractedFiles):
+    if not extractArchive(archiveFilePath, outputDir, expectedNumberOfExtractedFiles, checksum, progressCallback):
       numberOfTrials -= 1
       _cleanup()
       continue
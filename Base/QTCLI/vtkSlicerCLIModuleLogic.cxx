@@ -61,6 +61,8 @@
 
 #ifdef _WIN32
 #else
+#include <cerrno>
+#include <sys/stat.h>
 #include <sys/types.h>
 #include <unistd.h>
 #endif
@@ -199,6 +201,7 @@ public:
   ModuleDescription DefaultModuleDescription;
   int DeleteTemporaryFiles;
   int AllowInMemoryTransfer;
+  int SharedMemoryDataTransfer;
 
   int RedirectModuleStreams;
 
@@ -300,6 +303,7 @@ vtkSlicerCLIModuleLogic::vtkSlicerCLIModuleLogic()
 
   this->Internal->DeleteTemporaryFiles = 1;
   this->Internal->AllowInMemoryTransfer = 1;
+  this->Internal->SharedMemoryDataTransfer = 0;
   this->Internal->RedirectModuleStreams = 1;
   this->Internal->RescheduleCallback =
     vtkSmartPointer<vtkSlicerCLIRescheduleCallback>::New();
@@ -403,6 +407,91 @@ int vtkSlicerCLIModuleLogic::GetAllowInMemoryTransfer() const
   return this->Internal->AllowInMemoryTransfer;
 }
 
+//----------------------------------------------------------------------------
+void vtkSlicerCLIModuleLogic::SharedMemoryDataTransferOn()
+{
+  this->SetSharedMemoryDataTransfer(static_cast<int>(1));
+}
+
+//----------------------------------------------------------------------------
+void vtkSlicerCLIModuleLogic::SharedMemoryDataTransferOff()
+{
+  this->SetSharedMemoryDataTransfer(static_cast<int>(0));
+}
+
+//----------------------------------------------------------------------------
+void vtkSlicerCLIModuleLogic::SetSharedMemoryDataTransfer(int value)
+{
+  vtkDebugMacro(<< this->GetClassName() << " (" << this << "): setting SharedMemoryDataTransfer to " << value);
+  if (this->Internal->SharedMemoryDataTransfer != value)
+    {
+    this->Internal->SharedMemoryDataTransfer = value;
+    this->Modified();
+    }
+}
+
+//----------------------------------------------------------------------------
+int vtkSlicerCLIModuleLogic::GetSharedMemoryDataTransfer() const
+{
+  return this->Internal->SharedMemoryDataTransfer;
+}
+
+//----------------------------------------------------------------------------
+std::string vtkSlicerCLIModuleLogic::GetSharedMemoryDirectory()
+{
+#if defined(__linux__)
+  // /dev/shm is the tmpfs mount backing POSIX shared memory objects (shm_open).
+  // Files written there stay in memory and can be memory-mapped by the reader.
+  const std::string sharedMemoryRoot = "/dev/shm";
+  if (!vtksys::SystemTools::FileIsDirectory(sharedMemoryRoot))
+    {
+    return std::string();
+    }
+  // Use a per-user directory so that files of different users do not collide
+  std::ostringstream sharedMemoryDirectory;
+  sharedMemoryDirectory << sharedMemoryRoot << "/Slicer-" << getuid();
+  if (mkdir(sharedMemoryDirectory.str().c_str(), S_IRWXU) != 0 && errno != EEXIST)
+    {
+    return std::string();
+    }
+  // The directory name is predictable, therefore another user may have created it
+  // (or a symbolic link with this name) first. Only use a real directory that is
+  // owned by the current user and not accessible by anyone else.
+  struct stat directoryStatus;
+  if (lstat(sharedMemoryDirectory.str().c_str(), &directoryStatus) != 0
+    || !S_ISDIR(directoryStatus.st_mode)
+    || directoryStatus.st_uid != getuid()
+    || (directoryStatus.st_mode & (S_IRWXG | S_IRWXO)) != 0)
+    {
+    return std::string();
+    }
+  return sharedMemoryDirectory.str();
+#else
+  return std::string();
+#endif
+}
+
+//----------------------------------------------------------------------------
+std::string vtkSlicerCLIModuleLogic::GetDataTransferDirectory()
+{
+  if (this->GetSharedMemoryDataTransfer())
+    {
+    std::string sharedMemoryDirectory = vtkSlicerCLIModuleLogic::GetSharedMemoryDirectory();
+    if (!sharedMemoryDirectory.empty())
+      {
+      return sharedMemoryDirectory;
+      }
+    }
+  // by default use the current directory
+  std::string temporaryDirectory = ".";
+  vtkSlicerApplicationLogic* appLogic = this->GetApplicationLogic();
+  if (appLogic)
+    {
+    temporaryDirectory = appLogic->GetTemporaryPath();
+    }
+  return temporaryDirectory;
+}
+
 //----------------------------------------------------------------------------
 void vtkSlicerCLIModuleLogic::RedirectModuleStreamsOn()
 {
@@ -541,14 +630,9 @@ vtkSlicerCLIModuleLogic
                  fname.begin(), DigitsToCharacters());
 
   // By default, the filename is based on the temporary directory and
-  // the pid
-  std::string temporaryDirectory = ".";
-  vtkSlicerApplicationLogic* appLogic = this->GetApplicationLogic();
-  if (appLogic)
-    {
-    temporaryDirectory = appLogic->GetTemporaryPath();
-    }
-  fname = temporaryDirectory + "/" + pid + "_" + fname;
+  // the pid. If shared memory data transfer is enabled then the files are
+  // placed on a memory-backed file system instead.
+  fname = this->GetDataTransferDirectory() + "/" + pid + "_" + fname;
 
   if (tag == "image")
     {
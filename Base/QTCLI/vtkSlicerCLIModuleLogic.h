@@ -80,6 +80,31 @@ public:
   void SetAllowInMemoryTransfer(int value);
   int GetAllowInMemoryTransfer() const;
 
+  /// Control where the files used for passing data to and from command line
+  /// executables are written. If enabled and a memory-backed file system
+  /// is available (POSIX shared memory, mounted at /dev/shm on Linux) then
+  /// the files are written there, avoiding the round-trip through the disk.
+  /// Otherwise the application temporary directory is used.
+  /// Disabled by default.
+  /// \sa GetDataTransferDirectory(), GetSharedMemoryDirectory()
+  virtual void SharedMemoryDataTransferOn();
+  virtual void SharedMemoryDataTransferOff();
+  void SetSharedMemoryDataTransfer(int value);
+  int GetSharedMemoryDataTransfer() const;
+
+  /// Return the directory where files exchanged with command line
+  /// executables are written.
+  /// \sa SetSharedMemoryDataTransfer()
+  std::string GetDataTransferDirectory();
+
+  /// Return a directory located on a memory-backed file system that can be used
+  /// for exchanging data between processes. The directory is created if needed,
+  /// accessible only by the current user.
+  /// Returns an empty string if no such file system is available, or if the
+  /// directory exists but is not a directory owned by the current user that
+  /// no other user can access.
+  static std::string GetSharedMemoryDirectory();
+
   /// For debugging, control redirection of cout and cerr
   virtual void RedirectModuleStreamsOn();
   virtual void RedirectModuleStreamsOff();
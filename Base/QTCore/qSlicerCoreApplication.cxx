@@ -228,6 +228,16 @@ void qSlicerCoreApplicationPrivate::init()
 
   q->setEnvironmentVariable("SLICER_HOME", this->SlicerHome);
 
+#ifdef Slicer_USE_PYTHONQT
+  // Startup profiling is implemented in python (see slicer.profiling), which
+  // is initialized later. Pass the output file path to it using an environment variable.
+  QString profileStartupFilePath = q->coreCommandOptions()->profileStartupFilePath();
+  if (!profileStartupFilePath.isEmpty())
+    {
+    q->setEnvironmentVariable("SLICER_STARTUP_PROFILE", QFileInfo(profileStartupFilePath).absoluteFilePath());
+    }
+#endif
+
   ctkAppLauncherSettings appLauncherSettings;
   appLauncherSettings.setLauncherName(q->applicationName());
   appLauncherSettings.setLauncherDir(this->SlicerHome);
@@ -969,6 +979,13 @@ void qSlicerCoreApplication::handleCommandLineArguments()
       qApp->processEvents();
       this->corePythonManager()->executeString(pythonCode);
       }
+    if (!options->benchmarkPattern().isEmpty())
+      {
+      qApp->processEvents();
+      this->corePythonManager()->executeString(
+            "import slicer.benchmark; slicer.benchmark.runBenchmarksFromCommandLine()");
+      options->setRunPythonAndExit(true);
+      }
     if (options->runPythonAndExit())
       {
       qSlicerCoreApplication::exit(
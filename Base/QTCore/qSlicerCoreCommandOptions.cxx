@@ -248,6 +248,34 @@ QString qSlicerCoreCommandOptions::pythonCode() const
 CTK_GET_CPP(qSlicerCoreCommandOptions, bool, runPythonAndExit, RunPythonAndExit);
 CTK_SET_CPP(qSlicerCoreCommandOptions, bool, setRunPythonAndExit, RunPythonAndExit);
 
+//-----------------------------------------------------------------------------
+QString qSlicerCoreCommandOptions::benchmarkPattern() const
+{
+  Q_D(const qSlicerCoreCommandOptions);
+  return d->ParsedArgs.value("benchmark").toString();
+}
+
+//-----------------------------------------------------------------------------
+QString qSlicerCoreCommandOptions::benchmarkOutputFilePath() const
+{
+  Q_D(const qSlicerCoreCommandOptions);
+  return QDir::fromNativeSeparators(d->ParsedArgs.value("benchmark-output").toString());
+}
+
+//-----------------------------------------------------------------------------
+QString qSlicerCoreCommandOptions::benchmarkBaselineDirectory() const
+{
+  Q_D(const qSlicerCoreCommandOptions);
+  return QDir::fromNativeSeparators(d->ParsedArgs.value("benchmark-baseline").toString());
+}
+
+//-----------------------------------------------------------------------------
+QString qSlicerCoreCommandOptions::profileStartupFilePath() const
+{
+  Q_D(const qSlicerCoreCommandOptions);
+  return QDir::fromNativeSeparators(d->ParsedArgs.value("profile-startup").toString());
+}
+
 //-----------------------------------------------------------------------------
 bool qSlicerCoreCommandOptions::displayVersionAndExit() const
 {
@@ -396,6 +424,20 @@ void qSlicerCoreCommandOptions::addArguments()
   this->addArgument("", "c", QVariant::String,
                     "Python code to execute after slicer loads. By default, no modules are loaded and Slicer exits afterward.");
 
+  this->addArgument("benchmark", "", QVariant::String,
+                    "Run the registered benchmarks whose name or group matches the given wildcard pattern after slicer loads, then exit.");
+
+  this->addArgument("benchmark-output", "", QVariant::String,
+                    "JSON or CSV file benchmark results are written into.");
+
+  this->addArgument("benchmark-baseline", "", QVariant::String,
+                    "Directory of baseline benchmark results. Slicer exits with a failure code if a benchmark regressed.");
+
+  this->addArgument("profile-startup", "", QVariant::String,
+                    "Record time spent in importing python kits and scripted modules, instantiating scripted modules "
+                    "and setting up their widgets. The trace is written into the given file "
+                    "(Chrome trace event format if the extension is .json, flame graph folded stacks otherwise).");
+
   this->addArgument("ignore-slicerrc", "", QVariant::Bool,
                     "Do not load the Slicer resource file (~/.slicerrc.py).");
 #endif
@@ -39,6 +39,10 @@ class Q_SLICER_BASE_QTCORE_EXPORT qSlicerCoreCommandOptions : public ctkCommandL
   Q_PROPERTY(QString extraPythonScript READ extraPythonScript CONSTANT)
   Q_PROPERTY(QString pythonCode READ pythonCode CONSTANT)
   Q_PROPERTY(bool runPythonAndExit READ runPythonAndExit WRITE setRunPythonAndExit)
+  Q_PROPERTY(QString benchmarkPattern READ benchmarkPattern CONSTANT)
+  Q_PROPERTY(QString benchmarkOutputFilePath READ benchmarkOutputFilePath CONSTANT)
+  Q_PROPERTY(QString benchmarkBaselineDirectory READ benchmarkBaselineDirectory CONSTANT)
+  Q_PROPERTY(QString profileStartupFilePath READ profileStartupFilePath CONSTANT)
   Q_PROPERTY(bool disableCLIModules READ disableCLIModules CONSTANT)
   Q_PROPERTY(bool disableLoadableModules READ disableLoadableModules CONSTANT)
   Q_PROPERTY(bool disableScriptedLoadableModules READ disableScriptedLoadableModules CONSTANT)
@@ -95,6 +99,20 @@ public:
   /// \sa runPythonAndExit
   void setRunPythonAndExit(bool value);
 
+  /// Return the pattern of the names of the benchmarks to run after slicer is loaded
+  /// \sa slicer.benchmark
+  QString benchmarkPattern()const;
+
+  /// Return path of the file benchmark results should be written into
+  QString benchmarkOutputFilePath()const;
+
+  /// Return path of the directory containing the baselines benchmark results should be compared with
+  QString benchmarkBaselineDirectory()const;
+
+  /// Return path of the file the startup profile should be written into
+  /// \sa slicer.profiling
+  QString profileStartupFilePath()const;
+
   /// Return list of additional module path that should be considered when searching for modules to load.
   QStringList additionalModulePaths()const;
 
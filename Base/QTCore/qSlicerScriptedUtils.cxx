@@ -37,7 +37,16 @@ bool qSlicerScriptedUtils::loadSourceAsModule(const QString& moduleName,
                                        PyObject * local_dict)
 {
   PyObject* pyRes = nullptr;
-  if (fileName.endsWith(".py"))
+  if (!qgetenv("SLICER_STARTUP_PROFILE").isEmpty())
+    {
+    // Record import time and instrument module classes (see slicer.profiling)
+    pyRes = PyRun_String(
+          QString("import slicer.profiling;slicer.profiling.loadSourceAsModule(%2, %1)")
+          .arg(qSlicerCorePythonManager::toPythonStringLiteral(fileName))
+          .arg(qSlicerCorePythonManager::toPythonStringLiteral(moduleName)).toLatin1(),
+          Py_file_input, global_dict, local_dict);
+    }
+  else if (fileName.endsWith(".py"))
     {
     pyRes = PyRun_String(
           QString("import imp;imp.load_source(%2, %1);del imp;")
@@ -0,0 +1,175 @@
+/*==============================================================================
+
+  Program: 3D Slicer
+
+  See COPYRIGHT.txt
+  or http://www.slicer.org/copyright/copyright.txt for details.
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+
+==============================================================================*/
+
+// MRML includes
+#include "vtkEventBroker.h"
+#include "vtkMRMLCoreTestingMacros.h"
+#include "vtkObservation.h"
+
+// VTK includes
+#include <vtkCallbackCommand.h>
+#include <vtkNew.h>
+#include <vtkSmartPointer.h>
+
+// STD includes
+#include <map>
+
+namespace
+{
+
+//----------------------------------------------------------------------------
+// Number of invocations for each event ID
+typedef std::map<unsigned long, int> EventCounts;
+
+//----------------------------------------------------------------------------
+void CountEventsCallback(vtkObject* vtkNotUsed(caller), unsigned long eid,
+                         void* clientData, void* vtkNotUsed(callData))
+{
+  EventCounts* eventCounts = reinterpret_cast<EventCounts*>(clientData);
+  (*eventCounts)[eid]++;
+}
+
+//----------------------------------------------------------------------------
+int TestEventCoalescing()
+{
+  vtkEventBroker* broker = vtkEventBroker::GetInstance();
+  CHECK_BOOL(broker->IsEventCoalesced(vtkCommand::ModifiedEvent), true);
+  CHECK_BOOL(broker->IsEventCoalesced(vtkCommand::UserEvent), false);
+
+  EventCounts eventCounts;
+  vtkNew<vtkCallbackCommand> callback;
+  callback->SetCallback(CountEventsCallback);
+  callback->SetClientData(&eventCounts);
+
+  vtkNew<vtkObject> subject;
+  vtkNew<vtkObject> observer;
+  broker->AddObservation(subject.GetPointer(), vtkCommand::ModifiedEvent, observer.GetPointer(), callback.GetPointer());
+  broker->AddObservation(subject.GetPointer(), vtkCommand::UserEvent, observer.GetPointer(), callback.GetPointer());
+
+  // Events are invoked immediately without coalescing
+  broker->ResetEventStatistics();
+  subject->Modified();
+  subject->Modified();
+  CHECK_INT(eventCounts[vtkCommand::ModifiedEvent], 2);
+  CHECK_INT(broker->GetNumberOfEmittedEvents(), 2);
+  CHECK_INT(broker->GetNumberOfDeliveredEvents(), 2);
+
+  // Repeated events are invoked once at the end of the outermost coalescing
+  eventCounts.clear();
+  broker->ResetEventStatistics();
+  broker->StartEventCoalescing();
+  broker->StartEventCoalescing();
+  CHECK_BOOL(broker->IsEventCoalescingActive(), true);
+  for (int i = 0; i < 10; ++i)
+    {
+    subject->Modified();
+    }
+  // not coalesced events are still invoked immediately
+  subject->InvokeEvent(vtkCommand::UserEvent);
+  CHECK_INT(eventCounts[vtkCommand::UserEvent], 1);
+  CHECK_INT(eventCounts[vtkCommand::ModifiedEvent], 0);
+  broker->EndEventCoalescing();
+  CHECK_INT(eventCounts[vtkCommand::ModifiedEvent], 0);
+  broker->EndEventCoalescing();
+  CHECK_BOOL(broker->IsEventCoalescingActive(), false);
+  CHECK_INT(eventCounts[vtkCommand::ModifiedEvent], 1);
+  CHECK_INT(broker->GetNumberOfQueuedObservations(), 0);
+  CHECK_INT(broker->GetNumberOfEmittedEvents(), 11);
+  CHECK_INT(broker->GetNumberOfDeliveredEvents(), 2);
+
+  // Removed observations are not invoked
+  eventCounts.clear();
+  broker->StartEventCoalescing();
+  subject->Modified();
+  broker->RemoveObservations(subject.GetPointer(), vtkCommand::ModifiedEvent, observer.GetPointer());
+  broker->EndEventCoalescing();
+  CHECK_INT(eventCounts[vtkCommand::ModifiedEvent], 0);
+
+  // Observations of deleted subjects are not invoked
+  vtkSmartPointer<vtkObject> deletedSubject = vtkSmartPointer<vtkObject>::New();
+  broker->AddObservation(deletedSubject, vtkCommand::ModifiedEvent, observer.GetPointer(), callback.GetPointer());
+  broker->StartEventCoalescing();
+  deletedSubject->Modified();
+  CHECK_INT(broker->GetNumberOfQueuedObservations(), 1);
+  deletedSubject = nullptr;
+  CHECK_INT(broker->GetNumberOfQueuedObservations(), 0);
+  broker->EndEventCoalescing();
+  CHECK_INT(eventCounts[vtkCommand::ModifiedEvent], 0);
+
+  // Unbalanced end of coalescing is reported
+  TESTING_OUTPUT_ASSERT_ERRORS_BEGIN();
+  broker->EndEventCoalescing();
+  TESTING_OUTPUT_ASSERT_ERRORS_END();
+  CHECK_INT(broker->GetEventCoalescingLevel(), 0);
+
+  broker->RemoveObservations(observer.GetPointer());
+  return EXIT_SUCCESS;
+}
+
+//----------------------------------------------------------------------------
+int TestObservationLookup()
+{
+  vtkEventBroker* broker = vtkEventBroker::GetInstance();
+  int numberOfObservations = broker->GetNumberOfObservations();
+
+  vtkNew<vtkCallbackCommand> callback;
+  vtkNew<vtkObject> subject;
+  vtkNew<vtkObject> observer;
+  vtkNew<vtkObject> otherObserver;
+  vtkObservation* modifiedObservation = broker->AddObservation(
+    subject.GetPointer(), vtkCommand::ModifiedEvent, observer.GetPointer(), callback.GetPointer());
+  vtkObservation* userObservation = broker->AddObservation(
+    subject.GetPointer(), vtkCommand::UserEvent, observer.GetPointer(), callback.GetPointer());
+  broker->AddObservation(subject.GetPointer(), vtkCommand::ModifiedEvent, otherObserver.GetPointer(), callback.GetPointer());
+  CHECK_INT(broker->GetNumberOfObservations(), numberOfObservations + 3);
+
+  // Lookup by event tag
+  vtkEventBroker::ObservationVector observations =
+    broker->GetObservationsForSubjectByTag(subject.GetPointer(), userObservation->GetEventTag());
+  CHECK_INT(static_cast<int>(observations.size()), 1);
+  CHECK_POINTER(*observations.begin(), userObservation);
+  CHECK_INT(static_cast<int>(broker->GetObservationsForSubjectByTag(subject.GetPointer(), 0).size()), 3);
+  CHECK_INT(static_cast<int>(broker->GetObservationsForSubjectByTag(observer.GetPointer(), userObservation->GetEventTag()).size()), 0);
+
+  // Lookup by subject and observer
+  observations = broker->GetObservations(subject.GetPointer(), 0, observer.GetPointer());
+  CHECK_INT(static_cast<int>(observations.size()), 2);
+  observations = broker->GetObservations(subject.GetPointer(), vtkCommand::ModifiedEvent, observer.GetPointer());
+  CHECK_INT(static_cast<int>(observations.size()), 1);
+  CHECK_POINTER(*observations.begin(), modifiedObservation);
+  CHECK_INT(static_cast<int>(broker->GetObservations(observer.GetPointer(), 0, subject.GetPointer()).size()), 0);
+
+  // Removed observations are not found by their tag anymore
+  unsigned long modifiedTag = modifiedObservation->GetEventTag();
+  broker->RemoveObservationsForSubjectByTag(subject.GetPointer(), modifiedTag);
+  CHECK_INT(static_cast<int>(broker->GetObservationsForSubjectByTag(subject.GetPointer(), modifiedTag).size()), 0);
+  CHECK_BOOL(broker->GetObservationExist(subject.GetPointer(), vtkCommand::ModifiedEvent, observer.GetPointer()), false);
+  CHECK_BOOL(broker->GetObservationExist(subject.GetPointer(), vtkCommand::ModifiedEvent, otherObserver.GetPointer()), true);
+
+  broker->RemoveObservations(observer.GetPointer());
+  broker->RemoveObservations(otherObserver.GetPointer());
+  CHECK_INT(broker->GetNumberOfObservations(), numberOfObservations);
+  return EXIT_SUCCESS;
+}
+
+} // end of anonymous namespace
+
+//----------------------------------------------------------------------------
+int vtkEventBrokerTest1(int , char * [] )
+{
+  CHECK_EXIT_SUCCESS(TestEventCoalescing());
+  CHECK_EXIT_SUCCESS(TestObservationLookup());
+  return EXIT_SUCCESS;
+}
@@ -11,11 +11,178 @@
 =========================================================================auto=*/
 
 #include "vtkMRMLCoreTestingMacros.h"
+#include "vtkMRMLModelNode.h"
 #include "vtkMRMLNRRDStorageNode.h"
+#include "vtkMRMLScalarVolumeNode.h"
+#include "vtkMRMLScene.h"
 
-int vtkMRMLNRRDStorageNodeTest1(int , char * [])
+// vtkTeem includes
+#include <vtkTeemNRRDReader.h>
+
+// VTK includes
+#include <vtkImageData.h>
+#include <vtkNew.h>
+#include <vtksys/FStream.hxx>
+
+// STD includes
+#include <cstring>
+#include <iterator>
+#include <sstream>
+#include <string>
+
+namespace
+{
+
+//----------------------------------------------------------------------------
+int TestImportWithConcurrentRead(const std::string& tempDir)
+{
+  const int numberOfVolumes = 5;
+  vtkNew<vtkMRMLScene> scene;
+  for (int volumeIndex = 0; volumeIndex < numberOfVolumes; ++volumeIndex)
+    {
+    vtkNew<vtkImageData> imageData;
+    imageData->SetDimensions(20 + volumeIndex, 16, 8);
+    imageData->AllocateScalars(VTK_SHORT, 1);
+    short* voxels = static_cast<short*>(imageData->GetScalarPointer());
+    vtkIdType numberOfVoxels = imageData->GetNumberOfPoints();
+    for (vtkIdType i = 0; i < numberOfVoxels; ++i)
+      {
+      voxels[i] = static_cast<short>((i * 7919 + volumeIndex) % 4001 - 2000);
+      }
+
+    std::stringstream name;
+    name << "vtkMRMLNRRDStorageNodeTest1Volume" << volumeIndex;
+    vtkMRMLScalarVolumeNode* volumeNode = vtkMRMLScalarVolumeNode::SafeDownCast(
+      scene->AddNewNodeByClass("vtkMRMLScalarVolumeNode", name.str()));
+    volumeNode->SetAndObserveImageData(imageData.GetPointer());
+    vtkMRMLNRRDStorageNode* storageNode = vtkMRMLNRRDStorageNode::SafeDownCast(
+      scene->AddNewNodeByClass("vtkMRMLNRRDStorageNode"));
+    storageNode->SetFileName((tempDir + "/" + name.str() + ".nrrd").c_str());
+    storageNode->SetUseCompression(true);
+    CHECK_INT(storageNode->WriteData(volumeNode), 1);
+    volumeNode->SetAndObserveStorageNodeID(storageNode->GetID());
+    }
+  std::string sceneFileName = tempDir + "/vtkMRMLNRRDStorageNodeTest1.mrml";
+  scene->SetRootDirectory(tempDir.c_str());
+  scene->SetURL(sceneFileName.c_str());
+  CHECK_INT(scene->Commit(), 1);
+
+  vtkNew<vtkMRMLScene> importedScene;
+  CHECK_INT(importedScene->GetNumberOfReadThreads(), 1);
+  importedScene->SetNumberOfReadThreads(4);
+  importedScene->SetURL(sceneFileName.c_str());
+  CHECK_INT(importedScene->Import(), 1);
+  CHECK_INT(importedScene->GetNumberOfNodesByClass("vtkMRMLScalarVolumeNode"), numberOfVolumes);
+
+  // Nodes are in the same order and contain the same voxels
+  for (int volumeIndex = 0; volumeIndex < numberOfVolumes; ++volumeIndex)
+    {
+    vtkMRMLScalarVolumeNode* volumeNode = vtkMRMLScalarVolumeNode::SafeDownCast(
+      scene->GetNthNodeByClass(volumeIndex, "vtkMRMLScalarVolumeNode"));
+    vtkMRMLScalarVolumeNode* importedVolumeNode = vtkMRMLScalarVolumeNode::SafeDownCast(
+      importedScene->GetNthNodeByClass(volumeIndex, "vtkMRMLScalarVolumeNode"));
+    CHECK_NOT_NULL(importedVolumeNode);
+    CHECK_STRING(importedVolumeNode->GetName(), volumeNode->GetName());
+    vtkImageData* imageData = volumeNode->GetImageData();
+    vtkImageData* importedImageData = importedVolumeNode->GetImageData();
+    CHECK_NOT_NULL(importedImageData);
+    CHECK_INT(importedImageData->GetNumberOfPoints(), imageData->GetNumberOfPoints());
+    CHECK_INT(importedImageData->GetScalarType(), VTK_SHORT);
+    CHECK_INT(memcmp(importedImageData->GetScalarPointer(), imageData->GetScalarPointer(),
+      imageData->GetNumberOfPoints() * sizeof(short)), 0);
+    }
+
+  // Data is not prefetched into nodes that the storage node cannot read into,
+  // or if the file cannot be read
+  vtkMRMLNRRDStorageNode* storageNode = vtkMRMLNRRDStorageNode::SafeDownCast(
+    importedScene->GetFirstNodeByClass("vtkMRMLNRRDStorageNode"));
+  CHECK_NOT_NULL(storageNode);
+  vtkNew<vtkMRMLModelNode> modelNode;
+  CHECK_BOOL(storageNode->PrefetchData(modelNode.GetPointer()), false);
+  vtkNew<vtkMRMLNRRDStorageNode> missingFileStorageNode;
+  missingFileStorageNode->SetFileName((tempDir + "/vtkMRMLNRRDStorageNodeTest1Missing.nrrd").c_str());
+  vtkNew<vtkMRMLScalarVolumeNode> volumeNode;
+  CHECK_BOOL(missingFileStorageNode->PrefetchData(volumeNode.GetPointer()), false);
+
+  // Errors in a truncated file are only reported when the data is read
+  std::string truncatedFileName = tempDir + "/vtkMRMLNRRDStorageNodeTest1Truncated.nrrd";
+  vtksys::ifstream volumeFile((tempDir + "/vtkMRMLNRRDStorageNodeTest1Volume0.nrrd").c_str(), std::ios::in | std::ios::binary);
+  std::string fileContent((std::istreambuf_iterator<char>(volumeFile)), std::istreambuf_iterator<char>());
+  vtksys::ofstream truncatedFile(truncatedFileName.c_str(), std::ios::out | std::ios::binary);
+  truncatedFile.write(fileContent.c_str(), fileContent.size() * 3 / 4);
+  truncatedFile.close();
+  vtkNew<vtkMRMLNRRDStorageNode> truncatedFileStorageNode;
+  truncatedFileStorageNode->SetFileName(truncatedFileName.c_str());
+  CHECK_BOOL(truncatedFileStorageNode->PrefetchData(volumeNode.GetPointer()), false);
+  TESTING_OUTPUT_ASSERT_ERRORS_BEGIN();
+  truncatedFileStorageNode->ReadData(volumeNode.GetPointer());
+  TESTING_OUTPUT_ASSERT_ERRORS_END();
+
+  return EXIT_SUCCESS;
+}
+
+//----------------------------------------------------------------------------
+int TestWriteMemoryMappedVolume(const std::string& tempDir)
+{
+  vtkNew<vtkImageData> imageData;
+  imageData->SetDimensions(40, 30, 10);
+  imageData->AllocateScalars(VTK_UNSIGNED_CHAR, 1);
+  unsigned char* voxels = static_cast<unsigned char*>(imageData->GetScalarPointer());
+  vtkIdType numberOfVoxels = imageData->GetNumberOfPoints();
+  for (vtkIdType i = 0; i < numberOfVoxels; ++i)
+    {
+    voxels[i] = static_cast<unsigned char>((i * 7919) % 251);
+    }
+
+  std::string fileName = tempDir + "/vtkMRMLNRRDStorageNodeTest1MemoryMapped.nrrd";
+  vtkNew<vtkMRMLScalarVolumeNode> volumeNode;
+  volumeNode->SetAndObserveImageData(imageData.GetPointer());
+  vtkNew<vtkMRMLNRRDStorageNode> storageNode;
+  storageNode->SetFileName(fileName.c_str());
+  storageNode->SetUseCompression(false);
+  CHECK_INT(storageNode->WriteData(volumeNode.GetPointer()), 1);
+
+  vtkNew<vtkMRMLScalarVolumeNode> mappedVolumeNode;
+  vtkNew<vtkMRMLNRRDStorageNode> mappedStorageNode;
+  mappedStorageNode->SetFileName(fileName.c_str());
+  mappedStorageNode->SetUseCompression(false);
+  mappedStorageNode->SetUseMemoryMapping(true);
+  CHECK_INT(mappedStorageNode->ReadData(mappedVolumeNode.GetPointer()), 1);
+  CHECK_BOOL(vtkTeemNRRDReader::IsMemoryMapped(mappedVolumeNode->GetImageData()), true);
+
+  // Saving into the mapped file replaces the mapped voxels of the node by a copy
+  CHECK_INT(mappedStorageNode->WriteData(mappedVolumeNode.GetPointer()), 1);
+  vtkImageData* mappedImageData = mappedVolumeNode->GetImageData();
+  CHECK_NOT_NULL(mappedImageData);
+  CHECK_BOOL(vtkTeemNRRDReader::IsMemoryMapped(mappedImageData), false);
+  CHECK_INT(mappedImageData->GetNumberOfPoints(), numberOfVoxels);
+  CHECK_INT(memcmp(mappedImageData->GetScalarPointer(), voxels, numberOfVoxels), 0);
+
+  // The file contains the same voxels
+  vtkNew<vtkMRMLScalarVolumeNode> reReadVolumeNode;
+  CHECK_INT(storageNode->ReadData(reReadVolumeNode.GetPointer()), 1);
+  vtkImageData* reReadImageData = reReadVolumeNode->GetImageData();
+  CHECK_NOT_NULL(reReadImageData);
+  CHECK_INT(reReadImageData->GetNumberOfPoints(), numberOfVoxels);
+  CHECK_INT(memcmp(reReadImageData->GetScalarPointer(), voxels, numberOfVoxels), 0);
+
+  return EXIT_SUCCESS;
+}
+
+} // end of anonymous namespace
+
+//----------------------------------------------------------------------------
+int vtkMRMLNRRDStorageNodeTest1(int argc, char * argv[])
 {
   vtkNew<vtkMRMLNRRDStorageNode> node1;
   EXERCISE_ALL_BASIC_MRML_METHODS(node1.GetPointer());
+
+  if (argc != 2)
+    {
+    std::cerr << "Usage: " << argv[0] << " /path/to/temp" << std::endl;
+    return EXIT_FAILURE;
+    }
+  CHECK_EXIT_SUCCESS(TestImportWithConcurrentRead(argv[1]));
+  CHECK_EXIT_SUCCESS(TestWriteMemoryMappedVolume(argv[1]));
   return EXIT_SUCCESS;
 }
@@ -201,6 +201,7 @@ bool TestRemoveReferencedNodeID();
 bool TestRemoveReferencedNode();
 bool TestRemoveReferencingNode();
 bool TestNodeReferences();
+bool TestReferencingNodes();
 bool TestReferenceModifiedEvent();
 bool TestReferencesWithEvent();
 bool TestMultipleReferencesToSameNodeWithEvent();
@@ -213,6 +214,7 @@ bool TestClearScene();
 bool TestImportSceneReferenceValidDuringImport();
 int TestSaveLoadSpecialCharacters();
 int TestReadWriteXMLProperties();
+int TestNameChangedEvent();
 
 //---------------------------------------------------------------------------
 int vtkMRMLNodeTest1(int , char * [] )
@@ -229,6 +231,7 @@ int vtkMRMLNodeTest1(int , char * [] )
   res = res && TestRemoveReferencedNode();
   res = res && TestRemoveReferencingNode();
   res = res && TestNodeReferences();
+  res = res && TestReferencingNodes();
   res = res && TestReferenceModifiedEvent();
   res = res && TestReferencesWithEvent();
   res = res && TestMultipleReferencesToSameNodeWithEvent();
@@ -239,6 +242,7 @@ int vtkMRMLNodeTest1(int , char * [] )
   res = res && TestNodeReferenceSerialization();
   res = res && TestClearScene();
   res = res && (TestReadWriteXMLProperties() == EXIT_SUCCESS);
+  res = res && (TestNameChangedEvent() == EXIT_SUCCESS);
 
   return res ? EXIT_SUCCESS : EXIT_FAILURE;
 }
@@ -1628,6 +1632,72 @@ bool TestNodeReferences()
   return true;
 }
 
+//----------------------------------------------------------------------------
+bool TestReferencingNodes()
+{
+  std::string role1("refrole1");
+
+  vtkNew<vtkMRMLScene> scene;
+
+  vtkNew<vtkMRMLNodeTestHelper1> referencedNode;
+  scene->AddNode(referencedNode.GetPointer());
+  vtkNew<vtkMRMLNodeTestHelper1> otherReferencedNode;
+  scene->AddNode(otherReferencedNode.GetPointer());
+  vtkNew<vtkMRMLNodeTestHelper1> referencingNode1;
+  scene->AddNode(referencingNode1.GetPointer());
+  vtkNew<vtkMRMLNodeTestHelper1> referencingNode2;
+  scene->AddNode(referencingNode2.GetPointer());
+
+  referencingNode1->AddNodeReferenceID(role1.c_str(), referencedNode->GetID());
+  referencingNode1->AddNodeReferenceID(role1.c_str(), otherReferencedNode->GetID());
+  referencingNode2->AddNodeReferenceID(role1.c_str(), referencedNode->GetID());
+
+  vtkNew<vtkCollection> referencingNodes;
+  scene->GetReferencingNodes(referencedNode.GetPointer(), referencingNodes.GetPointer());
+  if (referencingNodes->GetNumberOfItems() != 2 ||
+      !referencingNodes->IsItemPresent(referencingNode1.GetPointer()) ||
+      !referencingNodes->IsItemPresent(referencingNode2.GetPointer()))
+    {
+    std::cerr << "Line " << __LINE__ << ": GetReferencingNodes failed: "
+              << referencingNodes->GetNumberOfItems() << " referencing nodes" << std::endl;
+    return false;
+    }
+
+  // Removing a referencing node removes all its references
+  scene->RemoveNode(referencingNode1.GetPointer());
+  scene->GetReferencingNodes(referencedNode.GetPointer(), referencingNodes.GetPointer());
+  if (referencingNodes->GetNumberOfItems() != 1 ||
+      referencingNodes->GetItemAsObject(0) != referencingNode2.GetPointer())
+    {
+    std::cerr << "Line " << __LINE__ << ": GetReferencingNodes failed after RemoveNode: "
+              << referencingNodes->GetNumberOfItems() << " referencing nodes" << std::endl;
+    return false;
+    }
+  scene->GetReferencingNodes(otherReferencedNode.GetPointer(), referencingNodes.GetPointer());
+  if (referencingNodes->GetNumberOfItems() != 0)
+    {
+    std::cerr << "Line " << __LINE__ << ": GetReferencingNodes failed after RemoveNode: "
+              << referencingNodes->GetNumberOfItems() << " referencing nodes" << std::endl;
+    return false;
+    }
+
+  // Removing a referenced node removes the references to it
+  scene->RemoveNode(referencedNode.GetPointer());
+  vtkSmartPointer<vtkCollection> referencedNodes;
+  referencedNodes.TakeReference(scene->GetReferencedNodes(referencingNode2.GetPointer(), false));
+  if (referencedNodes->GetNumberOfItems() != 1 ||
+      referencedNodes->GetItemAsObject(0) != referencingNode2.GetPointer() ||
+      scene->GetNumberOfNodeReferences() != 0)
+    {
+    std::cerr << "Line " << __LINE__ << ": GetReferencedNodes failed after RemoveNode: "
+              << referencedNodes->GetNumberOfItems() << " referenced nodes, "
+              << scene->GetNumberOfNodeReferences() << " node references" << std::endl;
+    return false;
+    }
+
+  return true;
+}
+
 //----------------------------------------------------------------------------
 bool TestReferenceModifiedEvent()
 {
@@ -3327,3 +3397,34 @@ int TestSaveLoadSpecialCharacters()
 
   return EXIT_SUCCESS;
 }
+
+//----------------------------------------------------------------------------
+int TestNameChangedEvent()
+{
+  vtkNew<vtkMRMLNodeTestHelper1> node;
+  vtkNew<vtkMRMLNodeCallback> spy;
+  node->AddObserver(vtkCommand::AnyEvent, spy.GetPointer());
+
+  node->SetName("First");
+  CHECK_STRING(node->GetName(), "First");
+  CHECK_INT(spy->GetNumberOfEvents(vtkMRMLNode::NameChangedEvent), 1);
+  CHECK_INT(spy->GetNumberOfEvents(vtkCommand::ModifiedEvent), 1);
+  spy->ResetNumberOfEvents();
+
+  // Setting the same name does not invoke any event
+  node->SetName("First");
+  CHECK_INT(spy->GetTotalNumberOfEvents(), 0);
+
+  // Event is invoked even if modified events are disabled
+  int wasModifying = node->StartModify();
+  node->SetName("Second");
+  CHECK_INT(spy->GetNumberOfEvents(vtkMRMLNode::NameChangedEvent), 1);
+  node->EndModify(wasModifying);
+  spy->ResetNumberOfEvents();
+
+  node->SetName(nullptr);
+  CHECK_NULL(node->GetName());
+  CHECK_INT(spy->GetNumberOfEvents(vtkMRMLNode::NameChangedEvent), 1);
+
+  return EXIT_SUCCESS;
+}
@@ -24,13 +24,19 @@
 #include "vtkMRMLTableNode.h"
 #include "vtkMRMLTableSQLiteStorageNode.h"
 
+#include "vtkDoubleArray.h"
 #include "vtkFloatArray.h"
+#include "vtkIntArray.h"
+#include "vtkStringArray.h"
 #include "vtkTable.h"
 #include "vtkTestErrorObserver.h"
 
 // ITKSYS includes
 #include <itksys/SystemTools.hxx>
 
+// STD includes
+#include <sstream>
+
 #include "vtkMRMLCoreTestingMacros.h"
 
 static int removeFile(char *fileName)
@@ -43,6 +49,73 @@ static int removeFile(char *fileName)
   return removed;
 }
 
+//---------------------------------------------------------------------------
+int TestColumnTypes()
+{
+  vtkNew<vtkMRMLScene> scene;
+  vtkNew<vtkMRMLTableNode> tableNode;
+  scene->AddNode(tableNode.GetPointer());
+  vtkNew<vtkMRMLTableSQLiteStorageNode> storageNode;
+  scene->AddNode(storageNode.GetPointer());
+  tableNode->SetAndObserveStorageNodeID(storageNode->GetID());
+
+  // Column and table names that require quoting, values that would need escaping in SQL queries
+  vtkNew<vtkTable> table;
+  vtkNew<vtkStringArray> names;
+  names->SetName("Segment name");
+  table->AddColumn(names.GetPointer());
+  vtkNew<vtkIntArray> labels;
+  labels->SetName("Label");
+  table->AddColumn(labels.GetPointer());
+  vtkNew<vtkDoubleArray> volumes;
+  volumes->SetName("Volume \"mm3\"");
+  table->AddColumn(volumes.GetPointer());
+
+  const int numberOfRows = 10000;
+  table->SetNumberOfRows(numberOfRows);
+  for (int i = 0; i < numberOfRows; ++i)
+    {
+    std::stringstream name;
+    name << "Segment's " << i << (i % 2 ? "" : " \"even\"");
+    names->SetValue(i, name.str());
+    labels->SetValue(i, i - 100);
+    volumes->SetValue(i, i * 0.125 + 1e-9);
+    }
+  tableNode->SetAndObserveTable(table.GetPointer());
+
+  storageNode->SetFileName("testSQLiteColumnTypes.db");
+  storageNode->SetTableName("Segment statistics");
+  removeFile(storageNode->GetFileName());
+  CHECK_INT(storageNode->WriteData(tableNode.GetPointer()), 1);
+  // Overwrite existing table
+  CHECK_INT(storageNode->WriteData(tableNode.GetPointer()), 1);
+
+  vtkNew<vtkMRMLTableNode> readTableNode;
+  scene->AddNode(readTableNode.GetPointer());
+  CHECK_INT(storageNode->ReadData(readTableNode.GetPointer()), 1);
+  removeFile(storageNode->GetFileName());
+
+  vtkTable* readTable = readTableNode->GetTable();
+  CHECK_NOT_NULL(readTable);
+  CHECK_INT(readTable->GetNumberOfColumns(), 3);
+  CHECK_INT(readTable->GetNumberOfRows(), numberOfRows);
+  vtkStringArray* readNames = vtkStringArray::SafeDownCast(readTable->GetColumnByName("Segment name"));
+  vtkIntArray* readLabels = vtkIntArray::SafeDownCast(readTable->GetColumnByName("Label"));
+  vtkDoubleArray* readVolumes = vtkDoubleArray::SafeDownCast(readTable->GetColumnByName("Volume \"mm3\""));
+  CHECK_NOT_NULL(readNames);
+  CHECK_NOT_NULL(readLabels);
+  CHECK_NOT_NULL(readVolumes);
+  for (int i = 0; i < numberOfRows; ++i)
+    {
+    CHECK_STD_STRING(readNames->GetValue(i), names->GetValue(i));
+    CHECK_INT(readLabels->GetValue(i), labels->GetValue(i));
+    CHECK_DOUBLE(readVolumes->GetValue(i), volumes->GetValue(i));
+    }
+
+  return EXIT_SUCCESS;
+}
+
+//---------------------------------------------------------------------------
 int vtkMRMLTableSQLiteStorageNodeTest(int , char * [] )
 {
   vtkNew<vtkMRMLScene> scene;
@@ -114,6 +187,8 @@ int vtkMRMLTableSQLiteStorageNodeTest(int , char * [] )
   // clean up
   removeFile(storageNode->GetFileName());
 
+  CHECK_EXIT_SUCCESS(TestColumnTypes());
+
   std::cout << "vtkMRMLTableSQLiteStorageNodeTest completed successfully" << std::endl;
   return EXIT_SUCCESS;
 }
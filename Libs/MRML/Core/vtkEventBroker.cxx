@@ -95,6 +95,10 @@ vtkEventBroker::vtkEventBroker()
   this->EventNestingLevel = 0;
   this->TimerLog = vtkTimerLog::New();
   this->CompressCallData = 0;
+  this->EventCoalescingLevel = 0;
+  this->CoalescedEvents.insert(vtkCommand::ModifiedEvent);
+  this->NumberOfEmittedEvents = 0;
+  this->NumberOfDeliveredEvents = 0;
   this->LogFileName = nullptr;
   this->ScriptHandler = nullptr;
   this->ScriptHandlerClientData = nullptr;
@@ -140,6 +144,7 @@ void vtkEventBroker::DetachObservations()
       }
     }
   this->SubjectMap.clear();
+  this->SubjectEventTagMap.clear();
 }
 
 //----------------------------------------------------------------------------
@@ -235,7 +240,7 @@ void vtkEventBroker::AttachObservation ( vtkObservation *observation )
 
   tag = observation->GetSubject()->AddObserver( observation->GetEvent(), observation->GetObservationCallbackCommand(), observation->GetPriority());
   observation->SetEventTag( tag );
-
+  this->SubjectEventTagMap[std::make_pair(observation->GetSubject(), tag)] = observation;
 }
 
 //----------------------------------------------------------------------------
@@ -259,6 +264,12 @@ void vtkEventBroker::DetachObservation ( vtkObservation *observation )
 
   if ( observation->GetEventTag() )
     {
+    SubjectEventTagToObservationMap::iterator tagIter = this->SubjectEventTagMap.find(
+      std::make_pair(observation->GetSubject(), observation->GetEventTag()));
+    if ( tagIter != this->SubjectEventTagMap.end() && tagIter->second == observation )
+      {
+      this->SubjectEventTagMap.erase( tagIter );
+      }
     observation->GetSubject()->RemoveObserver( observation->GetEventTag() );
     observation->SetEventTag( 0 );
     }
@@ -289,18 +300,34 @@ void vtkEventBroker::RemoveObservations (ObservationVector observations)
 
   ObservationVector::iterator inObsIter;
 
+  // entries of objects without observations are removed to keep the maps small
   for(inObsIter=observations.begin(); inObsIter != observations.end(); inObsIter++)
     {
     vtkObservation *inObs = (*inObsIter);
-    ObservationVector& subjectObservations = this->SubjectMap[(*inObsIter)->GetSubject()];
-    subjectObservations.erase(subjectObservations.find(inObs));
+    ObjectToObservationVectorMap::iterator subjectIter = this->SubjectMap.find(inObs->GetSubject());
+    if (subjectIter != this->SubjectMap.end())
+      {
+      subjectIter->second.erase(inObs);
+      if (subjectIter->second.empty())
+        {
+        this->SubjectMap.erase(subjectIter);
+        }
+      }
     }
 
   for(inObsIter=observations.begin(); inObsIter != observations.end(); inObsIter++)
     {
     vtkObservation *inObs = (*inObsIter);
-    ObservationVector& observerObservations = this->ObserverMap[inObs->GetObserver()];
-    observerObservations.erase(observerObservations.find(inObs));
+    // observations of scripts have no observer
+    ObjectToObservationVectorMap::iterator observerIter = this->ObserverMap.find(inObs->GetObserver());
+    if (observerIter != this->ObserverMap.end())
+      {
+      observerIter->second.erase(inObs);
+      if (observerIter->second.empty())
+        {
+        this->ObserverMap.erase(observerIter);
+        }
+      }
     }
 
   // remove from event queue
@@ -363,9 +390,12 @@ vtkEventBroker::ObservationVector vtkEventBroker
 ::GetSubjectObservations (vtkObject *observer)
 {
   // find matching observations to remove
-  ObservationVector observationList = this->ObserverMap[observer];
-
-  return( observationList );
+  ObjectToObservationVectorMap::iterator observerIter = this->ObserverMap.find(observer);
+  if (observerIter == this->ObserverMap.end())
+    {
+    return ObservationVector();
+    }
+  return observerIter->second;
 }
 
 //----------------------------------------------------------------------------
@@ -381,14 +411,32 @@ vtkEventBroker::ObservationVector vtkEventBroker::GetObservations (
     return observationList;
     }
   // find matching observations to remove
-  ObservationVector& subjectList = this->SubjectMap[subject];
+  ObjectToObservationVectorMap::iterator subjectIter = this->SubjectMap.find(subject);
+  if (subjectIter == this->SubjectMap.end())
+    {
+    return observationList;
+    }
+  // iterate through the shorter list of the subject and observer observations
+  ObservationVector* candidateList = &subjectIter->second;
+  if (observer != nullptr)
+    {
+    ObjectToObservationVectorMap::iterator observerIter = this->ObserverMap.find(observer);
+    if (observerIter == this->ObserverMap.end())
+      {
+      return observationList;
+      }
+    if (observerIter->second.size() < candidateList->size())
+      {
+      candidateList = &observerIter->second;
+      }
+    }
 
-  for(ObservationVector::iterator obsIter = subjectList.begin();
-      obsIter != subjectList.end();
+  for(ObservationVector::iterator obsIter = candidateList->begin();
+      obsIter != candidateList->end();
       ++obsIter)
     {
     if ( (observer == nullptr || (*obsIter)->GetObserver() == observer) &&
-         //(subject == 0 || (*obsIter)->GetSubject() == subject) &&
+         (*obsIter)->GetSubject() == subject &&
          (event == 0 || (*obsIter)->GetEvent() == event) &&
          (notify == nullptr || (*obsIter)->GetCallbackCommand() == notify))
       {
@@ -418,8 +466,22 @@ vtkEventBroker::ObservationVector vtkEventBroker::GetObservationsForSubjectByTag
 {
   // find matching observations to remove
   // - all tags match 0
-  ObservationVector& subjectList = this->SubjectMap[subject];
   ObservationVector observationList;
+  if (tag != 0)
+    {
+    SubjectEventTagToObservationMap::iterator tagIter = this->SubjectEventTagMap.find(std::make_pair(subject, tag));
+    if (tagIter != this->SubjectEventTagMap.end())
+      {
+      observationList.insert( tagIter->second );
+      }
+    return ( observationList );
+    }
+  ObjectToObservationVectorMap::iterator subjectIter = this->SubjectMap.find(subject);
+  if (subjectIter == this->SubjectMap.end())
+    {
+    return ( observationList );
+    }
+  ObservationVector& subjectList = subjectIter->second;
   for (ObservationVector::iterator obsIter = subjectList.begin();
        obsIter != subjectList.end(); obsIter++)
     {
@@ -437,7 +499,12 @@ vtkEventBroker::ObservationVector vtkEventBroker::GetObservationsForSubjectByTag
 vtkCollection *vtkEventBroker::GetObservationsForSubject ( vtkObject *subject )
 {
   vtkCollection *collection = vtkCollection::New();
-  ObservationVector& subjectList = this->SubjectMap[subject];
+  ObjectToObservationVectorMap::iterator subjectIter = this->SubjectMap.find(subject);
+  if (subjectIter == this->SubjectMap.end())
+    {
+    return collection;
+    }
+  ObservationVector& subjectList = subjectIter->second;
   for(ObservationVector::iterator iter=subjectList.begin();
       iter != subjectList.end(); iter++)
     {
@@ -453,7 +520,12 @@ vtkCollection *vtkEventBroker::GetObservationsForSubject ( vtkObject *subject )
 vtkCollection *vtkEventBroker::GetObservationsForObserver ( vtkObject *observer )
 {
   vtkCollection *collection = vtkCollection::New();
-  ObservationVector& observerList = this->ObserverMap[observer];
+  ObjectToObservationVectorMap::iterator observerIter = this->ObserverMap.find(observer);
+  if (observerIter == this->ObserverMap.end())
+    {
+    return collection;
+    }
+  ObservationVector& observerList = observerIter->second;
   for (ObservationVector::iterator iter = observerList.begin();
        iter != observerList.end(); iter++)
     {
@@ -681,7 +753,14 @@ void vtkEventBroker::ProcessEvent ( vtkObservation *observation, vtkObject *call
   //
   if ( eid == observation->GetEvent() || observation->GetEvent() == vtkCommand::AnyEvent )
     {
-    if ( this->EventMode == vtkEventBroker::Synchronous || eid == vtkCommand::DeleteEvent )
+    this->NumberOfEmittedEvents++;
+    if ( this->EventMode == vtkEventBroker::Synchronous && eid != vtkCommand::DeleteEvent
+      && this->EventCoalescingLevel > 0 && this->IsEventCoalesced(eid) )
+      {
+      // invoked at the end of event coalescing
+      this->QueueObservation( observation, eid, callData );
+      }
+    else if ( this->EventMode == vtkEventBroker::Synchronous || eid == vtkCommand::DeleteEvent )
       {
       this->InvokeObservation( observation, eid, callData );
       }
@@ -811,6 +890,7 @@ void vtkEventBroker::InvokeObservation ( vtkObservation *observation,
                                          unsigned long eid, void *callData )
 {
   this->EventNestingLevel++;
+  this->NumberOfDeliveredEvents++;
 
   double startTime = this->TimerLog->GetUniversalTime();
 
@@ -882,6 +962,52 @@ void vtkEventBroker::ProcessEventQueue ()
     }
 }
 
+//----------------------------------------------------------------------------
+void vtkEventBroker::StartEventCoalescing()
+{
+  this->EventCoalescingLevel++;
+}
+
+//----------------------------------------------------------------------------
+void vtkEventBroker::EndEventCoalescing()
+{
+  if (this->EventCoalescingLevel <= 0)
+    {
+    vtkErrorMacro("EndEventCoalescing: no matching StartEventCoalescing call");
+    return;
+    }
+  this->EventCoalescingLevel--;
+  if (this->EventCoalescingLevel == 0 && this->EventMode == vtkEventBroker::Synchronous)
+    {
+    this->ProcessEventQueue();
+    }
+}
+
+//----------------------------------------------------------------------------
+void vtkEventBroker::AddCoalescedEvent(unsigned long event)
+{
+  this->CoalescedEvents.insert(event);
+}
+
+//----------------------------------------------------------------------------
+void vtkEventBroker::RemoveCoalescedEvent(unsigned long event)
+{
+  this->CoalescedEvents.erase(event);
+}
+
+//----------------------------------------------------------------------------
+bool vtkEventBroker::IsEventCoalesced(unsigned long event)
+{
+  return this->CoalescedEvents.find(event) != this->CoalescedEvents.end();
+}
+
+//----------------------------------------------------------------------------
+void vtkEventBroker::ResetEventStatistics()
+{
+  this->NumberOfEmittedEvents = 0;
+  this->NumberOfDeliveredEvents = 0;
+}
+
 //----------------------------------------------------------------------------
 void vtkEventBroker::PrintSelf(ostream& os, vtkIndent indent)
 {
@@ -892,6 +1018,9 @@ void vtkEventBroker::PrintSelf(ostream& os, vtkIndent indent)
   os << indent << "EventMode: " << this->GetEventModeAsString() << "\n";
   os << indent << "EventLogging: " << this->EventLogging << "\n";
   os << indent << "EventNestingLevel: " << this->EventNestingLevel << "\n";
+  os << indent << "EventCoalescingLevel: " << this->EventCoalescingLevel << "\n";
+  os << indent << "NumberOfEmittedEvents: " << this->NumberOfEmittedEvents << "\n";
+  os << indent << "NumberOfDeliveredEvents: " << this->NumberOfDeliveredEvents << "\n";
   os << indent << "LogFileName: " <<
     (this->LogFileName ? this->LogFileName : "(none)") << "\n";
 }
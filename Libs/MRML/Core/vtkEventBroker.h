@@ -28,6 +28,7 @@ class vtkTimerLog;
 #include <set>
 #include <map>
 #include <fstream>
+#include <utility>
 
 class vtkCollection;
 class vtkCallbackCommand;
@@ -233,6 +234,43 @@ public:
   vtkGetMacro (CompressCallData, int);
   vtkSetMacro (CompressCallData, int);
 
+  /// Event coalescing
+  ///
+  /// Between StartEventCoalescing() and EndEventCoalescing() calls, coalesced
+  /// events (by default only vtkCommand::ModifiedEvent) are not invoked immediately
+  /// but queued: an observation is only invoked once for each unique event ID
+  /// and call data pair, regardless of how many times the event is invoked on the subject.
+  /// Queued observations are invoked, in the order of their first occurrence,
+  /// when the outermost EndEventCoalescing() is called.
+  /// Other events are still invoked immediately. Observations that are removed
+  /// (for example because the subject is deleted) are removed from the queue.
+  /// Calls can be nested. It only has effect in synchronous event mode.
+  /// \note Call data of coalesced events must remain valid until the events are
+  /// invoked.
+  void StartEventCoalescing();
+  void EndEventCoalescing();
+  vtkGetMacro(EventCoalescingLevel, int);
+  bool IsEventCoalescingActive() { return this->EventCoalescingLevel > 0; };
+
+  ///
+  /// Set of event IDs that are coalesced between StartEventCoalescing()
+  /// and EndEventCoalescing() calls.
+  void AddCoalescedEvent(unsigned long event);
+  void RemoveCoalescedEvent(unsigned long event);
+  bool IsEventCoalesced(unsigned long event);
+
+  /// Event statistics
+  ///
+  /// Number of events received for observations (including events that are
+  /// queued and invoked later)
+  vtkGetMacro(NumberOfEmittedEvents, vtkTypeInt64);
+  ///
+  /// Number of observation invocations
+  vtkGetMacro(NumberOfDeliveredEvents, vtkTypeInt64);
+  ///
+  /// Reset number of emitted and delivered events to zero
+  void ResetEventStatistics();
+
   ///
   /// Sets the method pointer to be used for processing script observations
   void SetScriptHandler ( void (*scriptHandler) (const char* script, void *clientData), void *clientData )
@@ -272,6 +310,12 @@ protected:
   ObjectToObservationVectorMap SubjectMap;
   ObjectToObservationVectorMap ObserverMap;
 
+  typedef std::map< std::pair<vtkObject*, unsigned long>, vtkObservation* > SubjectEventTagToObservationMap;
+
+  /// map to manage quick lookup of attached observations by subject and event tag
+  /// (e.g. when vtkObserverManager removes observations by tag)
+  SubjectEventTagToObservationMap SubjectEventTagMap;
+
   /// The event queue of triggered but not-yet-invoked observations
   std::deque< vtkObservation * > EventQueue;
 
@@ -286,6 +330,12 @@ protected:
   int EventMode;
   int CompressCallData;
 
+  int EventCoalescingLevel;
+  std::set<unsigned long> CoalescedEvents;
+
+  vtkTypeInt64 NumberOfEmittedEvents;
+  vtkTypeInt64 NumberOfDeliveredEvents;
+
   std::ofstream LogFile;
 private:
   /// DetachObservations is a fast (but dangerous) method to delete all the
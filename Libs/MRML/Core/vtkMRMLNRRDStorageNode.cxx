@@ -25,16 +25,32 @@ Version:   $Revision: 1.6 $
 #include <vtkTeemNRRDWriter.h>
 
 // VTK includes
+#include <vtkCallbackCommand.h>
 #include <vtkImageChangeInformation.h>
 #include <vtkImageData.h>
 #include <vtkNew.h>
 #include <vtkObjectFactory.h>
+#include <vtkPointData.h>
+#include <vtkSmartPointer.h>
 #include <vtkStringArray.h>
 #include <vtkVersion.h>
 
 // vnl includes
 #include <vnl/vnl_double_3.h>
 
+namespace
+{
+
+//----------------------------------------------------------------------------
+// Record that an error occurred, instead of displaying it
+void RecordErrorCallback(vtkObject* vtkNotUsed(caller), unsigned long vtkNotUsed(eid),
+                         void* clientData, void* vtkNotUsed(callData))
+{
+  *reinterpret_cast<bool*>(clientData) = true;
+}
+
+} // end of anonymous namespace
+
 //----------------------------------------------------------------------------
 vtkMRMLNodeNewMacro(vtkMRMLNRRDStorageNode);
 
@@ -42,6 +58,7 @@ vtkMRMLNodeNewMacro(vtkMRMLNRRDStorageNode);
 vtkMRMLNRRDStorageNode::vtkMRMLNRRDStorageNode()
 {
   this->CenterImage = 0;
+  this->UseMemoryMapping = false;
   this->DefaultWriteFileExtension = "nhdr";
 
   this->CompressionPresets.push_back(vtkMRMLStorageNode::CompressionPreset(this->GetCompressionParameterFastest(), "Fastest"));
@@ -101,6 +118,7 @@ void vtkMRMLNRRDStorageNode::Copy(vtkMRMLNode *anode)
   vtkMRMLNRRDStorageNode *node = (vtkMRMLNRRDStorageNode *) anode;
 
   this->SetCenterImage(node->CenterImage);
+  this->SetUseMemoryMapping(node->UseMemoryMapping);
 
   this->EndModify(disabledModify);
 
@@ -111,6 +129,7 @@ void vtkMRMLNRRDStorageNode::PrintSelf(ostream& os, vtkIndent indent)
 {
   vtkMRMLStorageNode::PrintSelf(os,indent);
   os << indent << "CenterImage:   " << this->CenterImage << "\n";
+  os << indent << "UseMemoryMapping:   " << this->UseMemoryMapping << "\n";
 }
 
 //----------------------------------------------------------------------------
@@ -155,7 +174,14 @@ int vtkMRMLNRRDStorageNode::ReadDataInternal(vtkMRMLNode *refNode)
     return 0;
     }
 
-  vtkNew<vtkTeemNRRDReader> reader;
+  // Use the reader that has already read the file in PrefetchData().
+  // If it is set up the same way below then it is not modified and Update() does not read the file again.
+  vtkSmartPointer<vtkTeemNRRDReader> reader = this->PrefetchedReader;
+  this->PrefetchedReader = nullptr;
+  if (!reader)
+    {
+    reader = vtkSmartPointer<vtkTeemNRRDReader>::New();
+    }
 
   // Set Reader member variables
   if (this->CenterImage)
@@ -166,6 +192,7 @@ int vtkMRMLNRRDStorageNode::ReadDataInternal(vtkMRMLNode *refNode)
     {
     reader->SetUseNativeOriginOn();
     }
+  reader->SetUseMemoryMapping(this->UseMemoryMapping);
 
   if (volNode->GetImageData())
     {
@@ -303,6 +330,74 @@ int vtkMRMLNRRDStorageNode::ReadDataInternal(vtkMRMLNode *refNode)
   return 1;
 }
 
+//----------------------------------------------------------------------------
+bool vtkMRMLNRRDStorageNode::PrefetchData(vtkMRMLNode* refNode)
+{
+  // Only the file is read here, the reader is checked against the node type
+  // and the data is set in the node in ReadDataInternal.
+  this->PrefetchedReader = nullptr;
+  if (!refNode || !refNode->IsA("vtkMRMLVolumeNode"))
+    {
+    return false;
+    }
+  std::string fullName = this->GetFullNameFromFileName();
+  if (fullName.empty())
+    {
+    return false;
+    }
+  vtkSmartPointer<vtkTeemNRRDReader> reader = vtkSmartPointer<vtkTeemNRRDReader>::New();
+  // This method may run on a worker thread, where errors must not be displayed
+  // (they are reported when ReadDataInternal reads the file again).
+  // Observers prevent vtkErrorMacro and vtkWarningMacro from displaying them.
+  bool errorOccurred = false;
+  vtkNew<vtkCallbackCommand> recordErrorCallback;
+  recordErrorCallback->SetCallback(RecordErrorCallback);
+  recordErrorCallback->SetClientData(&errorOccurred);
+  vtkNew<vtkCallbackCommand> ignoreWarningCallback;
+  reader->AddObserver(vtkCommand::ErrorEvent, recordErrorCallback.GetPointer());
+  reader->AddObserver(vtkCommand::WarningEvent, ignoreWarningCallback.GetPointer());
+  if (this->CenterImage)
+    {
+    reader->SetUseNativeOriginOff();
+    }
+  else
+    {
+    reader->SetUseNativeOriginOn();
+    }
+  reader->SetUseMemoryMapping(this->UseMemoryMapping);
+  // Decompress without holding the Teem mutex so that files are prefetched in parallel
+  reader->UseZlibDecompressionOn();
+  reader->SetFileName(fullName.c_str());
+  if (!reader->CanReadFile(fullName.c_str()))
+    {
+    return false;
+    }
+  reader->Update();
+  reader->RemoveAllObservers();
+  if (errorOccurred || reader->GetOutput()->GetPointData()->GetNumberOfArrays() == 0)
+    {
+    return false;
+    }
+  this->PrefetchedReader = reader;
+  return true;
+}
+
+//----------------------------------------------------------------------------
+int vtkMRMLNRRDStorageNode::ReadData(vtkMRMLNode* refNode, bool temporaryFile)
+{
+  int result = this->Superclass::ReadData(refNode, temporaryFile);
+  // ReadDataInternal may not have been called, do not keep the prefetched voxels in memory
+  this->PrefetchedReader = nullptr;
+  return result;
+}
+
+//----------------------------------------------------------------------------
+bool vtkMRMLNRRDStorageNode::CanWriteDataConcurrently(vtkMRMLNode* refNode)
+{
+  vtkMRMLVolumeNode* volumeNode = vtkMRMLVolumeNode::SafeDownCast(refNode);
+  return volumeNode && !vtkTeemNRRDReader::IsMemoryMapped(volumeNode->GetImageData());
+}
+
 //----------------------------------------------------------------------------
 int vtkMRMLNRRDStorageNode::WriteDataInternal(vtkMRMLNode *refNode)
 {
@@ -372,9 +467,19 @@ int vtkMRMLNRRDStorageNode::WriteDataInternal(vtkMRMLNode *refNode)
   // Use here the NRRD Writer
   vtkNew<vtkTeemNRRDWriter> writer;
   writer->SetFileName(fullName.c_str());
+  if (vtkTeemNRRDReader::IsMemoryMapped(volNode->GetImageData()))
+    {
+    // Memory mapped voxels may be in the file that is about to be overwritten.
+    // The node must not keep using the mapping while the file is truncated,
+    // therefore its voxels are replaced by a copy in memory before writing.
+    vtkNew<vtkImageData> imageDataCopy;
+    imageDataCopy->DeepCopy(volNode->GetImageData());
+    volNode->SetAndObserveImageData(imageDataCopy.GetPointer());
+    }
   writer->SetInputConnection(volNode->GetImageDataConnection());
   writer->SetUseCompression(this->GetUseCompression());
   writer->SetCompressionLevel(this->GetGzipCompressionLevelFromCompressionParameter(this->CompressionParameter));
+  writer->SetNumberOfThreads(this->NumberOfCompressionThreads);
 
   // set volume attributes
   writer->SetIJKToRASMatrix(ijkToRas.GetPointer());
@@ -16,6 +16,9 @@
 #define __vtkMRMLNRRDStorageNode_h
 
 #include "vtkMRMLStorageNode.h"
+
+// VTK includes
+#include <vtkSmartPointer.h>
 class vtkDoubleArray;
 class vtkTeemNRRDReader;
 
@@ -53,6 +56,16 @@ class VTK_MRML_EXPORT vtkMRMLNRRDStorageNode : public vtkMRMLStorageNode
   vtkGetMacro(CenterImage, int);
   vtkSetMacro(CenterImage, int);
 
+  /// Map voxels of uncompressed files into memory instead of reading them.
+  /// Loading is then nearly instantaneous and only those parts of the file are
+  /// loaded into memory that are accessed. The file must not be changed or removed
+  /// while the volume is loaded. Files that cannot be mapped are read normally.
+  /// It is a runtime setting, it is not saved in the scene. Off by default.
+  /// \sa vtkTeemNRRDReader::SetUseMemoryMapping
+  vtkGetMacro(UseMemoryMapping, bool);
+  vtkSetMacro(UseMemoryMapping, bool);
+  vtkBooleanMacro(UseMemoryMapping, bool);
+
   ///
   /// Access the nrrd header fields to create a diffusion gradient table
   int ParseDiffusionInformation(vtkTeemNRRDReader *reader,vtkDoubleArray *grad,vtkDoubleArray *bvalues);
@@ -60,6 +73,20 @@ class VTK_MRML_EXPORT vtkMRMLNRRDStorageNode : public vtkMRMLStorageNode
   /// Return true if the node can be read in.
   bool CanReadInReferenceNode(vtkMRMLNode *refNode) override;
 
+  /// Read the voxels of the file into a reader that is used by the next ReadData() call.
+  /// Errors are not reported, they are reported when ReadData() reads the file again.
+  /// \sa vtkMRMLStorageNode::PrefetchData()
+  bool PrefetchData(vtkMRMLNode* refNode) override;
+
+  /// Read data into the referenced node. The data read by PrefetchData() is
+  /// released even if it is not used (for example, if the node cannot be read).
+  int ReadData(vtkMRMLNode* refNode, bool temporaryFile = false) override;
+
+  /// Volumes are written without modifying the node, except memory-mapped
+  /// volumes, whose voxels are copied into the node before writing.
+  /// \sa vtkMRMLStorageNode::CanWriteDataConcurrently()
+  bool CanWriteDataConcurrently(vtkMRMLNode* refNode) override;
+
   ///
   /// Configure the storage node for data exchange. This is an
   /// opportunity to optimize the storage node's settings, for
@@ -95,6 +122,10 @@ protected:
   int GetGzipCompressionLevelFromCompressionParameter(std::string parameter);
 
   int CenterImage;
+  bool UseMemoryMapping;
+
+  /// Reader that has already read the file in PrefetchData()
+  vtkSmartPointer<vtkTeemNRRDReader> PrefetchedReader;
 };
 
 #endif
@@ -928,6 +928,31 @@ void vtkMRMLNode::SetID (const char* _arg)
   this->Modified();
 }
 
+//----------------------------------------------------------------------------
+void vtkMRMLNode::SetName(const char* _arg)
+{
+  // Mostly copied from vtkSetStringMacro() in vtkSetGet.cxx
+  vtkDebugMacro(<< this->GetClassName() << " (" << this << "): setting Name to " << (_arg?_arg:"(null)") );
+  if ( this->Name == nullptr && _arg == nullptr) { return;}
+  if ( this->Name && _arg && (!strcmp(this->Name,_arg))) { return;}
+  char* oldName = this->Name;
+  if (_arg)
+    {
+    size_t n = strlen(_arg) + 1;
+    char *cp1 =  new char[n];
+    const char *cp2 = (_arg);
+    this->Name = cp1;
+    do { *cp1++ = *cp2++; } while ( --n );
+    }
+   else
+    {
+    this->Name = nullptr;
+    }
+  this->InvokeEvent(vtkMRMLNode::NameChangedEvent, oldName);
+  if (oldName) { delete [] oldName; }
+  this->Modified();
+}
+
 //----------------------------------------------------------------------------
 const char * vtkMRMLNode::URLEncodeString(const char *inString)
 {
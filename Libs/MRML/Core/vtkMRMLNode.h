@@ -349,8 +349,11 @@ public:
   vtkSetStringMacro(Description);
   vtkGetStringMacro(Description);
 
-  /// Name of this node, to be set by the user
-  vtkSetStringMacro(Name);
+  /// Name of this node, to be set by the user.
+  /// If the name changes, NameChangedEvent is invoked with the previous name
+  /// as call data.
+  /// \sa NameChangedEvent
+  virtual void SetName(const char* name);
   vtkGetStringMacro(Name);
 
   /// ID use by other nodes to reference this node in XML.
@@ -740,6 +743,7 @@ public:
 
   /// HierarchyModifiedEvent is generated when the hierarchy node with which
   /// this node is associated changes
+  /// NameChangedEvent is generated when the node name changes, see SetName()
   enum
     {
       HierarchyModifiedEvent = 16000,
@@ -747,7 +751,8 @@ public:
       ReferenceAddedEvent,
       ReferenceModifiedEvent,
       ReferenceRemovedEvent,
-      ReferencedNodeModifiedEvent
+      ReferencedNodeModifiedEvent,
+      NameChangedEvent
     };
 
 
@@ -87,6 +87,8 @@ Version:   $Revision: 1.18 $
 #include <vtkCollection.h>
 #include <vtkDebugLeaks.h>
 #include <vtkErrorCode.h>
+#include <vtkMultiThreader.h>
+#include <vtkNew.h>
 #include <vtkObjectFactory.h>
 #include <vtkSmartPointer.h>
 
@@ -96,6 +98,7 @@ Version:   $Revision: 1.18 $
 
 // STD includes
 #include <algorithm>
+#include <atomic>
 #include <numeric>
 
 //#define MRMLSCENE_VERBOSE
@@ -123,6 +126,7 @@ vtkMRMLScene::vtkMRMLScene()
   this->UndoFlag = false;
 
   this->NodeReferences.clear();
+  this->ReferencedIDsByReferencingID.clear();
   this->ReferencedIDChanges.clear();
 
   this->CacheManager = nullptr;
@@ -137,6 +141,7 @@ vtkMRMLScene::vtkMRMLScene()
   this->SaveToXMLString = 0;
 
   this->ReadDataOnLoad = 1;
+  this->NumberOfReadThreads = 1;
 
   this->LastLoadedVersion = nullptr;
   this->Version = nullptr;
@@ -311,6 +316,7 @@ void vtkMRMLScene::Clear(int removeSingletons)
 
   this->RemoveAllNodes(removeSingletons);
   this->NodeReferences.clear();
+  this->ReferencedIDsByReferencingID.clear();
   this->ReferencedIDChanges.clear();
   this->ResetNodes();
 
@@ -642,6 +648,87 @@ int bitwiseOr(int firstValue, int secondValue)
 }
 }
 
+//------------------------------------------------------------------------------
+namespace
+{
+
+//----------------------------------------------------------------------------
+struct PrefetchDataInfo
+{
+  std::vector< std::pair<vtkMRMLStorageNode*, vtkMRMLStorableNode*> > StorageNodes;
+  std::atomic<size_t> NextStorageNodeIndex;
+};
+
+//----------------------------------------------------------------------------
+VTK_THREAD_RETURN_TYPE PrefetchDataThreadFunction(void* arg)
+{
+  vtkMultiThreader::ThreadInfo* threadInfo = static_cast<vtkMultiThreader::ThreadInfo*>(arg);
+  PrefetchDataInfo* info = static_cast<PrefetchDataInfo*>(threadInfo->UserData);
+  // Each thread picks the next storage node that is not read yet, as reading time varies a lot between files
+  for (size_t index = info->NextStorageNodeIndex++; index < info->StorageNodes.size(); index = info->NextStorageNodeIndex++)
+    {
+    info->StorageNodes[index].first->PrefetchData(info->StorageNodes[index].second);
+    }
+  return VTK_THREAD_RETURN_VALUE;
+}
+
+}
+
+//------------------------------------------------------------------------------
+void vtkMRMLScene::PrefetchStorageNodesData(vtkCollection* nodes)
+{
+  if (!nodes || !this->ReadDataOnLoad)
+    {
+    return;
+    }
+  PrefetchDataInfo info;
+  info.NextStorageNodeIndex = 0;
+  // A storage node may be shared by several storable nodes, but its data is prefetched
+  // only once, for the first one, as the prefetched data is kept in the storage node.
+  std::set<vtkMRMLStorageNode*> prefetchedStorageNodes;
+  vtkMRMLNode* node = nullptr;
+  vtkCollectionSimpleIterator it;
+  for (nodes->InitTraversal(it); (node = vtkMRMLNode::SafeDownCast(nodes->GetNextItemAsObject(it)));)
+    {
+    vtkMRMLStorableNode* storableNode = vtkMRMLStorableNode::SafeDownCast(node);
+    if (!storableNode || !storableNode->GetAddToScene())
+      {
+      continue;
+      }
+    int numberOfStorageNodes = storableNode->GetNumberOfStorageNodes();
+    for (int i = 0; i < numberOfStorageNodes; ++i)
+      {
+      vtkMRMLStorageNode* storageNode = storableNode->GetNthStorageNode(i);
+      // remote files are downloaded when the data is read
+      if (!storageNode || !storageNode->GetFileName() || (storageNode->GetURI() && strlen(storageNode->GetURI()) > 0))
+        {
+        continue;
+        }
+      if (!prefetchedStorageNodes.insert(storageNode).second)
+        {
+        continue;
+        }
+      info.StorageNodes.push_back(std::make_pair(storageNode, storableNode));
+      }
+    }
+  if (info.StorageNodes.empty())
+    {
+    return;
+    }
+
+  int numberOfThreads = this->NumberOfReadThreads;
+  if (numberOfThreads <= 0)
+    {
+    numberOfThreads = vtkMultiThreader::GetGlobalDefaultNumberOfThreads();
+    }
+  numberOfThreads = std::max(1, std::min(std::min(numberOfThreads, VTK_MAX_THREADS), static_cast<int>(info.StorageNodes.size())));
+
+  vtkNew<vtkMultiThreader> threader;
+  threader->SetNumberOfThreads(numberOfThreads);
+  threader->SetSingleMethod(PrefetchDataThreadFunction, &info);
+  threader->SingleMethodExecute();
+}
+
 //------------------------------------------------------------------------------
 int vtkMRMLScene::GetStates()const
 {
@@ -803,6 +890,12 @@ int vtkMRMLScene::Import()
 
     this->InvokeEvent(vtkMRMLScene::NewSceneEvent, nullptr);
 
+    // Read data files concurrently, the data is set in the nodes in UpdateScene
+    if (this->NumberOfReadThreads != 1)
+      {
+      this->PrefetchStorageNodesData(addedNodes);
+      }
+
     // Notify the imported nodes about that all nodes are created
     // (so the observers can be attached to referenced nodes, etc.)
     // by calling UpdateScene on each node
@@ -1468,6 +1561,7 @@ void vtkMRMLScene::RemoveReferencedNodeID(const char *id, vtkMRMLNode *referenci
     return;
     }
   referenceIt->second.erase(referencingNode->GetID());
+  this->RemoveReferencedIDFromIndex(referencingNode->GetID(), id);
 }
 
 //------------------------------------------------------------------------------
@@ -1485,18 +1579,24 @@ void vtkMRMLScene::RemoveNodeReferences(vtkMRMLNode *n)
     }
   std::string nid=n->GetID();
 
-  NodeReferencesType::value_type::second_type::iterator referringNodesIt;
-  for (NodeReferencesType::iterator referenceIt = this->NodeReferences.begin();
-    referenceIt != this->NodeReferences.end();
-    ++referenceIt)
+  // only visit the IDs that are referenced by this node
+  NodeReferencesType::iterator referencedIDsIt = this->ReferencedIDsByReferencingID.find(nid);
+  if (referencedIDsIt == this->ReferencedIDsByReferencingID.end())
     {
-    referringNodesIt=referenceIt->second.find(nid);
-    if (referringNodesIt!=referenceIt->second.end())
+    return;
+    }
+  for (NodeReferencesType::value_type::second_type::iterator referencedIDIt = referencedIDsIt->second.begin();
+    referencedIDIt != referencedIDsIt->second.end();
+    ++referencedIDIt)
+    {
+    NodeReferencesType::iterator referenceIt = this->NodeReferences.find(*referencedIDIt);
+    if (referenceIt != this->NodeReferences.end())
       {
       // observation has been deleted, so remove it from the index
-      referenceIt->second.erase(referringNodesIt);
+      referenceIt->second.erase(nid);
       }
     }
+  this->ReferencedIDsByReferencingID.erase(referencedIDsIt);
 }
 
 //------------------------------------------------------------------------------
@@ -1518,6 +1618,7 @@ void vtkMRMLScene::RemoveUnusedNodeReferences()
         // the node is not in the scene (or in the scene but with a different pointer), remove it
         NodeReferencesType::value_type::second_type::iterator referringNodesItToRemove = referringNodesIt;
         ++referringNodesIt;
+        this->RemoveReferencedIDFromIndex(*referringNodesItToRemove, referenceIt->first);
         referenceIt->second.erase(referringNodesItToRemove);
         continue;
         }
@@ -1537,6 +1638,7 @@ void vtkMRMLScene::RemoveUnusedNodeReferences()
       // the referenced ID is no longer in the scene (or no more references), so remove all related references
       NodeReferencesType::iterator referenceItToBeRemoved = referenceIt;
       ++referenceIt;
+      this->RemoveReferencedIDFromIndex(referenceItToBeRemoved);
       this->NodeReferences.erase(referenceItToBeRemoved);
       continue;
       }
@@ -1553,7 +1655,39 @@ void vtkMRMLScene::RemoveReferencesToNode(vtkMRMLNode *n)
     vtkErrorMacro("RemoveReferencesToNode: node is null or has null id, can't remove refs");
     return;
     }
-  this->NodeReferences.erase(n->GetID());
+  NodeReferencesType::iterator referenceIt = this->NodeReferences.find(n->GetID());
+  if (referenceIt == this->NodeReferences.end())
+    {
+    return;
+    }
+  this->RemoveReferencedIDFromIndex(referenceIt);
+  this->NodeReferences.erase(referenceIt);
+}
+
+//------------------------------------------------------------------------------
+void vtkMRMLScene::RemoveReferencedIDFromIndex(const std::string& referencingID, const std::string& referencedID)
+{
+  NodeReferencesType::iterator referencedIDsIt = this->ReferencedIDsByReferencingID.find(referencingID);
+  if (referencedIDsIt == this->ReferencedIDsByReferencingID.end())
+    {
+    return;
+    }
+  referencedIDsIt->second.erase(referencedID);
+  if (referencedIDsIt->second.empty())
+    {
+    this->ReferencedIDsByReferencingID.erase(referencedIDsIt);
+    }
+}
+
+//------------------------------------------------------------------------------
+void vtkMRMLScene::RemoveReferencedIDFromIndex(NodeReferencesType::iterator referenceIt)
+{
+  for (NodeReferencesType::value_type::second_type::iterator referringNodesIt = referenceIt->second.begin();
+    referringNodesIt != referenceIt->second.end();
+    ++referringNodesIt)
+    {
+    this->RemoveReferencedIDFromIndex(*referringNodesIt, referenceIt->first);
+    }
 }
 
 //------------------------------------------------------------------------------
@@ -2159,6 +2293,7 @@ void vtkMRMLScene::PrintSelf(ostream& os, vtkIndent indent)
   os << indent << "ErrorCode = " << this->ErrorCode << "\n";
   os << indent << "URL = " << this->GetURL() << "\n";
   os << indent << "Root Directory = " << this->GetRootDirectory() << "\n";
+  os << indent << "NumberOfReadThreads = " << this->NumberOfReadThreads << "\n";
 
   this->Nodes->vtkCollection::PrintSelf(os,indent);
   std::list<std::string> classes = this->GetNodeClassesList();
@@ -3016,6 +3151,7 @@ void vtkMRMLScene::AddReferencedNodeID(const char *id, vtkMRMLNode *referencingN
     return;
     }
   this->NodeReferences[id].insert(referencingNode->GetID());
+  this->ReferencedIDsByReferencingID[referencingNode->GetID()].insert(id);
 }
 
 //------------------------------------------------------------------------------
@@ -3089,6 +3225,18 @@ const char* vtkMRMLScene::GetChangedID(const char* id)
 //------------------------------------------------------------------------------
 void vtkMRMLScene::UpdateNodeReferences(vtkCollection* checkNodes/*=nullptr*/)
 {
+  // set of nodes to check, for quick lookup (checkNodes may contain all the nodes of an imported scene)
+  std::set<vtkMRMLNode*> checkNodesSet;
+  if (checkNodes != nullptr)
+    {
+    vtkMRMLNode* checkNode = nullptr;
+    vtkCollectionSimpleIterator it;
+    for (checkNodes->InitTraversal(it);
+      (checkNode = vtkMRMLNode::SafeDownCast(checkNodes->GetNextItemAsObject(it)));)
+      {
+      checkNodesSet.insert(checkNode);
+      }
+    }
   for (std::map< std::string, std::string>::const_iterator iterChanged = this->ReferencedIDChanges.begin();
     iterChanged != this->ReferencedIDChanges.end(); iterChanged++)
     {
@@ -3111,7 +3259,7 @@ void vtkMRMLScene::UpdateNodeReferences(vtkCollection* checkNodes/*=nullptr*/)
         {
         continue;
         }
-      if (checkNodes!=nullptr && !checkNodes->IsItemPresent(node))
+      if (checkNodes!=nullptr && checkNodesSet.find(node) == checkNodesSet.end())
         {
         continue;
         }
@@ -3131,15 +3279,15 @@ void vtkMRMLScene::AddReferencedNodes(vtkMRMLNode *node, vtkCollection *refNodes
 
   std::deque<vtkMRMLNode*> newFoundReferencedNodes;
 
-  for (NodeReferencesType::iterator referenceIt = this->NodeReferences.begin();
-    referenceIt != this->NodeReferences.end();
-    ++referenceIt)
+  NodeReferencesType::iterator referencedIDsIt = this->ReferencedIDsByReferencingID.find(node->GetID());
+  if (referencedIDsIt != this->ReferencedIDsByReferencingID.end())
     {
-    NodeReferencesType::value_type::second_type::iterator referringNodesIt = referenceIt->second.find(node->GetID());
-    if (referringNodesIt!=referenceIt->second.end())
+    for (NodeReferencesType::value_type::second_type::iterator referencedIDIt = referencedIDsIt->second.begin();
+      referencedIDIt != referencedIDsIt->second.end();
+      ++referencedIDIt)
       {
       // this ID is referenced by this node
-      vtkMRMLNode *referencedNode = this->GetNodeByID(referenceIt->first);
+      vtkMRMLNode *referencedNode = this->GetNodeByID(*referencedIDIt);
       if (referencedNode!=nullptr && !refNodes->IsItemPresent(referencedNode))
         {
         // this ID is not yet in the list of reference nodes, so add it
@@ -3204,6 +3352,24 @@ void vtkMRMLScene::GetReferencingNodes(vtkMRMLNode* referencedNode, std::vector<
     }
 }
 
+//-----------------------------------------------------------------------------
+void vtkMRMLScene::GetReferencingNodes(vtkMRMLNode* referencedNode, vtkCollection* referencingNodes)
+{
+  if (!referencingNodes)
+    {
+    vtkErrorMacro("GetReferencingNodes: null collection");
+    return;
+    }
+  referencingNodes->RemoveAllItems();
+  std::vector<vtkMRMLNode*> referencingNodesVector;
+  this->GetReferencingNodes(referencedNode, referencingNodesVector);
+  for (std::vector<vtkMRMLNode*>::iterator nodeIt = referencingNodesVector.begin();
+    nodeIt != referencingNodesVector.end(); ++nodeIt)
+    {
+    referencingNodes->AddItem(*nodeIt);
+    }
+}
+
 //------------------------------------------------------------------------------
 void vtkMRMLScene::CopyNodeReferences(vtkMRMLScene *scene)
 {
@@ -3214,6 +3380,7 @@ void vtkMRMLScene::CopyNodeReferences(vtkMRMLScene *scene)
 
   //assuming the nodes exist in this scene
   this->NodeReferences=scene->NodeReferences;
+  this->ReferencedIDsByReferencingID=scene->ReferencedIDsByReferencingID;
 }
 
 //------------------------------------------------------------------------------
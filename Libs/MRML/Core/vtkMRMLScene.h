@@ -388,7 +388,8 @@ public:
   void SaveStateForUndo(std::vector<vtkMRMLNode *> nodes);
 
   /// The Scene maintains a map (NodeReferences) to keep track of the relationship
-  /// between node IDs and the nodes referencing those IDs.  Each
+  /// between node IDs and the nodes referencing those IDs, and an inverse map to
+  /// quickly find the IDs referenced by a node.  Each
   /// node can use the call AddReferencedNodeID() to tell the scene
   /// that is 'has an interest' in the given ID so that the scene
   /// can notify that node when the ID has been remapped.   It does
@@ -459,6 +460,10 @@ public:
 
   /// Get vector of nodes containing references to an input node
   void GetReferencingNodes(vtkMRMLNode* referencedNode, std::vector<vtkMRMLNode *> &referencingNodes);
+  /// Get collection of nodes containing references to an input node.
+  /// The collection is cleared before nodes are added.
+  /// \sa GetReferencedNodes()
+  void GetReferencingNodes(vtkMRMLNode* referencedNode, vtkCollection* referencingNodes);
 
   /// \brief Get a sub-scene containing all nodes directly or indirectly
   /// referenced by the input node.
@@ -494,6 +499,17 @@ public:
   vtkSetMacro(ReadDataOnLoad,int);
   vtkGetMacro(ReadDataOnLoad,int);
 
+  /// \brief Number of threads used for reading data of storage nodes during Import().
+  ///
+  /// If it is not 1, then the data files of all imported storage nodes that support it
+  /// (see vtkMRMLStorageNode::PrefetchData()) are read concurrently on worker threads,
+  /// before the data is set in the nodes. Setting the data in the nodes and invoking
+  /// the node events is still done on the main thread, in the order of the nodes in the scene.
+  /// If the value is 0 then the default number of threads of vtkMultiThreader is used.
+  /// Default is 1 (data is read sequentially).
+  vtkSetClampMacro(NumberOfReadThreads, int, 0, VTK_INT_MAX);
+  vtkGetMacro(NumberOfReadThreads, int);
+
   void SetErrorMessage(const std::string &error);
   std::string GetErrorMessage();
 
@@ -802,9 +818,18 @@ protected:
   /// Clear NodeIDs map used to speedup GetByID() method.
   void ClearNodeIDs();
 
+  /// Read the data files of storage nodes of the nodes concurrently, using NumberOfReadThreads threads.
+  /// The read data is set in the nodes when their storage node ReadData() is called.
+  void PrefetchStorageNodesData(vtkCollection* nodes);
+
   /// Get a NodeReferences iterator for a node reference.
   NodeReferencesType::iterator FindNodeReference(const char* referencedId, vtkMRMLNode* referencingNode);
 
+  /// Remove a referenced ID from the ReferencedIDsByReferencingID index.
+  void RemoveReferencedIDFromIndex(const std::string& referencingID, const std::string& referencedID);
+  /// Remove all references of a NodeReferences element from the ReferencedIDsByReferencingID index.
+  void RemoveReferencedIDFromIndex(NodeReferencesType::iterator referenceIt);
+
   /// Clean up elements of the undo/redo stack beyond the maximum size
   void TrimUndoStack();
 
@@ -849,6 +874,8 @@ protected:
   std::vector< std::string >  RegisteredNodeTags;
 
   NodeReferencesType NodeReferences; // ReferencedIDs (string), ReferencingNodes (node pointer)
+  /// Inverse of NodeReferences, kept in sync with it: ReferencingNodes (node ID), ReferencedIDs (string)
+  NodeReferencesType ReferencedIDsByReferencingID;
   std::map< std::string, std::string > ReferencedIDChanges;
   std::map< std::string, vtkSmartPointer<vtkMRMLNode> > NodeIDs;
 
@@ -866,6 +893,7 @@ protected:
   int SaveToXMLString;
 
   int ReadDataOnLoad;
+  int NumberOfReadThreads;
 
   vtkMTimeType  NodeIDsMTime;
 
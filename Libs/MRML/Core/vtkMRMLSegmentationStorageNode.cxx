@@ -1146,6 +1146,7 @@ int vtkMRMLSegmentationStorageNode::WriteBinaryLabelmapRepresentation(vtkMRMLSeg
   vtkNew<vtkTeemNRRDWriter> writer;
   writer->SetFileName(fullName.c_str());
   writer->SetUseCompression(this->GetUseCompression());
+  writer->SetNumberOfThreads(this->NumberOfCompressionThreads);
   writer->SetSpace(nrrdSpaceLeftPosteriorSuperior);
   writer->SetMeasurementFrameMatrix(nullptr);
 
@@ -47,6 +47,7 @@ vtkMRMLStorageNode::vtkMRMLStorageNode()
   this->URI = nullptr;
   this->URIHandler = nullptr;
   this->UseCompression = 1;
+  this->NumberOfCompressionThreads = 1;
   this->ReadState = this->Idle;
   this->WriteState = this->Idle;
   this->URIHandler = nullptr;
@@ -350,6 +351,7 @@ void vtkMRMLStorageNode::Copy(vtkMRMLNode *anode)
     }
   this->SetUseCompression(node->UseCompression);
   this->SetCompressionParameter(node->CompressionParameter);
+  this->SetNumberOfCompressionThreads(node->NumberOfCompressionThreads);
   this->SetReadState(node->ReadState);
   this->SetWriteState(node->WriteState);
   this->SetDefaultWriteFileExtension(node->GetDefaultWriteFileExtension());
@@ -380,6 +382,7 @@ void vtkMRMLStorageNode::PrintSelf(ostream& os, vtkIndent indent)
     {
     os << indent << "CompressionParameter:   " << this->CompressionParameter << "\n";
     }
+  os << indent << "NumberOfCompressionThreads:   " << this->NumberOfCompressionThreads << "\n";
 
   os << indent << "ReadState:  " << this->GetReadStateAsString() << "\n";
   os << indent << "WriteState: " << this->GetWriteStateAsString() << "\n";
@@ -1222,6 +1225,18 @@ int vtkMRMLStorageNode::ReadData(vtkMRMLNode* refNode, bool temporary)
   return res;
 }
 
+//------------------------------------------------------------------------------
+bool vtkMRMLStorageNode::PrefetchData(vtkMRMLNode* vtkNotUsed(refNode))
+{
+  return false;
+}
+
+//------------------------------------------------------------------------------
+bool vtkMRMLStorageNode::CanWriteDataConcurrently(vtkMRMLNode* vtkNotUsed(refNode))
+{
+  return false;
+}
+
 //------------------------------------------------------------------------------
 int vtkMRMLStorageNode::WriteData(vtkMRMLNode* refNode)
 {
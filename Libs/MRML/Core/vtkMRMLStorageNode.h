@@ -57,6 +57,27 @@ public:
   /// \sa SetFileName(), ReadDataInternal(), GetStoredTime()
   virtual int ReadData(vtkMRMLNode *refNode, bool temporaryFile = false);
 
+  /// \brief Read the data file in advance, without modifying the referenced node.
+  ///
+  /// The data is kept in the storage node and it is set in the referenced node
+  /// by the next ReadData() call, which then does not read the file again.
+  /// This method may be called from a worker thread, concurrently with other
+  /// storage nodes (see vtkMRMLScene::SetNumberOfReadThreads()), therefore
+  /// implementations must not modify the node, the scene, or invoke events.
+  /// Returns true if the data is read. Default implementation does nothing and returns false,
+  /// in which case ReadData() reads the file as usual.
+  virtual bool PrefetchData(vtkMRMLNode* refNode);
+
+  /// \brief Return true if WriteData() may be called from a worker thread for this node.
+  ///
+  /// Writing is thread-safe if it does not modify the referenced node (which would
+  /// invoke events that observers, such as the GUI, process on the calling thread)
+  /// and it can run concurrently with other storage nodes.
+  /// Default implementation returns false, in which case the data is always written
+  /// on the main thread.
+  /// \sa vtkMRMLApplicationLogic::SetNumberOfWriteThreads()
+  virtual bool CanWriteDataConcurrently(vtkMRMLNode* refNode);
+
   ///
   /// Write data from a  referenced node
   /// Return 1 on success, 0 on failure.
@@ -318,6 +339,14 @@ public:
   vtkSetMacro(CompressionParameter, std::string);
   vtkGetMacro(CompressionParameter, std::string);
 
+  /// Number of threads that writers supporting parallel compression may use
+  /// to compress the data on write.
+  /// 1 (default) means single-threaded compression, 0 means using all available threads.
+  /// It is a runtime setting, it is not saved in the scene. To use it for all newly
+  /// created storage nodes of a class, set it in the default node of that class.
+  vtkSetClampMacro(NumberOfCompressionThreads, int, 0, VTK_INT_MAX);
+  vtkGetMacro(NumberOfCompressionThreads, int);
+
   /// Returns a list of displayable names of the supported compression presets
   virtual std::vector<std::string> GetCompressionPresetDisplayNames();
 
@@ -384,6 +413,7 @@ protected:
   int ReadState;
   int WriteState;
   std::string CompressionParameter;
+  int NumberOfCompressionThreads;
   std::vector<CompressionPreset> CompressionPresets;
 
   ///
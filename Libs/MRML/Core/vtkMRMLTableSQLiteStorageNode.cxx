@@ -30,9 +30,9 @@
 #include <vtkTable.h>
 #include <vtkStringArray.h>
 #include <vtkBitArray.h>
+#include <vtkDataArray.h>
 #include <vtkNew.h>
 #include <vtkSQLQuery.h>
-#include <vtkRowQueryToTable.h>
 #include <vtkSQLDatabase.h>
 #include <vtkSQLiteDatabase.h>
 #include <vtkSQLiteQuery.h>
@@ -40,6 +40,10 @@
 
 #include <vtksys/SystemTools.hxx>
 
+// STD includes
+#include <map>
+#include <vector>
+
 //------------------------------------------------------------------------------
 vtkMRMLNodeNewMacro(vtkMRMLTableSQLiteStorageNode);
 
@@ -83,6 +87,11 @@ int vtkMRMLTableSQLiteStorageNode::ReadDataInternal(vtkMRMLNode *refNode)
     vtkErrorMacro("ReadData: unable to cast input node " << refNode->GetID() << " to a table node");
     return 0;
     }
+  if (!this->TableName || std::string(this->TableName).empty())
+    {
+    vtkErrorMacro("ReadData: no table name specified");
+    return 0;
+    }
 
   // Check that the file exists
   if (vtksys::SystemTools::FileExists(fullName) == false)
@@ -103,16 +112,73 @@ int vtkMRMLTableSQLiteStorageNode::ReadDataInternal(vtkMRMLNode *refNode)
 
   vtkSmartPointer<vtkSQLiteQuery> query = vtkSmartPointer<vtkSQLiteQuery>::Take(
                    vtkSQLiteQuery::SafeDownCast( database->GetQueryInstance()));
-  std::string queryString("select * from ");
-  queryString += std::string(this->TableName);
-  query->SetQuery(queryString.c_str());
-  query->Execute();
+  std::string quotedTableName = vtkMRMLTableSQLiteStorageNode::QuoteIdentifier(this->TableName);
+
+  // Column array types are determined from the declared column types,
+  // so that columns have the same type in all rows and can be filled without conversion via vtkVariant arrays.
+  std::map<std::string, int> columnTypes;
+  query->SetQuery((std::string("PRAGMA table_info(") + quotedTableName + ");").c_str());
+  if (query->Execute())
+    {
+    while (query->NextRow())
+      {
+      // table_info fields: cid, name, type, notnull, dflt_value, pk
+      columnTypes[query->DataValue(1).ToString()] = vtkMRMLTableSQLiteStorageNode::GetVTKTypeFromSQLiteType(query->DataValue(2).ToString());
+      }
+    }
+  if (columnTypes.empty())
+    {
+    vtkErrorMacro("ReadData: table '" << this->TableName << "' not found in database file '" << fullName << "'");
+    return 0;
+    }
+
+  vtkIdType numberOfRows = 0;
+  query->SetQuery((std::string("SELECT COUNT(*) FROM ") + quotedTableName + ";").c_str());
+  if (query->Execute() && query->NextRow())
+    {
+    numberOfRows = query->DataValue(0).ToTypeInt64();
+    }
+
+  query->SetQuery((std::string("SELECT * FROM ") + quotedTableName + ";").c_str());
+  if (!query->Execute())
+    {
+    vtkErrorMacro("ReadData: failed to read table '" << this->TableName << "' from database file '" << fullName
+      << "': " << (query->GetLastErrorText() ? query->GetLastErrorText() : ""));
+    return 0;
+    }
 
-  vtkSmartPointer<vtkRowQueryToTable> queryToTable = vtkSmartPointer<vtkRowQueryToTable>::New();
-  queryToTable->SetQuery(query);
-  queryToTable->Update();
+  vtkSmartPointer<vtkTable> table = vtkSmartPointer<vtkTable>::New();
+  int numberOfColumns = query->GetNumberOfFields();
+  std::vector<vtkDataArray*> dataColumns(numberOfColumns, nullptr);
+  std::vector<vtkStringArray*> stringColumns(numberOfColumns, nullptr);
+  for (int columnIndex = 0; columnIndex < numberOfColumns; ++columnIndex)
+    {
+    std::string columnName = query->GetFieldName(columnIndex);
+    int columnType = columnTypes.count(columnName) ? columnTypes[columnName] : VTK_STRING;
+    vtkSmartPointer<vtkAbstractArray> column = vtkSmartPointer<vtkAbstractArray>::Take(vtkAbstractArray::CreateArray(columnType));
+    column->SetName(columnName.c_str());
+    column->Allocate(numberOfRows);
+    dataColumns[columnIndex] = vtkDataArray::SafeDownCast(column);
+    stringColumns[columnIndex] = vtkStringArray::SafeDownCast(column);
+    table->AddColumn(column);
+    }
 
-  vtkSmartPointer<vtkTable> table = queryToTable->GetOutput();
+  while (query->NextRow())
+    {
+    for (int columnIndex = 0; columnIndex < numberOfColumns; ++columnIndex)
+      {
+      vtkVariant value = query->DataValue(columnIndex);
+      if (dataColumns[columnIndex])
+        {
+        // NULL values are stored as 0
+        dataColumns[columnIndex]->InsertNextTuple1(value.IsValid() ? value.ToDouble() : 0.0);
+        }
+      else
+        {
+        stringColumns[columnIndex]->InsertNextValue(value.IsValid() ? value.ToString() : vtkStdString());
+        }
+      }
+    }
 
   tableNode->SetAndObserveTable(table);
 
@@ -148,27 +214,20 @@ int vtkMRMLTableSQLiteStorageNode::WriteDataInternal(vtkMRMLNode *refNode)
     return 0;
     }
 
-  std::string dbname = std::string("sqlite://") + fullName;
-
-  //vtkSmartPointer<vtkSQLiteDatabase> database = vtkSmartPointer<vtkSQLiteDatabase>::Take(vtkSQLiteDatabase::SafeDownCast( vtkSQLiteDatabase::CreateFromURL(dbname.c_str())));
-  vtkSQLiteDatabase *database = vtkSQLiteDatabase::SafeDownCast( vtkSQLiteDatabase::CreateFromURL(dbname.c_str()));
-
-  if (!database || !database->Open(this->GetPassword(), vtkSQLiteDatabase::USE_EXISTING_OR_CREATE))
-    {
-    vtkErrorMacro("ReadData: database file '" << fullName << "cannot be opened");
-    return 0;
-    }
-
   vtkTable *table = tableNode->GetTable();
   if (!table)
     {
-    vtkErrorMacro("ReadData: no table to write for the node '" << std::string(tableNode->GetName()));
+    vtkErrorMacro("WriteData: no table to write for the node '" << std::string(tableNode->GetName()));
     return 0;
     }
 
-  if (!this->TableName || std::string(this->TableName).empty())
+  std::string dbname = std::string("sqlite://") + fullName;
+  vtkSmartPointer<vtkSQLiteDatabase> database = vtkSmartPointer<vtkSQLiteDatabase>::Take(
+                   vtkSQLiteDatabase::SafeDownCast( vtkSQLiteDatabase::CreateFromURL(dbname.c_str())));
+
+  if (!database || !database->Open(this->GetPassword(), vtkSQLiteDatabase::USE_EXISTING_OR_CREATE))
     {
-    vtkErrorMacro("ReadData: no table name for the node '" << std::string(tableNode->GetName()));
+    vtkErrorMacro("WriteData: database file '" << fullName << "cannot be opened");
     return 0;
     }
 
@@ -176,96 +235,166 @@ int vtkMRMLTableSQLiteStorageNode::WriteDataInternal(vtkMRMLNode *refNode)
   this->DropTable(this->TableName, database);
 
   //converting this table to SQLite will require two queries: one to create
-  //the table, and another to populate its rows with data.
-  std::string createTableQuery = "CREATE TABLE IF NOT EXISTS ";
-  createTableQuery += this->TableName;
-  createTableQuery += "(";
-
-  std::string insertPreamble = "INSERT into ";
-  insertPreamble += this->TableName;
-  insertPreamble += "(";
+  //the table, and a prepared statement that is executed for each row to populate it.
+  std::string quotedTableName = vtkMRMLTableSQLiteStorageNode::QuoteIdentifier(this->TableName);
+  std::string createTableQuery = "CREATE TABLE IF NOT EXISTS " + quotedTableName + " (";
+  std::string insertQuery = "INSERT INTO " + quotedTableName + " (";
+  std::string insertValues = ") VALUES (";
 
   //get the columns from the vtkTable to finish the query
   vtkIdType numColumns = table->GetNumberOfColumns();
+  std::vector<int> columnTypes(numColumns, VTK_STRING);
   for(vtkIdType i = 0; i < numColumns; i++)
     {
-    //get this column's name
-    std::string columnName = table->GetColumn(i)->GetName();
-    createTableQuery += columnName;
-    insertPreamble += "'" + columnName + "'";
+    vtkAbstractArray* column = table->GetColumn(i);
+    std::string columnName = (column->GetName() ? column->GetName() : "");
+    createTableQuery += vtkMRMLTableSQLiteStorageNode::QuoteIdentifier(columnName);
+    insertQuery += vtkMRMLTableSQLiteStorageNode::QuoteIdentifier(columnName);
+    insertValues += "?";
 
     //figure out what type of data is stored in this column
-    std::string columnType = table->GetColumn(i)->GetClassName();
-
-    if( (columnType.find("String") != std::string::npos) ||
-        (columnType.find("Data") != std::string::npos) ||
-        (columnType.find("Variant") != std::string::npos) )
-      {
-      createTableQuery += " TEXT";
-      }
-    else if( (columnType.find("Double") != std::string::npos) ||
-             (columnType.find("Float") != std::string::npos) )
-      {
-      createTableQuery += " REAL";
-      }
-    else
+    columnTypes[i] = vtkMRMLTableSQLiteStorageNode::GetColumnValueType(column);
+    switch (columnTypes[i])
       {
-      createTableQuery += " INTEGER";
+      case VTK_DOUBLE: createTableQuery += " REAL"; break;
+      case VTK_TYPE_INT64: createTableQuery += " INTEGER"; break;
+      default: createTableQuery += " TEXT"; break;
       }
-    if(i == numColumns - 1)
-      {
-      createTableQuery += ");";
-      insertPreamble += ") VALUES (";
-      }
-    else
+    if(i < numColumns - 1)
       {
       createTableQuery += ", ";
-      insertPreamble += ", ";
+      insertQuery += ", ";
+      insertValues += ", ";
       }
     }
+  createTableQuery += ");";
+  insertQuery += insertValues + ");";
 
   //perform the create table query
-  vtkSQLiteQuery *query =
-    static_cast<vtkSQLiteQuery*>(database->GetQueryInstance());
-
+  vtkSmartPointer<vtkSQLiteQuery> query = vtkSmartPointer<vtkSQLiteQuery>::Take(
+                   vtkSQLiteQuery::SafeDownCast( database->GetQueryInstance()));
   query->SetQuery(createTableQuery.c_str());
-  cout << "creating the table" << endl;
   if(!query->Execute())
     {
-    vtkErrorMacro(<<"Error performing 'create table' query");
+    vtkErrorMacro("WriteData: error performing 'create table' query: "
+      << (query->GetLastErrorText() ? query->GetLastErrorText() : ""));
+    return 0;
     }
 
-  //iterate over the rows of the vtkTable to complete the insert query
+  // Insert all rows in a single transaction, as each transaction requires syncing the database file.
+  if (!query->BeginTransaction())
+    {
+    vtkErrorMacro("WriteData: failed to start transaction: "
+      << (query->GetLastErrorText() ? query->GetLastErrorText() : ""));
+    return 0;
+    }
+  query->SetQuery(insertQuery.c_str());
   vtkIdType numRows = table->GetNumberOfRows();
   for(vtkIdType i = 0; i < numRows; i++)
     {
-    std::string insertQuery = insertPreamble;
     for (vtkIdType j = 0; j < numColumns; j++)
       {
-      insertQuery += "'" + table->GetValue(i, j).ToString() + "'";
-      if(j < numColumns - 1)
+      vtkAbstractArray* column = table->GetColumn(j);
+      int parameterIndex = static_cast<int>(j);
+      if (columnTypes[j] == VTK_DOUBLE)
         {
-        insertQuery += ", ";
+        query->BindParameter(parameterIndex, vtkArrayDownCast<vtkDataArray>(column)->GetComponent(i, 0));
+        }
+      else if (columnTypes[j] == VTK_TYPE_INT64)
+        {
+        query->BindParameter(parameterIndex, static_cast<long long>(column->GetVariantValue(i).ToTypeInt64()));
+        }
+      else if (vtkStringArray* stringColumn = vtkArrayDownCast<vtkStringArray>(column))
+        {
+        const vtkStdString& value = stringColumn->GetValue(i);
+        query->BindParameter(parameterIndex, value.c_str(), value.size());
+        }
+      else
+        {
+        vtkStdString value = table->GetValue(i, j).ToString();
+        query->BindParameter(parameterIndex, value.c_str(), value.size());
         }
       }
-    insertQuery += ");";
     //perform the insert query for this row
-    query->SetQuery(insertQuery.c_str());
     if(!query->Execute())
       {
-      vtkErrorMacro(<<"Error performing 'insert' query");
+      vtkErrorMacro("WriteData: error performing 'insert' query: "
+        << (query->GetLastErrorText() ? query->GetLastErrorText() : ""));
+      query->RollbackTransaction();
+      return 0;
       }
     }
+  if (!query->CommitTransaction())
+    {
+    vtkErrorMacro("WriteData: failed to commit transaction: "
+      << (query->GetLastErrorText() ? query->GetLastErrorText() : ""));
+    return 0;
+    }
 
   //cleanup and return
-  query->Delete();
+  query = nullptr;
   database->Close();
-  database->Delete();
 
   vtkDebugMacro("WriteData: successfully wrote table to database: " << fullName);
   return 1;
 }
 
+//----------------------------------------------------------------------------
+std::string vtkMRMLTableSQLiteStorageNode::QuoteIdentifier(const std::string& identifier)
+{
+  std::string quoted = "\"";
+  for (char c : identifier)
+    {
+    if (c == '"')
+      {
+      quoted += '"';
+      }
+    quoted += c;
+    }
+  quoted += "\"";
+  return quoted;
+}
+
+//----------------------------------------------------------------------------
+int vtkMRMLTableSQLiteStorageNode::GetColumnValueType(vtkAbstractArray* column)
+{
+  vtkDataArray* dataColumn = vtkDataArray::SafeDownCast(column);
+  if (!dataColumn || dataColumn->GetNumberOfComponents() != 1)
+    {
+    return VTK_STRING;
+    }
+  int dataType = dataColumn->GetDataType();
+  if (dataType == VTK_FLOAT || dataType == VTK_DOUBLE)
+    {
+    return VTK_DOUBLE;
+    }
+  return VTK_TYPE_INT64;
+}
+
+//----------------------------------------------------------------------------
+int vtkMRMLTableSQLiteStorageNode::GetVTKTypeFromSQLiteType(const std::string& declaredType)
+{
+  // Column affinity rules of SQLite (https://www.sqlite.org/datatype3.html)
+  std::string type = vtksys::SystemTools::UpperCase(declaredType);
+  if (type.find("INT") != std::string::npos)
+    {
+    return VTK_INT;
+    }
+  if (type.find("CHAR") != std::string::npos || type.find("CLOB") != std::string::npos
+    || type.find("TEXT") != std::string::npos || type.empty() || type.find("BLOB") != std::string::npos)
+    {
+    return VTK_STRING;
+    }
+  if (type.find("REAL") != std::string::npos || type.find("FLOA") != std::string::npos
+    || type.find("DOUB") != std::string::npos)
+    {
+    return VTK_DOUBLE;
+    }
+  // NUMERIC affinity
+  return VTK_DOUBLE;
+}
+
+//----------------------------------------------------------------------------
 int vtkMRMLTableSQLiteStorageNode::DropTable(char *tableName, vtkSQLiteDatabase* database)
 {
   if(!tableName || std::string(tableName).empty())
@@ -289,7 +418,7 @@ int vtkMRMLTableSQLiteStorageNode::DropTable(char *tableName, vtkSQLiteDatabase*
     if (!tables->GetValue(i).compare(tableName))
       {
       std::string dropTableQuery = "DROP TABLE ";
-      dropTableQuery += tableName;
+      dropTableQuery += vtkMRMLTableSQLiteStorageNode::QuoteIdentifier(tableName);
       query->SetQuery(dropTableQuery.c_str());
       query->Execute();
       break;
@@ -32,6 +32,7 @@
 ///
 ///
 
+class vtkAbstractArray;
 class vtkSQLiteDatabase;
 
 class VTK_MRML_EXPORT vtkMRMLTableSQLiteStorageNode : public vtkMRMLStorageNode
@@ -60,6 +61,9 @@ public:
   /// Drop a specified table from the database
   static int DropTable(char *tableName, vtkSQLiteDatabase* database);
 
+  /// Return identifier (table or column name) in double quotes, to be used in SQL queries.
+  static std::string QuoteIdentifier(const std::string& identifier);
+
 protected:
   vtkMRMLTableSQLiteStorageNode();
   ~vtkMRMLTableSQLiteStorageNode() override;
@@ -78,6 +82,13 @@ protected:
   /// Write data from a  referenced node. Returns 0 on failure.
   int WriteDataInternal(vtkMRMLNode *refNode) override;
 
+  /// Return how values of the column are stored in the database:
+  /// VTK_DOUBLE (REAL), VTK_TYPE_INT64 (INTEGER), or VTK_STRING (TEXT).
+  static int GetColumnValueType(vtkAbstractArray* column);
+
+  /// Return VTK array type for storing values of a column with the specified declared SQLite type.
+  static int GetVTKTypeFromSQLiteType(const std::string& declaredType);
+
   char *TableName;
   char *Password;
 };
@@ -21,15 +21,24 @@
 // MRML includes
 #include "vtkMRMLApplicationLogic.h"
 #include "vtkMRMLCoreTestingMacros.h"
+#include <vtkMRMLModelNode.h>
+#include <vtkMRMLNRRDStorageNode.h>
+#include <vtkMRMLScalarVolumeNode.h>
 #include <vtkMRMLScene.h>
 #include <vtkMRMLSliceNode.h>
+#include <vtkMRMLStorageNode.h>
 
 // VTK includes
+#include <vtkCellArray.h>
 #include <vtkCollection.h>
+#include <vtkImageData.h>
 #include <vtkNew.h>
+#include <vtkPoints.h>
+#include <vtkPolyData.h>
 #include <vtksys/SystemTools.hxx>
 
 // STD includes
+#include <cstring>
 #include <sstream>
 #include <string>
 
@@ -39,6 +48,7 @@ int SliceLogicsTest();
 int SliceOrientationPresetInitializationTest();
 int TemporaryPathTest();
 int CreateUniqueFileNameTest(std::string tempDir);
+int SaveSceneToSlicerDataBundleDirectoryTest(std::string tempDir, int numberOfWriteThreads);
 
 //-----------------------------------------------------------------------------
 int vtkMRMLApplicationLogicTest1(int argc, char *argv [])
@@ -57,6 +67,8 @@ int vtkMRMLApplicationLogicTest1(int argc, char *argv [])
   CHECK_EXIT_SUCCESS(SliceOrientationPresetInitializationTest());
   CHECK_EXIT_SUCCESS(TemporaryPathTest());
   CHECK_EXIT_SUCCESS(CreateUniqueFileNameTest(tempDir));
+  CHECK_EXIT_SUCCESS(SaveSceneToSlicerDataBundleDirectoryTest(tempDir, 1));
+  CHECK_EXIT_SUCCESS(SaveSceneToSlicerDataBundleDirectoryTest(tempDir, 4));
   return EXIT_SUCCESS;
 }
 
@@ -239,3 +251,89 @@ int CreateUniqueFileNameTest(std::string tempDir)
 
   return EXIT_SUCCESS;
 }
+
+//-----------------------------------------------------------------------------
+int SaveSceneToSlicerDataBundleDirectoryTest(std::string tempDir, int numberOfWriteThreads)
+{
+  vtkNew<vtkMRMLScene> scene;
+  vtkNew<vtkMRMLApplicationLogic> appLogic;
+  appLogic->SetMRMLScene(scene.GetPointer());
+  appLogic->SetNumberOfWriteThreads(numberOfWriteThreads);
+  CHECK_INT(appLogic->GetNumberOfWriteThreads(), numberOfWriteThreads);
+
+  // Models with the same name must be written into different files
+  const int numberOfModels = 6;
+  for (int i = 0; i < numberOfModels; ++i)
+    {
+    vtkNew<vtkPoints> points;
+    points->InsertNextPoint(0.0, 0.0, i);
+    points->InsertNextPoint(1.0, 0.0, i);
+    points->InsertNextPoint(0.0, 1.0, i);
+    vtkNew<vtkCellArray> polys;
+    vtkIdType triangle[3] = { 0, 1, 2 };
+    polys->InsertNextCell(3, triangle);
+    vtkNew<vtkPolyData> polyData;
+    polyData->SetPoints(points.GetPointer());
+    polyData->SetPolys(polys.GetPointer());
+    vtkMRMLModelNode* modelNode = vtkMRMLModelNode::SafeDownCast(scene->AddNewNodeByClass("vtkMRMLModelNode"));
+    CHECK_NOT_NULL(modelNode);
+    modelNode->SetName("Model");
+    modelNode->SetAndObservePolyData(polyData.GetPointer());
+    }
+
+  // Volumes can be written concurrently, models are always written on the main thread
+  const int numberOfVolumes = 4;
+  for (int i = 0; i < numberOfVolumes; ++i)
+    {
+    vtkNew<vtkImageData> imageData;
+    imageData->SetDimensions(10, 12, 8);
+    imageData->AllocateScalars(VTK_UNSIGNED_CHAR, 1);
+    memset(imageData->GetScalarPointer(), i, imageData->GetNumberOfPoints());
+    vtkMRMLScalarVolumeNode* volumeNode = vtkMRMLScalarVolumeNode::SafeDownCast(
+      scene->AddNewNodeByClass("vtkMRMLScalarVolumeNode", "Volume"));
+    CHECK_NOT_NULL(volumeNode);
+    volumeNode->SetAndObserveImageData(imageData.GetPointer());
+    vtkMRMLNRRDStorageNode* storageNode = vtkMRMLNRRDStorageNode::SafeDownCast(
+      scene->AddNewNodeByClass("vtkMRMLNRRDStorageNode"));
+    CHECK_NOT_NULL(storageNode);
+    volumeNode->SetAndObserveStorageNodeID(storageNode->GetID());
+    CHECK_BOOL(storageNode->CanWriteDataConcurrently(volumeNode), true);
+    }
+  vtkMRMLModelNode* firstModelNode = vtkMRMLModelNode::SafeDownCast(scene->GetFirstNodeByClass("vtkMRMLModelNode"));
+  firstModelNode->AddDefaultStorageNode();
+  CHECK_BOOL(firstModelNode->GetStorageNode()->CanWriteDataConcurrently(firstModelNode), false);
+
+  std::stringstream sdbDirStream;
+  sdbDirStream << tempDir << "/SaveSceneToSlicerDataBundleDirectoryTest" << numberOfWriteThreads;
+  std::string sdbDir = vtksys::SystemTools::CollapseFullPath(sdbDirStream.str());
+  vtksys::SystemTools::MakeDirectory(sdbDir);
+  CHECK_BOOL(appLogic->SaveSceneToSlicerDataBundleDirectory(sdbDir.c_str()), true);
+
+  CHECK_BOOL(vtksys::SystemTools::FileExists(sdbDir + "/" + vtksys::SystemTools::GetFilenameName(sdbDir) + ".mrml", true), true);
+  CHECK_BOOL(vtksys::SystemTools::FileExists(sdbDir + "/Data/Model.vtk", true), true);
+  for (int i = 1; i < numberOfModels; ++i)
+    {
+    std::stringstream fileName;
+    fileName << sdbDir << "/Data/Model_" << i << ".vtk";
+    CHECK_BOOL(vtksys::SystemTools::FileExists(fileName.str(), true), true);
+    }
+
+  CHECK_BOOL(vtksys::SystemTools::FileExists(sdbDir + "/Data/Volume.nhdr", true), true);
+  for (int i = 1; i < numberOfVolumes; ++i)
+    {
+    std::stringstream fileName;
+    fileName << sdbDir << "/Data/Volume_" << i << ".nhdr";
+    CHECK_BOOL(vtksys::SystemTools::FileExists(fileName.str(), true), true);
+    }
+
+  // Original file names are restored after saving
+  for (int i = 0; i < numberOfModels; ++i)
+    {
+    vtkMRMLModelNode* modelNode = vtkMRMLModelNode::SafeDownCast(scene->GetNthNodeByClass(i, "vtkMRMLModelNode"));
+    CHECK_NOT_NULL(modelNode->GetStorageNode());
+    CHECK_BOOL(modelNode->GetStorageNode()->GetFileName() == nullptr
+      || strlen(modelNode->GetStorageNode()->GetFileName()) == 0, true);
+    }
+
+  return EXIT_SUCCESS;
+}
@@ -45,6 +45,7 @@
 // VTK includes
 #include <vtkCollection.h>
 #include <vtkImageData.h>
+#include <vtkMultiThreader.h>
 #include <vtkNew.h>
 #include <vtkObjectFactory.h>
 #include <vtkPNGWriter.h>
@@ -55,7 +56,10 @@
 #include <vtksys/Glob.hxx>
 
 // STD includes
+#include <algorithm>
+#include <atomic>
 #include <cassert>
+#include <set>
 #include <sstream>
 
 // For LoadDefaultParameterSets
@@ -86,9 +90,108 @@ public:
   vtkSmartPointer<vtkMRMLViewLinkLogic> ViewLinkLogic;
   vtkSmartPointer<vtkMRMLColorLogic> ColorLogic;
   std::string TemporaryPath;
+  int NumberOfWriteThreads;
+  /// File names of storage nodes that will be written in the data bundle directory
+  /// but that have not been written yet.
+  std::set<std::string> PendingWriteFileNames;
+};
+
+namespace
+{
 
+//----------------------------------------------------------------------------
+struct ConcurrentWriteInfo
+{
+  const std::vector<vtkMRMLStorableNode*>* StorableNodes;
+  std::atomic<size_t> NextNodeIndex;
 };
 
+//----------------------------------------------------------------------------
+VTK_THREAD_RETURN_TYPE WriteStorableNodesThreadFunction(void* arg)
+{
+  vtkMultiThreader::ThreadInfo* threadInfo = static_cast<vtkMultiThreader::ThreadInfo*>(arg);
+  ConcurrentWriteInfo* info = static_cast<ConcurrentWriteInfo*>(threadInfo->UserData);
+  // Each thread picks the next node that is not written yet, as writing time varies a lot between nodes
+  for (size_t nodeIndex = info->NextNodeIndex++; nodeIndex < info->StorableNodes->size(); nodeIndex = info->NextNodeIndex++)
+    {
+    vtkMRMLStorableNode* storableNode = (*info->StorableNodes)[nodeIndex];
+    storableNode->GetStorageNode()->WriteData(storableNode);
+    }
+  return VTK_THREAD_RETURN_VALUE;
+}
+
+//----------------------------------------------------------------------------
+std::string CreateUniqueFileNameExcluding(const std::string &filename, const std::string& knownExtension,
+  const std::set<std::string>& reservedFileNames)
+{
+  auto fileNameExists = [&reservedFileNames](const std::string& name)
+    {
+    return vtksys::SystemTools::FileExists(name.c_str()) || reservedFileNames.count(name) > 0;
+    };
+
+  if (!fileNameExists(filename))
+    {
+    // filename is unique already
+    return filename;
+    }
+
+  std::string extension = knownExtension;
+  if (extension.empty())
+    {
+    // if there is no information about the file extension then we
+    // assume it is the last extension
+    extension = vtksys::SystemTools::GetFilenameLastExtension(filename);
+    }
+
+  std::string baseName = filename.substr(0, filename.size()-extension.size());
+
+  // If there is a numeric suffix, separated by underscore (somefile_23)
+  // then use the string before the separator (somefile) as basename and increment the suffix value.
+  int suffix = 0;
+
+  std::size_t filenameStartPosition1 = baseName.find_last_of("/");
+  std::size_t filenameStartPosition2 = baseName.find_last_of("\\");
+  std::size_t filenameStartPosition = 0;
+  if (filenameStartPosition1 != std::string::npos && filenameStartPosition < filenameStartPosition1)
+    {
+    filenameStartPosition = filenameStartPosition1;
+    }
+  if (filenameStartPosition2 != std::string::npos && filenameStartPosition < filenameStartPosition2)
+    {
+    filenameStartPosition = filenameStartPosition2;
+    }
+
+  std::size_t separatorPosition = baseName.find_last_of("_");
+  if (separatorPosition != std::string::npos && separatorPosition > filenameStartPosition)
+    {
+    std::string suffixStr = baseName.substr(separatorPosition + 1, baseName.size() - separatorPosition - 1);
+    std::stringstream ss(suffixStr);
+    if (!(ss >> suffix).fail())
+      {
+      // numeric suffix found successfully
+      // remove the suffix from the base name
+      baseName = baseName.substr(0, separatorPosition);
+      }
+    }
+
+  std::string uniqueFilename;
+  while (true)
+    {
+    ++suffix;
+    std::stringstream ss;
+    ss << baseName << "_" << suffix << extension;
+    uniqueFilename = ss.str();
+    if (!fileNameExists(uniqueFilename))
+      {
+      // found unique filename
+      break;
+      }
+    }
+  return uniqueFilename;
+}
+
+} // end of anonymous namespace
+
 //----------------------------------------------------------------------------
 // vtkInternal methods
 
@@ -99,6 +202,7 @@ vtkMRMLApplicationLogic::vtkInternal::vtkInternal(vtkMRMLApplicationLogic* exter
   this->SliceLinkLogic = vtkSmartPointer<vtkMRMLSliceLinkLogic>::New();
   this->ViewLinkLogic = vtkSmartPointer<vtkMRMLViewLinkLogic>::New();
   this->ColorLogic = vtkSmartPointer<vtkMRMLColorLogic>::New();
+  this->NumberOfWriteThreads = 1;
 }
 
 //----------------------------------------------------------------------------
@@ -168,6 +272,7 @@ vtkMRMLApplicationLogic::~vtkMRMLApplicationLogic()
 void vtkMRMLApplicationLogic::PrintSelf(ostream& os, vtkIndent indent)
 {
   this->Superclass::PrintSelf(os, indent);
+  os << indent << "NumberOfWriteThreads: " << this->Internal->NumberOfWriteThreads << "\n";
 }
 
 //----------------------------------------------------------------------------
@@ -735,6 +840,10 @@ bool vtkMRMLApplicationLogic::SaveSceneToSlicerDataBundleDirectory(const char* s
   this->OriginalStorageNodeFileNames.clear();
 
   std::map<std::string, vtkMRMLNode *> storableNodes;
+  // Nodes of the main scene that are written after all file names are set, if nodes are written concurrently
+  std::vector<vtkMRMLStorableNode*> storableNodesToWrite;
+  bool writeConcurrently = (this->Internal->NumberOfWriteThreads != 1);
+  this->Internal->PendingWriteFileNames.clear();
 
   int numNodes = this->GetMRMLScene()->GetNumberOfNodes();
   for (int i = 0; i < numNodes; ++i)
@@ -751,7 +860,17 @@ bool vtkMRMLApplicationLogic::SaveSceneToSlicerDataBundleDirectory(const char* s
       // and store them in the map by ID to avoid duplicates for the scene views
       vtkMRMLStorableNode* storableNode = vtkMRMLStorableNode::SafeDownCast(mrmlNode);
 
-      this->SaveStorableNodeToSlicerDataBundleDirectory(storableNode, dataDir);
+      if (writeConcurrently)
+        {
+        if (this->PrepareStorableNodeForSlicerDataBundleDirectory(storableNode, dataDir))
+          {
+          storableNodesToWrite.push_back(storableNode);
+          }
+        }
+      else
+        {
+        this->SaveStorableNodeToSlicerDataBundleDirectory(storableNode, dataDir);
+        }
 
       storableNodes[std::string(storableNode->GetID())] = storableNode;
       }
@@ -811,6 +930,10 @@ bool vtkMRMLApplicationLogic::SaveSceneToSlicerDataBundleDirectory(const char* s
       }
     }
 
+  // write data files of all nodes before the scene file
+  this->WriteStorableNodesConcurrently(storableNodesToWrite);
+  this->Internal->PendingWriteFileNames.clear();
+
   // write the scene to disk, changes paths to relative
   vtkDebugMacro("calling commit on the scene, to url " << this->GetMRMLScene()->GetURL());
   this->GetMRMLScene()->Commit();
@@ -900,10 +1023,22 @@ bool vtkMRMLApplicationLogic::SaveSceneToSlicerDataBundleDirectory(const char* s
 void vtkMRMLApplicationLogic::SaveStorableNodeToSlicerDataBundleDirectory(vtkMRMLStorableNode* storableNode,
                                                                           std::string &dataDir)
 {
-  if (!storableNode || !storableNode->GetSaveWithScene())
+  vtkMRMLStorageNode* storageNode = this->PrepareStorableNodeForSlicerDataBundleDirectory(storableNode, dataDir);
+  if (!storageNode)
     {
     return;
     }
+  storageNode->WriteData(storableNode);
+}
+
+//----------------------------------------------------------------------------
+vtkMRMLStorageNode* vtkMRMLApplicationLogic::PrepareStorableNodeForSlicerDataBundleDirectory(
+  vtkMRMLStorableNode* storableNode, std::string &dataDir)
+{
+  if (!storableNode || !storableNode->GetSaveWithScene())
+    {
+    return nullptr;
+    }
   // adjust the file paths for storable nodes
   vtkMRMLStorageNode* storageNode = storableNode->GetStorageNode();
   if (!storageNode)
@@ -914,7 +1049,7 @@ void vtkMRMLApplicationLogic::SaveStorableNodeToSlicerDataBundleDirectory(vtkMRM
     if (!storageNode)
       {
       // no need for storage node to store this node
-      return;
+      return nullptr;
       }
     }
 
@@ -961,81 +1096,108 @@ void vtkMRMLApplicationLogic::SaveStorableNodeToSlicerDataBundleDirectory(vtkMRM
     << " file name is now: " << storageNode->GetFileName());
 
   // Make sure the filename is unique (default filenames may be the same if for example there are multiple
-  // nodes with the same name).
+  // nodes with the same name). Files that will be written later are considered existing, too.
   std::string existingFileName = (storageNode->GetFileName() ? storageNode->GetFileName() : "");
-  if (vtksys::SystemTools::FileExists(existingFileName, true))
+  if (vtksys::SystemTools::FileExists(existingFileName, true)
+    || this->Internal->PendingWriteFileNames.count(existingFileName) > 0)
     {
     std::string currentExtension = storageNode->GetSupportedFileExtension(existingFileName.c_str());
-    std::string uniqueFileName = this->CreateUniqueFileName(existingFileName, currentExtension);
+    std::string uniqueFileName = CreateUniqueFileNameExcluding(existingFileName, currentExtension,
+      this->Internal->PendingWriteFileNames);
     vtkDebugMacro("file " << existingFileName << " already exists, use " << uniqueFileName << " filename instead");
     storageNode->SetFileName(uniqueFileName.c_str());
     }
+  if (storageNode->GetFileName())
+    {
+    this->Internal->PendingWriteFileNames.insert(storageNode->GetFileName());
+    }
 
-  storageNode->WriteData(storableNode);
- }
+  return storageNode;
+}
 
 //----------------------------------------------------------------------------
-std::string vtkMRMLApplicationLogic::CreateUniqueFileName(const std::string &filename, const std::string& knownExtension)
+void vtkMRMLApplicationLogic::WriteStorableNodesConcurrently(const std::vector<vtkMRMLStorableNode*>& storableNodes)
 {
-  if (!vtksys::SystemTools::FileExists(filename.c_str()))
+  int numberOfThreads = this->Internal->NumberOfWriteThreads;
+  if (numberOfThreads <= 0)
     {
-    // filename is unique already
-    return filename;
+    numberOfThreads = vtkMultiThreader::GetGlobalDefaultNumberOfThreads();
     }
 
-  std::string extension = knownExtension;
-  if (extension.empty())
+  // Only storage nodes that are known to not modify the node are written on worker threads,
+  // others would invoke events (processed by the GUI) from the worker threads.
+  std::vector<vtkMRMLStorableNode*> concurrentStorableNodes;
+  std::vector<vtkMRMLStorableNode*> sequentialStorableNodes;
+  for (vtkMRMLStorableNode* storableNode : storableNodes)
     {
-    // if there is no information about the file extension then we
-    // assume it is the last extension
-    extension = vtksys::SystemTools::GetFilenameLastExtension(filename);
+    if (numberOfThreads > 1 && storableNode->GetStorageNode()->CanWriteDataConcurrently(storableNode))
+      {
+      concurrentStorableNodes.push_back(storableNode);
+      }
+    else
+      {
+      sequentialStorableNodes.push_back(storableNode);
+      }
     }
 
-  std::string baseName = filename.substr(0, filename.size()-extension.size());
+  if (!concurrentStorableNodes.empty())
+    {
+    numberOfThreads = std::max(1, std::min(std::min(numberOfThreads, VTK_MAX_THREADS),
+      static_cast<int>(concurrentStorableNodes.size())));
+
+    // Modified events of the nodes would be invoked from worker threads,
+    // defer them until all nodes are written.
+    std::vector<int> storableNodeWasModifying;
+    std::vector<int> storageNodeWasModifying;
+    for (vtkMRMLStorableNode* storableNode : concurrentStorableNodes)
+      {
+      storableNodeWasModifying.push_back(storableNode->StartModify());
+      storageNodeWasModifying.push_back(storableNode->GetStorageNode()->StartModify());
+      }
 
-  // If there is a numeric suffix, separated by underscore (somefile_23)
-  // then use the string before the separator (somefile) as basename and increment the suffix value.
-  int suffix = 0;
+    ConcurrentWriteInfo info;
+    info.StorableNodes = &concurrentStorableNodes;
+    info.NextNodeIndex = 0;
+    vtkNew<vtkMultiThreader> threader;
+    threader->SetNumberOfThreads(numberOfThreads);
+    threader->SetSingleMethod(WriteStorableNodesThreadFunction, &info);
+    threader->SingleMethodExecute();
 
-  std::size_t filenameStartPosition1 = baseName.find_last_of("/");
-  std::size_t filenameStartPosition2 = baseName.find_last_of("\\");
-  std::size_t filenameStartPosition = 0;
-  if (filenameStartPosition1 != std::string::npos && filenameStartPosition < filenameStartPosition1)
-    {
-    filenameStartPosition = filenameStartPosition1;
-    }
-  if (filenameStartPosition2 != std::string::npos && filenameStartPosition < filenameStartPosition2)
-    {
-    filenameStartPosition = filenameStartPosition2;
+    for (size_t nodeIndex = 0; nodeIndex < concurrentStorableNodes.size(); ++nodeIndex)
+      {
+      concurrentStorableNodes[nodeIndex]->GetStorageNode()->EndModify(storageNodeWasModifying[nodeIndex]);
+      concurrentStorableNodes[nodeIndex]->EndModify(storableNodeWasModifying[nodeIndex]);
+      }
     }
 
-  std::size_t separatorPosition = baseName.find_last_of("_");
-  if (separatorPosition != std::string::npos && separatorPosition > filenameStartPosition)
+  for (vtkMRMLStorableNode* storableNode : sequentialStorableNodes)
     {
-    std::string suffixStr = baseName.substr(separatorPosition + 1, baseName.size() - separatorPosition - 1);
-    std::stringstream ss(suffixStr);
-    if (!(ss >> suffix).fail())
-      {
-      // numeric suffix found successfully
-      // remove the suffix from the base name
-      baseName = baseName.substr(0, separatorPosition);
-      }
+    storableNode->GetStorageNode()->WriteData(storableNode);
     }
+}
 
-  std::string uniqueFilename;
-  while (true)
+//----------------------------------------------------------------------------
+void vtkMRMLApplicationLogic::SetNumberOfWriteThreads(int numberOfThreads)
+{
+  numberOfThreads = std::max(0, numberOfThreads);
+  if (this->Internal->NumberOfWriteThreads == numberOfThreads)
     {
-    ++suffix;
-    std::stringstream ss;
-    ss << baseName << "_" << suffix << extension;
-    uniqueFilename = ss.str();
-    if (!vtksys::SystemTools::FileExists(uniqueFilename))
-      {
-      // found unique filename
-      break;
-      }
+    return;
     }
-  return uniqueFilename;
+  this->Internal->NumberOfWriteThreads = numberOfThreads;
+  this->Modified();
+}
+
+//----------------------------------------------------------------------------
+int vtkMRMLApplicationLogic::GetNumberOfWriteThreads()
+{
+  return this->Internal->NumberOfWriteThreads;
+}
+
+//----------------------------------------------------------------------------
+std::string vtkMRMLApplicationLogic::CreateUniqueFileName(const std::string &filename, const std::string& knownExtension)
+{
+  return CreateUniqueFileNameExcluding(filename, knownExtension, std::set<std::string>());
 }
 
 //----------------------------------------------------------------------------
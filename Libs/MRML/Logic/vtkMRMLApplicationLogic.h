@@ -161,6 +161,14 @@ public:
   /// Returns false if the save failed
   bool SaveSceneToSlicerDataBundleDirectory(const char* sdbDir, vtkImageData* screenShot = nullptr);
 
+  /// Maximum number of storable nodes that SaveSceneToSlicerDataBundleDirectory writes concurrently.
+  /// 1 (default) writes the nodes one after the other, 0 uses the default number of threads of vtkMultiThreader.
+  /// The scene file is always written after all the data files are written.
+  /// Only nodes whose storage node reports that writing is thread-safe are written on worker threads
+  /// (see vtkMRMLStorageNode::CanWriteDataConcurrently()), all other nodes are written on the main thread.
+  void SetNumberOfWriteThreads(int numberOfThreads);
+  int GetNumberOfWriteThreads();
+
   /// Open the file into a temp directory and load the scene file
   /// inside.  Note that the first mrml file found in the extracted
   /// directory will be used.
@@ -244,6 +252,16 @@ protected:
   void SaveStorableNodeToSlicerDataBundleDirectory(vtkMRMLStorableNode* storableNode,
                                                  std::string &dataDir);
 
+  /// Update file name of the storage node of a storable node for saving into the data bundle directory.
+  /// Returns the storage node that must write the node, nullptr if the node does not need to be written.
+  vtkMRMLStorageNode* PrepareStorableNodeForSlicerDataBundleDirectory(vtkMRMLStorableNode* storableNode,
+                                                                      std::string &dataDir);
+
+  /// Write the storable nodes using their storage node, concurrently using NumberOfWriteThreads threads.
+  /// Nodes that cannot be written concurrently are written afterward on the calling thread.
+  /// Errors are reported by the storage nodes, as in vtkMRMLStorageNode::WriteData.
+  void WriteStorableNodesConcurrently(const std::vector<vtkMRMLStorableNode*>& storableNodes);
+
 private:
 
   /// use a map to store the file names from a storage node, the 0th one is by
@@ -38,6 +38,9 @@
 #include "vtkSegmentationConverterFactory.h"
 #include "vtkSegmentationHistory.h"
 
+// STD includes
+#include <cstring>
+#include <vector>
 
 int CreateCubeLabelmap(vtkOrientedImageData* imageData, int extent[6]);
 void SetReferenceGeometry(vtkSegmentation*);
@@ -68,6 +71,25 @@ int GetVoxelCount(vtkImageData* labelmap, int labelValue)
   return accumulate->GetVoxelCount();
 }
 
+//----------------------------------------------------------------------------
+bool AreLabelmapsEqual(vtkOrientedImageData* labelmap1, vtkOrientedImageData* labelmap2)
+{
+  if (!vtkOrientedImageDataResample::DoGeometriesMatch(labelmap1, labelmap2)
+    || !vtkOrientedImageDataResample::DoExtentsMatch(labelmap1, labelmap2))
+    {
+    return false;
+    }
+  vtkDataArray* scalars1 = labelmap1->GetPointData()->GetScalars();
+  vtkDataArray* scalars2 = labelmap2->GetPointData()->GetScalars();
+  if (!scalars1 || !scalars2 || scalars1->GetDataType() != scalars2->GetDataType()
+    || scalars1->GetDataSize() != scalars2->GetDataSize())
+    {
+    return false;
+    }
+  return memcmp(scalars1->GetVoidPointer(0), scalars2->GetVoidPointer(0),
+    scalars1->GetDataSize() * scalars1->GetDataTypeSize()) == 0;
+}
+
 //----------------------------------------------------------------------------
 int vtkSegmentationHistoryTest1(int vtkNotUsed(argc), char* vtkNotUsed(argv)[])
 {
@@ -178,6 +200,100 @@ int vtkSegmentationHistoryTest1(int vtkNotUsed(argc), char* vtkNotUsed(argv)[])
     return EXIT_FAILURE;
     }
 
+  /////////////////////////////////////////////////
+  // Test undo/redo of multiple states
+  // Earlier states are stored as differences, restored
+  // labelmaps should be identical to the saved ones
+  /////////////////////////////////////////////////
+  history->SetMaximumNumberOfStates(10);
+  std::vector<vtkSmartPointer<vtkOrientedImageData> > expectedLabelmaps;
+  vtkOrientedImageData* currentLabelmap = redoLabelmap;
+  for (int i = 0; i < 4; ++i)
+    {
+    vtkSmartPointer<vtkOrientedImageData> expectedLabelmap = vtkSmartPointer<vtkOrientedImageData>::New();
+    expectedLabelmap->DeepCopy(currentLabelmap);
+    expectedLabelmaps.push_back(expectedLabelmap);
+    if (i == 3)
+      {
+      // last state is not saved, it is saved by the first undo
+      break;
+      }
+    history->SaveState();
+    int stepExtent[6] = { 2 * i, 2 * i + 3, 0, 3, 20, 23 };
+    vtkNew<vtkOrientedImageData> stepModifierLabelmap;
+    CreateCubeLabelmap(stepModifierLabelmap, stepExtent);
+    vtkOrientedImageDataResample::ModifyImage(currentLabelmap, stepModifierLabelmap,
+      vtkOrientedImageDataResample::OPERATION_MASKING, nullptr, 0.0, 3.0 + i);
+    }
+
+  for (int i = 2; i >= 0; --i)
+    {
+    history->RestorePreviousState();
+    currentLabelmap = vtkOrientedImageData::SafeDownCast(segment1->GetRepresentation(vtkSegmentationConverter::GetBinaryLabelmapRepresentationName()));
+    if (!AreLabelmapsEqual(currentLabelmap, expectedLabelmaps[i]))
+      {
+      std::cerr << "Labelmap restored by undo does not match saved labelmap " << i << std::endl;
+      return EXIT_FAILURE;
+      }
+    if (currentLabelmap != segment2->GetRepresentation(vtkSegmentationConverter::GetBinaryLabelmapRepresentationName()))
+      {
+      std::cerr << "Segments should share the labelmap restored by undo" << std::endl;
+      return EXIT_FAILURE;
+      }
+    }
+  if (!StateCountCheck(history, 7))
+    {
+    return EXIT_FAILURE;
+    }
+
+  for (int i = 1; i <= 3; ++i)
+    {
+    history->RestoreNextState();
+    currentLabelmap = vtkOrientedImageData::SafeDownCast(segment1->GetRepresentation(vtkSegmentationConverter::GetBinaryLabelmapRepresentationName()));
+    if (!AreLabelmapsEqual(currentLabelmap, expectedLabelmaps[i]))
+      {
+      std::cerr << "Labelmap restored by redo does not match saved labelmap " << i << std::endl;
+      return EXIT_FAILURE;
+      }
+    }
+
+  /////////////////////////////////////////////////
+  // Test memory usage
+  // Only the most recent state contains a complete labelmap
+  /////////////////////////////////////////////////
+  unsigned long labelmapMemoryUsage = currentLabelmap->GetActualMemorySize();
+  if (history->GetMemoryUsage() >= 3 * labelmapMemoryUsage)
+    {
+    std::cerr << "Memory usage of 7 states (" << history->GetMemoryUsage() << " KiB) should be less than "
+      << "the memory usage of 3 labelmaps (" << 3 * labelmapMemoryUsage << " KiB)" << std::endl;
+    return EXIT_FAILURE;
+    }
+
+  // Oldest states are removed if the memory limit is exceeded
+  history->SetMaximumMemoryUsage(labelmapMemoryUsage);
+  if (history->GetNumberOfStates() < 1
+    || (history->GetNumberOfStates() > 1 && history->GetMemoryUsage() > labelmapMemoryUsage))
+    {
+    std::cerr << "Memory usage (" << history->GetMemoryUsage() << " KiB) exceeds the limit of "
+      << labelmapMemoryUsage << " KiB" << std::endl;
+    return EXIT_FAILURE;
+    }
+  history->SetMaximumMemoryUsage(1);
+  if (!StateCountCheck(history, 1))
+    {
+    return EXIT_FAILURE;
+    }
+  if (history->IsRestorePreviousStateAvailable())
+    {
+    std::cerr << "Undo should not be available after removing all previous states" << std::endl;
+    return EXIT_FAILURE;
+    }
+  if (!AreLabelmapsEqual(currentLabelmap, expectedLabelmaps[3]))
+    {
+    std::cerr << "Labelmap should not be changed after removing old states" << std::endl;
+    return EXIT_FAILURE;
+    }
+
   std::cout << "Segmentation history test 1 passed." << std::endl;
   return EXIT_SUCCESS;
 }
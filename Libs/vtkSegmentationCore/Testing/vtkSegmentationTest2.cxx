@@ -37,6 +37,9 @@
 #include "vtkBinaryLabelmapToClosedSurfaceConversionRule.h"
 #include "vtkClosedSurfaceToBinaryLabelmapConversionRule.h"
 
+// STD includes
+#include <cmath>
+
 void CreateSpherePolyData(vtkPolyData* polyData, double center[3], double radius);
 int CreateCubeLabelmap(vtkOrientedImageData* imageData, int extent[6]);
 
@@ -314,6 +317,94 @@ bool TestSharedLabelmapCasting()
   return true;
 }
 
+//----------------------------------------------------------------------------
+bool TestSharedLabelmapToClosedSurfaceConversion()
+{
+  // Two segments in a shared labelmap
+  vtkNew<vtkOrientedImageData> sharedLabelmap;
+  int sharedExtent[6] = { 0, 9, 0, 9, 0, 9 };
+  CreateCubeLabelmap(sharedLabelmap, sharedExtent);
+  for (int k = sharedExtent[4]; k <= sharedExtent[5]; ++k)
+    {
+    for (int j = sharedExtent[2]; j <= sharedExtent[3]; ++j)
+      {
+      for (int i = sharedExtent[0]; i <= sharedExtent[1]; ++i)
+        {
+        *static_cast<unsigned char*>(sharedLabelmap->GetScalarPointer(i, j, k)) = (i < 5 ? 1 : 2);
+        }
+      }
+    }
+
+  // One segment in a separate labelmap
+  vtkNew<vtkOrientedImageData> separateLabelmap;
+  int separateExtent[6] = { 2, 6, 2, 6, 12, 16 };
+  CreateCubeLabelmap(separateLabelmap, separateExtent);
+
+  vtkNew<vtkSegment> segment1;
+  segment1->SetName("shared1");
+  segment1->SetLabelValue(1);
+  segment1->AddRepresentation(vtkSegmentationConverter::GetBinaryLabelmapRepresentationName(), sharedLabelmap);
+
+  vtkNew<vtkSegment> segment2;
+  segment2->SetName("shared2");
+  segment2->SetLabelValue(2);
+  segment2->AddRepresentation(vtkSegmentationConverter::GetBinaryLabelmapRepresentationName(), sharedLabelmap);
+
+  vtkNew<vtkSegment> segment3;
+  segment3->SetName("separate");
+  segment3->SetLabelValue(1);
+  segment3->AddRepresentation(vtkSegmentationConverter::GetBinaryLabelmapRepresentationName(), separateLabelmap);
+
+  vtkNew<vtkSegmentation> segmentation;
+  segmentation->SetMasterRepresentationName(vtkSegmentationConverter::GetBinaryLabelmapRepresentationName());
+  segmentation->AddSegment(segment1);
+  segmentation->AddSegment(segment2);
+  segmentation->AddSegment(segment3);
+
+  // All segments are converted together
+  segmentation->CreateRepresentation(vtkSegmentationConverter::GetClosedSurfaceRepresentationName());
+
+  // Surfaces should be the same as surfaces of segments converted one by one
+  vtkNew<vtkBinaryLabelmapToClosedSurfaceConversionRule> rule;
+  std::vector<vtkSegment*> segments = { segment1, segment2, segment3 };
+  for (vtkSegment* segment : segments)
+    {
+    vtkPolyData* closedSurface = vtkPolyData::SafeDownCast(
+      segment->GetRepresentation(vtkSegmentationConverter::GetClosedSurfaceRepresentationName()));
+    if (!closedSurface || closedSurface->GetNumberOfPolys() == 0)
+      {
+      std::cerr << __LINE__ << ": Closed surface of segment " << segment->GetName() << " is empty" << std::endl;
+      return false;
+      }
+    vtkNew<vtkPolyData> expectedClosedSurface;
+    std::vector<int> labelValues = { segment->GetLabelValue() };
+    rule->CreateClosedSurface(vtkOrientedImageData::SafeDownCast(
+      segment->GetRepresentation(vtkSegmentationConverter::GetBinaryLabelmapRepresentationName())), expectedClosedSurface, labelValues);
+    if (closedSurface->GetNumberOfPoints() != expectedClosedSurface->GetNumberOfPoints()
+      || closedSurface->GetNumberOfPolys() != expectedClosedSurface->GetNumberOfPolys())
+      {
+      std::cerr << __LINE__ << ": Closed surface of segment " << segment->GetName() << " has "
+        << closedSurface->GetNumberOfPoints() << " points and " << closedSurface->GetNumberOfPolys() << " polygons, expected "
+        << expectedClosedSurface->GetNumberOfPoints() << " points and " << expectedClosedSurface->GetNumberOfPolys() << " polygons" << std::endl;
+      return false;
+      }
+    double bounds[6] = { 0.0 };
+    double expectedBounds[6] = { 0.0 };
+    closedSurface->GetBounds(bounds);
+    expectedClosedSurface->GetBounds(expectedBounds);
+    for (int i = 0; i < 6; ++i)
+      {
+      if (fabs(bounds[i] - expectedBounds[i]) > 1e-6)
+        {
+        std::cerr << __LINE__ << ": Closed surface bounds of segment " << segment->GetName() << " do not match" << std::endl;
+        return false;
+        }
+      }
+    }
+
+  return true;
+}
+
 //----------------------------------------------------------------------------
 int vtkSegmentationTest2(int vtkNotUsed(argc), char* vtkNotUsed(argv)[])
 {
@@ -338,6 +429,11 @@ int vtkSegmentationTest2(int vtkNotUsed(argc), char* vtkNotUsed(argv)[])
     return EXIT_FAILURE;
     }
 
+  if (!TestSharedLabelmapToClosedSurfaceConversion())
+    {
+    return EXIT_FAILURE;
+    }
+
   std::cout << "Segmentation test 2 passed." << std::endl;
   return EXIT_SUCCESS;
 }
@@ -28,6 +28,7 @@
 #include <vtkVersion.h> // must precede reference to VTK_MAJOR_VERSION
 #include <vtkCompositeDataGeometryFilter.h>
 #include <vtkCompositeDataIterator.h>
+#include <vtkCellArray.h>
 #include <vtkDecimatePro.h>
 #if VTK_MAJOR_VERSION >= 9 || (VTK_MAJOR_VERSION >= 8 && VTK_MINOR_VERSION >= 2)
   #include <vtkDiscreteFlyingEdges3D.h>
@@ -56,6 +57,7 @@
 #include <vtkUnstructuredGrid.h>
 #include <vtkWindowedSincPolyDataFilter.h>
 #include <vtkMatrix3x3.h>
+#include <vtkMatrix4x4.h>
 #include <vtkReverseSense.h>
 #include <vtkStringToNumeric.h>
 #include <vtkStringArray.h>
@@ -67,6 +69,13 @@
 #include <vtkInformation.h>
 #include <vtkExtractSelection.h>
 #include <vtkSelectionSource.h>
+#include <vtkIdList.h>
+#include <vtkPoints.h>
+#include <vtkSMPTools.h>
+#include <vtkTimerLog.h>
+
+// STD includes
+#include <set>
 
 //----------------------------------------------------------------------------
 vtkSegmentationConverterRuleNewMacro(vtkBinaryLabelmapToClosedSurfaceConversionRule);
@@ -224,6 +233,137 @@ bool vtkBinaryLabelmapToClosedSurfaceConversionRule::Convert(vtkSegment* segment
   return true;
 }
 
+//----------------------------------------------------------------------------
+bool vtkBinaryLabelmapToClosedSurfaceConversionRule::ConvertSegments(std::vector<vtkSegment*> segments)
+{
+  double smoothingFactor = vtkVariant(this->ConversionParameters[GetSmoothingFactorParameterName()].first).ToDouble();
+  int jointSmoothing = vtkVariant(this->ConversionParameters[GetJointSmoothingParameterName()].first).ToInt();
+  if (segments.size() < 2 || (jointSmoothing > 0 && smoothingFactor > 0))
+    {
+    // Joint smoothing creates one surface that is shared by all segments in a labelmap
+    return Superclass::ConvertSegments(segments);
+    }
+  double decimationFactor = vtkVariant(this->ConversionParameters[GetDecimationFactorParameterName()].first).ToDouble();
+  int computeSurfaceNormals = vtkVariant(this->ConversionParameters[GetComputeSurfaceNormalsParameterName()].first).ToInt();
+
+  double conversionStartTime = vtkTimerLog::GetUniversalTime();
+
+  // Collect label values of each labelmap
+  bool success = true;
+  std::vector<vtkSegment*> segmentsToConvert;
+  std::vector<vtkOrientedImageData*> segmentLabelmaps;
+  std::vector<int> segmentLabelValues;
+  std::map<vtkOrientedImageData*, std::vector<int> > labelmapLabelValues;
+  for (vtkSegment* segment : segments)
+    {
+    vtkOrientedImageData* orientedBinaryLabelmap = vtkOrientedImageData::SafeDownCast(
+      segment->GetRepresentation(this->GetSourceRepresentationName()));
+    if (!orientedBinaryLabelmap)
+      {
+      vtkErrorMacro("ConvertSegments: Source representation is not oriented image data");
+      success = false;
+      continue;
+      }
+    segmentsToConvert.push_back(segment);
+    segmentLabelmaps.push_back(orientedBinaryLabelmap);
+    segmentLabelValues.push_back(segment->GetLabelValue());
+    labelmapLabelValues[orientedBinaryLabelmap].push_back(segment->GetLabelValue());
+    }
+
+  // Surfaces of all segments in a shared labelmap are extracted in one pass
+  std::vector<vtkSmartPointer<vtkPolyData> > segmentIJKSurfaces(segmentsToConvert.size());
+  std::map<vtkOrientedImageData*, std::map<int, vtkSmartPointer<vtkPolyData> > > sharedLabelmapSurfaces;
+  for (std::map<vtkOrientedImageData*, std::vector<int> >::iterator labelmapIt = labelmapLabelValues.begin();
+    labelmapIt != labelmapLabelValues.end(); ++labelmapIt)
+    {
+    if (labelmapIt->second.size() < 2)
+      {
+      continue;
+      }
+    vtkNew<vtkPolyData> ijkSurface;
+    this->ExtractLabelSurface(labelmapIt->first, labelmapIt->second, ijkSurface);
+    vtkBinaryLabelmapToClosedSurfaceConversionRule::SplitLabelSurface(ijkSurface, sharedLabelmapSurfaces[labelmapIt->first]);
+    }
+  std::set<vtkPolyData*> assignedSurfaces;
+  for (size_t segmentIndex = 0; segmentIndex < segmentsToConvert.size(); ++segmentIndex)
+    {
+    std::map<vtkOrientedImageData*, std::map<int, vtkSmartPointer<vtkPolyData> > >::iterator sharedLabelmapIt =
+      sharedLabelmapSurfaces.find(segmentLabelmaps[segmentIndex]);
+    if (sharedLabelmapIt == sharedLabelmapSurfaces.end())
+      {
+      // surface is extracted during parallel processing
+      continue;
+      }
+    std::map<int, vtkSmartPointer<vtkPolyData> >::iterator labelSurfaceIt = sharedLabelmapIt->second.find(segmentLabelValues[segmentIndex]);
+    if (labelSurfaceIt == sharedLabelmapIt->second.end())
+      {
+      // empty segment
+      segmentIJKSurfaces[segmentIndex] = vtkSmartPointer<vtkPolyData>::New();
+      }
+    else if (!assignedSurfaces.insert(labelSurfaceIt->second).second)
+      {
+      // Each surface may only be processed by one thread (multiple segments may have the same label value)
+      segmentIJKSurfaces[segmentIndex] = vtkSmartPointer<vtkPolyData>::New();
+      segmentIJKSurfaces[segmentIndex]->DeepCopy(labelSurfaceIt->second);
+      }
+    else
+      {
+      segmentIJKSurfaces[segmentIndex] = labelSurfaceIt->second;
+      }
+    }
+  sharedLabelmapSurfaces.clear();
+
+  // Segment surfaces are processed in parallel
+  std::vector<vtkSmartPointer<vtkPolyData> > segmentClosedSurfaces(segmentsToConvert.size());
+  std::vector<double> segmentConversionTimes(segmentsToConvert.size(), 0.0);
+  auto processSegmentSurfaces = [&](vtkIdType beginIndex, vtkIdType endIndex)
+    {
+    for (vtkIdType segmentIndex = beginIndex; segmentIndex < endIndex; ++segmentIndex)
+      {
+      double startTime = vtkTimerLog::GetUniversalTime();
+      vtkSmartPointer<vtkPolyData> ijkSurface = segmentIJKSurfaces[segmentIndex];
+      if (!ijkSurface)
+        {
+        ijkSurface = vtkSmartPointer<vtkPolyData>::New();
+        std::vector<int> labelValue = { segmentLabelValues[segmentIndex] };
+        this->ExtractLabelSurface(segmentLabelmaps[segmentIndex], labelValue, ijkSurface);
+        }
+      vtkSmartPointer<vtkPolyData> closedSurfacePolyData = vtkSmartPointer<vtkPolyData>::New();
+      if (ijkSurface->GetNumberOfPolys() > 0)
+        {
+        vtkNew<vtkMatrix4x4> imageToWorldMatrix;
+        segmentLabelmaps[segmentIndex]->GetImageToWorldMatrix(imageToWorldMatrix);
+        vtkBinaryLabelmapToClosedSurfaceConversionRule::ProcessLabelSurface(ijkSurface, imageToWorldMatrix,
+          decimationFactor, smoothingFactor, computeSurfaceNormals > 0, closedSurfacePolyData);
+        }
+      segmentClosedSurfaces[segmentIndex] = closedSurfacePolyData;
+      segmentConversionTimes[segmentIndex] = vtkTimerLog::GetUniversalTime() - startTime;
+      }
+    };
+  vtkSMPTools::For(0, static_cast<vtkIdType>(segmentsToConvert.size()), 1, processSegmentSurfaces);
+
+  // Segments are only modified in the calling thread
+  for (size_t segmentIndex = 0; segmentIndex < segmentsToConvert.size(); ++segmentIndex)
+    {
+    vtkSegment* segment = segmentsToConvert[segmentIndex];
+    this->CreateTargetRepresentation(segment);
+    vtkPolyData* closedSurfacePolyData = vtkPolyData::SafeDownCast(segment->GetRepresentation(this->GetTargetRepresentationName()));
+    if (!closedSurfacePolyData)
+      {
+      vtkErrorMacro("ConvertSegments: Target representation is not poly data");
+      success = false;
+      continue;
+      }
+    closedSurfacePolyData->ShallowCopy(segmentClosedSurfaces[segmentIndex]);
+    vtkDebugMacro("ConvertSegments: Segment '" << (segment->GetName() ? segment->GetName() : "")
+      << "' converted in " << segmentConversionTimes[segmentIndex] << " s");
+    }
+  vtkDebugMacro("ConvertSegments: " << segmentsToConvert.size() << " segments converted in "
+    << vtkTimerLog::GetUniversalTime() - conversionStartTime << " s");
+
+  return success;
+}
+
 //----------------------------------------------------------------------------
 bool vtkBinaryLabelmapToClosedSurfaceConversionRule::CreateClosedSurface(vtkOrientedImageData* orientedBinaryLabelmap,
   vtkPolyData* closedSurfacePolyData, std::vector<int> labelValues)
@@ -241,13 +381,32 @@ bool vtkBinaryLabelmapToClosedSurfaceConversionRule::CreateClosedSurface(vtkOrie
     return false;
     }
 
-  vtkSmartPointer<vtkImageData> binaryLabelmap = orientedBinaryLabelmap;
-  if (!binaryLabelmap)
+  vtkNew<vtkPolyData> ijkSurface;
+  this->ExtractLabelSurface(orientedBinaryLabelmap, labelValues, ijkSurface);
+  if (ijkSurface->GetNumberOfPolys() == 0)
     {
-    vtkErrorMacro("Convert: Source representation is not data");
-    return false;
+    closedSurfacePolyData->Initialize();
+    return true;
     }
 
+  // Get conversion parameters
+  double decimationFactor = vtkVariant(this->ConversionParameters[GetDecimationFactorParameterName()].first).ToDouble();
+  double smoothingFactor = vtkVariant(this->ConversionParameters[GetSmoothingFactorParameterName()].first).ToDouble();
+  int computeSurfaceNormals = vtkVariant(this->ConversionParameters[GetComputeSurfaceNormalsParameterName()].first).ToInt();
+
+  vtkNew<vtkMatrix4x4> labelmapImageToWorldMatrix;
+  orientedBinaryLabelmap->GetImageToWorldMatrix(labelmapImageToWorldMatrix);
+  vtkBinaryLabelmapToClosedSurfaceConversionRule::ProcessLabelSurface(ijkSurface, labelmapImageToWorldMatrix,
+    decimationFactor, smoothingFactor, computeSurfaceNormals > 0, closedSurfacePolyData);
+  return true;
+}
+
+//----------------------------------------------------------------------------
+void vtkBinaryLabelmapToClosedSurfaceConversionRule::ExtractLabelSurface(vtkOrientedImageData* orientedBinaryLabelmap,
+  const std::vector<int>& labelValues, vtkPolyData* ijkSurface)
+{
+  vtkSmartPointer<vtkImageData> binaryLabelmap = orientedBinaryLabelmap;
+
   // Pad labelmap if it has non-background border voxels
   int* binaryLabelmapExtent = binaryLabelmap->GetExtent();
   if (binaryLabelmapExtent[0] > binaryLabelmapExtent[1]
@@ -256,8 +415,8 @@ bool vtkBinaryLabelmapToClosedSurfaceConversionRule::CreateClosedSurface(vtkOrie
     {
     // empty labelmap
     vtkDebugMacro("Convert: No polygons can be created, input image extent is empty");
-    closedSurfacePolyData->Initialize();
-    return true;
+    ijkSurface->Initialize();
+    return;
     }
 
   /// If input labelmap has non-background border voxels, then those regions remain open in the output closed surface.
@@ -282,11 +441,6 @@ bool vtkBinaryLabelmapToClosedSurfaceConversionRule::CreateClosedSurface(vtkOrie
   binaryLabelmapWithIdentityGeometry->SetOrigin(0, 0, 0);
   binaryLabelmapWithIdentityGeometry->SetSpacing(1.0, 1.0, 1.0);
 
-  // Get conversion parameters
-  double decimationFactor = vtkVariant(this->ConversionParameters[GetDecimationFactorParameterName()].first).ToDouble();
-  double smoothingFactor = vtkVariant(this->ConversionParameters[GetSmoothingFactorParameterName()].first).ToDouble();
-  int computeSurfaceNormals = vtkVariant(this->ConversionParameters[GetComputeSurfaceNormalsParameterName()].first).ToInt();
-
 #if VTK_MAJOR_VERSION >= 9 || (VTK_MAJOR_VERSION >= 8 && VTK_MINOR_VERSION >= 2)
   vtkNew<vtkDiscreteFlyingEdges3D> marchingCubes;
 #else
@@ -304,23 +458,80 @@ bool vtkBinaryLabelmapToClosedSurfaceConversionRule::CreateClosedSurface(vtkOrie
     ++valueIndex;
     }
 
-  vtkSmartPointer<vtkPolyData> convertedSegment = vtkSmartPointer<vtkPolyData>::New();
-
   // Run marching cubes
   marchingCubes->Update();
-  vtkSmartPointer<vtkPolyData> processingResult = marchingCubes->GetOutput();
+  vtkPolyData* processingResult = marchingCubes->GetOutput();
   if (processingResult->GetNumberOfPolys() == 0)
     {
     vtkDebugMacro("Convert: No polygons can be created, probably all voxels are empty");
-    convertedSegment = nullptr;
-    closedSurfacePolyData->Initialize();
+    ijkSurface->Initialize();
+    return;
     }
+  ijkSurface->ShallowCopy(processingResult);
+}
 
-  if (!convertedSegment)
+//----------------------------------------------------------------------------
+void vtkBinaryLabelmapToClosedSurfaceConversionRule::SplitLabelSurface(vtkPolyData* ijkSurface,
+  std::map<int, vtkSmartPointer<vtkPolyData> >& labelSurfaces)
+{
+  labelSurfaces.clear();
+  vtkPoints* points = ijkSurface->GetPoints();
+  vtkCellArray* polys = ijkSurface->GetPolys();
+  vtkPointData* pointData = ijkSurface->GetPointData();
+  vtkDataArray* labelValues = pointData->GetScalars();
+  if (!points || !polys || !labelValues)
     {
-    return true;
+    return;
     }
 
+  // Points are generated separately for each label value, therefore each point
+  // and each cell belongs to the surface of the label value of the point
+  vtkIdType numberOfPoints = points->GetNumberOfPoints();
+  std::vector<vtkPolyData*> pointLabelSurfaces(numberOfPoints, nullptr);
+  std::vector<vtkIdType> labelSurfacePointIds(numberOfPoints, -1);
+  for (vtkIdType pointId = 0; pointId < numberOfPoints; ++pointId)
+    {
+    int labelValue = static_cast<int>(labelValues->GetTuple1(pointId));
+    vtkSmartPointer<vtkPolyData>& labelSurface = labelSurfaces[labelValue];
+    if (!labelSurface)
+      {
+      labelSurface = vtkSmartPointer<vtkPolyData>::New();
+      vtkNew<vtkPoints> labelSurfacePoints;
+      labelSurfacePoints->SetDataType(points->GetDataType());
+      labelSurface->SetPoints(labelSurfacePoints);
+      vtkNew<vtkCellArray> labelSurfacePolys;
+      labelSurface->SetPolys(labelSurfacePolys);
+      labelSurface->GetPointData()->CopyAllocate(pointData);
+      }
+    vtkIdType labelSurfacePointId = labelSurface->GetPoints()->InsertNextPoint(points->GetPoint(pointId));
+    labelSurface->GetPointData()->CopyData(pointData, pointId, labelSurfacePointId);
+    pointLabelSurfaces[pointId] = labelSurface;
+    labelSurfacePointIds[pointId] = labelSurfacePointId;
+    }
+
+  vtkNew<vtkIdList> cellPointIds;
+  polys->InitTraversal();
+  while (polys->GetNextCell(cellPointIds))
+    {
+    if (cellPointIds->GetNumberOfIds() == 0)
+      {
+      continue;
+      }
+    vtkPolyData* labelSurface = pointLabelSurfaces[cellPointIds->GetId(0)];
+    for (vtkIdType i = 0; i < cellPointIds->GetNumberOfIds(); ++i)
+      {
+      cellPointIds->SetId(i, labelSurfacePointIds[cellPointIds->GetId(i)]);
+      }
+    labelSurface->GetPolys()->InsertNextCell(cellPointIds);
+    }
+}
+
+//----------------------------------------------------------------------------
+void vtkBinaryLabelmapToClosedSurfaceConversionRule::ProcessLabelSurface(vtkPolyData* ijkSurface, vtkMatrix4x4* imageToWorldMatrix,
+  double decimationFactor, double smoothingFactor, bool computeSurfaceNormals, vtkPolyData* closedSurfacePolyData)
+{
+  vtkSmartPointer<vtkPolyData> processingResult = ijkSurface;
+
   // Decimate
   if (decimationFactor > 0.0)
     {
@@ -357,15 +568,14 @@ bool vtkBinaryLabelmapToClosedSurfaceConversionRule::CreateClosedSurface(vtkOrie
 
   // Transform the result surface from labelmap IJK to world coordinate system
   vtkSmartPointer<vtkTransform> labelmapGeometryTransform = vtkSmartPointer<vtkTransform>::New();
-  vtkSmartPointer<vtkMatrix4x4> labelmapImageToWorldMatrix = vtkSmartPointer<vtkMatrix4x4>::New();
-  orientedBinaryLabelmap->GetImageToWorldMatrix(labelmapImageToWorldMatrix);
-  labelmapGeometryTransform->SetMatrix(labelmapImageToWorldMatrix);
+  labelmapGeometryTransform->SetMatrix(imageToWorldMatrix);
 
   vtkSmartPointer<vtkTransformPolyDataFilter> transformPolyDataFilter = vtkSmartPointer<vtkTransformPolyDataFilter>::New();
   transformPolyDataFilter->SetInputData(processingResult);
   transformPolyDataFilter->SetTransform(labelmapGeometryTransform);
 
-  if (computeSurfaceNormals > 0)
+  vtkSmartPointer<vtkPolyData> convertedSegment = vtkSmartPointer<vtkPolyData>::New();
+  if (computeSurfaceNormals)
     {
     vtkSmartPointer<vtkPolyDataNormals> polyDataNormals = vtkSmartPointer<vtkPolyDataNormals>::New();
     polyDataNormals->SetInputConnection(transformPolyDataFilter->GetOutputPort());
@@ -383,7 +593,6 @@ bool vtkBinaryLabelmapToClosedSurfaceConversionRule::CreateClosedSurface(vtkOrie
     }
 
   closedSurfacePolyData->ShallowCopy(convertedSegment);
-  return true;
 }
 
 //----------------------------------------------------------------------------
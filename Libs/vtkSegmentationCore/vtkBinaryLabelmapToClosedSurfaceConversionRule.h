@@ -30,6 +30,8 @@
 // VTK includes
 #include <vtkPolyData.h>
 
+class vtkMatrix4x4;
+
 /// \ingroup SegmentationCore
 /// \brief Convert binary labelmap representation (vtkOrientedImageData type) to
 ///   closed surface representation (vtkPolyData type). The conversion algorithm
@@ -71,6 +73,12 @@ public:
   /// Update the target representation based on the source representation
   bool Convert(vtkSegment* segment) override;
 
+  /// Update the target representation of multiple segments.
+  /// Surfaces of all segments in a shared labelmap are extracted in one pass, then surfaces
+  /// of the segments are decimated, smoothed, and transformed in parallel.
+  /// If joint smoothing is enabled then segments are converted one by one.
+  bool ConvertSegments(std::vector<vtkSegment*> segments) override;
+
   /// Perform postprocesing steps on the output
   /// Clears the joint smoothing cache
   bool PostConvert(vtkSegmentation* segmentation) override;
@@ -92,6 +100,19 @@ protected:
   /// This function checks whether this is the case.
   bool IsLabelmapPaddingNecessary(vtkImageData* binaryLabelMap);
 
+  /// Extract surface of the specified label values in the IJK coordinate system of the labelmap.
+  /// Points of the surface have the label value as scalar. The surface is empty if no polygons can be created.
+  void ExtractLabelSurface(vtkOrientedImageData* binaryLabelmap, const std::vector<int>& labelValues, vtkPolyData* ijkSurface);
+
+  /// Split surface extracted for multiple label values into one surface for each label value.
+  static void SplitLabelSurface(vtkPolyData* ijkSurface, std::map<int, vtkSmartPointer<vtkPolyData> >& labelSurfaces);
+
+  /// Decimate and smooth a surface extracted by ExtractLabelSurface, transform it to the world
+  /// coordinate system and compute surface normals.
+  /// The method does not use any member variables, therefore it may be called from multiple threads.
+  static void ProcessLabelSurface(vtkPolyData* ijkSurface, vtkMatrix4x4* imageToWorldMatrix,
+    double decimationFactor, double smoothingFactor, bool computeSurfaceNormals, vtkPolyData* closedSurfacePolyData);
+
 protected:
   vtkBinaryLabelmapToClosedSurfaceConversionRule();
   ~vtkBinaryLabelmapToClosedSurfaceConversionRule() override;
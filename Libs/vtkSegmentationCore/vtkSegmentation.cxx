@@ -1025,8 +1025,8 @@ bool vtkSegmentation::ConvertSegmentsUsingPath(std::vector<std::string> segmentI
       return false;
       }
 
-    // Perform conversion step
-    currentConversionRule->PreConvert(this);
+    // Collect segments that need to be converted
+    std::vector<vtkSegment*> segmentsToConvert;
     for (auto segmentID : segmentIDs)
       {
       vtkSegment* segment = this->GetSegment(segmentID);
@@ -1049,8 +1049,12 @@ bool vtkSegmentation::ConvertSegmentsUsingPath(std::vector<std::string> segmentI
         {
         continue;
         }
-      currentConversionRule->Convert(segment);
+      segmentsToConvert.push_back(segment);
       }
+
+    // Perform conversion step
+    currentConversionRule->PreConvert(this);
+    currentConversionRule->ConvertSegments(segmentsToConvert);
     currentConversionRule->PostConvert(this);
 
   }
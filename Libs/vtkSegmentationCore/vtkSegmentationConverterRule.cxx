@@ -65,6 +65,17 @@ bool vtkSegmentationConverterRule::CreateTargetRepresentation(vtkSegment* segmen
   return true;
 }
 
+//----------------------------------------------------------------------------
+bool vtkSegmentationConverterRule::ConvertSegments(std::vector<vtkSegment*> segments)
+{
+  bool success = true;
+  for (vtkSegment* segment : segments)
+    {
+    success &= this->Convert(segment);
+    }
+  return success;
+}
+
 //----------------------------------------------------------------------------
 void vtkSegmentationConverterRule::GetRuleConversionParameters(ConversionParameterListType& conversionParameters)
 {
@@ -92,6 +92,12 @@ public:
   /// \sa ConvertInternal
   virtual bool Convert(vtkSegment* segment) = 0;
 
+  /// Update the target representation of multiple segments based on the source representation
+  /// Default implementation calls Convert for each segment. Rules may override it to share
+  /// computations between segments or to convert segments in parallel.
+  /// \sa Convert
+  virtual bool ConvertSegments(std::vector<vtkSegment*> segments);
+
   /// Perform post-conversion steps across the specified segments in the segmentation
   /// This step should be unneccessary if only converting a single segment
   virtual bool PostConvert(vtkSegmentation* vtkNotUsed(segmentation)) { return true; };
@@ -22,14 +22,21 @@
 #include "vtkSegmentationHistory.h"
 #include "vtkSegmentationConverterFactory.h"
 #include "vtkSegmentation.h"
+#include "vtkOrientedImageData.h"
+#include "vtkOrientedImageDataResample.h"
 
 // VTK includes
 #include <vtkNew.h>
 #include <vtkObjectFactory.h>
 #include <vtkCallbackCommand.h>
+#include <vtkPointData.h>
+#include <vtkUnsignedCharArray.h>
+#include <vtkZLibDataCompressor.h>
 
 // std includes
 #include <algorithm>
+#include <cstring>
+#include <set>
 
 //----------------------------------------------------------------------------
 vtkStandardNewMacro(vtkSegmentationHistory);
@@ -40,6 +47,7 @@ vtkSegmentationHistory::vtkSegmentationHistory()
   this->Segmentation = nullptr;
 
   this->MaximumNumberOfStates = 5;
+  this->MaximumMemoryUsage = 0;
 
   this->LastRestoredState = 0;
   this->RestoreStateInProgress = false;
@@ -98,6 +106,8 @@ void vtkSegmentationHistory::PrintSelf(ostream& os, vtkIndent indent)
   os << indent << "Modified Time: " << this->GetMTime() << "\n";
 
   os << indent << "Number of saved states:  " << this->SegmentationStates.size() << "\n";
+  os << indent << "Memory usage (KiB):  " << this->GetMemoryUsage() << "\n";
+  os << indent << "Maximum memory usage (KiB):  " << this->MaximumMemoryUsage << "\n";
 }
 
 //---------------------------------------------------------------------------
@@ -134,7 +144,7 @@ bool vtkSegmentationHistory::SaveState()
     // Previous saved state of the segment
     // (if the new state has exactly the same representation then only a shallow copy will be made)
     vtkSegment* baselineSegment = nullptr;
-    if (this->SegmentationStates.size() > 0)
+    if (this->SegmentationStates.size() > 0 && !this->SegmentationStates.back().RestoredFromDeltas)
       {
       SegmentsMap::iterator baselineSegmentIt = this->SegmentationStates.back().Segments.find(*segmentIDIt);
       if (baselineSegmentIt != this->SegmentationStates.back().Segments.end())
@@ -149,6 +159,12 @@ bool vtkSegmentationHistory::SaveState()
     }
   this->SegmentationStates.push_back(newSegmentationState);
 
+  // Only the most recent state is stored completely
+  if (this->SegmentationStates.size() > 1)
+    {
+    this->StoreStateAsDelta((unsigned int)this->SegmentationStates.size() - 2);
+    }
+
   // Set the current state as last restored state
   this->LastRestoredState = (unsigned int)this->SegmentationStates.size();
   this->RemoveAllObsoleteStates();
@@ -185,6 +201,12 @@ bool vtkSegmentationHistory::RestorePreviousState()
     // this->SegmentationStates.size() - 2 is the state that was the last saved state before
     stateToRestore = (int)this->SegmentationStates.size() - 2;
     }
+  if (stateToRestore < 0)
+    {
+    // Previous states have been removed to stay within the limits
+    vtkWarningMacro("vtkSegmentation::RestorePreviousState failed: There are no previous state available for restore");
+    return false;
+    }
   return this->RestoreState(stateToRestore);
 }
 
@@ -213,6 +235,17 @@ bool vtkSegmentationHistory::RestoreState(unsigned int stateIndex)
 
   std::set<std::string> segmentIDsToKeep;
   std::map<vtkDataObject*, vtkDataObject*> restoredRepresentations;
+
+  // Labelmaps stored as differences are reconstructed into new objects, which are used
+  // in the segmentation directly (CopySegment uses the cached object instead of a copy).
+  std::vector<vtkSmartPointer<vtkDataObject> > reconstructedRepresentations;
+  for (LabelmapDeltasMap::iterator deltaIt = restoredState.LabelmapDeltas.begin();
+    deltaIt != restoredState.LabelmapDeltas.end(); ++deltaIt)
+    {
+    vtkSmartPointer<vtkDataObject> fullRepresentation = this->GetFullRepresentation(stateIndex, deltaIt->first);
+    reconstructedRepresentations.push_back(fullRepresentation);
+    restoredRepresentations[deltaIt->first] = fullRepresentation;
+    }
   for (SegmentsMap::iterator restoredSegmentsIt = restoredState.Segments.begin();
     restoredSegmentsIt != restoredState.Segments.end(); ++restoredSegmentsIt)
     {
@@ -285,6 +318,12 @@ bool vtkSegmentationHistory::IsRestoreNextStateAvailable()
 //---------------------------------------------------------------------------
 void vtkSegmentationHistory::RemoveAllNextStates()
 {
+  if (this->SegmentationStates.size() > this->LastRestoredState + 1)
+    {
+    // The state becomes the most recent state, therefore it must not refer to the removed states
+    this->StoreStateAsFull(this->LastRestoredState);
+    }
+
   bool modified = false;
   while ((this->SegmentationStates.size() > this->LastRestoredState + 1) && (!this->SegmentationStates.empty()))
     {
@@ -301,12 +340,24 @@ void vtkSegmentationHistory::RemoveAllNextStates()
 void vtkSegmentationHistory::RemoveAllObsoleteStates()
 {
   bool modified = false;
-  while ((this->SegmentationStates.size() > this->MaximumNumberOfStates) && (!this->SegmentationStates.empty()))
+  while (!this->SegmentationStates.empty())
     {
+    if (this->SegmentationStates.size() <= this->MaximumNumberOfStates)
+      {
+      // Number of states is within the limit, check memory usage (the most recent state is always kept)
+      if (this->MaximumMemoryUsage == 0 || this->SegmentationStates.size() < 2
+        || this->GetMemoryUsage() <= this->MaximumMemoryUsage)
+        {
+        break;
+        }
+      }
     this->SegmentationStates.pop_front();
-    this->LastRestoredState--;
+    if (this->LastRestoredState > 0)
+      {
+      this->LastRestoredState--;
+      }
     modified = true;
-   }
+    }
   if (modified)
     {
     this->Modified();
@@ -325,6 +376,351 @@ void vtkSegmentationHistory::SetMaximumNumberOfStates(unsigned int maximumNumber
   this->Modified();
 }
 
+//---------------------------------------------------------------------------
+void vtkSegmentationHistory::SetMaximumMemoryUsage(unsigned long maximumMemoryUsageKiB)
+{
+  if (maximumMemoryUsageKiB == this->MaximumMemoryUsage)
+    {
+    return;
+    }
+  this->MaximumMemoryUsage = maximumMemoryUsageKiB;
+  this->RemoveAllObsoleteStates();
+  this->Modified();
+}
+
+//---------------------------------------------------------------------------
+unsigned long vtkSegmentationHistory::GetMemoryUsage()
+{
+  unsigned long memoryUsageKiB = 0;
+  std::set<vtkDataObject*> countedObjects;
+  for (std::deque<SegmentationState>::iterator stateIt = this->SegmentationStates.begin();
+    stateIt != this->SegmentationStates.end(); ++stateIt)
+    {
+    for (SegmentsMap::iterator segmentIt = stateIt->Segments.begin(); segmentIt != stateIt->Segments.end(); ++segmentIt)
+      {
+      std::vector<std::string> representationNames;
+      segmentIt->second->GetContainedRepresentationNames(representationNames);
+      for (std::vector<std::string>::iterator representationNameIt = representationNames.begin();
+        representationNameIt != representationNames.end(); ++representationNameIt)
+        {
+        vtkDataObject* representation = segmentIt->second->GetRepresentation(*representationNameIt);
+        if (representation && countedObjects.insert(representation).second)
+          {
+          memoryUsageKiB += representation->GetActualMemorySize();
+          }
+        }
+      }
+    for (LabelmapDeltasMap::iterator deltaIt = stateIt->LabelmapDeltas.begin(); deltaIt != stateIt->LabelmapDeltas.end(); ++deltaIt)
+      {
+      if (deltaIt->second.CompressedVoxels)
+        {
+        memoryUsageKiB += deltaIt->second.CompressedVoxels->GetActualMemorySize();
+        }
+      }
+    }
+  return memoryUsageKiB;
+}
+
+//---------------------------------------------------------------------------
+void vtkSegmentationHistory::StoreStateAsDelta(unsigned int stateIndex)
+{
+  if (stateIndex + 1 >= this->SegmentationStates.size())
+    {
+    return;
+    }
+  SegmentationState& state = this->SegmentationStates[stateIndex];
+  SegmentationState& nextState = this->SegmentationStates[stateIndex + 1];
+
+  std::set<vtkDataObject*> processedRepresentations;
+  for (SegmentsMap::iterator segmentIt = state.Segments.begin(); segmentIt != state.Segments.end(); ++segmentIt)
+    {
+    SegmentsMap::iterator nextSegmentIt = nextState.Segments.find(segmentIt->first);
+    if (nextSegmentIt == nextState.Segments.end())
+      {
+      continue;
+      }
+    std::vector<std::string> representationNames;
+    segmentIt->second->GetContainedRepresentationNames(representationNames);
+    for (std::vector<std::string>::iterator representationNameIt = representationNames.begin();
+      representationNameIt != representationNames.end(); ++representationNameIt)
+      {
+      // Keep a reference, as the labelmap is removed from the segments when it is replaced
+      vtkSmartPointer<vtkOrientedImageData> labelmap = vtkOrientedImageData::SafeDownCast(
+        segmentIt->second->GetRepresentation(*representationNameIt));
+      if (!labelmap || !processedRepresentations.insert(labelmap.GetPointer()).second
+        || state.LabelmapDeltas.find(labelmap.GetPointer()) != state.LabelmapDeltas.end())
+        {
+        continue;
+        }
+      vtkDataObject* nextRepresentation = nextSegmentIt->second->GetRepresentation(*representationNameIt);
+      LabelmapDelta delta;
+      if (!vtkSegmentationHistory::ComputeLabelmapDelta(labelmap, nextRepresentation, delta))
+        {
+        // keep the complete labelmap
+        continue;
+        }
+
+      // The labelmap in the segments is replaced by an image that only stores the geometry
+      vtkSmartPointer<vtkOrientedImageData> geometryImage = vtkSmartPointer<vtkOrientedImageData>::New();
+      geometryImage->SetExtent(labelmap->GetExtent());
+      geometryImage->SetOrigin(labelmap->GetOrigin());
+      geometryImage->SetSpacing(labelmap->GetSpacing());
+      geometryImage->CopyDirections(labelmap);
+      vtkSegmentationHistory::ReplaceRepresentation(state, labelmap.GetPointer(), geometryImage.GetPointer());
+      processedRepresentations.insert(geometryImage.GetPointer());
+      state.LabelmapDeltas[geometryImage.GetPointer()] = delta;
+
+      // Differences stored in the previous state refer to the replaced labelmap
+      if (stateIndex > 0)
+        {
+        LabelmapDeltasMap& previousDeltas = this->SegmentationStates[stateIndex - 1].LabelmapDeltas;
+        for (LabelmapDeltasMap::iterator previousDeltaIt = previousDeltas.begin(); previousDeltaIt != previousDeltas.end(); ++previousDeltaIt)
+          {
+          if (previousDeltaIt->second.NextRepresentation.GetPointer() == labelmap.GetPointer())
+            {
+            previousDeltaIt->second.NextRepresentation = geometryImage.GetPointer();
+            }
+          }
+        }
+      }
+    }
+}
+
+//---------------------------------------------------------------------------
+void vtkSegmentationHistory::StoreStateAsFull(unsigned int stateIndex)
+{
+  if (stateIndex >= this->SegmentationStates.size())
+    {
+    return;
+    }
+  SegmentationState& state = this->SegmentationStates[stateIndex];
+  if (state.LabelmapDeltas.empty())
+    {
+    return;
+    }
+
+  std::map<vtkDataObject*, vtkSmartPointer<vtkDataObject> > fullRepresentations;
+  for (LabelmapDeltasMap::iterator deltaIt = state.LabelmapDeltas.begin(); deltaIt != state.LabelmapDeltas.end(); ++deltaIt)
+    {
+    fullRepresentations[deltaIt->first] = this->GetFullRepresentation(stateIndex, deltaIt->first);
+    }
+
+  state.LabelmapDeltas.clear();
+  for (std::map<vtkDataObject*, vtkSmartPointer<vtkDataObject> >::iterator fullIt = fullRepresentations.begin();
+    fullIt != fullRepresentations.end(); ++fullIt)
+    {
+    vtkSegmentationHistory::ReplaceRepresentation(state, fullIt->first, fullIt->second);
+    if (stateIndex > 0)
+      {
+      LabelmapDeltasMap& previousDeltas = this->SegmentationStates[stateIndex - 1].LabelmapDeltas;
+      for (LabelmapDeltasMap::iterator previousDeltaIt = previousDeltas.begin(); previousDeltaIt != previousDeltas.end(); ++previousDeltaIt)
+        {
+        if (previousDeltaIt->second.NextRepresentation.GetPointer() == fullIt->first)
+          {
+          previousDeltaIt->second.NextRepresentation = fullIt->second;
+          }
+        }
+      }
+    }
+  state.RestoredFromDeltas = true;
+}
+
+//---------------------------------------------------------------------------
+vtkSmartPointer<vtkDataObject> vtkSegmentationHistory::GetFullRepresentation(unsigned int stateIndex, vtkDataObject* representation)
+{
+  // Collect differences from this state to the state where the representation is stored completely
+  std::vector<LabelmapDelta*> deltas;
+  vtkDataObject* fullRepresentation = representation;
+  for (unsigned int index = stateIndex; index < this->SegmentationStates.size(); ++index)
+    {
+    LabelmapDeltasMap& stateDeltas = this->SegmentationStates[index].LabelmapDeltas;
+    LabelmapDeltasMap::iterator deltaIt = stateDeltas.find(fullRepresentation);
+    if (deltaIt == stateDeltas.end())
+      {
+      break;
+      }
+    deltas.push_back(&(deltaIt->second));
+    fullRepresentation = deltaIt->second.NextRepresentation;
+    }
+  if (deltas.empty())
+    {
+    return representation;
+    }
+
+  vtkSmartPointer<vtkOrientedImageData> labelmap = vtkSmartPointer<vtkOrientedImageData>::New();
+  labelmap->DeepCopy(fullRepresentation);
+  // Geometry is restored exactly as it was stored (geometries are compared with a tolerance)
+  vtkOrientedImageData* geometryImage = vtkOrientedImageData::SafeDownCast(representation);
+  labelmap->SetOrigin(geometryImage->GetOrigin());
+  labelmap->SetSpacing(geometryImage->GetSpacing());
+  labelmap->CopyDirections(geometryImage);
+  if (!labelmap->GetPointData()->GetScalars())
+    {
+    vtkErrorMacro("GetFullRepresentation: failed to restore labelmap, no complete labelmap is found");
+    return labelmap.GetPointer();
+    }
+
+  // Apply differences, starting from the most recent one
+  int* labelmapExtent = labelmap->GetExtent();
+  int voxelSize = labelmap->GetScalarSize() * labelmap->GetNumberOfScalarComponents();
+  vtkNew<vtkZLibDataCompressor> compressor;
+  std::vector<unsigned char> voxels;
+  for (std::vector<LabelmapDelta*>::reverse_iterator deltaIt = deltas.rbegin(); deltaIt != deltas.rend(); ++deltaIt)
+    {
+    LabelmapDelta* delta = *deltaIt;
+    if (!delta->CompressedVoxels)
+      {
+      // no difference
+      continue;
+      }
+    int* extent = delta->Extent;
+    size_t rowSize = static_cast<size_t>(extent[1] - extent[0] + 1) * voxelSize;
+    voxels.resize(rowSize * (extent[3] - extent[2] + 1) * (extent[5] - extent[4] + 1));
+    size_t uncompressedSize = compressor->Uncompress(delta->CompressedVoxels->GetPointer(0),
+      delta->CompressedVoxels->GetNumberOfValues(), voxels.data(), voxels.size());
+    if (uncompressedSize != voxels.size()
+      || extent[0] < labelmapExtent[0] || extent[1] > labelmapExtent[1]
+      || extent[2] < labelmapExtent[2] || extent[3] > labelmapExtent[3]
+      || extent[4] < labelmapExtent[4] || extent[5] > labelmapExtent[5])
+      {
+      vtkErrorMacro("GetFullRepresentation: failed to restore labelmap, invalid stored difference");
+      continue;
+      }
+    const unsigned char* voxelsRow = voxels.data();
+    for (int z = extent[4]; z <= extent[5]; ++z)
+      {
+      for (int y = extent[2]; y <= extent[3]; ++y)
+        {
+        memcpy(labelmap->GetScalarPointer(extent[0], y, z), voxelsRow, rowSize);
+        voxelsRow += rowSize;
+        }
+      }
+    }
+  labelmap->Modified();
+  return labelmap.GetPointer();
+}
+
+//---------------------------------------------------------------------------
+bool vtkSegmentationHistory::ComputeLabelmapDelta(vtkOrientedImageData* labelmap, vtkDataObject* nextRepresentation, LabelmapDelta& delta)
+{
+  delta.NextRepresentation = nextRepresentation;
+  delta.CompressedVoxels = nullptr;
+  for (int i = 0; i < 3; ++i)
+    {
+    delta.Extent[2 * i] = 0;
+    delta.Extent[2 * i + 1] = -1;
+    }
+
+  vtkOrientedImageData* nextLabelmap = vtkOrientedImageData::SafeDownCast(nextRepresentation);
+  if (!nextLabelmap || !labelmap->GetPointData()->GetScalars())
+    {
+    return false;
+    }
+  if (nextLabelmap == labelmap)
+    {
+    // shared between the states, no difference
+    return true;
+    }
+  if (!nextLabelmap->GetPointData()->GetScalars()
+    || labelmap->GetScalarType() != nextLabelmap->GetScalarType()
+    || labelmap->GetNumberOfScalarComponents() != nextLabelmap->GetNumberOfScalarComponents()
+    || !vtkOrientedImageDataResample::DoExtentsMatch(labelmap, nextLabelmap)
+    || !vtkOrientedImageDataResample::DoGeometriesMatch(labelmap, nextLabelmap))
+    {
+    return false;
+    }
+
+  int extent[6] = { 0, -1, 0, -1, 0, -1 };
+  labelmap->GetExtent(extent);
+  if (extent[0] > extent[1] || extent[2] > extent[3] || extent[4] > extent[5])
+    {
+    return true;
+    }
+
+  // Find bounding box of the voxels that differ
+  int voxelSize = labelmap->GetScalarSize() * labelmap->GetNumberOfScalarComponents();
+  int rowLength = extent[1] - extent[0] + 1;
+  size_t rowSize = static_cast<size_t>(rowLength) * voxelSize;
+  int changedExtent[6] = { extent[1] + 1, extent[0] - 1, extent[3] + 1, extent[2] - 1, extent[5] + 1, extent[4] - 1 };
+  for (int z = extent[4]; z <= extent[5]; ++z)
+    {
+    for (int y = extent[2]; y <= extent[3]; ++y)
+      {
+      const unsigned char* row = static_cast<unsigned char*>(labelmap->GetScalarPointer(extent[0], y, z));
+      const unsigned char* nextRow = static_cast<unsigned char*>(nextLabelmap->GetScalarPointer(extent[0], y, z));
+      if (memcmp(row, nextRow, rowSize) == 0)
+        {
+        continue;
+        }
+      int first = 0;
+      while (memcmp(row + first * voxelSize, nextRow + first * voxelSize, voxelSize) == 0)
+        {
+        ++first;
+        }
+      int last = rowLength - 1;
+      while (memcmp(row + last * voxelSize, nextRow + last * voxelSize, voxelSize) == 0)
+        {
+        --last;
+        }
+      changedExtent[0] = std::min(changedExtent[0], extent[0] + first);
+      changedExtent[1] = std::max(changedExtent[1], extent[0] + last);
+      changedExtent[2] = std::min(changedExtent[2], y);
+      changedExtent[3] = std::max(changedExtent[3], y);
+      changedExtent[4] = std::min(changedExtent[4], z);
+      changedExtent[5] = std::max(changedExtent[5], z);
+      }
+    }
+  if (changedExtent[0] > changedExtent[1])
+    {
+    // no difference
+    return true;
+    }
+
+  // Store the voxels of the labelmap in the modified region
+  size_t changedRowSize = static_cast<size_t>(changedExtent[1] - changedExtent[0] + 1) * voxelSize;
+  std::vector<unsigned char> voxels(changedRowSize * (changedExtent[3] - changedExtent[2] + 1) * (changedExtent[5] - changedExtent[4] + 1));
+  unsigned char* voxelsRow = voxels.data();
+  for (int z = changedExtent[4]; z <= changedExtent[5]; ++z)
+    {
+    for (int y = changedExtent[2]; y <= changedExtent[3]; ++y)
+      {
+      memcpy(voxelsRow, labelmap->GetScalarPointer(changedExtent[0], y, z), changedRowSize);
+      voxelsRow += changedRowSize;
+      }
+    }
+  vtkNew<vtkZLibDataCompressor> compressor;
+  compressor->SetCompressionLevel(1); // Z_BEST_SPEED
+  vtkUnsignedCharArray* compressedVoxels = compressor->Compress(voxels.data(), voxels.size()); // returns a new buffer that has to be deleted
+  if (!compressedVoxels)
+    {
+    return false;
+    }
+  // The compressor allocates a buffer of the size of the uncompressed data, reclaim the unused memory
+  compressedVoxels->Squeeze();
+  delta.CompressedVoxels = compressedVoxels;
+  compressedVoxels->Delete();
+  std::copy(changedExtent, changedExtent + 6, delta.Extent);
+  return true;
+}
+
+//---------------------------------------------------------------------------
+void vtkSegmentationHistory::ReplaceRepresentation(SegmentationState& state, vtkDataObject* oldRepresentation, vtkDataObject* newRepresentation)
+{
+  for (SegmentsMap::iterator segmentIt = state.Segments.begin(); segmentIt != state.Segments.end(); ++segmentIt)
+    {
+    std::vector<std::string> representationNames;
+    segmentIt->second->GetContainedRepresentationNames(representationNames);
+    for (std::vector<std::string>::iterator representationNameIt = representationNames.begin();
+      representationNameIt != representationNames.end(); ++representationNameIt)
+      {
+      if (segmentIt->second->GetRepresentation(*representationNameIt) == oldRepresentation)
+        {
+        segmentIt->second->AddRepresentation(*representationNameIt, newRepresentation);
+        }
+      }
+    }
+}
+
 //---------------------------------------------------------------------------
 void vtkSegmentationHistory::OnSegmentationModified(vtkObject* vtkNotUsed(caller),
   unsigned long vtkNotUsed(eid),
@@ -34,10 +34,18 @@
 
 class vtkCallbackCommand;
 class vtkDataObject;
+class vtkOrientedImageData;
 class vtkSegment;
 class vtkSegmentation;
+class vtkUnsignedCharArray;
 
 /// \ingroup SegmentationCore
+/// \brief Stores states of a segmentation to allow undo/redo of changes.
+///
+/// Only the most recent state contains complete copies of the representations.
+/// Binary labelmaps of earlier states are stored as the zlib-compressed voxels of the region
+/// that differs from the same labelmap in the next state, which makes the memory usage of
+/// a state proportional to the size of the modified region instead of the size of the segmentation.
 class vtkSegmentationCore_EXPORT vtkSegmentationHistory : public vtkObject
 {
 public:
@@ -86,6 +94,18 @@ public:
   /// Get the current number of states.
   int GetNumberOfStates();
 
+  /// Limits how much memory the stored states may use (in kibibytes, 0 means no limit).
+  /// If the stored states use more memory than the limit then the oldest states are removed.
+  /// The most recent state is always kept.
+  void SetMaximumMemoryUsage(unsigned long maximumMemoryUsageKiB);
+
+  /// Get the limit of memory that the stored states may use (in kibibytes, 0 means no limit).
+  vtkGetMacro(MaximumMemoryUsage, unsigned long);
+
+  /// Get the memory used by the stored states (in kibibytes).
+  /// Data objects that are shared between states are counted only once.
+  unsigned long GetMemoryUsage();
+
 protected:
   /// Callback function called when the segmentation has been modified.
   /// It clears all states that are more recent than the last restored state.
@@ -95,11 +115,24 @@ protected:
   void RemoveAllNextStates();
 
   /// Delete all old states so that we keep only up to MaximumNumberOfStates states
+  /// and the memory usage does not exceed MaximumMemoryUsage
   void RemoveAllObsoleteStates();
 
   /// Restores a state defined by stateIndex.
   bool RestoreState(unsigned int stateIndex);
 
+  /// Store binary labelmaps of a state as differences to the next state.
+  void StoreStateAsDelta(unsigned int stateIndex);
+
+  /// Replace binary labelmap differences of a state by complete labelmaps.
+  /// Called before removing the more recent states that the differences refer to.
+  void StoreStateAsFull(unsigned int stateIndex);
+
+  /// Get complete content of a representation of a state.
+  /// If the representation is stored as a difference then a new labelmap is returned,
+  /// otherwise the stored representation (that must not be modified) is returned.
+  vtkSmartPointer<vtkDataObject> GetFullRepresentation(unsigned int stateIndex, vtkDataObject* representation);
+
 protected:
   vtkSegmentationHistory();
   ~vtkSegmentationHistory() override;
@@ -107,16 +140,39 @@ protected:
 
   typedef std::map<std::string, vtkSmartPointer<vtkSegment> > SegmentsMap;
 
+  /// Binary labelmap stored as its difference to the same representation in the next state.
+  /// The segments of the state contain a labelmap without scalars, which only holds the geometry.
+  struct LabelmapDelta
+    {
+    /// Representation in the next state that the labelmap differs from
+    vtkSmartPointer<vtkDataObject> NextRepresentation;
+    /// Region where the labelmap differs from the next representation (empty if there is no difference)
+    int Extent[6];
+    /// zlib-compressed voxels of the labelmap in Extent
+    vtkSmartPointer<vtkUnsignedCharArray> CompressedVoxels;
+    };
+  typedef std::map<vtkDataObject*, LabelmapDelta> LabelmapDeltasMap;
+
   struct SegmentationState
     {
     SegmentsMap Segments;
     std::vector<std::string> SegmentIds; // order of segments
+    LabelmapDeltasMap LabelmapDeltas; // differences of the labelmaps in Segments, by labelmap
+    bool RestoredFromDeltas{false}; // representations are recent copies, they cannot be used as baseline
     };
 
+  /// Compute the region where labelmap differs from nextRepresentation and store its compressed voxels in delta.
+  /// \return False if the difference cannot be stored (e.g., the geometries do not match)
+  static bool ComputeLabelmapDelta(vtkOrientedImageData* labelmap, vtkDataObject* nextRepresentation, LabelmapDelta& delta);
+
+  /// Replace a representation object in all segments of a state.
+  static void ReplaceRepresentation(SegmentationState& state, vtkDataObject* oldRepresentation, vtkDataObject* newRepresentation);
+
   vtkSegmentation* Segmentation;
   vtkCallbackCommand* SegmentationModifiedCallbackCommand;
   std::deque<SegmentationState> SegmentationStates;
   unsigned int MaximumNumberOfStates;
+  unsigned long MaximumMemoryUsage;
 
   // Index of the state in SegmentationStates that was restored last.
   // If index == size of states then it means that the segmentation has changed
@@ -0,0 +1,147 @@
+/*==============================================================================
+
+  Program: 3D Slicer
+
+  See COPYRIGHT.txt
+  or http://www.slicer.org/copyright/copyright.txt for details.
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+
+==============================================================================*/
+
+// vtkTeem includes
+#include <vtkTeemNRRDReader.h>
+#include <vtkTeemNRRDWriter.h>
+
+// VTK includes
+#include <vtkImageData.h>
+#include <vtkNew.h>
+#include <vtkPointData.h>
+#include <vtkSmartPointer.h>
+
+// STD includes
+#include <cstring>
+#include <string>
+
+namespace
+{
+
+//----------------------------------------------------------------------------
+bool WriteImage(vtkImageData* image, const std::string& fileName, bool useCompression)
+{
+  vtkNew<vtkTeemNRRDWriter> writer;
+  writer->SetFileName(fileName.c_str());
+  writer->SetInputData(image);
+  writer->SetUseCompression(useCompression);
+  writer->Write();
+  if (writer->GetWriteError())
+    {
+    std::cerr << "Failed to write " << fileName << std::endl;
+    return false;
+    }
+  return true;
+}
+
+//----------------------------------------------------------------------------
+vtkSmartPointer<vtkImageData> ReadImage(const std::string& fileName, bool useMemoryMapping)
+{
+  vtkNew<vtkTeemNRRDReader> reader;
+  reader->SetFileName(fileName.c_str());
+  reader->SetUseMemoryMapping(useMemoryMapping);
+  reader->Update();
+  return reader->GetOutput();
+}
+
+//----------------------------------------------------------------------------
+bool IsSameVoxels(vtkImageData* image1, vtkImageData* image2)
+{
+  size_t dataSize = static_cast<size_t>(image1->GetNumberOfPoints()) * image1->GetScalarSize()
+    * image1->GetNumberOfScalarComponents();
+  return image2->GetNumberOfPoints() == image1->GetNumberOfPoints()
+    && image2->GetScalarType() == image1->GetScalarType()
+    && image2->GetNumberOfScalarComponents() == image1->GetNumberOfScalarComponents()
+    && memcmp(image1->GetScalarPointer(), image2->GetScalarPointer(), dataSize) == 0;
+}
+
+//----------------------------------------------------------------------------
+bool TestMemoryMappedRead(vtkImageData* image, const std::string& fileName,
+  bool useCompression, bool expectedMemoryMapped)
+{
+  if (!WriteImage(image, fileName, useCompression))
+    {
+    return false;
+    }
+
+  vtkSmartPointer<vtkImageData> readImage = ReadImage(fileName, true);
+  if (vtkTeemNRRDReader::IsMemoryMapped(readImage) != expectedMemoryMapped)
+    {
+    std::cerr << "Memory mapped state of " << fileName << " is not " << expectedMemoryMapped << std::endl;
+    return false;
+    }
+  if (!IsSameVoxels(image, readImage))
+    {
+    std::cerr << "Voxel values mismatch in " << fileName << std::endl;
+    return false;
+    }
+
+  // Modified voxels are not written into the file
+  unsigned char* voxels = static_cast<unsigned char*>(readImage->GetScalarPointer());
+  voxels[0] = static_cast<unsigned char>(voxels[0] + 1);
+  vtkSmartPointer<vtkImageData> reReadImage = ReadImage(fileName, false);
+  if (!IsSameVoxels(image, reReadImage) || vtkTeemNRRDReader::IsMemoryMapped(reReadImage))
+    {
+    std::cerr << "File " << fileName << " is changed by modifying the memory mapped image" << std::endl;
+    return false;
+    }
+  return true;
+}
+
+} // end of anonymous namespace
+
+//----------------------------------------------------------------------------
+int vtkTeemNRRDReaderTest1(int argc, char* argv[])
+{
+  if (argc != 2)
+    {
+    std::cerr << "Usage: " << argv[0] << " /path/to/temp" << std::endl;
+    return EXIT_FAILURE;
+    }
+  std::string tempDir = argv[1];
+
+  vtkNew<vtkImageData> image;
+  image->SetDimensions(64, 48, 20);
+  image->AllocateScalars(VTK_UNSIGNED_CHAR, 1);
+  unsigned char* voxels = static_cast<unsigned char*>(image->GetScalarPointer());
+  vtkIdType numberOfVoxels = image->GetNumberOfPoints();
+  for (vtkIdType i = 0; i < numberOfVoxels; ++i)
+    {
+    voxels[i] = static_cast<unsigned char>((i * 7919) % 251);
+    }
+
+  vtkNew<vtkImageData> shortImage;
+  shortImage->SetDimensions(30, 20, 10);
+  shortImage->AllocateScalars(VTK_SHORT, 1);
+  short* shortVoxels = static_cast<short*>(shortImage->GetScalarPointer());
+  numberOfVoxels = shortImage->GetNumberOfPoints();
+  for (vtkIdType i = 0; i < numberOfVoxels; ++i)
+    {
+    shortVoxels[i] = static_cast<short>((i * 7919) % 4001 - 2000);
+    }
+
+  if (// single byte voxels can always be mapped from attached header files
+      !TestMemoryMappedRead(image, tempDir + "/vtkTeemNRRDReaderTest1.nrrd", false, true)
+      // voxels in a detached data file are always aligned
+    || !TestMemoryMappedRead(image, tempDir + "/vtkTeemNRRDReaderTest1.nhdr", false, true)
+    || !TestMemoryMappedRead(shortImage, tempDir + "/vtkTeemNRRDReaderTest1Short.nhdr", false, true)
+      // compressed files are read
+    || !TestMemoryMappedRead(image, tempDir + "/vtkTeemNRRDReaderTest1Compressed.nrrd", true, false))
+    {
+    return EXIT_FAILURE;
+    }
+
+  return EXIT_SUCCESS;
+}
@@ -0,0 +1,128 @@
+/*==============================================================================
+
+  Program: 3D Slicer
+
+  See COPYRIGHT.txt
+  or http://www.slicer.org/copyright/copyright.txt for details.
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+
+==============================================================================*/
+
+// vtkTeem includes
+#include <vtkTeemNRRDReader.h>
+#include <vtkTeemNRRDWriter.h>
+
+// VTK includes
+#include <vtkImageData.h>
+#include <vtkNew.h>
+#include <vtkPointData.h>
+#include <vtkTimerLog.h>
+
+// STD includes
+#include <cstring>
+#include <string>
+
+namespace
+{
+
+//----------------------------------------------------------------------------
+bool TestWriteRead(vtkImageData* image, const std::string& fileName,
+  bool useCompression, int numberOfThreads, vtkIdType blockSize)
+{
+  vtkNew<vtkTimerLog> timer;
+  timer->StartTimer();
+  vtkNew<vtkTeemNRRDWriter> writer;
+  writer->SetFileName(fileName.c_str());
+  writer->SetInputData(image);
+  writer->SetUseCompression(useCompression);
+  writer->SetCompressionLevel(1);
+  writer->SetNumberOfThreads(numberOfThreads);
+  writer->SetCompressionBlockSize(blockSize);
+  writer->Write();
+  timer->StopTimer();
+  if (writer->GetWriteError())
+    {
+    std::cerr << "Failed to write " << fileName << std::endl;
+    return false;
+    }
+  std::cout << fileName << " (compression: " << useCompression << ", threads: " << numberOfThreads
+    << ", block size: " << blockSize << ") written in " << timer->GetElapsedTime() << "s" << std::endl;
+
+  vtkNew<vtkTeemNRRDReader> reader;
+  reader->SetFileName(fileName.c_str());
+  reader->Update();
+  vtkImageData* readImage = reader->GetOutput();
+  int* dimensions = image->GetDimensions();
+  int* readDimensions = readImage->GetDimensions();
+  if (dimensions[0] != readDimensions[0] || dimensions[1] != readDimensions[1] || dimensions[2] != readDimensions[2])
+    {
+    std::cerr << "Dimensions mismatch in " << fileName << std::endl;
+    return false;
+    }
+  if (!readImage->GetPointData()->GetScalars()
+    || readImage->GetScalarType() != image->GetScalarType())
+    {
+    std::cerr << "Scalar type mismatch in " << fileName << std::endl;
+    return false;
+    }
+  size_t dataSize = static_cast<size_t>(image->GetNumberOfPoints()) * image->GetScalarSize();
+  if (memcmp(image->GetScalarPointer(), readImage->GetScalarPointer(), dataSize) != 0)
+    {
+    std::cerr << "Voxel values mismatch in " << fileName << std::endl;
+    return false;
+    }
+  return true;
+}
+
+} // end of anonymous namespace
+
+//----------------------------------------------------------------------------
+int vtkTeemNRRDWriterTest1(int argc, char* argv[])
+{
+  if (argc != 2)
+    {
+    std::cerr << "Usage: " << argv[0] << " /path/to/temp" << std::endl;
+    return EXIT_FAILURE;
+    }
+  std::string tempDir = argv[1];
+
+  // Image that is larger than a few compression blocks
+  vtkNew<vtkImageData> image;
+  image->SetDimensions(181, 217, 60);
+  image->AllocateScalars(VTK_SHORT, 1);
+  short* voxels = static_cast<short*>(image->GetScalarPointer());
+  vtkIdType numberOfVoxels = image->GetNumberOfPoints();
+  for (vtkIdType i = 0; i < numberOfVoxels; ++i)
+    {
+    voxels[i] = static_cast<short>((i % 181) * (i % 217) % 1000 - 500 + (i * 7919) % 13);
+    }
+
+  const std::string fileName = tempDir + "/vtkTeemNRRDWriterTest1.nrrd";
+  if (!TestWriteRead(image, fileName, false, 1, 1024 * 1024)
+    || !TestWriteRead(image, fileName, true, 1, 1024 * 1024)
+    || !TestWriteRead(image, fileName, true, 4, 1024 * 1024)
+    || !TestWriteRead(image, fileName, true, 4, 32768) // more blocks than threads
+    || !TestWriteRead(image, fileName, true, 0, 32768)
+    // data is written by teem if header is detached
+    || !TestWriteRead(image, tempDir + "/vtkTeemNRRDWriterTest1.nhdr", true, 4, 32768))
+    {
+    return EXIT_FAILURE;
+    }
+
+  // Volume smaller than a compression block
+  vtkNew<vtkImageData> smallImage;
+  smallImage->SetDimensions(1, 1, 1);
+  smallImage->AllocateScalars(VTK_UNSIGNED_CHAR, 1);
+  smallImage->GetPointData()->GetScalars()->FillComponent(0, 0);
+  if (!TestWriteRead(smallImage, fileName, true, 4, 32768))
+    {
+    return EXIT_FAILURE;
+    }
+
+  return EXIT_SUCCESS;
+}
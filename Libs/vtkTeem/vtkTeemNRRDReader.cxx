@@ -47,11 +47,181 @@
 #include "vtkUnsignedShortArray.h"
 #include "vtkUnsignedIntArray.h"
 #include "vtkUnsignedLongArray.h"
+#include <vtksys/Encoding.hxx>
+#include <vtksys/FStream.hxx>
 #include <vtksys/SystemTools.hxx>
+#include <vtk_zlib.h>
 
 // Teem includes
 #include "teem/ten.h"
 
+// STD includes
+#include <algorithm>
+#include <cstring>
+#include <map>
+#include <mutex>
+#include <vector>
+
+#ifdef _WIN32
+# include <vtkWindows.h>
+#else
+# include <fcntl.h>
+# include <sys/mman.h>
+# include <unistd.h>
+#endif
+
+namespace
+{
+
+//----------------------------------------------------------------------------
+struct MemoryMappedRegion
+{
+  void* Address; // beginning of the mapped region, aligned to page boundary
+  size_t Length;
+};
+
+//----------------------------------------------------------------------------
+// Mapped regions are indexed by the pointer to the array data in the region.
+// The registry is intentionally never destroyed, as arrays may be released
+// during static destruction.
+std::map<void*, MemoryMappedRegion>& GetMemoryMappedRegions()
+{
+  static std::map<void*, MemoryMappedRegion>* regions = new std::map<void*, MemoryMappedRegion>;
+  return *regions;
+}
+
+//----------------------------------------------------------------------------
+std::mutex& GetMemoryMappedRegionsMutex()
+{
+  static std::mutex* mutex = new std::mutex;
+  return *mutex;
+}
+
+//----------------------------------------------------------------------------
+// Free function of memory mapped data arrays
+void UnmapArrayData(void* data)
+{
+  std::unique_lock<std::mutex> lock(GetMemoryMappedRegionsMutex());
+  std::map<void*, MemoryMappedRegion>& regions = GetMemoryMappedRegions();
+  std::map<void*, MemoryMappedRegion>::iterator regionIt = regions.find(data);
+  if (regionIt == regions.end())
+    {
+    return;
+    }
+  MemoryMappedRegion region = regionIt->second;
+  regions.erase(regionIt);
+  lock.unlock();
+#ifdef _WIN32
+  UnmapViewOfFile(region.Address);
+#else
+  munmap(region.Address, region.Length);
+#endif
+}
+
+//----------------------------------------------------------------------------
+// Map length bytes of the file starting at offset into memory (copy on write).
+// Returns pointer to the byte at offset, nullptr on failure.
+void* MapFile(const std::string& fileName, size_t offset, size_t length)
+{
+  MemoryMappedRegion region;
+#ifdef _WIN32
+  SYSTEM_INFO systemInfo;
+  GetSystemInfo(&systemInfo);
+  size_t alignedOffset = offset - offset % systemInfo.dwAllocationGranularity;
+  region.Length = length + offset - alignedOffset;
+  HANDLE file = CreateFileW(vtksys::Encoding::ToWide(fileName).c_str(), GENERIC_READ, FILE_SHARE_READ,
+    nullptr, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, nullptr);
+  if (file == INVALID_HANDLE_VALUE)
+    {
+    return nullptr;
+    }
+  HANDLE mapping = CreateFileMappingW(file, nullptr, PAGE_WRITECOPY, 0, 0, nullptr);
+  CloseHandle(file);
+  if (mapping == nullptr)
+    {
+    return nullptr;
+    }
+  unsigned long long mappingOffset = alignedOffset;
+  region.Address = MapViewOfFile(mapping, FILE_MAP_COPY,
+    static_cast<DWORD>(mappingOffset >> 32), static_cast<DWORD>(mappingOffset & 0xFFFFFFFF), region.Length);
+  // the view keeps the file mapping open
+  CloseHandle(mapping);
+  if (region.Address == nullptr)
+    {
+    return nullptr;
+    }
+#else
+  size_t pageSize = static_cast<size_t>(sysconf(_SC_PAGESIZE));
+  size_t alignedOffset = offset - offset % pageSize;
+  region.Length = length + offset - alignedOffset;
+  int file = open(fileName.c_str(), O_RDONLY);
+  if (file < 0)
+    {
+    return nullptr;
+    }
+  // MAP_PRIVATE: modified pages are copied, changes are not written to the file
+  region.Address = mmap(nullptr, region.Length, PROT_READ | PROT_WRITE, MAP_PRIVATE,
+    file, static_cast<off_t>(alignedOffset));
+  // the mapping keeps the file open
+  close(file);
+  if (region.Address == MAP_FAILED)
+    {
+    return nullptr;
+    }
+#endif
+  void* data = static_cast<char*>(region.Address) + (offset - alignedOffset);
+  std::lock_guard<std::mutex> lock(GetMemoryMappedRegionsMutex());
+  GetMemoryMappedRegions()[data] = region;
+  return data;
+}
+
+//----------------------------------------------------------------------------
+// Get position of the first byte after the header of a NRRD file with attached header
+// (the header is terminated by an empty line).
+bool GetAttachedHeaderLength(const std::string& fileName, size_t& headerLength)
+{
+  vtksys::ifstream file(fileName.c_str(), std::ios::in | std::ios::binary);
+  if (!file.is_open())
+    {
+    return false;
+    }
+  std::string line;
+  // first line is the magic
+  if (!std::getline(file, line))
+    {
+    return false;
+    }
+  while (std::getline(file, line))
+    {
+    if (line.empty() || line == "\r")
+      {
+      headerLength = static_cast<size_t>(file.tellg());
+      return true;
+      }
+    }
+  return false;
+}
+
+//----------------------------------------------------------------------------
+// Point data array that stores the voxels as they are in the file.
+// Tensors are converted after reading, therefore they are not stored as in the file.
+vtkDataArray* GetVoxelArray(vtkImageData* imageData, int pointDataType)
+{
+  switch (pointDataType)
+    {
+    case vtkDataSetAttributes::SCALARS:
+      return imageData->GetPointData()->GetScalars();
+    case vtkDataSetAttributes::VECTORS:
+      return imageData->GetPointData()->GetVectors();
+    case vtkDataSetAttributes::NORMALS:
+      return imageData->GetPointData()->GetNormals();
+    default:
+      return nullptr;
+    }
+}
+
+} // end of anonymous namespace
+
 vtkStandardNewMacro(vtkTeemNRRDReader);
 
 //----------------------------------------------------------------------------
@@ -62,6 +232,8 @@ vtkTeemNRRDReader::vtkTeemNRRDReader()
   this->MeasurementFrameMatrix = vtkSmartPointer<vtkMatrix4x4>::New();
   this->nrrd = nrrdNew();
   this->UseNativeOrigin = true;
+  this->UseMemoryMapping = false;
+  this->UseZlibDecompression = false;
   this->ReadStatus = 0;
   this->PointDataType = -1;
   this->DataType = -1;
@@ -212,10 +384,13 @@ int vtkTeemNRRDReader::CanReadFile(const char* filename)
   nrrdIoStateSet(nio, nrrdIoStateSkipData, 1);
 
   bool supported = true;
+  std::unique_lock<std::mutex> lock(vtkTeemNRRDReader::GetTeemMutex());
   if (nrrdLoad(nrrdTemp, filename, nio) != 0)
     {
+    free(biffGetDone(NRRD));
     supported = false;
     }
+  lock.unlock();
   if (nrrdTypeBlock == nrrdTemp->type)
     {
     supported = false;
@@ -350,6 +525,7 @@ void vtkTeemNRRDReader::ExecuteInformation()
     }
   this->CurrentFileName = this->GetFileName();
 
+  std::lock_guard<std::mutex> lock(vtkTeemNRRDReader::GetTeemMutex());
   nrrdNuke(this->nrrd); // nuke and reallocate to reset the state
   this->nrrd = nrrdNew();
 
@@ -913,6 +1089,16 @@ void vtkTeemNRRDReader::ExecuteDataWithInformation(vtkDataObject *output, vtkInf
     return;
     }
 
+  if (this->UseMemoryMapping && this->ReadDataMemoryMapped(imageData))
+    {
+    return;
+    }
+  if (this->UseZlibDecompression && this->ReadDataGzip(imageData))
+    {
+    return;
+    }
+
+  std::lock_guard<std::mutex> lock(vtkTeemNRRDReader::GetTeemMutex());
   // Read in the this->nrrd.  Yes, this means that the header is being read
   // twice: once by ExecuteInformation, and once here
   if ( nrrdLoad(this->nrrd, this->GetFileName(), nullptr) != 0 )
@@ -1098,8 +1284,202 @@ void vtkTeemNRRDReader::ExecuteDataWithInformation(vtkDataObject *output, vtkInf
   nrrdEmpty(this->nrrd);
 }
 
+//----------------------------------------------------------------------------
+bool vtkTeemNRRDReader::GetVoxelDataLocation(vtkDataArray* array, const NrrdEncoding* encoding,
+  std::string& dataFileName, size_t& dataOffset, size_t& dataLength)
+{
+  Nrrd* nrrdHeader = nrrdNew();
+  NrrdIoState* nio = nrrdIoStateNew();
+  nrrdIoStateSet(nio, nrrdIoStateSkipData, 1);
+  bool found = true;
+  std::unique_lock<std::mutex> lock(vtkTeemNRRDReader::GetTeemMutex());
+  if (nrrdLoad(nrrdHeader, this->GetFileName(), nio) != 0)
+    {
+    free(biffGetDone(NRRD));
+    found = false;
+    }
+  lock.unlock();
+
+  // Voxels must be stored as they are in memory
+  size_t elementSize = nrrdElementSize(nrrdHeader);
+  found = found
+    && nio->encoding == encoding
+    && (elementSize == 1 || nio->endian == airMyEndian())
+    && this->NrrdToVTKScalarType(nrrdHeader->type) == array->GetDataType()
+    && static_cast<vtkIdType>(nrrdElementNumber(nrrdHeader)) == array->GetNumberOfValues()
+    // byte skip of compressed data applies to the decompressed data
+    && nio->lineSkip == 0 && (nio->byteSkip == 0 || (encoding == nrrdEncodingRaw && nio->byteSkip > 0));
+  if (found)
+    {
+    // The non-scalar axis must be the fastest axis, as voxels are not permuted
+    unsigned int rangeAxisIdx[NRRD_DIM_MAX] = { 0 };
+    unsigned int rangeAxisNum = nrrdRangeAxesGet(nrrdHeader, rangeAxisIdx);
+    found = (rangeAxisNum == 0 || (rangeAxisNum == 1 && rangeAxisIdx[0] == 0));
+    }
+
+  // Find location of the voxels, which must be in a single file
+  dataOffset = 0;
+  if (found)
+    {
+    if (nio->dataFNFormat == nullptr && nio->dataFNArr->len == 0)
+      {
+      dataFileName = this->GetFileName();
+      found = GetAttachedHeaderLength(dataFileName, dataOffset);
+      }
+    else if (nio->dataFNFormat == nullptr && nio->dataFNArr->len == 1)
+      {
+      dataFileName = nio->dataFN[0];
+      if (!vtksys::SystemTools::FileIsFullPath(dataFileName))
+        {
+        dataFileName = vtksys::SystemTools::CollapseFullPath(dataFileName,
+          vtksys::SystemTools::GetFilenamePath(this->GetFileName()));
+        }
+      }
+    else
+      {
+      found = false;
+      }
+    }
+  dataOffset += found ? static_cast<size_t>(nio->byteSkip) : 0;
+  dataLength = elementSize * nrrdElementNumber(nrrdHeader);
+  found = found && dataLength > 0;
+
+  nrrdIoStateNix(nio);
+  nrrdNuke(nrrdHeader);
+  return found;
+}
+
+//----------------------------------------------------------------------------
+bool vtkTeemNRRDReader::ReadDataMemoryMapped(vtkImageData* imageData)
+{
+  vtkDataArray* array = GetVoxelArray(imageData, this->PointDataType);
+  std::string dataFileName;
+  size_t dataOffset = 0;
+  size_t dataLength = 0;
+  bool canBeMapped = array
+    && this->GetVoxelDataLocation(array, nrrdEncodingRaw, dataFileName, dataOffset, dataLength)
+    // Data pointer must be properly aligned for the voxel component type
+    && dataOffset % array->GetDataTypeSize() == 0
+    && vtksys::SystemTools::FileLength(dataFileName) >= dataOffset + dataLength;
+  if (!canBeMapped)
+    {
+    vtkDebugMacro("ReadDataMemoryMapped: voxels of " << this->GetFileName() << " cannot be memory mapped, read them instead");
+    return false;
+    }
+
+  void* data = MapFile(dataFileName, dataOffset, dataLength);
+  if (!data)
+    {
+    vtkWarningMacro("ReadDataMemoryMapped: failed to map " << dataFileName << " into memory, read it instead");
+    return false;
+    }
+  array->SetVoidArray(data, array->GetNumberOfValues(), 0, vtkAbstractArray::VTK_DATA_ARRAY_USER_DEFINED);
+  array->SetArrayFreeFunction(UnmapArrayData);
+  array->SetName("NRRDImage");
+  return true;
+}
+
+//----------------------------------------------------------------------------
+bool vtkTeemNRRDReader::ReadDataGzip(vtkImageData* imageData)
+{
+  vtkDataArray* array = GetVoxelArray(imageData, this->PointDataType);
+  std::string dataFileName;
+  size_t dataOffset = 0;
+  size_t dataLength = 0;
+  if (!array || !this->GetVoxelDataLocation(array, nrrdEncodingGzip, dataFileName, dataOffset, dataLength))
+    {
+    return false;
+    }
+  vtksys::ifstream file(dataFileName.c_str(), std::ios::in | std::ios::binary);
+  if (!file.is_open() || !file.seekg(static_cast<std::streamoff>(dataOffset)))
+    {
+    return false;
+    }
+
+  z_stream stream;
+  memset(&stream, 0, sizeof(stream));
+  // windowBits of 15+16 makes zlib expect gzip header and trailer around the deflate stream
+  if (inflateInit2(&stream, 15 + 16) != Z_OK)
+    {
+    return false;
+    }
+  std::vector<char> compressed(1024 * 1024);
+  unsigned char* voxels = static_cast<unsigned char*>(array->GetVoidPointer(0));
+  size_t decompressedLength = 0;
+  while (decompressedLength < dataLength)
+    {
+    if (stream.avail_in == 0)
+      {
+      file.read(compressed.data(), compressed.size());
+      stream.next_in = reinterpret_cast<Bytef*>(compressed.data());
+      stream.avail_in = static_cast<uInt>(file.gcount());
+      if (stream.avail_in == 0)
+        {
+        // truncated file
+        break;
+        }
+      }
+    stream.next_out = voxels + decompressedLength;
+    stream.avail_out = static_cast<uInt>(std::min<size_t>(dataLength - decompressedLength, 1 << 30));
+    uInt availableOutput = stream.avail_out;
+    int result = inflate(&stream, Z_NO_FLUSH);
+    decompressedLength += availableOutput - stream.avail_out;
+    if (result == Z_STREAM_END)
+      {
+      // data compressed on multiple threads is stored in concatenated gzip members
+      if (inflateReset(&stream) != Z_OK)
+        {
+        break;
+        }
+      }
+    else if (result != Z_OK)
+      {
+      break;
+      }
+    }
+  inflateEnd(&stream);
+  if (decompressedLength != dataLength)
+    {
+    vtkDebugMacro("ReadDataGzip: voxels of " << this->GetFileName() << " cannot be decompressed, read them using Teem");
+    return false;
+    }
+  array->SetName("NRRDImage");
+  return true;
+}
+
+//----------------------------------------------------------------------------
+std::mutex& vtkTeemNRRDReader::GetTeemMutex()
+{
+  // intentionally never destroyed, readers may be used during static destruction
+  static std::mutex* mutex = new std::mutex;
+  return *mutex;
+}
+
+//----------------------------------------------------------------------------
+bool vtkTeemNRRDReader::IsMemoryMapped(vtkImageData* imageData)
+{
+  if (!imageData)
+    {
+    return false;
+    }
+  vtkPointData* pointData = imageData->GetPointData();
+  std::lock_guard<std::mutex> lock(GetMemoryMappedRegionsMutex());
+  std::map<void*, MemoryMappedRegion>& regions = GetMemoryMappedRegions();
+  for (int arrayIndex = 0; arrayIndex < pointData->GetNumberOfArrays(); ++arrayIndex)
+    {
+    vtkDataArray* array = pointData->GetArray(arrayIndex);
+    if (array && array->GetNumberOfValues() > 0 && regions.find(array->GetVoidPointer(0)) != regions.end())
+      {
+      return true;
+      }
+    }
+  return false;
+}
+
 //----------------------------------------------------------------------------
 void vtkTeemNRRDReader::PrintSelf(ostream& os, vtkIndent indent)
 {
   this->Superclass::PrintSelf(os,indent);
+  os << indent << "UseMemoryMapping: " << (this->UseMemoryMapping ? "true" : "false") << "\n";
+  os << indent << "UseZlibDecompression: " << (this->UseZlibDecompression ? "true" : "false") << "\n";
 }
@@ -31,6 +31,7 @@
 
 #include <string>
 #include <map>
+#include <mutex>
 #include <iostream>
 
 #include "vtkTeemConfigure.h"
@@ -133,6 +134,47 @@ public:
   vtkGetMacro(NumberOfComponents,int);
 
 
+  ///
+  /// Map the voxels of uncompressed (raw encoded) files into memory instead of
+  /// reading them. Loading time is then independent of the image size and only
+  /// those parts of the file are loaded into memory that are accessed.
+  /// Mapped voxels are copied on write: they can be modified in memory but
+  /// the file is never changed. The file must not be modified or removed while
+  /// the image data is in use.
+  /// Files that cannot be mapped (compressed, different byte order, voxel data
+  /// not aligned to the voxel component size in the file, tensor data...)
+  /// are read normally. Off by default.
+  vtkSetMacro(UseMemoryMapping, bool);
+  vtkGetMacro(UseMemoryMapping, bool);
+  vtkBooleanMacro(UseMemoryMapping, bool);
+
+  ///
+  /// Decompress voxels of gzip compressed files directly with zlib instead of
+  /// using Teem. Decompression then does not hold the Teem mutex, which allows
+  /// several readers to decompress files on different threads concurrently.
+  /// Files that store their voxels in a different layout or in several data
+  /// files are read by Teem. Off by default.
+  /// \sa GetTeemMutex()
+  vtkSetMacro(UseZlibDecompression, bool);
+  vtkGetMacro(UseZlibDecompression, bool);
+  vtkBooleanMacro(UseZlibDecompression, bool);
+
+  ///
+  /// Returns true if any point data array of the image is memory mapped
+  /// from a file.
+  static bool IsMemoryMapped(vtkImageData* imageData);
+
+#ifndef __VTK_WRAP__
+  ///
+  /// Mutex that is locked while calling Teem functions that may report errors.
+  /// Teem stores error messages (biff) in global variables without synchronization,
+  /// therefore these calls must not run on several threads at the same time.
+  /// Readers lock it, which allows using them on different threads concurrently.
+  /// Voxels of gzip compressed files are decompressed without holding the lock
+  /// if UseZlibDecompression is enabled.
+  static std::mutex& GetTeemMutex();
+#endif
+
   ///
   /// Use image origin from the file
   void SetUseNativeOriginOn()
@@ -256,6 +298,8 @@ protected:
   int DataType;
   int NumberOfComponents;
   bool UseNativeOrigin;
+  bool UseMemoryMapping;
+  bool UseZlibDecompression;
 
   std::map <std::string, std::string> HeaderKeyValue;
   std::string HeaderKeys; // buffer for returning key list
@@ -268,6 +312,22 @@ protected:
 
   int tenSpaceDirectionReduce(Nrrd *nout, const Nrrd *nin, double SD[9]);
 
+  /// Set memory mapped voxels of the file in the point data array of the image.
+  /// Returns false if the file cannot be memory mapped.
+  bool ReadDataMemoryMapped(vtkImageData* imageData);
+
+  /// Decompress voxels of gzip compressed files directly into the point data array
+  /// of the image, without using Teem.
+  /// Returns false if the voxels cannot be read this way.
+  bool ReadDataGzip(vtkImageData* imageData);
+
+  /// Read the header of the file and get the location of the voxels if they are
+  /// stored with the specified encoding, in a single data file, in the same
+  /// layout, type, and byte order as in the point data array.
+  /// Returns false if the voxels are stored differently.
+  bool GetVoxelDataLocation(vtkDataArray* array, const NrrdEncoding* encoding,
+    std::string& dataFileName, size_t& dataOffset, size_t& dataLength);
+
 private:
   vtkTeemNRRDReader(const vtkTeemNRRDReader&) = delete;
   void operator=(const vtkTeemNRRDReader&) = delete;
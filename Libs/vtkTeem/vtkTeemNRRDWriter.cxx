@@ -1,4 +1,7 @@
+#include <algorithm>
+#include <cstring>
 #include <map>
+#include <vector>
 
 #include "vtkTeemNRRDWriter.h"
 
@@ -7,7 +10,10 @@
 #include "vtkPointData.h"
 #include "vtkObjectFactory.h"
 #include "vtkInformation.h"
+#include <vtkMultiThreader.h>
 #include <vtkVersion.h>
+#include <vtk_zlib.h>
+#include <vtksys/SystemTools.hxx>
 
 #include <vnl/vnl_math.h>
 #include <vnl/vnl_double_3.h>
@@ -18,6 +24,61 @@
 class AttributeMapType: public std::map<std::string, std::string> {};
 class AxisInfoMapType : public std::map<unsigned int, std::string> {};
 
+namespace
+{
+
+//----------------------------------------------------------------------------
+struct ParallelCompressionInfo
+{
+  const unsigned char* Data;
+  vtkIdType DataSize;
+  vtkIdType BlockSize;
+  vtkIdType FirstBlock;
+  vtkIdType NumberOfBlocks;
+  int CompressionLevel;
+  std::vector<std::vector<unsigned char> >* CompressedBlocks;
+  std::vector<char>* BlockSucceeded;
+};
+
+//----------------------------------------------------------------------------
+/// Compress data into a complete gzip member (header, deflate stream, trailer).
+bool CompressGzipMember(const unsigned char* data, vtkIdType size, int level, std::vector<unsigned char>& compressed)
+{
+  z_stream stream;
+  memset(&stream, 0, sizeof(stream));
+  // windowBits of 15+16 makes zlib write gzip header and trailer around the deflate stream
+  if (deflateInit2(&stream, level, Z_DEFLATED, 15 + 16, 8, Z_DEFAULT_STRATEGY) != Z_OK)
+    {
+    return false;
+    }
+  compressed.resize(deflateBound(&stream, static_cast<uLong>(size)));
+  stream.next_in = const_cast<Bytef*>(data);
+  stream.avail_in = static_cast<uInt>(size);
+  stream.next_out = compressed.data();
+  stream.avail_out = static_cast<uInt>(compressed.size());
+  int result = deflate(&stream, Z_FINISH);
+  compressed.resize(stream.total_out);
+  deflateEnd(&stream);
+  return (result == Z_STREAM_END);
+}
+
+//----------------------------------------------------------------------------
+VTK_THREAD_RETURN_TYPE CompressBlocksThreadFunction(void* arg)
+{
+  vtkMultiThreader::ThreadInfo* threadInfo = static_cast<vtkMultiThreader::ThreadInfo*>(arg);
+  ParallelCompressionInfo* info = static_cast<ParallelCompressionInfo*>(threadInfo->UserData);
+  for (vtkIdType blockIndex = threadInfo->ThreadID; blockIndex < info->NumberOfBlocks; blockIndex += threadInfo->NumberOfThreads)
+    {
+    vtkIdType offset = (info->FirstBlock + blockIndex) * info->BlockSize;
+    vtkIdType size = std::min(info->BlockSize, info->DataSize - offset);
+    (*info->BlockSucceeded)[blockIndex] = CompressGzipMember(info->Data + offset, size,
+      info->CompressionLevel, (*info->CompressedBlocks)[blockIndex]);
+    }
+  return VTK_THREAD_RETURN_VALUE;
+}
+
+} // end of anonymous namespace
+
 vtkStandardNewMacro(vtkTeemNRRDWriter);
 
 //----------------------------------------------------------------------------
@@ -31,6 +92,8 @@ vtkTeemNRRDWriter::vtkTeemNRRDWriter()
   this->UseCompression = 1;
   // use default CompressionLevel
   this->CompressionLevel = -1;
+  this->NumberOfThreads = 1;
+  this->CompressionBlockSize = 1024 * 1024;
   this->DiffusionWeightedData = 0;
   this->FileType = VTK_BINARY;
   this->WriteErrorOff();
@@ -437,8 +500,18 @@ void vtkTeemNRRDWriter::WriteData()
   // set endianness as unknown of output
   nio->endian = airEndianUnknown;
 
+  // Compress in parallel if data is written into the same file as the header
+  std::string extension = vtksys::SystemTools::LowerCase(
+    vtksys::SystemTools::GetFilenameLastExtension(this->GetFileName()));
+  if (nio->encoding == nrrdEncodingGzip && this->NumberOfThreads != 1 && extension == ".nrrd")
+    {
+    if (!this->WriteParallelCompressed(nrrd, nio))
+      {
+      this->WriteErrorOn();
+      }
+    }
   // Write the nrrd to file.
-  if (nrrdSave(this->GetFileName(), nrrd, nio))
+  else if (nrrdSave(this->GetFileName(), nrrd, nio))
     {
     char *err = biffGetDone(NRRD); // would be nice to free(err)
     vtkErrorMacro("Write: Error writing "
@@ -451,10 +524,101 @@ void vtkTeemNRRDWriter::WriteData()
   return;
 }
 
+//----------------------------------------------------------------------------
+bool vtkTeemNRRDWriter::WriteParallelCompressed(void* nrrdPtr, void* nioPtr)
+{
+  Nrrd* nrrd = static_cast<Nrrd*>(nrrdPtr);
+  NrrdIoState* nio = static_cast<NrrdIoState*>(nioPtr);
+
+  FILE* file = vtksys::SystemTools::Fopen(this->GetFileName(), "wb");
+  if (!file)
+    {
+    vtkErrorMacro("Write: Cannot open file " << this->GetFileName() << " for writing");
+    return false;
+    }
+
+  // Let teem write the header (which specifies gzip encoding) but not the data
+  nio->format = nrrdFormatNRRD;
+  nio->skipData = AIR_TRUE;
+  if (nrrdWrite(file, nrrd, nio))
+    {
+    char *err = biffGetDone(NRRD); // would be nice to free(err)
+    vtkErrorMacro("Write: Error writing header of " << this->GetFileName() << ":\n" << err);
+    fclose(file);
+    return false;
+    }
+
+  int numberOfThreads = this->NumberOfThreads;
+  if (numberOfThreads <= 0)
+    {
+    numberOfThreads = vtkMultiThreader::GetGlobalDefaultNumberOfThreads();
+    }
+  numberOfThreads = std::max(1, std::min(numberOfThreads, VTK_MAX_THREADS));
+
+  // Blocks are compressed in batches to limit the amount of memory used by compressed data
+  const vtkIdType dataSize = static_cast<vtkIdType>(nrrdElementNumber(nrrd) * nrrdElementSize(nrrd));
+  // write at least one (empty) gzip member
+  const vtkIdType totalNumberOfBlocks = std::max(static_cast<vtkIdType>(1),
+    (dataSize + this->CompressionBlockSize - 1) / this->CompressionBlockSize);
+  const vtkIdType blocksPerBatch = 4 * numberOfThreads;
+  std::vector<std::vector<unsigned char> > compressedBlocks(blocksPerBatch);
+  std::vector<char> blockSucceeded(blocksPerBatch); // not vector<bool>, elements are set from different threads
+
+  ParallelCompressionInfo info;
+  info.Data = static_cast<const unsigned char*>(nrrd->data);
+  info.DataSize = dataSize;
+  info.BlockSize = this->CompressionBlockSize;
+  info.CompressionLevel = (this->CompressionLevel < 0 ? Z_DEFAULT_COMPRESSION : this->CompressionLevel);
+  info.CompressedBlocks = &compressedBlocks;
+  info.BlockSucceeded = &blockSucceeded;
+
+  vtkNew<vtkMultiThreader> threader;
+  threader->SetSingleMethod(CompressBlocksThreadFunction, &info);
+
+  bool success = true;
+  for (vtkIdType firstBlock = 0; firstBlock < totalNumberOfBlocks && success; firstBlock += blocksPerBatch)
+    {
+    info.FirstBlock = firstBlock;
+    info.NumberOfBlocks = std::min(blocksPerBatch, totalNumberOfBlocks - firstBlock);
+    threader->SetNumberOfThreads(static_cast<int>(std::min(static_cast<vtkIdType>(numberOfThreads), info.NumberOfBlocks)));
+    threader->SingleMethodExecute();
+    // Concatenated gzip members form a valid gzip stream, they must be written in order
+    for (vtkIdType blockIndex = 0; blockIndex < info.NumberOfBlocks; ++blockIndex)
+      {
+      if (!blockSucceeded[blockIndex])
+        {
+        vtkErrorMacro("Write: Error compressing data of " << this->GetFileName());
+        success = false;
+        break;
+        }
+      const std::vector<unsigned char>& block = compressedBlocks[blockIndex];
+      if (fwrite(block.data(), 1, block.size(), file) != block.size())
+        {
+        vtkErrorMacro("Write: Error writing data of " << this->GetFileName());
+        success = false;
+        break;
+        }
+      }
+    }
+
+  if (fclose(file) != 0 && success)
+    {
+    vtkErrorMacro("Write: Error closing file " << this->GetFileName());
+    success = false;
+    }
+  return success;
+}
+
+//----------------------------------------------------------------------------
 void vtkTeemNRRDWriter::PrintSelf(ostream& os, vtkIndent indent)
 {
   this->Superclass::PrintSelf(os,indent);
 
+  os << indent << "UseCompression: " << this->UseCompression << "\n";
+  os << indent << "CompressionLevel: " << this->CompressionLevel << "\n";
+  os << indent << "NumberOfThreads: " << this->NumberOfThreads << "\n";
+  os << indent << "CompressionBlockSize: " << this->CompressionBlockSize << "\n";
+
   os << indent << "RAS to IJK Matrix: ";
      this->IJKToRASMatrix->PrintSelf(os,indent);
   os << indent << "Measurement frame: ";
@@ -58,6 +58,24 @@ public:
   vtkSetClampMacro(CompressionLevel, int, 0, 9);
   vtkGetMacro(CompressionLevel, int);
 
+  /// Number of threads used for compressing the voxel data.
+  /// If set to 1 (default) then data is compressed by teem into a single gzip stream.
+  /// If set to a different value then voxels are split into blocks that are compressed
+  /// in parallel and written as consecutive gzip members (similarly to pigz). Any NRRD reader
+  /// that uses zlib's gzip file reading (teem, ITK) reads these files, but some third-party
+  /// readers only decompress the first gzip member of a file.
+  /// 0 means that the default number of threads of vtkMultiThreader is used.
+  /// Only used for writing compressed data into a single file (.nrrd); data of detached
+  /// headers (.nhdr) is always compressed using a single thread.
+  vtkSetClampMacro(NumberOfThreads, int, 0, VTK_INT_MAX);
+  vtkGetMacro(NumberOfThreads, int);
+
+  /// Size of the uncompressed blocks (in bytes) that are compressed in parallel.
+  /// Larger blocks slightly improve compression ratio, smaller blocks allow using
+  /// more threads for small images. Default is 1MiB.
+  vtkSetClampMacro(CompressionBlockSize, vtkIdType, 32768, 1073741824);
+  vtkGetMacro(CompressionBlockSize, vtkIdType);
+
   vtkSetClampMacro(FileType,int,VTK_ASCII,VTK_BINARY);
   vtkGetMacro(FileType,int);
   void SetFileTypeToASCII() {this->SetFileType(VTK_ASCII);};
@@ -108,6 +126,10 @@ protected:
   /// Write method. It is called by vtkWriter::Write();
   void WriteData() override;
 
+  /// Write header using teem and data as gzip members compressed in parallel.
+  /// Returns false if writing failed.
+  bool WriteParallelCompressed(void* nrrd, void* nio);
+
   ///
   /// Flag to set to on when a write error occurred
   int WriteError;
@@ -122,6 +144,8 @@ protected:
 
   int UseCompression;
   int CompressionLevel;
+  int NumberOfThreads;
+  vtkIdType CompressionBlockSize;
   int FileType;
 
   AttributeMapType *Attributes;
@@ -44,6 +44,7 @@
 #include <vtkStringArray.h>
 #include <vtkTransformPolyDataFilter.h>
 #include <vtkTrivialProducer.h>
+#include <vtkUnsignedCharArray.h>
 
 // STD includes
 #include <sstream>
@@ -1849,36 +1850,137 @@ void vtkMRMLMarkupsNode::GetControlPointLabels(vtkStringArray* labels)
 //---------------------------------------------------------------------------
 void vtkMRMLMarkupsNode::SetControlPointPositionsWorld(vtkPoints* points)
 {
-  if (!points)
+  this->SetControlPointPositionsInternal(points, true);
+}
+
+//---------------------------------------------------------------------------
+void vtkMRMLMarkupsNode::SetControlPointPositions(vtkPoints* points)
+{
+  this->SetControlPointPositionsInternal(points, false);
+}
+
+//---------------------------------------------------------------------------
+void vtkMRMLMarkupsNode::SetControlPointPositionsInternal(vtkPoints* points, bool world)
+{
+  if (!points || points->GetNumberOfPoints() == 0)
     {
     this->RemoveAllControlPoints();
     return;
     }
+  int numberOfPoints = static_cast<int>(points->GetNumberOfPoints());
+  if (this->MaximumNumberOfControlPoints != 0 && numberOfPoints > this->MaximumNumberOfControlPoints)
+    {
+    vtkErrorMacro("SetControlPointPositions: number of points " << numberOfPoints <<
+                  " major than maximum number of control points allowed : " << this->MaximumNumberOfControlPoints);
+    return;
+    }
+
+  // Transform all the points at once instead of point by point
+  vtkSmartPointer<vtkPoints> localPoints = points;
+  vtkMRMLTransformNode* transformNode = this->GetParentTransformNode();
+  if (world && transformNode)
+    {
+    vtkNew<vtkGeneralTransform> transformFromWorld;
+    transformNode->GetTransformFromWorld(transformFromWorld.GetPointer());
+    localPoints = vtkSmartPointer<vtkPoints>::New();
+    transformFromWorld->TransformPoints(points, localPoints);
+    }
+
   int wasModified = this->StartModify();
-  vtkIdType numberOfPoints = points->GetNumberOfPoints();
-  for (vtkIdType pointIndex = 0; pointIndex < numberOfPoints; pointIndex++)
+  int oldNumberOfControlPoints = this->GetNumberOfControlPoints();
+  bool positionDefined = false;
+  bool positionUndefined = false;
+
+  // Remove extra control points
+  for (int pointIndex = oldNumberOfControlPoints - 1; pointIndex >= numberOfPoints; pointIndex--)
+    {
+    ControlPoint* controlPoint = this->ControlPoints[static_cast<unsigned int>(pointIndex)];
+    // Allow reusing last control point number (same as in RemoveNthControlPoint)
+    if (this->GenerateControlPointLabel(this->LastUsedControlPointNumber) == controlPoint->Label)
+      {
+      this->LastUsedControlPointNumber--;
+      }
+    if (controlPoint->PositionStatus == vtkMRMLMarkupsNode::PositionDefined)
+      {
+      positionUndefined = true;
+      }
+    delete controlPoint;
+    }
+  if (numberOfPoints < oldNumberOfControlPoints)
     {
-    double* posWorld = points->GetPoint(pointIndex);
-    if (pointIndex < this->GetNumberOfControlPoints())
+    this->ControlPoints.resize(static_cast<unsigned int>(numberOfPoints));
+    }
+
+  // Update existing control points and add new ones
+  for (int pointIndex = 0; pointIndex < numberOfPoints; pointIndex++)
+    {
+    ControlPoint* controlPoint = nullptr;
+    if (pointIndex < oldNumberOfControlPoints)
       {
-      // point already exists, just update it
-      this->SetNthControlPointPositionWorldFromArray(pointIndex, posWorld);
+      controlPoint = this->ControlPoints[static_cast<unsigned int>(pointIndex)];
       }
     else
       {
-      // need to add a new point
-      vtkMRMLMarkupsNode::AddControlPointWorld(vtkVector3d(posWorld));
+      controlPoint = new ControlPoint;
+      controlPoint->ID = this->GenerateUniqueControlPointID();
+      controlPoint->Label = this->GenerateControlPointLabel(this->LastUsedControlPointNumber);
+      this->ControlPoints.push_back(controlPoint);
+      }
+    localPoints->GetPoint(pointIndex, controlPoint->Position);
+    if (controlPoint->PositionStatus != vtkMRMLMarkupsNode::PositionDefined)
+      {
+      controlPoint->PositionStatus = vtkMRMLMarkupsNode::PositionDefined;
+      positionDefined = true;
       }
     }
-  while (this->GetNumberOfControlPoints() > numberOfPoints)
+
+  this->UpdateCurvePolyFromControlPoints();
+
+  if (numberOfPoints > oldNumberOfControlPoints)
+    {
+    this->InvokeCustomModifiedEvent(vtkMRMLMarkupsNode::PointAddedEvent);
+    }
+  else if (numberOfPoints < oldNumberOfControlPoints)
+    {
+    this->InvokeCustomModifiedEvent(vtkMRMLMarkupsNode::PointRemovedEvent);
+    }
+  this->InvokeCustomModifiedEvent(vtkMRMLMarkupsNode::PointModifiedEvent);
+  if (positionDefined)
     {
-    this->RemoveNthControlPoint(this->GetNumberOfControlPoints() - 1);
+    this->InvokeCustomModifiedEvent(vtkMRMLMarkupsNode::PointPositionDefinedEvent);
     }
+  if (positionUndefined)
+    {
+    this->InvokeCustomModifiedEvent(vtkMRMLMarkupsNode::PointPositionUndefinedEvent);
+    }
+  this->UpdateMeasurements();
   this->EndModify(wasModified);
 }
 
 //---------------------------------------------------------------------------
 void vtkMRMLMarkupsNode::GetControlPointPositionsWorld(vtkPoints* points)
+{
+  if (!points)
+    {
+    return;
+    }
+  vtkMRMLTransformNode* transformNode = this->GetParentTransformNode();
+  if (!transformNode)
+    {
+    this->GetControlPointPositions(points);
+    return;
+    }
+  // Transform all the points at once instead of point by point
+  vtkNew<vtkPoints> localPoints;
+  this->GetControlPointPositions(localPoints.GetPointer());
+  vtkNew<vtkGeneralTransform> transformToWorld;
+  transformNode->GetTransformToWorld(transformToWorld.GetPointer());
+  points->Reset();
+  transformToWorld->TransformPoints(localPoints.GetPointer(), points);
+}
+
+//---------------------------------------------------------------------------
+void vtkMRMLMarkupsNode::GetControlPointPositions(vtkPoints* points)
 {
   if (!points)
     {
@@ -1886,11 +1988,125 @@ void vtkMRMLMarkupsNode::GetControlPointPositionsWorld(vtkPoints* points)
     }
   int numberOfControlPoints = this->GetNumberOfControlPoints();
   points->SetNumberOfPoints(numberOfControlPoints);
-  double posWorld[3] = { 0.0 };
   for (int controlPointIndex = 0; controlPointIndex < numberOfControlPoints; controlPointIndex++)
     {
-    this->GetNthControlPointPositionWorld(controlPointIndex, posWorld);
-    points->SetPoint(controlPointIndex, posWorld);
+    points->SetPoint(controlPointIndex, this->ControlPoints[static_cast<unsigned int>(controlPointIndex)]->Position);
+    }
+  points->Modified();
+}
+
+//---------------------------------------------------------------------------
+void vtkMRMLMarkupsNode::SetControlPointLabels(vtkStringArray* labels)
+{
+  if (!labels)
+    {
+    vtkErrorMacro("SetControlPointLabels failed: invalid labels");
+    return;
+    }
+  int numberOfControlPoints = std::min(this->GetNumberOfControlPoints(), static_cast<int>(labels->GetNumberOfValues()));
+  bool modified = false;
+  for (int pointIndex = 0; pointIndex < numberOfControlPoints; pointIndex++)
+    {
+    ControlPoint* controlPoint = this->ControlPoints[static_cast<unsigned int>(pointIndex)];
+    const vtkStdString& label = labels->GetValue(pointIndex);
+    if (controlPoint->Label != label)
+      {
+      controlPoint->Label = label;
+      modified = true;
+      }
+    }
+  if (modified)
+    {
+    this->InvokeCustomModifiedEvent(vtkMRMLMarkupsNode::PointModifiedEvent);
+    }
+}
+
+//---------------------------------------------------------------------------
+void vtkMRMLMarkupsNode::GetControlPointSelectedFlags(vtkUnsignedCharArray* flags)
+{
+  if (!flags)
+    {
+    vtkErrorMacro("GetControlPointSelectedFlags failed: invalid flags");
+    return;
+    }
+  int numberOfControlPoints = this->GetNumberOfControlPoints();
+  flags->SetNumberOfComponents(1);
+  flags->SetNumberOfValues(numberOfControlPoints);
+  for (int pointIndex = 0; pointIndex < numberOfControlPoints; pointIndex++)
+    {
+    flags->SetValue(pointIndex, this->ControlPoints[static_cast<unsigned int>(pointIndex)]->Selected ? 1 : 0);
+    }
+}
+
+//---------------------------------------------------------------------------
+void vtkMRMLMarkupsNode::SetControlPointSelectedFlags(vtkUnsignedCharArray* flags)
+{
+  if (!flags)
+    {
+    vtkErrorMacro("SetControlPointSelectedFlags failed: invalid flags");
+    return;
+    }
+  int numberOfControlPoints = std::min(this->GetNumberOfControlPoints(), static_cast<int>(flags->GetNumberOfValues()));
+  bool modified = false;
+  for (int pointIndex = 0; pointIndex < numberOfControlPoints; pointIndex++)
+    {
+    ControlPoint* controlPoint = this->ControlPoints[static_cast<unsigned int>(pointIndex)];
+    bool selected = (flags->GetValue(pointIndex) != 0);
+    if (controlPoint->Selected != selected)
+      {
+      controlPoint->Selected = selected;
+      modified = true;
+      }
+    }
+  if (modified)
+    {
+    int wasModified = this->StartModify();
+    this->InvokeCustomModifiedEvent(vtkMRMLMarkupsNode::PointModifiedEvent);
+    this->UpdateMeasurements();
+    this->EndModify(wasModified);
+    }
+}
+
+//---------------------------------------------------------------------------
+void vtkMRMLMarkupsNode::GetControlPointVisibilityFlags(vtkUnsignedCharArray* flags)
+{
+  if (!flags)
+    {
+    vtkErrorMacro("GetControlPointVisibilityFlags failed: invalid flags");
+    return;
+    }
+  int numberOfControlPoints = this->GetNumberOfControlPoints();
+  flags->SetNumberOfComponents(1);
+  flags->SetNumberOfValues(numberOfControlPoints);
+  for (int pointIndex = 0; pointIndex < numberOfControlPoints; pointIndex++)
+    {
+    flags->SetValue(pointIndex, this->ControlPoints[static_cast<unsigned int>(pointIndex)]->Visibility ? 1 : 0);
+    }
+}
+
+//---------------------------------------------------------------------------
+void vtkMRMLMarkupsNode::SetControlPointVisibilityFlags(vtkUnsignedCharArray* flags)
+{
+  if (!flags)
+    {
+    vtkErrorMacro("SetControlPointVisibilityFlags failed: invalid flags");
+    return;
+    }
+  int numberOfControlPoints = std::min(this->GetNumberOfControlPoints(), static_cast<int>(flags->GetNumberOfValues()));
+  bool modified = false;
+  for (int pointIndex = 0; pointIndex < numberOfControlPoints; pointIndex++)
+    {
+    ControlPoint* controlPoint = this->ControlPoints[static_cast<unsigned int>(pointIndex)];
+    bool visibility = (flags->GetValue(pointIndex) != 0);
+    if (controlPoint->Visibility != visibility)
+      {
+      controlPoint->Visibility = visibility;
+      modified = true;
+      }
+    }
+  if (modified)
+    {
+    this->InvokeCustomModifiedEvent(vtkMRMLMarkupsNode::PointModifiedEvent);
     }
 }
 
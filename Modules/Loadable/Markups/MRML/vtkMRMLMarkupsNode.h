@@ -63,6 +63,7 @@ class vtkMRMLMarkupsDisplayNode;
 class vtkPolyData;
 class vtkStringArray;
 class vtkTransformPolyDataFilter;
+class vtkUnsignedCharArray;
 
 class  VTK_SLICER_MARKUPS_MODULE_MRML_EXPORT vtkMRMLMarkupsNode : public vtkMRMLDisplayableNode
 {
@@ -556,11 +557,41 @@ public:
   /// New control points are added if needed.
   /// Existing control points are updated with the new positions.
   /// Any extra existing control points are removed.
+  /// All control points are updated at once: the curve and measurements are
+  /// updated once and each Point* event is invoked once, with nullptr call data.
   void SetControlPointPositionsWorld(vtkPoints* points);
 
   /// Get a copy of all control point positions in world coordinate system
   void GetControlPointPositionsWorld(vtkPoints* points);
 
+  /// Set all control point positions from a point list in the node coordinate system.
+  /// \sa SetControlPointPositionsWorld
+  void SetControlPointPositions(vtkPoints* points);
+
+  /// Get a copy of all control point positions in the node coordinate system
+  void GetControlPointPositions(vtkPoints* points);
+
+  /// Set the labels of the first control points from a string array
+  /// (one value per control point).
+  /// A single PointModifiedEvent is invoked, with nullptr call data.
+  void SetControlPointLabels(vtkStringArray* labels);
+
+  //@{
+  /// Get/set the selected state of all control points as one value
+  /// (0 or 1) per control point.
+  /// A single PointModifiedEvent is invoked, with nullptr call data.
+  void GetControlPointSelectedFlags(vtkUnsignedCharArray* flags);
+  void SetControlPointSelectedFlags(vtkUnsignedCharArray* flags);
+  //@}
+
+  //@{
+  /// Get/set the visibility of all control points as one value
+  /// (0 or 1) per control point.
+  /// A single PointModifiedEvent is invoked, with nullptr call data.
+  void GetControlPointVisibilityFlags(vtkUnsignedCharArray* flags);
+  void SetControlPointVisibilityFlags(vtkUnsignedCharArray* flags);
+  //@}
+
 protected:
   vtkMRMLMarkupsNode();
   ~vtkMRMLMarkupsNode() override;
@@ -584,6 +615,9 @@ protected:
   /// If control point does not exist then an error is logged with the supplied failedMethodName.
   ControlPoint* GetNthControlPointCustomLog(int n, const char* failedMethodName);
 
+  /// Set all control point positions from a point list, in world or local coordinate system.
+  void SetControlPointPositionsInternal(vtkPoints* points, bool world);
+
   /// Set the id of the nth control point.
   /// The goal is to keep this ID unique, so it's
   /// managed by the markups node.
@@ -3,6 +3,7 @@ import os
 import time
 import unittest
 import vtk, qt, ctk, slicer
+import slicer.benchmark
 from slicer.ScriptedLoadableModule import *
 
 #
@@ -113,7 +114,7 @@ class AddManyMarkupsFiducialTestLogic(ScriptedLoadableModuleLogic):
     timeToAddThisFid = 0
     timeToAddLastFid = 0
 
-    testStartTime = time.clock()
+    testStartTime = time.perf_counter()
     fidNode = slicer.vtkMRMLMarkupsFiducialNode()
     slicer.mrmlScene.AddNode(fidNode)
     fidNode.CreateDefaultDisplayNodes()
@@ -127,9 +128,9 @@ class AddManyMarkupsFiducialTestLogic(ScriptedLoadableModuleLogic):
     # iterate over the number of fiducials to add
     for i in range(numToAdd):
       #    print "i = ", i, "/", numToAdd, ", r = ", r, ", a = ", a, ", s = ", s
-      t1 = time.clock()
+      t1 = time.perf_counter()
       fidNode.AddFiducial(r,a,s)
-      t2 = time.clock()
+      t2 = time.perf_counter()
       timeToAddThisFid = t2 - t1
       dt = timeToAddThisFid - timeToAddLastFid
       #print '%(index)04d\t' % {'index': i}, timeToAddThisFid, "\t", dt
@@ -141,7 +142,7 @@ class AddManyMarkupsFiducialTestLogic(ScriptedLoadableModuleLogic):
     if usefewerModifyCalls == 1:
       fidNode.EndModify(mod)
 
-    testEndTime = time.clock()
+    testEndTime = time.perf_counter()
     testTime = testEndTime - testStartTime
     print("Total time to add ",numToAdd," = ", testTime)
 
@@ -165,6 +166,8 @@ class AddManyMarkupsFiducialTestTest(ScriptedLoadableModuleTest):
     """
     self.setUp()
     self.test_AddManyMarkupsFiducialTest1()
+    self.setUp()
+    self.test_AddManyMarkupsFiducialFromArray()
 
   def test_AddManyMarkupsFiducialTest1(self):
 
@@ -182,3 +185,110 @@ class AddManyMarkupsFiducialTestTest(ScriptedLoadableModuleTest):
     logic.run(100,100)
 
     self.delayDisplay('Test passed!')
+
+  def test_AddManyMarkupsFiducialFromArray(self):
+
+    self.delayDisplay("Starting the add many Markups fiducials from array test")
+
+    for benchmarkFunction in [addManyFiducialsBenchmark, addManyFiducialsCoalescedEventsBenchmark,
+                              updateControlPointsFromArrayBenchmark, arrayFromControlPointsBenchmark]:
+      result = benchmarkFunction.benchmark.run(warmup=0, repeat=1)
+      self.assertTrue(result.succeeded)
+      self.delayDisplay("%s: %.3fs" % (result.name, result.statistics['median']))
+
+    # Modified events of the markups node are delivered only once when they are coalesced
+    broker = slicer.vtkEventBroker.GetInstance()
+    for useEventCoalescing in [False, True]:
+      state = setUpFiducialsBenchmark()
+      broker.ResetEventStatistics()
+      addFiducials(state['fidNode'], 100, False, useEventCoalescing)
+      self.delayDisplay("Event coalescing %s: %d events emitted, %d delivered"
+        % ("on" if useEventCoalescing else "off", broker.GetNumberOfEmittedEvents(), broker.GetNumberOfDeliveredEvents()))
+      if useEventCoalescing:
+        self.assertLess(broker.GetNumberOfDeliveredEvents(), broker.GetNumberOfEmittedEvents())
+      tearDownFiducialsBenchmark(state)
+
+    state = setUpArrayFromControlPointsBenchmark()
+    fidNode = state['fidNode']
+    self.assertEqual(fidNode.GetNumberOfControlPoints(), 10000)
+    self.assertEqual(fidNode.GetNthControlPointLabel(9999), 'F-10000')
+    self.assertFalse(fidNode.GetNthControlPointSelected(9999))
+    tearDownFiducialsBenchmark(state)
+
+    self.delayDisplay('Test passed!')
+
+
+#
+# Benchmarks
+#
+
+def setUpFiducialsBenchmark():
+  fidNode = slicer.vtkMRMLMarkupsFiducialNode()
+  slicer.mrmlScene.AddNode(fidNode)
+  fidNode.CreateDefaultDisplayNodes()
+  return {'fidNode': fidNode}
+
+def setUpFiducialsBenchmarkSample(state):
+  state['fidNode'].RemoveAllMarkups()
+
+def tearDownFiducialsBenchmark(state):
+  slicer.mrmlScene.RemoveNode(state['fidNode'])
+
+def addFiducials(fidNode, numToAdd, usefewerModifyCalls, useEventCoalescing=False):
+  broker = slicer.vtkEventBroker.GetInstance()
+  if useEventCoalescing:
+    broker.StartEventCoalescing()
+  if usefewerModifyCalls:
+    mod = fidNode.StartModify()
+  for i in range(numToAdd):
+    fidNode.AddFiducial(float(i)/numToAdd * 100.0 - 50.0, float(i)/numToAdd * 100.0 - 50.0, 0.0)
+  if usefewerModifyCalls:
+    fidNode.EndModify(mod)
+  if useEventCoalescing:
+    broker.EndEventCoalescing()
+
+@slicer.benchmark.benchmark("Markups.AddManyFiducials", group="Markups", warmup=1, repeat=5,
+  setUp=setUpFiducialsBenchmark, tearDown=tearDownFiducialsBenchmark, setUpSample=setUpFiducialsBenchmarkSample)
+def addManyFiducialsBenchmark(state):
+  """Add 500 fiducials to a markups fiducial node, one by one."""
+  addFiducials(state['fidNode'], 500, False)
+
+@slicer.benchmark.benchmark("Markups.AddManyFiducialsFewerModifyEvents", group="Markups", warmup=1, repeat=5,
+  setUp=setUpFiducialsBenchmark, tearDown=tearDownFiducialsBenchmark, setUpSample=setUpFiducialsBenchmarkSample)
+def addManyFiducialsFewerModifyEventsBenchmark(state):
+  """Add 500 fiducials to a markups fiducial node inside a StartModify/EndModify block."""
+  addFiducials(state['fidNode'], 500, True)
+
+@slicer.benchmark.benchmark("Markups.AddManyFiducialsCoalescedEvents", group="Markups", warmup=1, repeat=5,
+  setUp=setUpFiducialsBenchmark, tearDown=tearDownFiducialsBenchmark, setUpSample=setUpFiducialsBenchmarkSample)
+def addManyFiducialsCoalescedEventsBenchmark(state):
+  """Add 500 fiducials to a markups fiducial node, one by one, with modified events coalesced by the event broker."""
+  addFiducials(state['fidNode'], 500, False, True)
+
+def setUpControlPointArrayBenchmark():
+  import numpy as np
+  state = setUpFiducialsBenchmark()
+  numberOfControlPoints = 10000
+  state['positions'] = np.random.uniform(-50.0, 50.0, (numberOfControlPoints, 3))
+  state['labels'] = ['F-%d' % (index + 1) for index in range(numberOfControlPoints)]
+  state['selected'] = np.arange(numberOfControlPoints) % 2 == 0
+  return state
+
+@slicer.benchmark.benchmark("Markups.UpdateControlPointsFromArray", group="Markups", warmup=1, repeat=5,
+  setUp=setUpControlPointArrayBenchmark, tearDown=tearDownFiducialsBenchmark, setUpSample=setUpFiducialsBenchmarkSample)
+def updateControlPointsFromArrayBenchmark(state):
+  """Set 10000 control point positions, labels and selection states from arrays, in one call."""
+  slicer.util.updateMarkupsControlPointsFromArray(state['fidNode'], state['positions'],
+    labels=state['labels'], selected=state['selected'])
+
+def setUpArrayFromControlPointsBenchmark():
+  state = setUpControlPointArrayBenchmark()
+  updateControlPointsFromArrayBenchmark(state)
+  return state
+
+@slicer.benchmark.benchmark("Markups.ArrayFromControlPoints", group="Markups", warmup=1, repeat=10,
+  setUp=setUpArrayFromControlPointsBenchmark, tearDown=tearDownFiducialsBenchmark)
+def arrayFromControlPointsBenchmark(state):
+  """Get 10000 control point positions and selection states as arrays."""
+  slicer.util.arrayFromMarkupsControlPoints(state['fidNode'])
+  slicer.util.arrayFromMarkupsControlPointSelected(state['fidNode'])
@@ -2983,6 +2983,20 @@ void qMRMLSegmentEditorWidget::setMaximumNumberOfUndoStates(int maxNumberOfState
   d->SegmentationHistory->SetMaximumNumberOfStates(maxNumberOfStates);
 }
 
+//-----------------------------------------------------------------------------
+int qMRMLSegmentEditorWidget::maximumUndoMemoryUsage() const
+{
+  Q_D(const qMRMLSegmentEditorWidget);
+  return static_cast<int>(d->SegmentationHistory->GetMaximumMemoryUsage());
+}
+
+//-----------------------------------------------------------------------------
+void qMRMLSegmentEditorWidget::setMaximumUndoMemoryUsage(int maxMemoryUsageKiB)
+{
+  Q_D(qMRMLSegmentEditorWidget);
+  d->SegmentationHistory->SetMaximumMemoryUsage(maxMemoryUsageKiB > 0 ? maxMemoryUsageKiB : 0);
+}
+
 //------------------------------------------------------------------------------
 bool qMRMLSegmentEditorWidget::readOnly() const
 {
@@ -72,6 +72,7 @@ class Q_SLICER_MODULE_SEGMENTATIONS_WIDGETS_EXPORT qMRMLSegmentEditorWidget : pu
   Q_PROPERTY(bool switchToSegmentationsButtonVisible READ switchToSegmentationsButtonVisible WRITE setSwitchToSegmentationsButtonVisible)
   Q_PROPERTY(bool undoEnabled READ undoEnabled WRITE setUndoEnabled)
   Q_PROPERTY(int maximumNumberOfUndoStates READ maximumNumberOfUndoStates WRITE setMaximumNumberOfUndoStates)
+  Q_PROPERTY(int maximumUndoMemoryUsage READ maximumUndoMemoryUsage WRITE setMaximumUndoMemoryUsage)
   Q_PROPERTY(bool readOnly READ readOnly WRITE setReadOnly)
   Q_PROPERTY(Qt::ToolButtonStyle effectButtonStyle READ effectButtonStyle WRITE setEffectButtonStyle)
   Q_PROPERTY(bool unorderedEffectsVisible READ unorderedEffectsVisible WRITE setUnorderedEffectsVisible)
@@ -163,6 +164,8 @@ public:
   bool undoEnabled() const;
   /// Get maximum number of saved undo/redo states.
   int maximumNumberOfUndoStates() const;
+  /// Get maximum memory that saved undo/redo states may use (in kibibytes, 0 means no limit).
+  int maximumUndoMemoryUsage() const;
   /// Get whether widget is read-only
   bool readOnly() const;
 
@@ -242,6 +245,9 @@ public slots:
   void setUndoEnabled(bool);
   /// Set maximum number of saved undo/redo states.
   void setMaximumNumberOfUndoStates(int);
+  /// Set maximum memory that saved undo/redo states may use (in kibibytes, 0 means no limit).
+  /// If the limit is exceeded then the oldest states are removed.
+  void setMaximumUndoMemoryUsage(int);
   /// Set whether the widget is read-only
   void setReadOnly(bool aReadOnly);
   /// Enable/disable masking using master volume intensity
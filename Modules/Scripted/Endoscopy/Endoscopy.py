@@ -45,6 +45,9 @@ class EndoscopyWidget(ScriptedLoadableModuleWidget):
   https://github.com/Slicer/Slicer/blob/master/Base/Python/slicer/ScriptedLoadableModule.py
   """
 
+  # Widget is set up when the module is first entered
+  lazySetup = True
+
   def __init__(self, parent=None):
     ScriptedLoadableModuleWidget.__init__(self, parent)
     self.cameraNode = None
@@ -1,5 +1,6 @@
 from __future__ import print_function
 import vtk, qt, ctk, slicer
+import slicer.benchmark
 from slicer.ScriptedLoadableModule import *
 
 #
@@ -86,76 +87,39 @@ class PerformanceTestsWidget(ScriptedLoadableModuleWidget):
     self.log.ensureCursorVisible()
     self.log.repaint()
 
+  def logBenchmarkResult(self, result, details=""):
+    if not result.succeeded:
+      message = "%s %s" % (result.name, result.skipped if result.skipped else "failed")
+    else:
+      medianTime = result.statistics['median']
+      message = ("%sfps = %.1f (median %.1f ms, p95 %.1f ms, std %.2f ms per frame)"
+        % (details, 1.0/medianTime, 1000. * medianTime, 1000. * result.statistics['p95'], 1000. * result.statistics['stddev']))
+    print (message)
+    self.log.insertHtml('<i>%s</i>' % message)
+    self.log.insertPlainText('\n')
+    self.log.ensureCursorVisible()
+    self.log.repaint()
+
   def reslicing(self, iters=100):
     """ go into a loop that stresses the reslice performance
     """
-    import time
-    import math
     import numpy as np
-    sliceNode = slicer.util.getNode('vtkMRMLSliceNodeRed')
-    dims = sliceNode.GetDimensions()
-    elapsedTime = 0
-    sliceOffset = 5
-    offsetSteps = 10
-    numerOfSweeps = int(math.ceil(iters / offsetSteps))
-    renderingTimesSec = np.zeros(numerOfSweeps*offsetSteps*2)
-    sampleIndex = 0
-    startOffset = sliceNode.GetSliceOffset()
-    for i in range(numerOfSweeps):
-      for offset in ([sliceOffset]*offsetSteps + [-sliceOffset]*offsetSteps):
-        startTime = time.time()
-        sliceNode.SetSliceOffset(sliceNode.GetSliceOffset()+offset)
-        slicer.app.processEvents()
-        endTime = time.time()
-        renderingTimesSec[sampleIndex] = (endTime-startTime)
-        sampleIndex += 1
-    sliceNode.SetSliceOffset(startOffset)
-
-    resultTableName = slicer.mrmlScene.GetUniqueNameByString("Reslice performance")
-    resultTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode", resultTableName)
-    slicer.util.updateTableFromArray(resultTableNode, renderingTimesSec, "Rendering time [s]")
-
-    renderingTimeMean = np.mean(renderingTimesSec)
-    renderingTimeStd = np.std(renderingTimesSec)
-    result = ("%d x %d, fps = %.1f (%.1f +/- %.2f ms per frame) - see details in table '%s'"
-      % (dims[0], dims[1], 1.0/renderingTimeMean, 1000. * renderingTimeMean, 1000. * renderingTimeStd, resultTableNode.GetName()))
-    print (result)
-    self.log.insertHtml('<i>%s</i>' % result)
-    self.log.insertPlainText('\n')
-    self.log.ensureCursorVisible()
-    self.log.repaint()
+    result = reslicingBenchmark.benchmark.run(warmup=0, repeat=iters)
+    details = ""
+    if result.succeeded:
+      resultTableName = slicer.mrmlScene.GetUniqueNameByString("Reslice performance")
+      resultTableNode = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLTableNode", resultTableName)
+      slicer.util.updateTableFromArray(resultTableNode, np.array(result.samples), "Rendering time [s]")
+      dims = slicer.util.getNode('vtkMRMLSliceNodeRed').GetDimensions()
+      details = "%d x %d (see details in table '%s'), " % (dims[0], dims[1], resultTableNode.GetName())
+    self.logBenchmarkResult(result, details)
 
   def crosshairJump(self, iters=15):
     """ go into a loop that stresses jumping to slices by moving crosshair
     """
-    import time
-    sliceNode = slicer.util.getNode('vtkMRMLSliceNodeRed')
-    dims = sliceNode.GetDimensions()
-    layoutManager = slicer.app.layoutManager()
-    sliceViewNames = layoutManager.sliceViewNames()
-    # Order of slice view names is random, prefer 'Red' slice to make results more predictable
-    firstSliceViewName = 'Red' if 'Red' in sliceViewNames else sliceViewNames[0]
-    firstSliceWidget = layoutManager.sliceWidget(firstSliceViewName)
-    elapsedTime = 0
-    startPoint = (int(dims[0]*0.3), int(dims[1]*0.3))
-    endPoint = (int(dims[0]*0.6), int(dims[1]*0.6))
-    for i in range(iters):
-      startTime = time.time()
-      slicer.util.clickAndDrag(firstSliceWidget, button = None, modifiers = ['Shift'], start=startPoint, end=endPoint, steps=2)
-      slicer.app.processEvents()
-      endTime1 = time.time()
-      slicer.util.clickAndDrag(firstSliceWidget, button = None, modifiers = ['Shift'], start=endPoint, end=startPoint, steps=2)
-      slicer.app.processEvents()
-      endTime2 = time.time()
-      delta = ((endTime1-startTime) + (endTime2 - endTime1)) / 2.
-      elapsedTime += delta
-    fps = int(iters / elapsedTime)
-    result = "number of slice views = %d, fps = %g (%g ms per frame)" % (len(sliceViewNames), fps, 1000./fps)
-    print (result)
-    self.log.insertHtml('<i>%s</i>' % result)
-    self.log.insertPlainText('\n')
-    self.log.ensureCursorVisible()
-    self.log.repaint()
+    result = crosshairJumpBenchmark.benchmark.run(warmup=0, repeat=2*iters)
+    details = "number of slice views = %d, " % len(slicer.app.layoutManager().sliceViewNames())
+    self.logBenchmarkResult(result, details)
 
   def chartMouseOverCallback(self, mrmlID, pointIndex, x, y):
     node = slicer.util.getNode(mrmlID)
@@ -330,3 +294,109 @@ class sliceLogicTest(object):
   def testSliceLogic(self, iters):
     timeSteps(iters, self.stepSliceLogic)
 
+
+#
+# Benchmarks
+#
+
+def setUpSliceViewBenchmark():
+  """Return the benchmark state for the red slice view, showing MRHead in it."""
+  layoutManager = slicer.app.layoutManager()
+  if layoutManager is None:
+    raise slicer.benchmark.SkipBenchmark("slice views are not available without main window")
+  sliceViewNames = layoutManager.sliceViewNames()
+  # Order of slice view names is random, prefer 'Red' slice to make results more predictable
+  sliceWidget = layoutManager.sliceWidget('Red' if 'Red' in sliceViewNames else sliceViewNames[0])
+  if sliceWidget.sliceLogic().GetBackgroundLayer().GetVolumeNode() is None:
+    import SampleData
+    if not SampleData.downloadSample("MRHead"):
+      raise RuntimeError("Failed to download MRHead sample data")
+  sliceNode = sliceWidget.mrmlSliceNode()
+  return {'sliceWidget': sliceWidget, 'sliceNode': sliceNode, 'startOffset': sliceNode.GetSliceOffset(), 'step': 0}
+
+def tearDownSliceViewBenchmark(state):
+  state['sliceNode'].SetSliceOffset(state['startOffset'])
+
+@slicer.benchmark.benchmark("PerformanceTests.Reslicing", group="Rendering", warmup=10, repeat=100,
+  setUp=setUpSliceViewBenchmark, tearDown=tearDownSliceViewBenchmark)
+def reslicingBenchmark(state):
+  """Move the slice back and forth by 10 steps of 5mm and render it."""
+  sliceOffset = 5
+  offsetSteps = 10
+  offset = sliceOffset if (state['step'] // offsetSteps) % 2 == 0 else -sliceOffset
+  state['step'] += 1
+  sliceNode = state['sliceNode']
+  sliceNode.SetSliceOffset(sliceNode.GetSliceOffset()+offset)
+  slicer.app.processEvents()
+
+@slicer.benchmark.benchmark("PerformanceTests.CrosshairJump", group="Rendering", warmup=2, repeat=30,
+  setUp=setUpSliceViewBenchmark, tearDown=tearDownSliceViewBenchmark)
+def crosshairJumpBenchmark(state):
+  """Jump to slices by shift-dragging the crosshair, alternately forth and back."""
+  dims = state['sliceNode'].GetDimensions()
+  points = [(int(dims[0]*0.3), int(dims[1]*0.3)), (int(dims[0]*0.6), int(dims[1]*0.6))]
+  if state['step'] % 2:
+    points.reverse()
+  state['step'] += 1
+  slicer.util.clickAndDrag(state['sliceWidget'], button = None, modifiers = ['Shift'], start=points[0], end=points[1], steps=2)
+  slicer.app.processEvents()
+
+def lazySetupModuleNames():
+  """Return names of the scripted modules that set up their widget when the module is first entered."""
+  import sys
+  moduleNames = []
+  for moduleName in slicer.app.moduleManager().modulesNames():
+    widgetClass = getattr(sys.modules.get(moduleName), moduleName + "Widget", None)
+    if getattr(widgetClass, 'lazySetup', False):
+      moduleNames.append(moduleName)
+  return moduleNames
+
+def setUpModuleWidgetBenchmark(lazySetup):
+  """Return the benchmark state for creating widgets of scripted modules that support lazy setup.
+  Setup of these widgets is deferred if ``lazySetup`` is True and done immediately otherwise."""
+  import sys
+  moduleNames = lazySetupModuleNames()
+  if not moduleNames:
+    raise slicer.benchmark.SkipBenchmark("no scripted module supports lazy widget setup")
+  for moduleName in moduleNames:
+    getattr(sys.modules[moduleName], moduleName + "Widget").lazySetup = lazySetup
+  # Creating a widget representation replaces slicer.modules.<ModuleName>Widget
+  moduleWidgets = {moduleName: getattr(slicer.modules, moduleName + "Widget", None) for moduleName in moduleNames}
+  return {'moduleNames': moduleNames, 'moduleWidgets': moduleWidgets, 'widgetRepresentations': []}
+
+def tearDownModuleWidgetBenchmark(state):
+  import sys
+  for moduleName, moduleWidget in state['moduleWidgets'].items():
+    getattr(sys.modules[moduleName], moduleName + "Widget").lazySetup = True
+    if moduleWidget is not None:
+      setattr(slicer.modules, moduleName + "Widget", moduleWidget)
+    elif hasattr(slicer.modules, moduleName + "Widget"):
+      delattr(slicer.modules, moduleName + "Widget")
+
+def deleteModuleWidgets(state):
+  for widgetRepresentation in state['widgetRepresentations']:
+    widget = widgetRepresentation.self()
+    slicer.app.moduleManager().disconnect('moduleAboutToBeUnloaded(QString)', widget._onModuleAboutToBeUnloaded)
+    if not widget.setupPending:
+      widget.cleanup()
+    widgetRepresentation.deleteLater()
+  state['widgetRepresentations'] = []
+
+def createModuleWidgets(state):
+  """Create a new widget representation of each scripted module that supports lazy setup."""
+  for moduleName in state['moduleNames']:
+    state['widgetRepresentations'].append(slicer.util.getNewModuleGui(moduleName))
+
+@slicer.benchmark.benchmark("PerformanceTests.ModuleWidgetsLazySetup", group="Startup", warmup=1, repeat=10,
+  setUp=lambda: setUpModuleWidgetBenchmark(lazySetup=True), tearDown=tearDownModuleWidgetBenchmark,
+  tearDownSample=deleteModuleWidgets)
+def moduleWidgetsLazySetupBenchmark(state):
+  """Create widgets of scripted modules that support lazy setup, deferring their setup."""
+  createModuleWidgets(state)
+
+@slicer.benchmark.benchmark("PerformanceTests.ModuleWidgetsEagerSetup", group="Startup", warmup=1, repeat=10,
+  setUp=lambda: setUpModuleWidgetBenchmark(lazySetup=False), tearDown=tearDownModuleWidgetBenchmark,
+  tearDownSample=deleteModuleWidgets)
+def moduleWidgetsEagerSetupBenchmark(state):
+  """Create widgets of scripted modules that support lazy setup, setting them up immediately."""
+  createModuleWidgets(state)
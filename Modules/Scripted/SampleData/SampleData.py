@@ -178,7 +178,7 @@ class SampleDataSource(object):
           ext = os.path.splitext(fileName.lower())[1]
           if ext in [".mrml", ".mrb"]:
             fileType = "SceneFile"
-          elif ext in [".zip"]:
+          elif slicer.util.splitArchiveExtension(fileName)[1] is not None:
             fileType = "ZipFile"
       updatedFileType.append(fileType)
 
@@ -487,6 +487,10 @@ class SampleDataLogic(object):
   def __init__(self, logMessage=None):
     if logMessage:
       self.logMessage = logMessage
+    self.maximumNumberOfConcurrentDownloads = 4
+    self.maximumNumberOfResumeAttempts = 5
+    self.downloadChunkSize = 1024 * 1024
+    self.downloadPercent = 0
     self.builtInCategoryName = 'BuiltIn'
     self.developmentCategoryName = 'Development'
     self.registerBuiltInSampleDataSources()
@@ -564,6 +568,10 @@ class SampleDataLogic(object):
   def downloadFileIntoCache(self, uri, name, checksum=None):
     """Given a uri and and a filename, download the data into
     a file of the given name in the scene's cache"""
+    return self.downloadFile(uri, self.cacheFolderPath(), name, checksum)
+
+  def cacheFolderPath(self):
+    """Return the scene's cache folder, created if it does not exist."""
     destFolderPath = slicer.mrmlScene.GetCacheManager().GetRemoteCacheDirectory()
 
     if not os.access(destFolderPath, os.W_OK):
@@ -573,14 +581,71 @@ class SampleDataLogic(object):
         self.logMessage('<b>Failed to create cache folder %s</b>' % destFolderPath, logging.ERROR)
       if not os.access(destFolderPath, os.W_OK):
         self.logMessage('<b>Cache folder %s is not writable</b>' % destFolderPath, logging.ERROR)
-    return self.downloadFile(uri, destFolderPath, name, checksum)
+    return destFolderPath
+
+  def downloadFilesIntoCache(self, uris, names, checksums):
+    """Download several files into the scene's cache.
+
+    Independent files are downloaded concurrently, using up to
+    ``maximumNumberOfConcurrentDownloads`` worker threads. The workers do not
+    call ``logMessage`` (which updates the user interface): their messages are
+    queued and logged by the calling thread, which must be the main thread.
+
+    Returns a list with one entry per uri, either the downloaded file path
+    or the :class:`ValueError` raised while downloading it.
+    """
+    import concurrent.futures
+    import queue
+
+    if len(uris) < 2 or self.maximumNumberOfConcurrentDownloads < 2:
+      results = []
+      for uri,name,checksum in zip(uris,names,checksums):
+        try:
+          results.append(self.downloadFileIntoCache(uri, name, checksum))
+        except ValueError as e:
+          results.append(e)
+      return results
+
+    destFolderPath = self.cacheFolderPath()
+    pendingMessages = queue.Queue()
+
+    def queueMessage(message, logLevel=logging.INFO):
+      pendingMessages.put((message, logLevel))
+
+    def logPendingMessages():
+      while not pendingMessages.empty():
+        self.logMessage(*pendingMessages.get())
+
+    try:
+      with concurrent.futures.ThreadPoolExecutor(max_workers=self.maximumNumberOfConcurrentDownloads) as executor:
+        # The same file name is downloaded only once
+        futures = {}
+        for uri,name,checksum in zip(uris,names,checksums):
+          if name not in futures:
+            futures[name] = executor.submit(self.downloadFile, uri, destFolderPath, name, checksum, queueMessage)
+        notDone = set(futures.values())
+        while notDone:
+          _, notDone = concurrent.futures.wait(notDone, timeout=0.1)
+          logPendingMessages()
+    finally:
+      logPendingMessages()
+
+    results = []
+    for name in names:
+      try:
+        results.append(futures[name].result())
+      except ValueError as e:
+        results.append(e)
+    return results
 
   def downloadSourceIntoCache(self, source):
     """Download all files for the given source and return a
     list of file paths for the results"""
     filePaths = []
-    for uri,fileName,checksum in zip(source.uris,source.fileNames,source.checksums):
-      filePaths.append(self.downloadFileIntoCache(uri, fileName, checksum))
+    for filePath in self.downloadFilesIntoCache(source.uris, source.fileNames, source.checksums):
+      if isinstance(filePath, ValueError):
+        raise filePath
+      filePaths.append(filePath)
     return filePaths
 
   def downloadFromSource(self,source,attemptCount=0):
@@ -594,7 +659,8 @@ class SampleDataLogic(object):
 
       - if nodeName is specified, appends loaded nodes but if ``loadFile`` is False appends downloaded filepath
       - if fileType is ``SceneFile``, appends downloaded filepath
-      - if fileType is ``ZipFile``, appends directory of extracted archive but if ``loadFile`` is False appends downloaded filepath
+      - if fileType is ``ZipFile`` (any archive format supported by :func:`slicer.util.extractArchive`),
+        appends directory of extracted archive but if ``loadFile`` is False appends downloaded filepath
 
     If no ``nodeNames`` and no ``fileTypes`` are specified or if ``loadFiles`` are all False,
     returns the list of all downloaded filepaths.
@@ -602,11 +668,16 @@ class SampleDataLogic(object):
     nodes = []
     filePaths = []
 
-    for uri,fileName,nodeName,checksum,loadFile,loadFileType in zip(source.uris,source.fileNames,source.nodeNames,source.checksums,source.loadFiles,source.loadFileType):
+    # Files are downloaded concurrently, then loaded one after the other in the source order
+    downloadedFilePaths = self.downloadFilesIntoCache(source.uris, source.fileNames, source.checksums)
+
+    for uri,fileName,nodeName,checksum,loadFile,loadFileType,downloadedFilePath in zip(source.uris,source.fileNames,source.nodeNames,source.checksums,source.loadFiles,source.loadFileType,downloadedFilePaths):
 
       current_source = SampleDataSource(uris=uri, fileNames=fileName, nodeNames=nodeName, checksums=checksum, loadFiles=loadFile, loadFileType=loadFileType, loadFileProperties=source.loadFileProperties)
       try:
-        filePath = self.downloadFileIntoCache(uri, fileName, checksum)
+        if isinstance(downloadedFilePath, ValueError):
+          raise downloadedFilePath
+        filePath = downloadedFilePath
       except ValueError:
         if attemptCount < 5:
           attemptCount += 1
@@ -619,9 +690,10 @@ class SampleDataLogic(object):
         if loadFile == False:
           nodes.append(filePath)
           continue
-        outputDir = slicer.mrmlScene.GetCacheManager().GetRemoteCacheDirectory() + "/" + os.path.splitext(os.path.basename(filePath))[0]
+        outputDir = slicer.mrmlScene.GetCacheManager().GetRemoteCacheDirectory() + "/" + slicer.util.splitArchiveExtension(os.path.basename(filePath))[0]
         qt.QDir().mkpath(outputDir)
-        success = slicer.util.extractArchive(filePath, outputDir)
+        self.logMessage('<b>Extracting</b> <i>%s</i> ...' % fileName)
+        success = slicer.util.extractArchive(filePath, outputDir, checksum=checksum, progressCallback=self.extractionProgressCallback())
         if not success and attemptCount < 5:
           file = qt.QFile(filePath)
           if not file.remove():
@@ -785,6 +857,11 @@ class SampleDataLogic(object):
     return "%3.1f %s" % (size, 'TB')
 
   def reportHook(self,blocksSoFar,blockSize,totalSize):
+    """Log download progress, in the form of a ``urllib.request.urlretrieve`` report hook.
+
+    Kept for backward compatibility, downloads of this module report their progress
+    using ``logMessage``.
+    """
     # we clamp to 100% because the blockSize might be larger than the file itself
     percent = min(int((100. * blocksSoFar * blockSize) / totalSize), 100)
     if percent == 100 or (percent - self.downloadPercent >= 10):
@@ -794,49 +871,166 @@ class SampleDataLogic(object):
       self.logMessage('<i>Downloaded %s (%d%% of %s)...</i>' % (humanSizeSoFar, percent, humanSizeTotal))
       self.downloadPercent = percent
 
-  def downloadFile(self, uri, destFolderPath, name, checksum=None):
+  def extractionProgressCallback(self):
+    """Return a callback for :func:`slicer.util.extractArchive` logging progress every 10%."""
+    reportedPercent = [0]
+    def progressCallback(processedSize, totalSize):
+      if totalSize <= 0:
+        return
+      percent = min(int((100. * processedSize) / totalSize), 100)
+      if percent - reportedPercent[0] >= 10:
+        self.logMessage('<i>Extracted %d%%...</i>' % percent)
+        reportedPercent[0] = percent
+    return progressCallback
+
+  def downloadFile(self, uri, destFolderPath, name, checksum=None, logMessage=None):
     """
     :param uri: Download URL.
     :param destFolderPath: Folder to download the file into.
     :param name: File name that will be downloaded.
     :param checksum: Checksum formatted as ``<algo>:<digest>`` to verify the downloaded file. For example, ``SHA256:cc211f0dfd9a05ca3841ce1141b292898b2dd2d3f08286affadf823a7e58df93``.
+    :param logMessage: Function called with ``(message, logLevel)`` to report progress, ``logMessage`` by default.
+
+    The checksum is computed while the file is downloaded. Files are recorded in the data
+    cache manifest (see :func:`slicer.util.registerCachedFile`) so that a file with the
+    same checksum, referenced by a different source or name, is reused instead of being
+    downloaded and verified again, and least recently used data is evicted when the cache
+    exceeds its quota (see :func:`slicer.util.evictDataCache`).
     """
+    if logMessage is None:
+      logMessage = self.logMessage
     filePath = destFolderPath + '/' + name
     (algo, digest) = extractAlgoAndDigest(checksum)
     if not os.path.exists(filePath) or os.stat(filePath).st_size == 0:
-      import urllib.request, urllib.parse, urllib.error
-      self.logMessage('<b>Requesting download</b> <i>%s</i> from %s ...' % (name, uri))
-      # add a progress bar
-      self.downloadPercent = 0
+      if algo is not None:
+        cachedFilePath = slicer.util.findFileByChecksum(checksum)
+        if cachedFilePath is not None:
+          logMessage('<b>File with the same checksum already exists in cache - reusing it.</b>')
+          slicer.util.linkOrCopyFile(cachedFilePath, filePath)
+          slicer.util.registerCachedFile(filePath, checksum)
+          return filePath
+      # Data is downloaded into a ".part" file that is renamed once complete and verified,
+      # an interrupted download is resumed from the ".part" file.
+      partFilePath = filePath + '.part'
+      logMessage('<b>Requesting download</b> <i>%s</i> from %s ...' % (name, uri))
       try:
-        urllib.request.urlretrieve(uri, filePath, self.reportHook)
-        self.logMessage('<b>Download finished</b>')
+        current_digest = self.downloadFileWithResume(uri, partFilePath, algo, logMessage)
+        logMessage('<b>Download finished</b>')
       except IOError as e:
-        self.logMessage('<b>\tDownload failed: %s</b>' % e, logging.ERROR)
+        logMessage('<b>\tDownload failed: %s</b>' % e, logging.ERROR)
         raise ValueError(f"Failed to download {uri} to {filePath}")
 
       if algo is not None:
-        self.logMessage('<b>Verifying checksum</b>')
-        current_digest = computeChecksum(algo, filePath)
         if current_digest != digest:
-          self.logMessage('<b>Checksum verification failed. Computed checksum %s different from expected checksum %s</b>' % (current_digest, digest))
-          qt.QFile(filePath).remove()
+          logMessage('<b>Checksum verification failed. Computed checksum %s different from expected checksum %s</b>' % (current_digest, digest))
+          os.remove(partFilePath)
+          return filePath
         else:
-          self.logMessage('<b>Checksum OK</b>')
+          logMessage('<b>Checksum OK</b>')
+      os.replace(partFilePath, filePath)
+      slicer.util.registerCachedFile(filePath, checksum)
     else:
       if algo is not None:
-        self.logMessage('<b>Verifying checksum</b>')
-        current_digest = computeChecksum(algo, filePath)
+        if slicer.util.findFileByChecksum(checksum, filePath) is not None:
+          logMessage('<b>File already exists and checksum was already verified - reusing it.</b>')
+          return filePath
+        logMessage('<b>Verifying checksum</b>')
+        current_digest = computeChecksum(algo, filePath, self.downloadChunkSize)
         if current_digest != digest:
-          self.logMessage('<b>File already exists in cache but checksum is different - re-downloading it.</b>')
-          qt.QFile(filePath).remove()
-          return self.downloadFile(uri, destFolderPath, name, checksum)
+          logMessage('<b>File already exists in cache but checksum is different - re-downloading it.</b>')
+          os.remove(filePath)
+          return self.downloadFile(uri, destFolderPath, name, checksum, logMessage)
         else:
-          self.logMessage('<b>File already exists and checksum is OK - reusing it.</b>')
+          logMessage('<b>File already exists and checksum is OK - reusing it.</b>')
+          slicer.util.registerCachedFile(filePath, checksum)
       else:
-        self.logMessage('<b>File already exists in cache - reusing it.</b>')
+        logMessage('<b>File already exists in cache - reusing it.</b>')
+        slicer.util.registerCachedFile(filePath)
     return filePath
 
+  def downloadFileWithResume(self, uri, partFilePath, algo=None, logMessage=None):
+    """Download ``uri`` into ``partFilePath``.
+
+    If ``partFilePath`` already contains data, only the remaining bytes are requested
+    using an HTTP ``Range`` header. An interrupted transfer is resumed up to
+    ``maximumNumberOfResumeAttempts`` times. If the server does not support ranges,
+    the bytes already received are skipped.
+
+    If ``algo`` is specified, returns the digest of the file computed while the
+    data is received, otherwise returns None.
+
+    Progress is reported using ``logMessage`` (see :meth:`downloadFile`).
+
+    Raises :class:`IOError` if the file could not be completely downloaded.
+    """
+    import hashlib
+    import http.client
+    if logMessage is None:
+      logMessage = self.logMessage
+    hash = None
+    if algo is not None:
+      hash = hashlib.new(algo)
+      # Only the bytes of a partial file downloaded earlier have to be read back
+      if os.path.exists(partFilePath):
+        with open(partFilePath, 'rb') as partFile:
+          for chunk in iter(lambda: partFile.read(self.downloadChunkSize), b''):
+            hash.update(chunk)
+    for attempt in range(self.maximumNumberOfResumeAttempts + 1):
+      try:
+        self._downloadRemainingBytes(uri, partFilePath, hash, logMessage)
+        return hash.hexdigest() if hash is not None else None
+      except (IOError, http.client.HTTPException) as e:
+        error = e
+        if attempt < self.maximumNumberOfResumeAttempts:
+          logMessage('<b>Download of %s interrupted (%s), resuming (%d of %d attempts)...</b>'
+            % (uri, e, attempt + 1, self.maximumNumberOfResumeAttempts), logging.WARNING)
+    raise IOError(error)
+
+  def _downloadRemainingBytes(self, uri, partFilePath, hash, logMessage):
+    import urllib.request, urllib.error
+    receivedSize = os.path.getsize(partFilePath) if os.path.exists(partFilePath) else 0
+    request = urllib.request.Request(uri)
+    if receivedSize > 0:
+      request.add_header('Range', 'bytes=%d-' % receivedSize)
+    try:
+      response = urllib.request.urlopen(request)
+    except urllib.error.HTTPError as e:
+      if e.code == 416 and receivedSize > 0:
+        # Range not satisfiable: the partial file is already complete
+        return
+      raise
+    with response:
+      contentLength = response.headers.get('Content-Length')
+      if receivedSize > 0 and response.getcode() != 206:
+        # The server ignored the range request, skip the bytes already received
+        skippedSize = 0
+        while skippedSize < receivedSize:
+          chunk = response.read(min(self.downloadChunkSize, receivedSize - skippedSize))
+          if not chunk:
+            raise IOError("connection closed after receiving %d of %d already received bytes" % (skippedSize, receivedSize))
+          skippedSize += len(chunk)
+        totalSize = int(contentLength) if contentLength is not None else -1
+      else:
+        totalSize = receivedSize + int(contentLength) if contentLength is not None else -1
+      reportedPercent = 0
+      with open(partFilePath, 'ab') as partFile:
+        while True:
+          chunk = response.read(self.downloadChunkSize)
+          if not chunk:
+            break
+          partFile.write(chunk)
+          if hash is not None:
+            hash.update(chunk)
+          receivedSize += len(chunk)
+          if totalSize > 0:
+            percent = min(int((100. * receivedSize) / totalSize), 100)
+            if percent == 100 or (percent - reportedPercent >= 10):
+              logMessage('<i>Downloaded %s (%d%% of %s)...</i>' % (
+                self.humanFormatSize(receivedSize), percent, self.humanFormatSize(totalSize)))
+              reportedPercent = percent
+    if totalSize >= 0 and receivedSize < totalSize:
+      raise IOError("connection closed after receiving %d of %d bytes" % (receivedSize, totalSize))
+
   def loadScene(self, uri,  fileProperties = {}):
     self.logMessage('<b>Requesting load</b> %s ...' % uri)
     fileProperties['fileName'] = uri
@@ -907,6 +1101,8 @@ class SampleDataTest(ScriptedLoadableModuleTest):
       self.test_isSampleDataSourceRegistered,
       self.test_customDownloader,
       self.test_categoryForSource,
+      self.test_downloadFile_resumeInterruptedDownload,
+      self.test_downloadFromSource_concurrentDownloads,
     ]:
       self.setUp()
       test()
@@ -1116,3 +1312,98 @@ class SampleDataTest(ScriptedLoadableModuleTest):
     logic = SampleDataLogic()
     source = slicer.modules.sampleDataSources[logic.builtInCategoryName][0]
     self.assertEqual(logic.categoryForSource(source), logic.builtInCategoryName)
+
+  @staticmethod
+  def startInterruptingHTTPServer(contents, interruptAfter):
+    """Start a local HTTP server serving ``contents``, a dictionary mapping URL paths to bytes.
+
+    The first request of each path is interrupted after sending ``interruptAfter`` bytes,
+    requests with a ``Range`` header are answered with the requested bytes.
+
+    Returns the server and the dictionary of ``Range`` headers received for each path.
+    """
+    import http.server
+    import threading
+
+    requestedRanges = {}
+
+    class InterruptingRequestHandler(http.server.BaseHTTPRequestHandler):
+      def do_GET(self):
+        content = contents.get(self.path)
+        if content is None:
+          self.send_error(404)
+          return
+        rangeHeader = self.headers.get('Range')
+        firstRequest = self.path not in requestedRanges
+        requestedRanges.setdefault(self.path, []).append(rangeHeader)
+        if rangeHeader is None:
+          self.send_response(200)
+          self.send_header('Content-Length', str(len(content)))
+          self.end_headers()
+          # Simulate a connection dropped in the middle of the transfer
+          self.wfile.write(content[:interruptAfter] if firstRequest else content)
+          return
+        start = int(rangeHeader.split('=')[1].split('-')[0])
+        self.send_response(206)
+        self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, len(content) - 1, len(content)))
+        self.send_header('Content-Length', str(len(content) - start))
+        self.end_headers()
+        self.wfile.write(content[start:])
+
+      def log_message(self, format, *args):
+        pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), InterruptingRequestHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, requestedRanges
+
+  @staticmethod
+  def removeFromCache(fileName):
+    filePath = slicer.mrmlScene.GetCacheManager().GetRemoteCacheDirectory() + '/' + fileName
+    for path in [filePath, filePath + '.part']:
+      if os.path.exists(path):
+        os.remove(path)
+    return filePath
+
+  def test_downloadFile_resumeInterruptedDownload(self):
+    import hashlib
+    content = bytes(range(256)) * 1024
+    server, requestedRanges = self.startInterruptingHTTPServer({'/data.bin': content}, interruptAfter=100000)
+    try:
+      logic = SampleDataLogic()
+      filePath = self.removeFromCache('SampleDataTest-resume.bin')
+      checksum = 'SHA256:' + hashlib.sha256(content).hexdigest()
+      uri = 'http://127.0.0.1:%d/data.bin' % server.server_address[1]
+      self.assertEqual(logic.downloadFileIntoCache(uri, 'SampleDataTest-resume.bin', checksum), filePath)
+    finally:
+      server.shutdown()
+      server.server_close()
+    self.assertEqual(requestedRanges['/data.bin'], [None, 'bytes=100000-'])
+    self.assertFalse(os.path.exists(filePath + '.part'))
+    with open(filePath, 'rb') as downloadedFile:
+      self.assertEqual(downloadedFile.read(), content)
+
+  def test_downloadFromSource_concurrentDownloads(self):
+    import hashlib
+    contents = {'/data%d.bin' % index: bytes([index]) * (200000 + index) for index in range(3)}
+    server, requestedRanges = self.startInterruptingHTTPServer(contents, interruptAfter=50000)
+    try:
+      logic = SampleDataLogic()
+      paths = sorted(contents.keys())
+      fileNames = ['SampleDataTest-concurrent%s' % path[1:] for path in paths]
+      for fileName in fileNames:
+        self.removeFromCache(fileName)
+      filePaths = logic.downloadFromSource(SampleDataSource(
+        uris=['http://127.0.0.1:%d%s' % (server.server_address[1], path) for path in paths],
+        fileNames=fileNames,
+        checksums=['SHA256:' + hashlib.sha256(contents[path]).hexdigest() for path in paths]))
+    finally:
+      server.shutdown()
+      server.server_close()
+    self.assertEqual(len(filePaths), 3)
+    for path, filePath in zip(paths, filePaths):
+      self.assertEqual(requestedRanges[path], [None, 'bytes=50000-'])
+      with open(filePath, 'rb') as downloadedFile:
+        self.assertEqual(downloadedFile.read(), contents[path])
@@ -44,6 +44,9 @@ class ScreenCaptureWidget(ScriptedLoadableModuleWidget):
   https://github.com/Slicer/Slicer/blob/master/Base/Python/slicer/ScriptedLoadableModule.py
   """
 
+  # Widget is set up when the module is first entered
+  lazySetup = True
+
   def setup(self):
     ScriptedLoadableModuleWidget.setup(self)
 
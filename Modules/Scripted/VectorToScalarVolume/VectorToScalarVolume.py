@@ -84,6 +84,9 @@ class VectorToScalarVolumeWidget(ScriptedLoadableModuleWidget, VTKObservationMix
   The user selected parameters are stored in a parameterNode.
   """
 
+  # Widget is set up when the module is first entered
+  lazySetup = True
+
   def __init__(self, parent=None):
     ScriptedLoadableModuleWidget.__init__(self, parent)
     VTKObservationMixin.__init__(self)
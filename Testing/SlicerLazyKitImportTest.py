@@ -0,0 +1,63 @@
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+import time
+
+# prevents dashboard from truncating output of this test.
+print("Enabling CTEST_FULL_OUTPUT\n", file=sys.stderr)
+
+def coldImportTime(lazyKitLoading, repeat=5):
+  """Return the shortest time (in seconds) to run ``import slicer`` in a new interpreter."""
+  env = dict(os.environ)
+  env["SLICER_LAZY_KIT_LOADING"] = "1" if lazyKitLoading else "0"
+  times = []
+  for _ in range(repeat):
+    startTime = time.perf_counter()
+    subprocess.check_call([sys.executable, "-c", "import slicer"], env=env)
+    times.append(time.perf_counter() - startTime)
+  return min(times)
+
+print("\nChecking lazy kit loading...", file=sys.stderr)
+
+os.environ["SLICER_LAZY_KIT_LOADING"] = "1"
+import slicer
+
+lazyKits = sorted(slicer._lazyKits)
+if not lazyKits:
+  print("\t----> class index of the kits is not available, nothing to test.", file=sys.stderr)
+  os._exit(0)
+
+try:
+  for kit in lazyKits:
+    assert kit not in sys.modules, "%s is imported before any of its classes is accessed" % kit
+    className = sorted(name for name, classKit in slicer._lazyKitClasses.items() if classKit == kit)[0]
+    assert className in dir(slicer)
+    getattr(slicer, className)
+    assert kit in sys.modules, "%s is not imported after accessing slicer.%s" % (kit, className)
+    print("\t%s imported on first access of slicer.%s" % (kit, className), file=sys.stderr)
+
+  if "mrml" in lazyKits:
+    scene = slicer.vtkMRMLScene()
+    assert scene.IsA("vtkMRMLScene")
+
+  try:
+    slicer.vtkClassThatDoesNotExist
+    raise AssertionError("slicer.vtkClassThatDoesNotExist did not raise AttributeError")
+  except AttributeError:
+    pass
+
+except AssertionError as detail:
+  print("\t----> lazy kit loading FAILED: %s" % detail, file=sys.stderr)
+  os._exit(1)
+
+print("\t----> lazy kit loading WORKS!", file=sys.stderr)
+
+print("\nMeasuring cold import time of 'import slicer'...", file=sys.stderr)
+eagerTime = coldImportTime(lazyKitLoading=False)
+lazyTime = coldImportTime(lazyKitLoading=True)
+print("\tall kits imported: %.1f ms" % (eagerTime * 1000.0), file=sys.stderr)
+print("\tlazy kit loading:  %.1f ms" % (lazyTime * 1000.0), file=sys.stderr)
+
+os._exit(0)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+import re
+import sys
+
+#-----------------------------------------------------------------------------
+def writeFile(path, content):
+  # Test if file already contains desired content
+  if os.path.exists(path):
+    try:
+      with open(path, "rt") as f:
+        if f.read() == content:
+          return
+
+    except:
+      pass
+
+  # Write file
+  with open(path, "wt") as f:
+    f.write(content)
+
+#-----------------------------------------------------------------------------
+def readClassNames(hierarchy_path):
+  """Return names of the classes listed in a VTK wrapping hierarchy file.
+
+  Each line of the file describes a class, an enum or a typedef::
+
+    vtkMRMLNode : vtkObject ; vtkMRMLNode.h ; MRMLCore
+    vtkMRMLNode::Content : enum ; vtkMRMLNode.h ; MRMLCore
+    vtkMRMLIdType = int ; vtkMRMLNode.h ; MRMLCore
+  """
+  names = []
+  with open(hierarchy_path, "rt") as f:
+    for line in f:
+      declaration = line.split(";")[0].strip()
+      if not declaration or "=" in declaration or re.search(r":\s*enum\b", declaration):
+        continue
+      name = re.match(r"[^\s:<]*", declaration).group(0)
+      if not name or "::" in name:
+        continue
+      names.append(name)
+  return names
+
+#-----------------------------------------------------------------------------
+def main(argv):
+  parser = argparse.ArgumentParser(description="Slicer Python kits class index generator")
+
+  parser.add_argument("-o", dest="out_path", metavar="PATH", default="-",
+                      help="location to which to write the output .py file"
+                           " (default=stdout)")
+  parser.add_argument("kit_hierarchies", nargs="*", metavar="KIT=HIERARCHY_FILE",
+                      help="name of a python kit and a wrapping hierarchy file of"
+                           " one of the libraries it loads")
+
+  args = parser.parse_args(argv)
+
+  kit_classes = {}
+  for kit_hierarchy in args.kit_hierarchies:
+    kit, hierarchy_path = kit_hierarchy.split("=", 1)
+    if not os.path.exists(hierarchy_path):
+      print("warning: %s hierarchy file not found: %s" % (kit, hierarchy_path), file=sys.stderr)
+      continue
+    for name in readClassNames(hierarchy_path):
+      # Importing all kits in order would also let a later kit override a class
+      kit_classes[name] = kit
+
+  content = [
+    "# This file was automatically generated by %s" % os.path.basename(__file__),
+    "# It maps the names of the classes of VTK-wrapped kits to the kit providing them.",
+    "",
+    "kit_classes = {"]
+  content += ["  %r: %r," % (name, kit_classes[name]) for name in sorted(kit_classes)]
+  content += ["  }"]
+
+  content = "\n".join(content) + "\n"
+
+  if args.out_path == "-":
+    sys.stdout.write(content)
+
+  else:
+    writeFile(args.out_path, content)
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+
+if __name__ == "__main__":
+  main(sys.argv[1:])